@@ -57,6 +57,17 @@ app.include_router(dashboard.app)
 # app.include_router(insights.app)
 app.include_router(v1_api.app_apikey)
 
+
+@app.on_event("startup")
+async def startup():
+    await pg_client.make_async_pool()
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    await pg_client.close_async_pool()
+
+
 Schedule = AsyncIOScheduler()
 Schedule.start()
 
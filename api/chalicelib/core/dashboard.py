@@ -29,7 +29,7 @@ def __quantiles(a, q, interpolation='higher'):
 
 def __get_constraints(project_id, time_constraint=True, chart=False, duration=True, project=True,
                       project_identifier="project_id",
-                      main_table="sessions", time_column="start_ts", data={}):
+                      main_table="sessions", time_column="start_ts", data={}, meta_keys=None):
     pg_sub_query = []
     main_table = main_table + "." if main_table is not None and len(main_table) > 0 else ""
     if project:
@@ -42,7 +42,14 @@ def __get_constraints(project_id, time_constraint=True, chart=False, duration=Tr
     if chart:
         pg_sub_query.append(f"{main_table}{time_column} >= generated_timestamp")
         pg_sub_query.append(f"{main_table}{time_column} < generated_timestamp + %(step_size)s")
-    return pg_sub_query + __get_meta_constraint(project_id=project_id, data=data)
+    return pg_sub_query + __get_meta_constraint(project_id=project_id, data=data, meta_keys=meta_keys)
+
+
+async def __get_constraints_async(project_id, data={}, **args):
+    meta_keys = None
+    if len(data.get("filters", [])) > 0:
+        meta_keys = await metadata.get_async(project_id=project_id)
+    return __get_constraints(project_id=project_id, data=data, meta_keys=meta_keys, **args)
 
 
 def __merge_charts(list1, list2, time_key="timestamp"):
@@ -78,11 +85,12 @@ METADATA_FIELDS = {"userId": "user_id",
 from chalicelib.core import sessions_metas
 
 
-def __get_meta_constraint(project_id, data):
+def __get_meta_constraint(project_id, data, meta_keys=None):
     if len(data.get("filters", [])) == 0:
         return []
     constraints = []
-    meta_keys = metadata.get(project_id=project_id)
+    if meta_keys is None:
+        meta_keys = metadata.get(project_id=project_id)
     meta_keys = {m["key"]: m["index"] for m in meta_keys}
 
     for i, f in enumerate(data.get("filters", [])):
@@ -128,14 +136,14 @@ SESSIONS_META_FIELDS = {"revId": "rev_id",
 
 
 @dev.timed
-def get_processed_sessions(project_id, startTimestamp=TimeUTC.now(delta_days=-1),
-                           endTimestamp=TimeUTC.now(),
-                           density=7, **args):
+async def get_processed_sessions(project_id, startTimestamp=TimeUTC.now(delta_days=-1),
+                                 endTimestamp=TimeUTC.now(),
+                                 density=7, **args):
     step_size = __get_step_size(startTimestamp, endTimestamp, density, factor=1)
-    pg_sub_query = __get_constraints(project_id=project_id, data=args)
-    pg_sub_query_chart = __get_constraints(project_id=project_id, time_constraint=True,
-                                           chart=True, data=args)
-    with pg_client.PostgresClient() as cur:
+    pg_sub_query = await __get_constraints_async(project_id=project_id, data=args)
+    pg_sub_query_chart = await __get_constraints_async(project_id=project_id, time_constraint=True,
+                                                       chart=True, data=args)
+    async with pg_client.AsyncPostgresClient() as cur:
         pg_query = f"""\
                 SELECT generated_timestamp AS timestamp,
                        COALESCE(COUNT(sessions), 0) AS count
@@ -148,8 +156,8 @@ def get_processed_sessions(project_id, startTimestamp=TimeUTC.now(delta_days=-1)
                 ORDER BY generated_timestamp;"""
         params = {"step_size": step_size, "project_id": project_id, "startTimestamp": startTimestamp,
                   "endTimestamp": endTimestamp, **__get_constraint_values(args)}
-        cur.execute(cur.mogrify(pg_query, params))
-        rows = cur.fetchall()
+        await cur.execute(cur.mogrify(pg_query, params))
+        rows = await cur.fetchall()
         results = {
             "count": sum([r["count"] for r in rows]),
             "chart": rows
@@ -166,9 +174,9 @@ def get_processed_sessions(project_id, startTimestamp=TimeUTC.now(delta_days=-1)
         params = {"project_id": project_id, "startTimestamp": startTimestamp, "endTimestamp": endTimestamp,
                   **__get_constraint_values(args)}
 
-        cur.execute(cur.mogrify(pg_query, params))
+        await cur.execute(cur.mogrify(pg_query, params))
 
-        count = cur.fetchone()["count"]
+        count = (await cur.fetchone())["count"]
 
         results["countProgress"] = helper.__progress(old_val=count, new_val=results["count"])
 
@@ -176,19 +184,19 @@ def get_processed_sessions(project_id, startTimestamp=TimeUTC.now(delta_days=-1)
 
 
 @dev.timed
-def get_errors(project_id, startTimestamp=TimeUTC.now(delta_days=-1), endTimestamp=TimeUTC.now(),
-               density=7, **args):
+async def get_errors(project_id, startTimestamp=TimeUTC.now(delta_days=-1), endTimestamp=TimeUTC.now(),
+                     density=7, **args):
     step_size = __get_step_size(startTimestamp, endTimestamp, density, factor=1)
 
-    pg_sub_query_subset = __get_constraints(project_id=project_id, data=args, duration=False, main_table="m_errors",
-                                            time_constraint=False)
-    pg_sub_query_chart = __get_constraints(project_id=project_id, time_constraint=False,
-                                           chart=True, data=args, main_table="errors", time_column="timestamp",
-                                           project=False, duration=False)
+    pg_sub_query_subset = await __get_constraints_async(project_id=project_id, data=args, duration=False, main_table="m_errors",
+                                                        time_constraint=False)
+    pg_sub_query_chart = await __get_constraints_async(project_id=project_id, time_constraint=False,
+                                                       chart=True, data=args, main_table="errors", time_column="timestamp",
+                                                       project=False, duration=False)
     pg_sub_query_subset.append("m_errors.source = 'js_exception'")
     pg_sub_query_subset.append("errors.timestamp>=%(startTimestamp)s")
     pg_sub_query_subset.append("errors.timestamp<%(endTimestamp)s")
-    with pg_client.PostgresClient() as cur:
+    async with pg_client.AsyncPostgresClient() as cur:
         pg_query = f"""WITH errors AS (SELECT DISTINCT session_id, timestamp
                                         FROM events.errors
                                                  INNER JOIN public.errors AS m_errors USING (error_id)
@@ -205,11 +213,11 @@ def get_errors(project_id, startTimestamp=TimeUTC.now(delta_days=-1), endTimesta
                         ORDER BY generated_timestamp;"""
         params = {"step_size": step_size, "project_id": project_id, "startTimestamp": startTimestamp,
                   "endTimestamp": endTimestamp, **__get_constraint_values(args)}
-        cur.execute(cur.mogrify(pg_query, params))
-        rows = cur.fetchall()
+        await cur.execute(cur.mogrify(pg_query, params))
+        rows = await cur.fetchall()
         results = {
-            "count": 0 if len(rows) == 0 else __count_distinct_errors(cur, project_id, startTimestamp, endTimestamp,
-                                                                      pg_sub_query_subset),
+            "count": 0 if len(rows) == 0 else await __count_distinct_errors(cur, project_id, startTimestamp, endTimestamp,
+                                                                            pg_sub_query_subset),
             "impactedSessions": sum([r["count"] for r in rows]),
             "chart": rows
         }
@@ -217,40 +225,40 @@ def get_errors(project_id, startTimestamp=TimeUTC.now(delta_days=-1), endTimesta
         diff = endTimestamp - startTimestamp
         endTimestamp = startTimestamp
         startTimestamp = endTimestamp - diff
-        count = __count_distinct_errors(cur, project_id, startTimestamp, endTimestamp, pg_sub_query_subset, **args)
+        count = await __count_distinct_errors(cur, project_id, startTimestamp, endTimestamp, pg_sub_query_subset, **args)
         results["progress"] = helper.__progress(old_val=count, new_val=results["count"])
     return results
 
 
-def __count_distinct_errors(cur, project_id, startTimestamp, endTimestamp, pg_sub_query, **args):
+async def __count_distinct_errors(cur, project_id, startTimestamp, endTimestamp, pg_sub_query, **args):
     pg_query = f"""WITH errors AS (SELECT DISTINCT error_id
                                 FROM events.errors
                                          INNER JOIN public.errors AS m_errors USING (error_id)
                                 WHERE {" AND ".join(pg_sub_query)})
                     SELECT COALESCE(COUNT(*), 0) AS count
                     FROM errors;"""
-    cur.execute(cur.mogrify(pg_query, {"project_id": project_id, "startTimestamp": startTimestamp,
-                                       "endTimestamp": endTimestamp, **__get_constraint_values(args)}))
-    return cur.fetchone()["count"]
+    await cur.execute(cur.mogrify(pg_query, {"project_id": project_id, "startTimestamp": startTimestamp,
+                                             "endTimestamp": endTimestamp, **__get_constraint_values(args)}))
+    return (await cur.fetchone())["count"]
 
 
 @dev.timed
-def get_errors_trend(project_id, startTimestamp=TimeUTC.now(delta_days=-1),
-                     endTimestamp=TimeUTC.now(),
-                     density=7, **args):
+async def get_errors_trend(project_id, startTimestamp=TimeUTC.now(delta_days=-1),
+                           endTimestamp=TimeUTC.now(),
+                           density=7, **args):
     step_size = __get_step_size(startTimestamp, endTimestamp, density, factor=1)
 
-    pg_sub_query_subset = __get_constraints(project_id=project_id, time_constraint=False,
-                                            chart=False, data=args, main_table="m_errors", duration=False)
-    pg_sub_query_chart = __get_constraints(project_id=project_id, time_constraint=False, project=False,
-                                           chart=True, data=args, main_table="errors_subsest", time_column="timestamp",
-                                           duration=False)
+    pg_sub_query_subset = await __get_constraints_async(project_id=project_id, time_constraint=False,
+                                                        chart=False, data=args, main_table="m_errors", duration=False)
+    pg_sub_query_chart = await __get_constraints_async(project_id=project_id, time_constraint=False, project=False,
+                                                       chart=True, data=args, main_table="errors_subsest", time_column="timestamp",
+                                                       duration=False)
     pg_sub_query_subset.append("errors.timestamp >= %(startTimestamp)s")
     pg_sub_query_subset.append("errors.timestamp < %(endTimestamp)s")
 
     pg_sub_query_chart.append("errors_subsest.error_id = top_errors.error_id")
 
-    with pg_client.PostgresClient() as cur:
+    async with pg_client.AsyncPostgresClient() as cur:
         pg_query = f"""WITH errors_subsest AS (SELECT session_id, error_id, timestamp
                                         FROM events.errors
                                                  INNER JOIN public.errors AS m_errors USING (error_id)
@@ -285,8 +293,8 @@ def get_errors_trend(project_id, startTimestamp=TimeUTC.now(delta_days=-1),
                                                            ORDER BY generated_timestamp) AS chart) AS chart ON (TRUE);"""
         params = {"step_size": step_size, "project_id": project_id, "startTimestamp": startTimestamp,
                   "endTimestamp": endTimestamp, **__get_constraint_values(args)}
-        cur.execute(cur.mogrify(pg_query, params))
-        rows = cur.fetchall()
+        await cur.execute(cur.mogrify(pg_query, params))
+        rows = await cur.fetchall()
 
         for i in range(len(rows)):
             rows[i] = helper.dict_to_camel_case(rows[i])
@@ -299,26 +307,25 @@ def get_errors_trend(project_id, startTimestamp=TimeUTC.now(delta_days=-1),
 
 
 @dev.timed
-def get_page_metrics(project_id, startTimestamp=TimeUTC.now(delta_days=-1),
-                     endTimestamp=TimeUTC.now(), **args):
-    with pg_client.PostgresClient() as cur:
-        rows = __get_page_metrics(cur, project_id, startTimestamp, endTimestamp, **args)
-        if len(rows) > 0:
-            results = helper.dict_to_camel_case(rows[0])
-        diff = endTimestamp - startTimestamp
-        endTimestamp = startTimestamp
-        startTimestamp = endTimestamp - diff
-        rows = __get_page_metrics(cur, project_id, startTimestamp, endTimestamp, **args)
-        if len(rows) > 0:
-            previous = helper.dict_to_camel_case(rows[0])
-            for key in previous.keys():
-                results[key + "Progress"] = helper.__progress(old_val=previous[key], new_val=results[key])
+async def get_page_metrics(project_id, startTimestamp=TimeUTC.now(delta_days=-1),
+                           endTimestamp=TimeUTC.now(), **args):
+    rows = await __get_page_metrics(project_id, startTimestamp, endTimestamp, **args)
+    if len(rows) > 0:
+        results = helper.dict_to_camel_case(rows[0])
+    diff = endTimestamp - startTimestamp
+    endTimestamp = startTimestamp
+    startTimestamp = endTimestamp - diff
+    rows = await __get_page_metrics(project_id, startTimestamp, endTimestamp, **args)
+    if len(rows) > 0:
+        previous = helper.dict_to_camel_case(rows[0])
+        for key in previous.keys():
+            results[key + "Progress"] = helper.__progress(old_val=previous[key], new_val=results[key])
     return results
 
 
 @dev.timed
-def __get_page_metrics(cur, project_id, startTimestamp, endTimestamp, **args):
-    pg_sub_query = __get_constraints(project_id=project_id, data=args)
+async def __get_page_metrics(project_id, startTimestamp, endTimestamp, **args):
+    pg_sub_query = await __get_constraints_async(project_id=project_id, data=args)
     pg_sub_query.append("pages.timestamp>=%(startTimestamp)s")
     pg_sub_query.append("pages.timestamp<%(endTimestamp)s")
     pg_sub_query.append("(pages.dom_content_loaded_time > 0 OR pages.first_contentful_paint_time > 0)")
@@ -331,30 +338,30 @@ def __get_page_metrics(cur, project_id, startTimestamp, endTimestamp, **args):
                          ) AS pages;"""
     params = {"project_id": project_id, "startTimestamp": startTimestamp, "endTimestamp": endTimestamp,
               **__get_constraint_values(args)}
-    cur.execute(cur.mogrify(pg_query, params))
-    rows = cur.fetchall()
+    async with pg_client.AsyncPostgresClient() as cur:
+        await cur.execute(cur.mogrify(pg_query, params))
+        rows = await cur.fetchall()
     return rows
 
 
 @dev.timed
-def get_application_activity(project_id, startTimestamp=TimeUTC.now(delta_days=-1),
-                             endTimestamp=TimeUTC.now(), **args):
-    with pg_client.PostgresClient() as cur:
-        row = __get_application_activity(cur, project_id, startTimestamp, endTimestamp, **args)
-        results = helper.dict_to_camel_case(row)
-        diff = endTimestamp - startTimestamp
-        endTimestamp = startTimestamp
-        startTimestamp = endTimestamp - diff
-        row = __get_application_activity(cur, project_id, startTimestamp, endTimestamp, **args)
-        previous = helper.dict_to_camel_case(row)
-        for key in previous.keys():
-            results[key + "Progress"] = helper.__progress(old_val=previous[key], new_val=results[key])
+async def get_application_activity(project_id, startTimestamp=TimeUTC.now(delta_days=-1),
+                                   endTimestamp=TimeUTC.now(), **args):
+    row = await __get_application_activity(project_id, startTimestamp, endTimestamp, **args)
+    results = helper.dict_to_camel_case(row)
+    diff = endTimestamp - startTimestamp
+    endTimestamp = startTimestamp
+    startTimestamp = endTimestamp - diff
+    row = await __get_application_activity(project_id, startTimestamp, endTimestamp, **args)
+    previous = helper.dict_to_camel_case(row)
+    for key in previous.keys():
+        results[key + "Progress"] = helper.__progress(old_val=previous[key], new_val=results[key])
     return results
 
 
-def __get_application_activity(cur, project_id, startTimestamp, endTimestamp, **args):
+async def __get_application_activity(project_id, startTimestamp, endTimestamp, **args):
     result = {}
-    pg_sub_query = __get_constraints(project_id=project_id, data=args)
+    pg_sub_query = await __get_constraints_async(project_id=project_id, data=args)
     pg_sub_query.append("pages.timestamp >= %(startTimestamp)s")
     pg_sub_query.append("pages.timestamp > %(endTimestamp)s")
     pg_sub_query.append("pages.load_time > 0")
@@ -366,10 +373,11 @@ def __get_application_activity(cur, project_id, startTimestamp, endTimestamp, **
     params = {"project_id": project_id, "startTimestamp": startTimestamp, "endTimestamp": endTimestamp,
               **__get_constraint_values(args)}
 
-    cur.execute(cur.mogrify(pg_query, params))
-    row = cur.fetchone()
+    async with pg_client.AsyncPostgresClient() as cur:
+        await cur.execute(cur.mogrify(pg_query, params))
+        row = await cur.fetchone()
     result = {**result, **row}
-    pg_sub_query = __get_constraints(project_id=project_id, data=args)
+    pg_sub_query = await __get_constraints_async(project_id=project_id, data=args)
     pg_sub_query.append("resources.duration > 0")
     pg_sub_query.append("resources.type= %(type)s")
     pg_query = f"""\
@@ -377,38 +385,38 @@ def __get_application_activity(cur, project_id, startTimestamp, endTimestamp, **
                 FROM events.resources INNER JOIN public.sessions USING (session_id)
                 WHERE {" AND ".join(pg_sub_query)};"""
 
-    cur.execute(cur.mogrify(pg_query, {"project_id": project_id, "type": 'img', "startTimestamp": startTimestamp,
-                                       "endTimestamp": endTimestamp, **__get_constraint_values(args)}))
-    row = cur.fetchone()
-    result = {**result, "avg_image_load_time": row["avg"]}
-    cur.execute(cur.mogrify(pg_query, {"project_id": project_id, "type": 'fetch', "startTimestamp": startTimestamp,
-                                       "endTimestamp": endTimestamp, **__get_constraint_values(args)}))
+    params = {"project_id": project_id, "startTimestamp": startTimestamp, "endTimestamp": endTimestamp,
+              **__get_constraint_values(args)}
+    async with pg_client.AsyncPostgresClient() as cur:
+        await cur.execute(cur.mogrify(pg_query, {**params, "type": 'img'}))
+        row = await cur.fetchone()
+        result = {**result, "avg_image_load_time": row["avg"]}
+        await cur.execute(cur.mogrify(pg_query, {**params, "type": 'fetch'}))
 
-    row = cur.fetchone()
-    result = {**result, "avg_request_load_time": row["avg"]}
+        row = await cur.fetchone()
+        result = {**result, "avg_request_load_time": row["avg"]}
 
     return result
 
 
 @dev.timed
-def get_user_activity(project_id, startTimestamp=TimeUTC.now(delta_days=-1),
-                      endTimestamp=TimeUTC.now(), **args):
-    with pg_client.PostgresClient() as cur:
-        row = __get_user_activity(cur, project_id, startTimestamp, endTimestamp, **args)
-        results = helper.dict_to_camel_case(row)
-        diff = endTimestamp - startTimestamp
-        endTimestamp = startTimestamp
-        startTimestamp = endTimestamp - diff
-        row = __get_user_activity(cur, project_id, startTimestamp, endTimestamp, **args)
-
-        previous = helper.dict_to_camel_case(row)
-        for key in previous:
-            results[key + "Progress"] = helper.__progress(old_val=previous[key], new_val=results[key])
+async def get_user_activity(project_id, startTimestamp=TimeUTC.now(delta_days=-1),
+                            endTimestamp=TimeUTC.now(), **args):
+    row = await __get_user_activity(project_id, startTimestamp, endTimestamp, **args)
+    results = helper.dict_to_camel_case(row)
+    diff = endTimestamp - startTimestamp
+    endTimestamp = startTimestamp
+    startTimestamp = endTimestamp - diff
+    row = await __get_user_activity(project_id, startTimestamp, endTimestamp, **args)
+
+    previous = helper.dict_to_camel_case(row)
+    for key in previous:
+        results[key + "Progress"] = helper.__progress(old_val=previous[key], new_val=results[key])
     return results
 
 
-def __get_user_activity(cur, project_id, startTimestamp, endTimestamp, **args):
-    pg_sub_query = __get_constraints(project_id=project_id, data=args)
+async def __get_user_activity(project_id, startTimestamp, endTimestamp, **args):
+    pg_sub_query = await __get_constraints_async(project_id=project_id, data=args)
 
     pg_query = f"""\
         SELECT COALESCE(CEIL(AVG(NULLIF(sessions.pages_count,0))),0) AS avg_visited_pages,
@@ -418,32 +426,33 @@ def __get_user_activity(cur, project_id, startTimestamp, endTimestamp, **args):
     params = {"project_id": project_id, "startTimestamp": startTimestamp, "endTimestamp": endTimestamp,
               **__get_constraint_values(args)}
 
-    cur.execute(cur.mogrify(pg_query, params))
-    row = cur.fetchone()
+    async with pg_client.AsyncPostgresClient() as cur:
+        await cur.execute(cur.mogrify(pg_query, params))
+        row = await cur.fetchone()
     return row
 
 
 @dev.timed
-def get_slowest_images(project_id, startTimestamp=TimeUTC.now(delta_days=-1),
-                       endTimestamp=TimeUTC.now(),
-                       density=7, **args):
+async def get_slowest_images(project_id, startTimestamp=TimeUTC.now(delta_days=-1),
+                             endTimestamp=TimeUTC.now(),
+                             density=7, **args):
     step_size = __get_step_size(endTimestamp=endTimestamp, startTimestamp=startTimestamp, density=density, factor=1)
-    pg_sub_query = __get_constraints(project_id=project_id, data=args)
+    pg_sub_query = await __get_constraints_async(project_id=project_id, data=args)
     pg_sub_query.append("resources.type = 'img'")
-    pg_sub_query_chart = __get_constraints(project_id=project_id, time_constraint=True,
-                                           chart=True, data=args)
+    pg_sub_query_chart = await __get_constraints_async(project_id=project_id, time_constraint=True,
+                                                       chart=True, data=args)
     pg_sub_query_chart.append("resources.type = 'img'")
     pg_sub_query_chart.append("resources.url = top_img.url")
 
-    pg_sub_query_subset = __get_constraints(project_id=project_id, time_constraint=True,
-                                            chart=False, data=args)
+    pg_sub_query_subset = await __get_constraints_async(project_id=project_id, time_constraint=True,
+                                                        chart=False, data=args)
     pg_sub_query_subset.append("resources.timestamp >= %(startTimestamp)s")
     pg_sub_query_subset.append("resources.timestamp < %(endTimestamp)s")
     pg_sub_query_subset.append("resources.duration >0")
     pg_sub_query_subset.append("resources.duration IS NOT NULL")
     pg_sub_query_subset.append("resources.type='img'")
 
-    with pg_client.PostgresClient() as cur:
+    async with pg_client.AsyncPostgresClient() as cur:
         pg_query = f"""SELECT *
                         FROM (SELECT resources.url,
                                      COALESCE(AVG(resources.duration), 0) AS avg_duration,
@@ -468,9 +477,9 @@ def get_slowest_images(project_id, startTimestamp=TimeUTC.now(delta_days=-1),
                                   ORDER BY generated_timestamp) AS chart
                             ) AS chart ON (TRUE);"""
 
-        cur.execute(cur.mogrify(pg_query, {"step_size": step_size,"project_id": project_id, "startTimestamp": startTimestamp,
-                                           "endTimestamp": endTimestamp, **__get_constraint_values(args)}))
-        rows = cur.fetchall()
+        await cur.execute(cur.mogrify(pg_query, {"step_size": step_size,"project_id": project_id, "startTimestamp": startTimestamp,
+                                                 "endTimestamp": endTimestamp, **__get_constraint_values(args)}))
+        rows = await cur.fetchall()
     for i in range(len(rows)):
         rows[i]["sessions"] = rows[i].pop("sessions_count")
         rows[i] = helper.dict_to_camel_case(rows[i])
@@ -487,8 +496,8 @@ def __get_performance_constraint(l):
 
 
 @dev.timed
-def get_performance(project_id, startTimestamp=TimeUTC.now(delta_days=-1), endTimestamp=TimeUTC.now(),
-                    density=19, resources=None, **args):
+async def get_performance(project_id, startTimestamp=TimeUTC.now(delta_days=-1), endTimestamp=TimeUTC.now(),
+                          density=19, resources=None, **args):
     step_size = __get_step_size(endTimestamp=endTimestamp, startTimestamp=startTimestamp, density=density, factor=1)
     location_constraints = []
     img_constraints = []
@@ -511,92 +520,94 @@ def get_performance(project_id, startTimestamp=TimeUTC.now(delta_days=-1), endTi
                 request_constraints_vals["val_" + str(len(request_constraints) - 1)] = r['value']
     params = {"step_size": step_size, "project_id": project_id, "startTimestamp": startTimestamp,
               "endTimestamp": endTimestamp}
-    with pg_client.PostgresClient() as cur:
-        pg_sub_query_subset = __get_constraints(project_id=project_id, time_constraint=True,
-                                                chart=False, data=args)
-        pg_sub_query_chart = __get_constraints(project_id=project_id, time_constraint=False, project=False,
-                                               chart=True, data=args, main_table="resources", time_column="timestamp",
-                                               duration=False)
-        pg_sub_query_subset.append("resources.timestamp >= %(startTimestamp)s")
-        pg_sub_query_subset.append("resources.timestamp < %(endTimestamp)s")
-
-        pg_query = f"""WITH resources AS (SELECT resources.duration, resources.timestamp 
+    pg_sub_query_subset = await __get_constraints_async(project_id=project_id, time_constraint=True,
+                                                        chart=False, data=args)
+    pg_sub_query_chart = await __get_constraints_async(project_id=project_id, time_constraint=False, project=False,
+                                                       chart=True, data=args, main_table="resources", time_column="timestamp",
+                                                       duration=False)
+    pg_sub_query_subset.append("resources.timestamp >= %(startTimestamp)s")
+    pg_sub_query_subset.append("resources.timestamp < %(endTimestamp)s")
+
+    pg_query = f"""WITH resources AS (SELECT resources.duration, resources.timestamp 
+                                    FROM events.resources INNER JOIN public.sessions USING (session_id)
+                                    WHERE {" AND ".join(pg_sub_query_subset)}
+                                      AND resources.type = 'img' AND resources.duration>0
+                                      {(f' AND ({" OR ".join(img_constraints)})') if len(img_constraints) > 0 else ""}
+                    )
+                SELECT 
+                         generated_timestamp AS timestamp,
+                         COALESCE(AVG(resources.duration),0) AS avg_image_load_time 
+                  FROM generate_series(%(startTimestamp)s, %(endTimestamp)s, %(step_size)s) AS generated_timestamp
+                    LEFT JOIN LATERAL ( 
+                            SELECT resources.duration
+                            FROM resources
+                            WHERE {" AND ".join(pg_sub_query_chart)}
+                    ) AS resources ON (TRUE)
+                  GROUP BY timestamp
+                  ORDER BY timestamp;"""
+    async with pg_client.AsyncPostgresClient() as cur:
+        await cur.execute(cur.mogrify(pg_query, {**params, **img_constraints_vals, **__get_constraint_values(args)}))
+        rows = await cur.fetchall()
+    images = helper.list_to_camel_case(rows)
+
+    pg_sub_query_subset = await __get_constraints_async(project_id=project_id, time_constraint=True,
+                                                        chart=False, data=args)
+    pg_sub_query_chart = await __get_constraints_async(project_id=project_id, time_constraint=False, project=False,
+                                                       chart=True, data=args, main_table="resources", time_column="timestamp",
+                                                       duration=False)
+    pg_sub_query_subset.append("resources.timestamp >= %(startTimestamp)s")
+    pg_sub_query_subset.append("resources.timestamp < %(endTimestamp)s")
+
+    pg_query = f"""WITH resources AS(SELECT resources.duration, resources.timestamp 
                                         FROM events.resources INNER JOIN public.sessions USING (session_id)
-                                        WHERE {" AND ".join(pg_sub_query_subset)}
-                                          AND resources.type = 'img' AND resources.duration>0
-                                          {(f' AND ({" OR ".join(img_constraints)})') if len(img_constraints) > 0 else ""}
-                        )
+                                        WHERE {" AND ".join(pg_sub_query_subset)} 
+                                        AND resources.type = 'fetch' AND resources.duration>0  
+                                        {(f' AND ({" OR ".join(request_constraints)})') if len(request_constraints) > 0 else ""}
+                    )
                     SELECT 
-                             generated_timestamp AS timestamp,
-                             COALESCE(AVG(resources.duration),0) AS avg_image_load_time 
-                      FROM generate_series(%(startTimestamp)s, %(endTimestamp)s, %(step_size)s) AS generated_timestamp
-                        LEFT JOIN LATERAL ( 
-                                SELECT resources.duration
-                                FROM resources
-                                WHERE {" AND ".join(pg_sub_query_chart)}
-                        ) AS resources ON (TRUE)
-                      GROUP BY timestamp
-                      ORDER BY timestamp;"""
-        cur.execute(cur.mogrify(pg_query, {**params, **img_constraints_vals, **__get_constraint_values(args)}))
-        rows = cur.fetchall()
-        images = helper.list_to_camel_case(rows)
-
-        pg_sub_query_subset = __get_constraints(project_id=project_id, time_constraint=True,
-                                                chart=False, data=args)
-        pg_sub_query_chart = __get_constraints(project_id=project_id, time_constraint=False, project=False,
-                                               chart=True, data=args, main_table="resources", time_column="timestamp",
-                                               duration=False)
-        pg_sub_query_subset.append("resources.timestamp >= %(startTimestamp)s")
-        pg_sub_query_subset.append("resources.timestamp < %(endTimestamp)s")
-
-        pg_query = f"""WITH resources AS(SELECT resources.duration, resources.timestamp 
-                                            FROM events.resources INNER JOIN public.sessions USING (session_id)
-                                            WHERE {" AND ".join(pg_sub_query_subset)} 
-                                            AND resources.type = 'fetch' AND resources.duration>0  
-                                            {(f' AND ({" OR ".join(request_constraints)})') if len(request_constraints) > 0 else ""}
-                        )
-                        SELECT 
-                             generated_timestamp AS timestamp,
-                             COALESCE(AVG(resources.duration),0) AS avg_request_load_time 
-                      FROM generate_series(%(startTimestamp)s, %(endTimestamp)s, %(step_size)s) AS generated_timestamp
-                        LEFT JOIN LATERAL ( 
-                                SELECT resources.duration
-                                FROM resources
-                                WHERE {" AND ".join(pg_sub_query_chart)} 
-                        ) AS resources ON (TRUE)
-                      GROUP BY generated_timestamp
-                      ORDER BY generated_timestamp;"""
-        cur.execute(cur.mogrify(pg_query, {**params, **request_constraints_vals, **__get_constraint_values(args)}))
-        rows = cur.fetchall()
-        requests = helper.list_to_camel_case(rows)
-        pg_sub_query_subset = __get_constraints(project_id=project_id, time_constraint=True,
-                                                chart=False, data=args)
-        pg_sub_query_chart = __get_constraints(project_id=project_id, time_constraint=False, project=False,
-                                               chart=True, data=args, main_table="pages", time_column="timestamp",
-                                               duration=False)
-        pg_sub_query_subset.append("pages.timestamp >= %(startTimestamp)s")
-        pg_sub_query_subset.append("pages.timestamp < %(endTimestamp)s")
-        pg_query = f"""WITH pages AS(SELECT pages.load_time, timestamp 
-                                    FROM events.pages INNER JOIN public.sessions USING (session_id)
-                                    WHERE {" AND ".join(pg_sub_query_subset)} AND pages.load_time>0 AND pages.load_time IS NOT NULL
-                                      {(f' AND ({" OR ".join(location_constraints)})') if len(location_constraints) > 0 else ""}
-                        )
-                        SELECT 
-                             generated_timestamp AS timestamp,
-                             COALESCE(AVG(pages.load_time),0) AS avg_page_load_time 
-                        FROM generate_series(%(startTimestamp)s, %(endTimestamp)s, %(step_size)s) AS generated_timestamp
-                        LEFT JOIN LATERAL ( SELECT pages.load_time
-                                            FROM pages 
-                                            WHERE {" AND ".join(pg_sub_query_chart)}  
-                                              {(f' AND ({" OR ".join(location_constraints)})') if len(location_constraints) > 0 else ""}
-                                            ) AS pages ON (TRUE)
-                        GROUP BY generated_timestamp
-                        ORDER BY generated_timestamp;"""
-        cur.execute(cur.mogrify(pg_query, {**params, **location_constraints_vals, **__get_constraint_values(args)}))
-        rows = cur.fetchall()
-        pages = helper.list_to_camel_case(rows)
-
-        rows = helper.merge_lists_by_key(helper.merge_lists_by_key(pages, requests, "timestamp"), images, "timestamp")
+                         generated_timestamp AS timestamp,
+                         COALESCE(AVG(resources.duration),0) AS avg_request_load_time 
+                  FROM generate_series(%(startTimestamp)s, %(endTimestamp)s, %(step_size)s) AS generated_timestamp
+                    LEFT JOIN LATERAL ( 
+                            SELECT resources.duration
+                            FROM resources
+                            WHERE {" AND ".join(pg_sub_query_chart)} 
+                    ) AS resources ON (TRUE)
+                  GROUP BY generated_timestamp
+                  ORDER BY generated_timestamp;"""
+    async with pg_client.AsyncPostgresClient() as cur:
+        await cur.execute(cur.mogrify(pg_query, {**params, **request_constraints_vals, **__get_constraint_values(args)}))
+        rows = await cur.fetchall()
+    requests = helper.list_to_camel_case(rows)
+    pg_sub_query_subset = await __get_constraints_async(project_id=project_id, time_constraint=True,
+                                                        chart=False, data=args)
+    pg_sub_query_chart = await __get_constraints_async(project_id=project_id, time_constraint=False, project=False,
+                                                       chart=True, data=args, main_table="pages", time_column="timestamp",
+                                                       duration=False)
+    pg_sub_query_subset.append("pages.timestamp >= %(startTimestamp)s")
+    pg_sub_query_subset.append("pages.timestamp < %(endTimestamp)s")
+    pg_query = f"""WITH pages AS(SELECT pages.load_time, timestamp 
+                                FROM events.pages INNER JOIN public.sessions USING (session_id)
+                                WHERE {" AND ".join(pg_sub_query_subset)} AND pages.load_time>0 AND pages.load_time IS NOT NULL
+                                  {(f' AND ({" OR ".join(location_constraints)})') if len(location_constraints) > 0 else ""}
+                    )
+                    SELECT 
+                         generated_timestamp AS timestamp,
+                         COALESCE(AVG(pages.load_time),0) AS avg_page_load_time 
+                    FROM generate_series(%(startTimestamp)s, %(endTimestamp)s, %(step_size)s) AS generated_timestamp
+                    LEFT JOIN LATERAL ( SELECT pages.load_time
+                                        FROM pages 
+                                        WHERE {" AND ".join(pg_sub_query_chart)}  
+                                          {(f' AND ({" OR ".join(location_constraints)})') if len(location_constraints) > 0 else ""}
+                                        ) AS pages ON (TRUE)
+                    GROUP BY generated_timestamp
+                    ORDER BY generated_timestamp;"""
+    async with pg_client.AsyncPostgresClient() as cur:
+        await cur.execute(cur.mogrify(pg_query, {**params, **location_constraints_vals, **__get_constraint_values(args)}))
+        rows = await cur.fetchall()
+    pages = helper.list_to_camel_case(rows)
+
+    rows = helper.merge_lists_by_key(helper.merge_lists_by_key(pages, requests, "timestamp"), images, "timestamp")
 
     return {"chart": rows}
 
@@ -622,8 +633,8 @@ def __get_resource_db_type_from_type(resource_type):
 
 
 @dev.timed
-def search(text, resource_type, project_id, performance=False, pages_only=False, events_only=False,
-           metadata=False, key=None, platform=None):
+async def search(text, resource_type, project_id, performance=False, pages_only=False, events_only=False,
+                 metadata=False, key=None, platform=None):
     if not resource_type:
         data = []
         if metadata:
@@ -632,17 +643,17 @@ def search(text, resource_type, project_id, performance=False, pages_only=False,
             resource_type = "LOCATION"
         else:
             resource_type = "ALL"
-        data.extend(search(text=text, resource_type=resource_type, project_id=project_id,
-                           performance=performance, pages_only=pages_only, events_only=events_only, key=key,
-                           platform=platform))
+        data.extend(await search(text=text, resource_type=resource_type, project_id=project_id,
+                                 performance=performance, pages_only=pages_only, events_only=events_only, key=key,
+                                 platform=platform))
         return data
 
-    pg_sub_query = __get_constraints(project_id=project_id, time_constraint=False, duration=True,
-                                     data={} if platform is None else {"platform": platform})
+    pg_sub_query = await __get_constraints_async(project_id=project_id, time_constraint=False, duration=True,
+                                                 data={} if platform is None else {"platform": platform})
 
     if resource_type == "ALL" and not pages_only and not events_only:
         pg_sub_query.append("url_hostpath ILIKE %(value)s")
-        with pg_client.PostgresClient() as cur:
+        async with pg_client.AsyncPostgresClient() as cur:
             pg_query = f"""SELECT key, value
                             FROM ( SELECT DISTINCT ON (url) ROW_NUMBER() OVER (PARTITION BY type ORDER BY url) AS r,
                                               url AS value,
@@ -652,11 +663,11 @@ def search(text, resource_type, project_id, performance=False, pages_only=False,
                                   ORDER BY url, type ASC) AS ranked_values
                             WHERE ranked_values.r<=5;"""
             print(cur.mogrify(pg_query, {"project_id": project_id, "value": helper.string_to_sql_like(text)}))
-            cur.execute(cur.mogrify(pg_query, {"project_id": project_id, "value": helper.string_to_sql_like(text)}))
-            rows = cur.fetchall()
+            await cur.execute(cur.mogrify(pg_query, {"project_id": project_id, "value": helper.string_to_sql_like(text)}))
+            rows = await cur.fetchall()
             rows = [{"value": i["value"], "type": __get_resource_type_from_db_type(i["key"])} for i in rows]
     elif resource_type == "ALL" and events_only:
-        with pg_client.PostgresClient() as cur:
+        async with pg_client.AsyncPostgresClient() as cur:
             pg_query = f"""(SELECT DISTINCT label AS value, 'INPUT' AS key
                              FROM events.inputs INNER JOIN public.sessions USING(session_id)
                              WHERE {" AND ".join(pg_sub_query)} AND positionUTF8(lowerUTF8(label), %(value)s) != 0
@@ -674,16 +685,16 @@ def search(text, resource_type, project_id, performance=False, pages_only=False,
             print(cur.mogrify(pg_query, {"project_id": project_id,
                                                "value": helper.string_to_sql_like(text.lower()),
                                                "platform_0": platform}))
-            cur.execute(cur.mogrify(pg_query, {"project_id": project_id,
-                                               "value": helper.string_to_sql_like(text.lower()),
-                                               "platform_0": platform}))
-            rows = cur.fetchall()
+            await cur.execute(cur.mogrify(pg_query, {"project_id": project_id,
+                                                     "value": helper.string_to_sql_like(text.lower()),
+                                                     "platform_0": platform}))
+            rows = await cur.fetchall()
             rows = [{"value": i["value"], "type": i["key"]} for i in rows]
     elif resource_type in ['IMG', 'REQUEST', 'STYLESHEET', 'OTHER', 'SCRIPT'] and not pages_only:
         pg_sub_query.append("url_hostpath ILIKE %(value)s")
         pg_sub_query.append(f"resources.type = '{__get_resource_db_type_from_type(resource_type)}'")
 
-        with pg_client.PostgresClient() as cur:
+        async with pg_client.AsyncPostgresClient() as cur:
             pg_query = f"""SELECT 
                               DISTINCT url_hostpath AS value,
                               %(resource_type)s AS type
@@ -694,13 +705,13 @@ def search(text, resource_type, project_id, performance=False, pages_only=False,
                                                "value": helper.string_to_sql_like(text),
                                                "resource_type": resource_type,
                                                "platform_0": platform}))
-            cur.execute(cur.mogrify(pg_query, {"project_id": project_id,
-                                               "value": helper.string_to_sql_like(text),
-                                               "resource_type": resource_type,
-                                               "platform_0": platform}))
-            rows = cur.fetchall()
+            await cur.execute(cur.mogrify(pg_query, {"project_id": project_id,
+                                                     "value": helper.string_to_sql_like(text),
+                                                     "resource_type": resource_type,
+                                                     "platform_0": platform}))
+            rows = await cur.fetchall()
     elif resource_type == 'LOCATION':
-        with pg_client.PostgresClient() as cur:
+        async with pg_client.AsyncPostgresClient() as cur:
             pg_sub_query.append("path ILIKE %(value)s")
             pg_query = f"""SELECT 
                              DISTINCT path AS value,
@@ -711,12 +722,12 @@ def search(text, resource_type, project_id, performance=False, pages_only=False,
             print(cur.mogrify(pg_query, {"project_id": project_id,
                                                "value": helper.string_to_sql_like(text),
                                                "platform_0": platform}))
-            cur.execute(cur.mogrify(pg_query, {"project_id": project_id,
-                                               "value": helper.string_to_sql_like(text),
-                                               "platform_0": platform}))
-            rows = cur.fetchall()
+            await cur.execute(cur.mogrify(pg_query, {"project_id": project_id,
+                                                     "value": helper.string_to_sql_like(text),
+                                                     "platform_0": platform}))
+            rows = await cur.fetchall()
     elif resource_type == "INPUT":
-        with pg_client.PostgresClient() as cur:
+        async with pg_client.AsyncPostgresClient() as cur:
             pg_sub_query.append("label ILIKE %(value)s")
             pg_query = f"""SELECT DISTINCT label AS value, 'INPUT' AS type
                              FROM events.inputs INNER JOIN public.sessions USING (session_id)
@@ -725,12 +736,12 @@ def search(text, resource_type, project_id, performance=False, pages_only=False,
             print(cur.mogrify(pg_query, {"project_id": project_id,
                                                "value": helper.string_to_sql_like(text),
                                                "platform_0": platform}))
-            cur.execute(cur.mogrify(pg_query, {"project_id": project_id,
-                                               "value": helper.string_to_sql_like(text),
-                                               "platform_0": platform}))
-            rows = cur.fetchall()
+            await cur.execute(cur.mogrify(pg_query, {"project_id": project_id,
+                                                     "value": helper.string_to_sql_like(text),
+                                                     "platform_0": platform}))
+            rows = await cur.fetchall()
     elif resource_type == "CLICK":
-        with pg_client.PostgresClient() as cur:
+        async with pg_client.AsyncPostgresClient() as cur:
             pg_sub_query.append("label ILIKE %(value)s")
             pg_query = f"""SELECT DISTINCT label AS value, 'CLICK' AS key
                              FROM events.clicks INNER JOIN public.sessions USING (session_id)
@@ -739,10 +750,10 @@ def search(text, resource_type, project_id, performance=False, pages_only=False,
             print(cur.mogrify(pg_query, {"project_id": project_id,
                                                "value": helper.string_to_sql_like(text),
                                                "platform_0": platform}))
-            cur.execute(cur.mogrify(pg_query, {"project_id": project_id,
-                                               "value": helper.string_to_sql_like(text),
-                                               "platform_0": platform}))
-            rows = cur.fetchall()
+            await cur.execute(cur.mogrify(pg_query, {"project_id": project_id,
+                                                     "value": helper.string_to_sql_like(text),
+                                                     "platform_0": platform}))
+            rows = await cur.fetchall()
     elif resource_type == "METADATA":
         if key and len(key) > 0 and key in {**METADATA_FIELDS, **SESSIONS_META_FIELDS}.keys():
             if key in METADATA_FIELDS.keys():
@@ -751,7 +762,7 @@ def search(text, resource_type, project_id, performance=False, pages_only=False,
             else:
                 column = SESSIONS_META_FIELDS[key]
                 pg_sub_query.append(f"{SESSIONS_META_FIELDS[key]} ILIKE %(value)s")
-            with pg_client.PostgresClient() as cur:
+            async with pg_client.AsyncPostgresClient() as cur:
                 pg_query = f"""SELECT  DISTINCT {column} AS value,
                                           %(key)s AS key
                                       FROM sessions
@@ -760,12 +771,12 @@ def search(text, resource_type, project_id, performance=False, pages_only=False,
                 print(cur.mogrify(pg_query,
                                         {"project_id": project_id, "value": helper.string_to_sql_like(text), "key": key,
                                          "platform_0": platform}))
-                cur.execute(cur.mogrify(pg_query,
-                                        {"project_id": project_id, "value": helper.string_to_sql_like(text), "key": key,
-                                         "platform_0": platform}))
-                rows = cur.fetchall()
+                await cur.execute(cur.mogrify(pg_query,
+                                              {"project_id": project_id, "value": helper.string_to_sql_like(text), "key": key,
+                                               "platform_0": platform}))
+                rows = await cur.fetchall()
         else:
-            with pg_client.PostgresClient() as cur:
+            async with pg_client.AsyncPostgresClient() as cur:
                 pg_query = []
                 for k in METADATA_FIELDS.keys():
                     pg_query.append(f"""(SELECT DISTINCT sessions.{METADATA_FIELDS[k]} AS value,
@@ -788,29 +799,29 @@ def search(text, resource_type, project_id, performance=False, pages_only=False,
                                         {"project_id": project_id, "value": helper.string_to_sql_like(text),
                                          "key": key,
                                          "platform_0": platform}))
-                cur.execute(cur.mogrify(pg_query,
-                                        {"project_id": project_id, "value": helper.string_to_sql_like(text),
-                                         "key": key,
-                                         "platform_0": platform}))
-                rows = cur.fetchall()
+                await cur.execute(cur.mogrify(pg_query,
+                                              {"project_id": project_id, "value": helper.string_to_sql_like(text),
+                                               "key": key,
+                                               "platform_0": platform}))
+                rows = await cur.fetchall()
     else:
         return []
     return [helper.dict_to_camel_case(row) for row in rows]
 
 
 @dev.timed
-def get_missing_resources_trend(project_id, startTimestamp=TimeUTC.now(delta_days=-1),
-                                endTimestamp=TimeUTC.now(),
-                                density=7, **args):
+async def get_missing_resources_trend(project_id, startTimestamp=TimeUTC.now(delta_days=-1),
+                                      endTimestamp=TimeUTC.now(),
+                                      density=7, **args):
     step_size = __get_step_size(startTimestamp, endTimestamp, density, factor=1)
-    pg_sub_query = __get_constraints(project_id=project_id, data=args)
-    pg_sub_query_chart = __get_constraints(project_id=project_id, time_constraint=True, chart=True, data=args)
+    pg_sub_query = await __get_constraints_async(project_id=project_id, data=args)
+    pg_sub_query_chart = await __get_constraints_async(project_id=project_id, time_constraint=True, chart=True, data=args)
     pg_sub_query.append("resources.success = FALSE")
     pg_sub_query_chart.append("resources.success = FALSE")
     pg_sub_query.append("resources.type != 'fetch'")
     pg_sub_query_chart.append("resources.type != 'fetch'")
 
-    with pg_client.PostgresClient() as cur:
+    async with pg_client.AsyncPostgresClient() as cur:
         pg_query = f"""SELECT 
                              resources.url_hostpath AS url,
                              COUNT(resources.session_id) AS sessions
@@ -819,10 +830,10 @@ def get_missing_resources_trend(project_id, startTimestamp=TimeUTC.now(delta_day
                       GROUP BY url_hostpath
                       ORDER BY sessions DESC
                       LIMIT 10;"""
-        cur.execute(cur.mogrify(pg_query, {"project_id": project_id, "startTimestamp": startTimestamp,
-                                           "endTimestamp": endTimestamp, **__get_constraint_values(args)}))
+        await cur.execute(cur.mogrify(pg_query, {"project_id": project_id, "startTimestamp": startTimestamp,
+                                                 "endTimestamp": endTimestamp, **__get_constraint_values(args)}))
 
-        rows = cur.fetchall()
+        rows = await cur.fetchall()
         # rows = [{"url": i["key"], "sessions": i["doc_count"]} for i in rows]
         if len(rows) == 0:
             return []
@@ -843,32 +854,32 @@ def get_missing_resources_trend(project_id, startTimestamp=TimeUTC.now(delta_day
             e["startTimestamp"] = startTimestamp
             e["endTimestamp"] = endTimestamp
 
-            cur.execute(cur.mogrify(pg_query, {"step_size": step_size, "project_id": project_id,
-                                               "startTimestamp": startTimestamp,
-                                               "endTimestamp": endTimestamp,
-                                               "value": e["url"],
-                                               **__get_constraint_values(args)}))
-            r = cur.fetchall()
+            await cur.execute(cur.mogrify(pg_query, {"step_size": step_size, "project_id": project_id,
+                                                     "startTimestamp": startTimestamp,
+                                                     "endTimestamp": endTimestamp,
+                                                     "value": e["url"],
+                                                     **__get_constraint_values(args)}))
+            r = await cur.fetchall()
             e["endedAt"] = r[-1]["max_datatime"]
             e["chart"] = [{"timestamp": i["timestamp"], "count": i["count"]} for i in r]
     return rows
 
 
 @dev.timed
-def get_network(project_id, startTimestamp=TimeUTC.now(delta_days=-1),
-                endTimestamp=TimeUTC.now(),
-                density=7, **args):
+async def get_network(project_id, startTimestamp=TimeUTC.now(delta_days=-1),
+                      endTimestamp=TimeUTC.now(),
+                      density=7, **args):
     step_size = __get_step_size(startTimestamp, endTimestamp, density, factor=1)
-    pg_sub_query_subset = __get_constraints(project_id=project_id, data=args)
-    pg_sub_query_chart = __get_constraints(project_id=project_id, time_constraint=False,
-                                           chart=True, data=args, main_table="resources", time_column="timestamp",
-                                           project=False, duration=False)
+    pg_sub_query_subset = await __get_constraints_async(project_id=project_id, data=args)
+    pg_sub_query_chart = await __get_constraints_async(project_id=project_id, time_constraint=False,
+                                                       chart=True, data=args, main_table="resources", time_column="timestamp",
+                                                       project=False, duration=False)
     pg_sub_query_subset.append("resources.timestamp>=%(startTimestamp)s")
     pg_sub_query_subset.append("resources.timestamp<%(endTimestamp)s")
 
 
 
-    with pg_client.PostgresClient() as cur:
+    async with pg_client.AsyncPostgresClient() as cur:
         pg_query = f"""WITH resources AS (SELECT resources.session_id,
                                                   resources.url_hostpath,
                                                   timestamp
@@ -887,10 +898,10 @@ def get_network(project_id, startTimestamp=TimeUTC.now(delta_days=-1),
                             ) AS resources ON (TRUE)
                         GROUP BY generated_timestamp, resources.url_hostpath
                         ORDER BY generated_timestamp;"""
-        cur.execute(cur.mogrify(pg_query, {"step_size": step_size, "project_id": project_id,
-                                           "startTimestamp": startTimestamp,
-                                           "endTimestamp": endTimestamp, **__get_constraint_values(args)}))
-        r = cur.fetchall()
+        await cur.execute(cur.mogrify(pg_query, {"step_size": step_size, "project_id": project_id,
+                                                 "startTimestamp": startTimestamp,
+                                                 "endTimestamp": endTimestamp, **__get_constraint_values(args)}))
+        r = await cur.fetchall()
         results = []
 
         i = 0
@@ -923,14 +934,14 @@ def dashboard_args(params):
 
 
 @dev.timed
-def get_resources_loading_time(project_id, startTimestamp=TimeUTC.now(delta_days=-1),
-                               endTimestamp=TimeUTC.now(),
-                               density=19, type=None, url=None, **args):
+async def get_resources_loading_time(project_id, startTimestamp=TimeUTC.now(delta_days=-1),
+                                     endTimestamp=TimeUTC.now(),
+                                     density=19, type=None, url=None, **args):
     step_size = __get_step_size(startTimestamp, endTimestamp, density, factor=1)
-    pg_sub_query_subset = __get_constraints(project_id=project_id, data=args)
-    pg_sub_query_chart = __get_constraints(project_id=project_id, time_constraint=False,
-                                           chart=True, data=args, main_table="resources", time_column="timestamp",
-                                           project=False, duration=False)
+    pg_sub_query_subset = await __get_constraints_async(project_id=project_id, data=args)
+    pg_sub_query_chart = await __get_constraints_async(project_id=project_id, time_constraint=False,
+                                                       chart=True, data=args, main_table="resources", time_column="timestamp",
+                                                       project=False, duration=False)
     pg_sub_query_subset.append("resources.timestamp>=%(startTimestamp)s")
     pg_sub_query_subset.append("resources.timestamp<%(endTimestamp)s")
     pg_sub_query_subset.append("resources.duration>0")
@@ -941,7 +952,7 @@ def get_resources_loading_time(project_id, startTimestamp=TimeUTC.now(delta_days
     if url is not None:
         pg_sub_query_subset.append(f"resources.url = %(value)s")
 
-    with pg_client.PostgresClient() as cur:
+    async with pg_client.AsyncPostgresClient() as cur:
         pg_query = f"""WITH resources AS (SELECT resources.duration, timestamp
                                            FROM events.resources
                                                     INNER JOIN public.sessions USING (session_id)
@@ -960,25 +971,25 @@ def get_resources_loading_time(project_id, startTimestamp=TimeUTC.now(delta_days
                   "startTimestamp": startTimestamp,
                   "endTimestamp": endTimestamp,
                   "value": url, "type": type, **__get_constraint_values(args)}
-        cur.execute(cur.mogrify(pg_query, params))
-        rows = cur.fetchall()
+        await cur.execute(cur.mogrify(pg_query, params))
+        rows = await cur.fetchall()
         pg_query = f"""SELECT COALESCE(AVG(resources.duration),0) AS avg 
                   FROM events.resources INNER JOIN sessions USING(session_id)
                   WHERE {" AND ".join(pg_sub_query_subset)};"""
-        cur.execute(cur.mogrify(pg_query, params))
-        avg = cur.fetchone()["avg"]
+        await cur.execute(cur.mogrify(pg_query, params))
+        avg = (await cur.fetchone())["avg"]
 
     return {"avg": avg, "chart": rows}
 
 
 @dev.timed
-def get_pages_dom_build_time(project_id, startTimestamp=TimeUTC.now(delta_days=-1),
-                             endTimestamp=TimeUTC.now(), density=19, url=None, **args):
+async def get_pages_dom_build_time(project_id, startTimestamp=TimeUTC.now(delta_days=-1),
+                                   endTimestamp=TimeUTC.now(), density=19, url=None, **args):
     step_size = __get_step_size(startTimestamp, endTimestamp, density, factor=1)
-    pg_sub_query_subset = __get_constraints(project_id=project_id, data=args)
-    pg_sub_query_chart = __get_constraints(project_id=project_id, time_constraint=False,
-                                           chart=True, data=args, main_table="pages", time_column="timestamp",
-                                           project=False, duration=False)
+    pg_sub_query_subset = await __get_constraints_async(project_id=project_id, data=args)
+    pg_sub_query_chart = await __get_constraints_async(project_id=project_id, time_constraint=False,
+                                                       chart=True, data=args, main_table="pages", time_column="timestamp",
+                                                       project=False, duration=False)
 
     if url is not None:
         pg_sub_query_subset.append(f"pages.path = %(value)s")
@@ -988,7 +999,7 @@ def get_pages_dom_build_time(project_id, startTimestamp=TimeUTC.now(delta_days=-
     pg_sub_query_subset.append("pages.dom_building_time>0")
     pg_sub_query_subset.append("pages.dom_building_time IS NOT NULL")
 
-    with pg_client.PostgresClient() as cur:
+    async with pg_client.AsyncPostgresClient() as cur:
         pg_query = f"""WITH pages AS ( SELECT pages.dom_building_time, timestamp 
                                     FROM public.sessions
                                              INNER JOIN events.pages USING (session_id)
@@ -1012,20 +1023,20 @@ def get_pages_dom_build_time(project_id, startTimestamp=TimeUTC.now(delta_days=-
                   "endTimestamp": endTimestamp,
                   "value": url, **__get_constraint_values(args)}
 
-        cur.execute(cur.mogrify(pg_query, params))
-        row = cur.fetchone()
+        await cur.execute(cur.mogrify(pg_query, params))
+        row = await cur.fetchone()
     return row
 
 
 @dev.timed
-def get_slowest_resources(project_id, startTimestamp=TimeUTC.now(delta_days=-1),
-                          endTimestamp=TimeUTC.now(), type="all", density=19, **args):
+async def get_slowest_resources(project_id, startTimestamp=TimeUTC.now(delta_days=-1),
+                                endTimestamp=TimeUTC.now(), type="all", density=19, **args):
     step_size = __get_step_size(startTimestamp, endTimestamp, density, factor=1)
-    pg_sub_query = __get_constraints(project_id=project_id, data=args)
-    pg_sub_query_subset = __get_constraints(project_id=project_id, data=args)
-    pg_sub_query_chart = __get_constraints(project_id=project_id, time_constraint=False,
-                                           chart=True, data=args, main_table="resources", time_column="timestamp",
-                                           project=False, duration=False)
+    pg_sub_query = await __get_constraints_async(project_id=project_id, data=args)
+    pg_sub_query_subset = await __get_constraints_async(project_id=project_id, data=args)
+    pg_sub_query_chart = await __get_constraints_async(project_id=project_id, time_constraint=False,
+                                                       chart=True, data=args, main_table="resources", time_column="timestamp",
+                                                       project=False, duration=False)
 
     pg_sub_query_subset.append("resources.timestamp>=%(startTimestamp)s")
     pg_sub_query_subset.append("resources.timestamp<%(endTimestamp)s")
@@ -1039,7 +1050,7 @@ def get_slowest_resources(project_id, startTimestamp=TimeUTC.now(delta_days=-1),
     pg_sub_query_subset.append(sq)
     pg_sub_query_chart.append("resources.url_hostpath ILIKE '%%' || main_list.name")
 
-    with pg_client.PostgresClient() as cur:
+    async with pg_client.AsyncPostgresClient() as cur:
         pg_query = f"""WITH resources AS (
                                             SELECT resources.duration, url_hostpath, timestamp
                                             FROM events.resources
@@ -1080,44 +1091,44 @@ def get_slowest_resources(project_id, startTimestamp=TimeUTC.now(delta_days=-1),
                                  ) AS chart_details
                             ) AS chart_details ON (TRUE);"""
 
-        cur.execute(cur.mogrify(pg_query, {"project_id": project_id,
-                                           "startTimestamp": startTimestamp,
-                                           "endTimestamp": endTimestamp,
-                                           "step_size": step_size,
-                                           **__get_constraint_values(args)}))
-        rows = cur.fetchall()
+        await cur.execute(cur.mogrify(pg_query, {"project_id": project_id,
+                                                 "startTimestamp": startTimestamp,
+                                                 "endTimestamp": endTimestamp,
+                                                 "step_size": step_size,
+                                                 **__get_constraint_values(args)}))
+        rows = await cur.fetchall()
         for r in rows:
             r["type"] = __get_resource_type_from_db_type(r["type"])
     return rows
 
 
 @dev.timed
-def get_sessions_location(project_id, startTimestamp=TimeUTC.now(delta_days=-1),
-                          endTimestamp=TimeUTC.now(), **args):
-    pg_sub_query = __get_constraints(project_id=project_id, data=args)
+async def get_sessions_location(project_id, startTimestamp=TimeUTC.now(delta_days=-1),
+                                endTimestamp=TimeUTC.now(), **args):
+    pg_sub_query = await __get_constraints_async(project_id=project_id, data=args)
 
-    with pg_client.PostgresClient() as cur:
+    async with pg_client.AsyncPostgresClient() as cur:
         pg_query = f"""SELECT user_country, COUNT(session_id) AS count
                         FROM public.sessions
                         WHERE {" AND ".join(pg_sub_query)} 
                         GROUP BY user_country
                         ORDER BY user_country;"""
-        cur.execute(cur.mogrify(pg_query,
-                                {"project_id": project_id,
-                                 "startTimestamp": startTimestamp,
-                                 "endTimestamp": endTimestamp, **__get_constraint_values(args)}))
-        rows = cur.fetchall()
+        await cur.execute(cur.mogrify(pg_query,
+                                      {"project_id": project_id,
+                                       "startTimestamp": startTimestamp,
+                                       "endTimestamp": endTimestamp, **__get_constraint_values(args)}))
+        rows = await cur.fetchall()
     return {"count": sum(i["count"] for i in rows), "chart": helper.list_to_camel_case(rows)}
 
 
 @dev.timed
-def get_speed_index_location(project_id, startTimestamp=TimeUTC.now(delta_days=-1),
-                             endTimestamp=TimeUTC.now(), **args):
-    pg_sub_query = __get_constraints(project_id=project_id, data=args)
+async def get_speed_index_location(project_id, startTimestamp=TimeUTC.now(delta_days=-1),
+                                   endTimestamp=TimeUTC.now(), **args):
+    pg_sub_query = await __get_constraints_async(project_id=project_id, data=args)
     pg_sub_query.append("pages.speed_index IS NOT NULL")
     pg_sub_query.append("pages.speed_index>0")
 
-    with pg_client.PostgresClient() as cur:
+    async with pg_client.AsyncPostgresClient() as cur:
         pg_query = f"""SELECT sessions.user_country, AVG(pages.speed_index) AS avg
                         FROM events.pages INNER JOIN public.sessions USING (session_id)
                         WHERE {" AND ".join(pg_sub_query)} 
@@ -1126,34 +1137,34 @@ def get_speed_index_location(project_id, startTimestamp=TimeUTC.now(delta_days=-
         params = {"project_id": project_id,
                   "startTimestamp": startTimestamp,
                   "endTimestamp": endTimestamp, **__get_constraint_values(args)}
-        cur.execute(cur.mogrify(pg_query, params))
-        rows = cur.fetchall()
+        await cur.execute(cur.mogrify(pg_query, params))
+        rows = await cur.fetchall()
         if len(rows) > 0:
             pg_query = f"""SELECT AVG(pages.speed_index) AS avg
                                 FROM events.pages INNER JOIN public.sessions USING (session_id)
                                 WHERE {" AND ".join(pg_sub_query)};"""
-            cur.execute(cur.mogrify(pg_query, params))
-            avg = cur.fetchone()["avg"]
+            await cur.execute(cur.mogrify(pg_query, params))
+            avg = (await cur.fetchone())["avg"]
         else:
             avg = 0
     return {"avg": avg, "chart": helper.list_to_camel_case(rows)}
 
 
 @dev.timed
-def get_pages_response_time(project_id, startTimestamp=TimeUTC.now(delta_days=-1),
-                            endTimestamp=TimeUTC.now(), density=7, url=None, **args):
+async def get_pages_response_time(project_id, startTimestamp=TimeUTC.now(delta_days=-1),
+                                  endTimestamp=TimeUTC.now(), density=7, url=None, **args):
     step_size = __get_step_size(startTimestamp, endTimestamp, density, factor=1)
-    pg_sub_query = __get_constraints(project_id=project_id, data=args)
+    pg_sub_query = await __get_constraints_async(project_id=project_id, data=args)
     pg_sub_query.append("pages.response_time IS NOT NULL")
     pg_sub_query.append("pages.response_time>0")
-    pg_sub_query_chart = __get_constraints(project_id=project_id, time_constraint=True, chart=True,
-                                           data=args)
+    pg_sub_query_chart = await __get_constraints_async(project_id=project_id, time_constraint=True, chart=True,
+                                                       data=args)
     pg_sub_query_chart.append("pages.response_time IS NOT NULL")
     pg_sub_query_chart.append("pages.response_time>0")
 
     if url is not None:
         pg_sub_query_chart.append(f"url = %(value)s")
-    with pg_client.PostgresClient() as cur:
+    async with pg_client.AsyncPostgresClient() as cur:
         pg_query = f"""SELECT generated_timestamp AS timestamp,
                                 COALESCE(AVG(pages.response_time),0) AS avg
                         FROM generate_series(%(startTimestamp)s, %(endTimestamp)s, %(step_size)s) AS generated_timestamp
@@ -1169,49 +1180,49 @@ def get_pages_response_time(project_id, startTimestamp=TimeUTC.now(delta_days=-1
                   "startTimestamp": startTimestamp,
                   "endTimestamp": endTimestamp,
                   "value": url, **__get_constraint_values(args)}
-        cur.execute(cur.mogrify(pg_query, params))
-        rows = cur.fetchall()
+        await cur.execute(cur.mogrify(pg_query, params))
+        rows = await cur.fetchall()
         pg_query = f"""SELECT COALESCE(AVG(pages.response_time),0) AS avg
                         FROM events.pages INNER JOIN public.sessions USING (session_id)
                         WHERE {" AND ".join(pg_sub_query)};"""
-        cur.execute(cur.mogrify(pg_query, params))
-        avg = cur.fetchone()["avg"]
+        await cur.execute(cur.mogrify(pg_query, params))
+        avg = (await cur.fetchone())["avg"]
     return {"avg": avg, "chart": rows}
 
 
 @dev.timed
-def get_pages_response_time_distribution(project_id, startTimestamp=TimeUTC.now(delta_days=-1),
-                                         endTimestamp=TimeUTC.now(), density=20, **args):
-    pg_sub_query = __get_constraints(project_id=project_id, data=args)
+async def get_pages_response_time_distribution(project_id, startTimestamp=TimeUTC.now(delta_days=-1),
+                                               endTimestamp=TimeUTC.now(), density=20, **args):
+    pg_sub_query = await __get_constraints_async(project_id=project_id, data=args)
     pg_sub_query.append("pages.response_time IS NOT NULL")
     pg_sub_query.append("pages.response_time>0")
 
-    with pg_client.PostgresClient() as cur:
+    async with pg_client.AsyncPostgresClient() as cur:
         pg_query = f"""SELECT pages.response_time AS response_time,
                               COUNT(pages.session_id) AS count
                         FROM events.pages INNER JOIN public.sessions USING (session_id)
                         WHERE {" AND ".join(pg_sub_query)} 
                         GROUP BY response_time
                         ORDER BY pages.response_time;"""
-        cur.execute(cur.mogrify(pg_query, {"project_id": project_id,
-                                           "startTimestamp": startTimestamp,
-                                           "endTimestamp": endTimestamp, **__get_constraint_values(args)}))
-        rows = cur.fetchall()
+        await cur.execute(cur.mogrify(pg_query, {"project_id": project_id,
+                                                 "startTimestamp": startTimestamp,
+                                                 "endTimestamp": endTimestamp, **__get_constraint_values(args)}))
+        rows = await cur.fetchall()
         pg_query = f"""SELECT COALESCE(AVG(pages.response_time),0) AS avg
                         FROM events.pages INNER JOIN public.sessions USING (session_id)
                         WHERE {" AND ".join(pg_sub_query)};"""
-        cur.execute(cur.mogrify(pg_query, {"project_id": project_id,
-                                           "startTimestamp": startTimestamp,
-                                           "endTimestamp": endTimestamp, **__get_constraint_values(args)}))
-        avg = cur.fetchone()["avg"]
+        await cur.execute(cur.mogrify(pg_query, {"project_id": project_id,
+                                                 "startTimestamp": startTimestamp,
+                                                 "endTimestamp": endTimestamp, **__get_constraint_values(args)}))
+        avg = (await cur.fetchone())["avg"]
         quantiles_keys = [50, 90, 95, 99]
         pg_query = f"""SELECT pages.response_time AS value
                         FROM events.pages INNER JOIN public.sessions USING (session_id)
                         WHERE {" AND ".join(pg_sub_query)};"""
-        cur.execute(cur.mogrify(pg_query, {"project_id": project_id,
-                                           "startTimestamp": startTimestamp,
-                                           "endTimestamp": endTimestamp, **__get_constraint_values(args)}))
-        response_times = cur.fetchall()
+        await cur.execute(cur.mogrify(pg_query, {"project_id": project_id,
+                                                 "startTimestamp": startTimestamp,
+                                                 "endTimestamp": endTimestamp, **__get_constraint_values(args)}))
+        response_times = await cur.fetchall()
         response_times = [i["value"] for i in response_times]
         if len(response_times) > 0:
             quantiles = __quantiles(a=response_times,
@@ -1298,11 +1309,11 @@ def get_pages_response_time_distribution(project_id, startTimestamp=TimeUTC.now(
 
 
 @dev.timed
-def get_busiest_time_of_day(project_id, startTimestamp=TimeUTC.now(delta_days=-1),
-                            endTimestamp=TimeUTC.now(), **args):
-    pg_sub_query = __get_constraints(project_id=project_id, data=args)
+async def get_busiest_time_of_day(project_id, startTimestamp=TimeUTC.now(delta_days=-1),
+                                  endTimestamp=TimeUTC.now(), **args):
+    pg_sub_query = await __get_constraints_async(project_id=project_id, data=args)
 
-    with pg_client.PostgresClient() as cur:
+    async with pg_client.AsyncPostgresClient() as cur:
         pg_query = f"""SELECT
                             (EXTRACT(HOUR FROM TO_TIMESTAMP(sessions.start_ts))::INTEGER / 2) * 2 AS hour,
                             COUNT(sessions.session_id) AS count
@@ -1310,21 +1321,21 @@ def get_busiest_time_of_day(project_id, startTimestamp=TimeUTC.now(delta_days=-1
                         WHERE {" AND ".join(pg_sub_query)}
                         GROUP BY hour
                         ORDER BY hour ASC;"""
-        cur.execute(cur.mogrify(pg_query, {"project_id": project_id,
-                                           "startTimestamp": startTimestamp,
-                                           "endTimestamp": endTimestamp, **__get_constraint_values(args)}))
-        rows = cur.fetchall()
+        await cur.execute(cur.mogrify(pg_query, {"project_id": project_id,
+                                                 "startTimestamp": startTimestamp,
+                                                 "endTimestamp": endTimestamp, **__get_constraint_values(args)}))
+        rows = await cur.fetchall()
     return rows
 
 
 @dev.timed
-def get_top_metrics(project_id, startTimestamp=TimeUTC.now(delta_days=-1),
-                    endTimestamp=TimeUTC.now(), value=None, **args):
-    pg_sub_query = __get_constraints(project_id=project_id, data=args)
+async def get_top_metrics(project_id, startTimestamp=TimeUTC.now(delta_days=-1),
+                          endTimestamp=TimeUTC.now(), value=None, **args):
+    pg_sub_query = await __get_constraints_async(project_id=project_id, data=args)
 
     if value is not None:
         pg_sub_query.append("pages.path = %(value)s")
-    with pg_client.PostgresClient() as cur:
+    async with pg_client.AsyncPostgresClient() as cur:
         pg_query = f"""WITH pages AS (SELECT pages.response_time,
                               pages.first_paint_time,
                               pages.dom_content_loaded_time,
@@ -1360,27 +1371,27 @@ def get_top_metrics(project_id, startTimestamp=TimeUTC.now(delta_days=-1),
                 FROM events.pages
                          INNER JOIN public.sessions USING (session_id)
                 WHERE {" AND ".join(pg_sub_query)}) AS count_requests;"""
-        cur.execute(cur.mogrify(pg_query, {"project_id": project_id,
-                                           "startTimestamp": startTimestamp,
-                                           "endTimestamp": endTimestamp,
-                                           "value": value, **__get_constraint_values(args)}))
-        row = cur.fetchone()
+        await cur.execute(cur.mogrify(pg_query, {"project_id": project_id,
+                                                 "startTimestamp": startTimestamp,
+                                                 "endTimestamp": endTimestamp,
+                                                 "value": value, **__get_constraint_values(args)}))
+        row = await cur.fetchone()
     return helper.dict_to_camel_case(row)
 
 
 @dev.timed
-def get_time_to_render(project_id, startTimestamp=TimeUTC.now(delta_days=-1),
-                       endTimestamp=TimeUTC.now(), density=7, url=None, **args):
+async def get_time_to_render(project_id, startTimestamp=TimeUTC.now(delta_days=-1),
+                             endTimestamp=TimeUTC.now(), density=7, url=None, **args):
     step_size = __get_step_size(startTimestamp, endTimestamp, density, factor=1)
-    pg_sub_query_subset = __get_constraints(project_id=project_id, data=args)
-    pg_sub_query_chart = __get_constraints(project_id=project_id, time_constraint=False,
-                                           chart=True, data=args, main_table="pages", time_column="timestamp",
-                                           project=False, duration=False)
+    pg_sub_query_subset = await __get_constraints_async(project_id=project_id, data=args)
+    pg_sub_query_chart = await __get_constraints_async(project_id=project_id, time_constraint=False,
+                                                       chart=True, data=args, main_table="pages", time_column="timestamp",
+                                                       project=False, duration=False)
     pg_sub_query_subset.append("pages.visually_complete>0")
     if url is not None:
         pg_sub_query_subset.append("pages.path = %(value)s")
 
-    with pg_client.PostgresClient() as cur:
+    async with pg_client.AsyncPostgresClient() as cur:
         pg_query = f"""WITH pages AS(SELECT pages.visually_complete,pages.timestamp 
                                     FROM events.pages INNER JOIN public.sessions USING (session_id)
                                     WHERE {" AND ".join(pg_sub_query_subset)})
@@ -1400,18 +1411,18 @@ def get_time_to_render(project_id, startTimestamp=TimeUTC.now(delta_days=-1),
                   "project_id": project_id,
                   "startTimestamp": startTimestamp,
                   "endTimestamp": endTimestamp, "value": url, **__get_constraint_values(args)}
-        cur.execute(cur.mogrify(pg_query, params))
-        row = cur.fetchone()
+        await cur.execute(cur.mogrify(pg_query, params))
+        row = await cur.fetchone()
     return row
 
 
 @dev.timed
-def get_impacted_sessions_by_slow_pages(project_id, startTimestamp=TimeUTC.now(delta_days=-1),
-                                        endTimestamp=TimeUTC.now(), value=None, density=7, **args):
+async def get_impacted_sessions_by_slow_pages(project_id, startTimestamp=TimeUTC.now(delta_days=-1),
+                                              endTimestamp=TimeUTC.now(), value=None, density=7, **args):
     step_size = __get_step_size(startTimestamp, endTimestamp, density, factor=1)
-    pg_sub_query = __get_constraints(project_id=project_id, data=args)
-    pg_sub_query_chart = __get_constraints(project_id=project_id, time_constraint=True, chart=True,
-                                           data=args)
+    pg_sub_query = await __get_constraints_async(project_id=project_id, data=args)
+    pg_sub_query_chart = await __get_constraints_async(project_id=project_id, time_constraint=True, chart=True,
+                                                       data=args)
     pg_sub_query.append("pages.response_time IS NOT NULL")
     pg_sub_query_chart.append("pages.response_time IS NOT NULL")
     pg_sub_query.append("pages.response_time>0")
@@ -1421,7 +1432,7 @@ def get_impacted_sessions_by_slow_pages(project_id, startTimestamp=TimeUTC.now(d
         pg_sub_query_chart.append("pages.path = %(value)s")
     pg_sub_query_chart.append("avg_response_time>0")
     pg_sub_query_chart.append("pages.response_time>avg_response_time*2")
-    with pg_client.PostgresClient() as cur:
+    async with pg_client.AsyncPostgresClient() as cur:
         pg_query = f"""SELECT generated_timestamp AS timestamp,
                               COUNT(pages.session_id) AS count
                         FROM generate_series(%(startTimestamp)s, %(endTimestamp)s, %(step_size)s) AS generated_timestamp
@@ -1435,24 +1446,24 @@ def get_impacted_sessions_by_slow_pages(project_id, startTimestamp=TimeUTC.now(d
                              ) AS pages ON (TRUE)
                         GROUP BY generated_timestamp
                         ORDER BY generated_timestamp;"""
-        cur.execute(cur.mogrify(pg_query, {"step_size": step_size,
-                                           "project_id": project_id,
-                                           "startTimestamp": startTimestamp,
-                                           "endTimestamp": endTimestamp,
-                                           "value": value, **__get_constraint_values(args)}))
-        rows = cur.fetchall()
+        await cur.execute(cur.mogrify(pg_query, {"step_size": step_size,
+                                                 "project_id": project_id,
+                                                 "startTimestamp": startTimestamp,
+                                                 "endTimestamp": endTimestamp,
+                                                 "value": value, **__get_constraint_values(args)}))
+        rows = await cur.fetchall()
     return rows
 
 
 @dev.timed
-def get_memory_consumption(project_id, startTimestamp=TimeUTC.now(delta_days=-1),
-                           endTimestamp=TimeUTC.now(), density=7, **args):
+async def get_memory_consumption(project_id, startTimestamp=TimeUTC.now(delta_days=-1),
+                                 endTimestamp=TimeUTC.now(), density=7, **args):
     step_size = __get_step_size(startTimestamp, endTimestamp, density, factor=1)
-    pg_sub_query = __get_constraints(project_id=project_id, data=args)
-    pg_sub_query_chart = __get_constraints(project_id=project_id, time_constraint=True,
-                                           chart=True, data=args)
+    pg_sub_query = await __get_constraints_async(project_id=project_id, data=args)
+    pg_sub_query_chart = await __get_constraints_async(project_id=project_id, time_constraint=True,
+                                                       chart=True, data=args)
 
-    with pg_client.PostgresClient() as cur:
+    async with pg_client.AsyncPostgresClient() as cur:
         pg_query = f"""SELECT generated_timestamp AS timestamp,
                             COALESCE(AVG(performance.avg_used_js_heap_size),0) AS avg_used_js_heap_size
                         FROM generate_series(%(startTimestamp)s, %(endTimestamp)s, %(step_size)s) AS generated_timestamp
@@ -1467,25 +1478,25 @@ def get_memory_consumption(project_id, startTimestamp=TimeUTC.now(delta_days=-1)
                   "project_id": project_id,
                   "startTimestamp": startTimestamp,
                   "endTimestamp": endTimestamp, **__get_constraint_values(args)}
-        cur.execute(cur.mogrify(pg_query, params))
-        rows = cur.fetchall()
+        await cur.execute(cur.mogrify(pg_query, params))
+        rows = await cur.fetchall()
         pg_query = f"""SELECT COALESCE(AVG(performance.avg_used_js_heap_size),0) AS avg
                         FROM events.performance INNER JOIN public.sessions USING (session_id)
                         WHERE {" AND ".join(pg_sub_query)};"""
-        cur.execute(cur.mogrify(pg_query, params))
-        avg = cur.fetchone()["avg"]
+        await cur.execute(cur.mogrify(pg_query, params))
+        avg = (await cur.fetchone())["avg"]
     return {"avgUsedJsHeapSize": avg, "chart": helper.list_to_camel_case(rows)}
 
 
 @dev.timed
-def get_avg_cpu(project_id, startTimestamp=TimeUTC.now(delta_days=-1),
-                endTimestamp=TimeUTC.now(), density=7, **args):
+async def get_avg_cpu(project_id, startTimestamp=TimeUTC.now(delta_days=-1),
+                      endTimestamp=TimeUTC.now(), density=7, **args):
     step_size = __get_step_size(startTimestamp, endTimestamp, density, factor=1)
-    pg_sub_query = __get_constraints(project_id=project_id, data=args)
-    pg_sub_query_chart = __get_constraints(project_id=project_id, time_constraint=True,
-                                           chart=True, data=args)
+    pg_sub_query = await __get_constraints_async(project_id=project_id, data=args)
+    pg_sub_query_chart = await __get_constraints_async(project_id=project_id, time_constraint=True,
+                                                       chart=True, data=args)
 
-    with pg_client.PostgresClient() as cur:
+    async with pg_client.AsyncPostgresClient() as cur:
         pg_query = f"""SELECT generated_timestamp AS timestamp,
                             COALESCE(AVG(performance.avg_cpu),0) AS avg_cpu
                         FROM generate_series(%(startTimestamp)s, %(endTimestamp)s, %(step_size)s) AS generated_timestamp
@@ -1500,25 +1511,25 @@ def get_avg_cpu(project_id, startTimestamp=TimeUTC.now(delta_days=-1),
                   "project_id": project_id,
                   "startTimestamp": startTimestamp,
                   "endTimestamp": endTimestamp, **__get_constraint_values(args)}
-        cur.execute(cur.mogrify(pg_query, params))
-        rows = cur.fetchall()
+        await cur.execute(cur.mogrify(pg_query, params))
+        rows = await cur.fetchall()
         pg_query = f"""SELECT COALESCE(AVG(performance.avg_cpu),0) AS avg
                         FROM events.performance INNER JOIN public.sessions USING (session_id)
                         WHERE {" AND ".join(pg_sub_query)};"""
-        cur.execute(cur.mogrify(pg_query, params))
-        avg = cur.fetchone()["avg"]
+        await cur.execute(cur.mogrify(pg_query, params))
+        avg = (await cur.fetchone())["avg"]
     return {"avgCpu": avg, "chart": helper.list_to_camel_case(rows)}
 
 
 @dev.timed
-def get_avg_fps(project_id, startTimestamp=TimeUTC.now(delta_days=-1),
-                endTimestamp=TimeUTC.now(), density=7, **args):
+async def get_avg_fps(project_id, startTimestamp=TimeUTC.now(delta_days=-1),
+                      endTimestamp=TimeUTC.now(), density=7, **args):
     step_size = __get_step_size(startTimestamp, endTimestamp, density, factor=1)
-    pg_sub_query = __get_constraints(project_id=project_id, data=args)
-    pg_sub_query_chart = __get_constraints(project_id=project_id, time_constraint=True,
-                                           chart=True, data=args)
+    pg_sub_query = await __get_constraints_async(project_id=project_id, data=args)
+    pg_sub_query_chart = await __get_constraints_async(project_id=project_id, time_constraint=True,
+                                                       chart=True, data=args)
 
-    with pg_client.PostgresClient() as cur:
+    async with pg_client.AsyncPostgresClient() as cur:
         pg_query = f"""SELECT generated_timestamp AS timestamp,
                               COALESCE(AVG(NULLIF(performance.avg_fps,0)),0) AS avg_fps
                         FROM generate_series(%(startTimestamp)s, %(endTimestamp)s, %(step_size)s) AS generated_timestamp 
@@ -1533,26 +1544,26 @@ def get_avg_fps(project_id, startTimestamp=TimeUTC.now(delta_days=-1),
                   "project_id": project_id,
                   "startTimestamp": startTimestamp,
                   "endTimestamp": endTimestamp, **__get_constraint_values(args)}
-        cur.execute(cur.mogrify(pg_query, params))
-        rows = cur.fetchall()
+        await cur.execute(cur.mogrify(pg_query, params))
+        rows = await cur.fetchall()
         pg_query = f"""SELECT COALESCE(AVG(NULLIF(performance.avg_fps,0)),0) AS avg
                         FROM events.performance INNER JOIN public.sessions USING (session_id)
                         WHERE {" AND ".join(pg_sub_query)};"""
-        cur.execute(cur.mogrify(pg_query, params))
-        avg = cur.fetchone()["avg"]
+        await cur.execute(cur.mogrify(pg_query, params))
+        avg = (await cur.fetchone())["avg"]
     return {"avgFps": avg, "chart": helper.list_to_camel_case(rows)}
 
 
 @dev.timed
-def get_crashes(project_id, startTimestamp=TimeUTC.now(delta_days=-1),
-                endTimestamp=TimeUTC.now(), density=7, **args):
+async def get_crashes(project_id, startTimestamp=TimeUTC.now(delta_days=-1),
+                      endTimestamp=TimeUTC.now(), density=7, **args):
     step_size = __get_step_size(startTimestamp, endTimestamp, density, factor=1)
-    pg_sub_query = __get_constraints(project_id=project_id, data=args)
+    pg_sub_query = await __get_constraints_async(project_id=project_id, data=args)
     pg_sub_query.append("m_issues.type = 'crash'")
-    pg_sub_query_chart = __get_constraints(project_id=project_id, time_constraint=True,
-                                           chart=True, data=args)
+    pg_sub_query_chart = await __get_constraints_async(project_id=project_id, time_constraint=True,
+                                                       chart=True, data=args)
     pg_sub_query_chart.append("m_issues.type = 'crash'")
-    with pg_client.PostgresClient() as cur:
+    async with pg_client.AsyncPostgresClient() as cur:
         pg_query = f"""SELECT generated_timestamp AS timestamp,
                                COUNT(sessions) AS count
                         FROM generate_series(%(startTimestamp)s, %(endTimestamp)s, %(step_size)s) AS generated_timestamp
@@ -1565,12 +1576,12 @@ def get_crashes(project_id, startTimestamp=TimeUTC.now(delta_days=-1),
                             ) AS sessions ON (TRUE)
                         GROUP BY generated_timestamp
                         ORDER BY generated_timestamp;"""
-        cur.execute(cur.mogrify(pg_query, {"step_size": step_size,
-                                           "project_id": project_id,
-                                           "startTimestamp": startTimestamp,
-                                           "endTimestamp": endTimestamp,
-                                           **__get_constraint_values(args)}))
-        rows = cur.fetchall()
+        await cur.execute(cur.mogrify(pg_query, {"step_size": step_size,
+                                                 "project_id": project_id,
+                                                 "startTimestamp": startTimestamp,
+                                                 "endTimestamp": endTimestamp,
+                                                 **__get_constraint_values(args)}))
+        rows = await cur.fetchall()
         pg_query = f"""SELECT b.user_browser AS browser,
                                 sum(bv.count) AS total,
                                 JSONB_AGG(bv) AS versions
@@ -1598,12 +1609,12 @@ def get_crashes(project_id, startTimestamp=TimeUTC.now(delta_days=-1),
                              ) AS bv ON (TRUE)
                         GROUP BY b.user_browser
                         ORDER BY b.user_browser;"""
-        cur.execute(cur.mogrify(pg_query, {"step_size": step_size,
-                                           "project_id": project_id,
-                                           "startTimestamp": startTimestamp,
-                                           "endTimestamp": endTimestamp,
-                                           **__get_constraint_values(args)}))
-        browsers = cur.fetchall()
+        await cur.execute(cur.mogrify(pg_query, {"step_size": step_size,
+                                                 "project_id": project_id,
+                                                 "startTimestamp": startTimestamp,
+                                                 "endTimestamp": endTimestamp,
+                                                 **__get_constraint_values(args)}))
+        browsers = await cur.fetchall()
         total = sum(r["total"] for r in browsers)
         for r in browsers:
             r["percentage"] = r["total"] / (total / 100)
@@ -1629,18 +1640,18 @@ def __merge_rows_with_neutral(rows, neutral):
 
 
 @dev.timed
-def get_domains_errors(project_id, startTimestamp=TimeUTC.now(delta_days=-1),
-                       endTimestamp=TimeUTC.now(), density=6, **args):
+async def get_domains_errors(project_id, startTimestamp=TimeUTC.now(delta_days=-1),
+                             endTimestamp=TimeUTC.now(), density=6, **args):
     step_size = __get_step_size(startTimestamp, endTimestamp, density, factor=1)
-    pg_sub_query_subset = __get_constraints(project_id=project_id, time_constraint=True, chart=False, data=args)
-    pg_sub_query_chart = __get_constraints(project_id=project_id, time_constraint=False, chart=True,
-                                           data=args, main_table="resources", time_column="timestamp", project=False,
-                                           duration=False)
+    pg_sub_query_subset = await __get_constraints_async(project_id=project_id, time_constraint=True, chart=False, data=args)
+    pg_sub_query_chart = await __get_constraints_async(project_id=project_id, time_constraint=False, chart=True,
+                                                       data=args, main_table="resources", time_column="timestamp", project=False,
+                                                       duration=False)
     pg_sub_query_subset.append("resources.timestamp>=%(startTimestamp)s")
     pg_sub_query_subset.append("resources.timestamp<%(endTimestamp)s")
     pg_sub_query_subset.append("resources.status/100 = %(status_code)s")
 
-    with pg_client.PostgresClient() as cur:
+    async with pg_client.AsyncPostgresClient() as cur:
         pg_query = f"""WITH resources AS(SELECT resources.url_host, timestamp 
                                          FROM events.resources INNER JOIN public.sessions USING (session_id)
                                          WHERE {" AND ".join(pg_sub_query_subset)}
@@ -1662,16 +1673,16 @@ def get_domains_errors(project_id, startTimestamp=TimeUTC.now(delta_days=-1),
                   "endTimestamp": endTimestamp,
                   "step_size": step_size,
                   "status_code": 4, **__get_constraint_values(args)}
-        cur.execute(cur.mogrify(pg_query, params))
-        rows = cur.fetchall()
+        await cur.execute(cur.mogrify(pg_query, params))
+        rows = await cur.fetchall()
         rows = __nested_array_to_dict_array(rows)
         neutral = __get_neutral(rows)
         rows = __merge_rows_with_neutral(rows, neutral)
 
         result = {"4xx": rows}
         params["status_code"] = 5
-        cur.execute(cur.mogrify(pg_query, params))
-        rows = cur.fetchall()
+        await cur.execute(cur.mogrify(pg_query, params))
+        rows = await cur.fetchall()
         rows = __nested_array_to_dict_array(rows)
         neutral = __get_neutral(rows)
         rows = __merge_rows_with_neutral(rows, neutral)
@@ -1680,16 +1691,16 @@ def get_domains_errors(project_id, startTimestamp=TimeUTC.now(delta_days=-1),
 
 
 @dev.timed
-def get_domains_errors_4xx(project_id, startTimestamp=TimeUTC.now(delta_days=-1),
-                           endTimestamp=TimeUTC.now(), density=6, **args):
+async def get_domains_errors_4xx(project_id, startTimestamp=TimeUTC.now(delta_days=-1),
+                                 endTimestamp=TimeUTC.now(), density=6, **args):
     step_size = __get_step_size(startTimestamp, endTimestamp, density, factor=1)
-    pg_sub_query_subset = __get_constraints(project_id=project_id, time_constraint=True, chart=False, data=args)
-    pg_sub_query_chart = __get_constraints(project_id=project_id, time_constraint=False, chart=True,
-                                           data=args, main_table="resources", time_column="timestamp", project=False,
-                                           duration=False)
+    pg_sub_query_subset = await __get_constraints_async(project_id=project_id, time_constraint=True, chart=False, data=args)
+    pg_sub_query_chart = await __get_constraints_async(project_id=project_id, time_constraint=False, chart=True,
+                                                       data=args, main_table="resources", time_column="timestamp", project=False,
+                                                       duration=False)
     pg_sub_query_subset.append("resources.status/100 = %(status_code)s")
 
-    with pg_client.PostgresClient() as cur:
+    async with pg_client.AsyncPostgresClient() as cur:
         pg_query = f"""WITH resources AS (SELECT resources.url_host, timestamp 
                                          FROM events.resources INNER JOIN public.sessions USING (session_id)
                                          WHERE {" AND ".join(pg_sub_query_subset)}
@@ -1711,8 +1722,8 @@ def get_domains_errors_4xx(project_id, startTimestamp=TimeUTC.now(delta_days=-1)
                   "endTimestamp": endTimestamp,
                   "step_size": step_size,
                   "status_code": 4, **__get_constraint_values(args)}
-        cur.execute(cur.mogrify(pg_query, params))
-        rows = cur.fetchall()
+        await cur.execute(cur.mogrify(pg_query, params))
+        rows = await cur.fetchall()
         rows = __nested_array_to_dict_array(rows)
         neutral = __get_neutral(rows)
         rows = __merge_rows_with_neutral(rows, neutral)
@@ -1721,16 +1732,16 @@ def get_domains_errors_4xx(project_id, startTimestamp=TimeUTC.now(delta_days=-1)
 
 
 @dev.timed
-def get_domains_errors_5xx(project_id, startTimestamp=TimeUTC.now(delta_days=-1),
-                           endTimestamp=TimeUTC.now(), density=6, **args):
+async def get_domains_errors_5xx(project_id, startTimestamp=TimeUTC.now(delta_days=-1),
+                                 endTimestamp=TimeUTC.now(), density=6, **args):
     step_size = __get_step_size(startTimestamp, endTimestamp, density, factor=1)
-    pg_sub_query_subset = __get_constraints(project_id=project_id, time_constraint=True, chart=False, data=args)
-    pg_sub_query_chart = __get_constraints(project_id=project_id, time_constraint=False, chart=True,
-                                           data=args, main_table="resources", time_column="timestamp", project=False,
-                                           duration=False)
+    pg_sub_query_subset = await __get_constraints_async(project_id=project_id, time_constraint=True, chart=False, data=args)
+    pg_sub_query_chart = await __get_constraints_async(project_id=project_id, time_constraint=False, chart=True,
+                                                       data=args, main_table="resources", time_column="timestamp", project=False,
+                                                       duration=False)
     pg_sub_query_subset.append("resources.status/100 = %(status_code)s")
 
-    with pg_client.PostgresClient() as cur:
+    async with pg_client.AsyncPostgresClient() as cur:
         pg_query = f"""WITH resources AS (SELECT resources.url_host, timestamp 
                                          FROM events.resources INNER JOIN public.sessions USING (session_id)
                                          WHERE {" AND ".join(pg_sub_query_subset)}
@@ -1752,8 +1763,8 @@ def get_domains_errors_5xx(project_id, startTimestamp=TimeUTC.now(delta_days=-1)
                   "endTimestamp": endTimestamp,
                   "step_size": step_size,
                   "status_code": 5, **__get_constraint_values(args)}
-        cur.execute(cur.mogrify(pg_query, params))
-        rows = cur.fetchall()
+        await cur.execute(cur.mogrify(pg_query, params))
+        rows = await cur.fetchall()
         rows = __nested_array_to_dict_array(rows)
         neutral = __get_neutral(rows)
         rows = __merge_rows_with_neutral(rows, neutral)
@@ -1770,13 +1781,13 @@ def __nested_array_to_dict_array(rows, key="url_host", value="count"):
 
 
 @dev.timed
-def get_slowest_domains(project_id, startTimestamp=TimeUTC.now(delta_days=-1),
-                        endTimestamp=TimeUTC.now(), **args):
-    pg_sub_query = __get_constraints(project_id=project_id, data=args)
+async def get_slowest_domains(project_id, startTimestamp=TimeUTC.now(delta_days=-1),
+                              endTimestamp=TimeUTC.now(), **args):
+    pg_sub_query = await __get_constraints_async(project_id=project_id, data=args)
     pg_sub_query.append("resources.duration IS NOT NULL")
     pg_sub_query.append("resources.duration>0")
 
-    with pg_client.PostgresClient() as cur:
+    async with pg_client.AsyncPostgresClient() as cur:
         pg_query = f"""SELECT
                             resources.url_host AS domain,
                             AVG(resources.duration) AS avg
@@ -1788,26 +1799,26 @@ def get_slowest_domains(project_id, startTimestamp=TimeUTC.now(delta_days=-1),
         params = {"project_id": project_id,
                   "startTimestamp": startTimestamp,
                   "endTimestamp": endTimestamp, **__get_constraint_values(args)}
-        cur.execute(cur.mogrify(pg_query, params))
-        rows = cur.fetchall()
+        await cur.execute(cur.mogrify(pg_query, params))
+        rows = await cur.fetchall()
         if len(rows) > 0:
             pg_query = f"""SELECT AVG(resources.duration) AS avg
                             FROM events.resources INNER JOIN sessions USING (session_id)
                             WHERE {" AND ".join(pg_sub_query)};"""
-            cur.execute(cur.mogrify(pg_query, params))
-            avg = cur.fetchone()["avg"]
+            await cur.execute(cur.mogrify(pg_query, params))
+            avg = (await cur.fetchone())["avg"]
         else:
             avg = 0
     return {"avg": avg, "partition": rows}
 
 
 @dev.timed
-def get_errors_per_domains(project_id, startTimestamp=TimeUTC.now(delta_days=-1),
-                           endTimestamp=TimeUTC.now(), **args):
-    pg_sub_query = __get_constraints(project_id=project_id, data=args)
+async def get_errors_per_domains(project_id, startTimestamp=TimeUTC.now(delta_days=-1),
+                                 endTimestamp=TimeUTC.now(), **args):
+    pg_sub_query = await __get_constraints_async(project_id=project_id, data=args)
     pg_sub_query.append("resources.success = FALSE")
 
-    with pg_client.PostgresClient() as cur:
+    async with pg_client.AsyncPostgresClient() as cur:
         pg_query = f"""SELECT
                             resources.url_host AS domain,
                             COUNT(resources.session_id) AS errors_count
@@ -1816,20 +1827,20 @@ def get_errors_per_domains(project_id, startTimestamp=TimeUTC.now(delta_days=-1)
                         GROUP BY resources.url_host
                         ORDER BY errors_count DESC
                         LIMIT 10;"""
-        cur.execute(cur.mogrify(pg_query, {"project_id": project_id,
-                                           "startTimestamp": startTimestamp,
-                                           "endTimestamp": endTimestamp, **__get_constraint_values(args)}))
-        rows = cur.fetchall()
+        await cur.execute(cur.mogrify(pg_query, {"project_id": project_id,
+                                                 "startTimestamp": startTimestamp,
+                                                 "endTimestamp": endTimestamp, **__get_constraint_values(args)}))
+        rows = await cur.fetchall()
     return helper.list_to_camel_case(rows)
 
 
 @dev.timed
-def get_sessions_per_browser(project_id, startTimestamp=TimeUTC.now(delta_days=-1), endTimestamp=TimeUTC.now(),
-                             platform=None, **args):
-    pg_sub_query = __get_constraints(project_id=project_id, data=args)
+async def get_sessions_per_browser(project_id, startTimestamp=TimeUTC.now(delta_days=-1), endTimestamp=TimeUTC.now(),
+                                   platform=None, **args):
+    pg_sub_query = await __get_constraints_async(project_id=project_id, data=args)
     pg_sub_query2 = pg_sub_query[:]
     pg_sub_query2.append("sessions.user_browser = b.user_browser")
-    with pg_client.PostgresClient() as cur:
+    async with pg_client.AsyncPostgresClient() as cur:
         pg_query = f"""SELECT b.user_browser AS browser,
                                b.count,
                                jsonb_agg(bv)  AS versions
@@ -1855,10 +1866,10 @@ def get_sessions_per_browser(project_id, startTimestamp=TimeUTC.now(delta_days=-
                             ) AS bv ON (TRUE)
                         GROUP BY b.user_browser, b.count
                         ORDER BY b.count DESC;"""
-        cur.execute(cur.mogrify(pg_query, {"project_id": project_id,
-                                           "startTimestamp": startTimestamp,
-                                           "endTimestamp": endTimestamp, **__get_constraint_values(args)}))
-        rows = cur.fetchall()
+        await cur.execute(cur.mogrify(pg_query, {"project_id": project_id,
+                                                 "startTimestamp": startTimestamp,
+                                                 "endTimestamp": endTimestamp, **__get_constraint_values(args)}))
+        rows = await cur.fetchall()
     for r in rows:
         for j in r["versions"]:
             r[j["user_browser_version"]] = j["count"]
@@ -1867,14 +1878,14 @@ def get_sessions_per_browser(project_id, startTimestamp=TimeUTC.now(delta_days=-
 
 
 @dev.timed
-def get_calls_errors(project_id, startTimestamp=TimeUTC.now(delta_days=-1), endTimestamp=TimeUTC.now(),
-                     platform=None, **args):
-    pg_sub_query = __get_constraints(project_id=project_id, data=args)
+async def get_calls_errors(project_id, startTimestamp=TimeUTC.now(delta_days=-1), endTimestamp=TimeUTC.now(),
+                           platform=None, **args):
+    pg_sub_query = await __get_constraints_async(project_id=project_id, data=args)
     pg_sub_query.append("resources.type = 'fetch'")
     pg_sub_query.append("resources.method IS NOT NULL")
     pg_sub_query.append("resources.status/100 != 2")
 
-    with pg_client.PostgresClient() as cur:
+    async with pg_client.AsyncPostgresClient() as cur:
         pg_query = f"""SELECT  resources.method,
                                resources.url_hostpath,
                                COUNT(resources.session_id)                           AS all_requests,
@@ -1885,22 +1896,22 @@ def get_calls_errors(project_id, startTimestamp=TimeUTC.now(delta_days=-1), endT
                         GROUP BY resources.method, resources.url_hostpath
                         ORDER BY (4 + 5), 3 DESC
                         LIMIT 50;"""
-        cur.execute(cur.mogrify(pg_query, {"project_id": project_id,
-                                           "startTimestamp": startTimestamp,
-                                           "endTimestamp": endTimestamp, **__get_constraint_values(args)}))
-        rows = cur.fetchall()
+        await cur.execute(cur.mogrify(pg_query, {"project_id": project_id,
+                                                 "startTimestamp": startTimestamp,
+                                                 "endTimestamp": endTimestamp, **__get_constraint_values(args)}))
+        rows = await cur.fetchall()
     return helper.list_to_camel_case(rows)
 
 
 @dev.timed
-def get_calls_errors_4xx(project_id, startTimestamp=TimeUTC.now(delta_days=-1), endTimestamp=TimeUTC.now(),
-                         platform=None, **args):
-    pg_sub_query = __get_constraints(project_id=project_id, data=args)
+async def get_calls_errors_4xx(project_id, startTimestamp=TimeUTC.now(delta_days=-1), endTimestamp=TimeUTC.now(),
+                               platform=None, **args):
+    pg_sub_query = await __get_constraints_async(project_id=project_id, data=args)
     pg_sub_query.append("resources.type = 'fetch'")
     pg_sub_query.append("resources.method IS NOT NULL")
     pg_sub_query.append("resources.status/100 = 4")
 
-    with pg_client.PostgresClient() as cur:
+    async with pg_client.AsyncPostgresClient() as cur:
         pg_query = f"""SELECT  resources.method,
                                resources.url_hostpath,
                                COUNT(resources.session_id)                           AS all_requests
@@ -1909,22 +1920,22 @@ def get_calls_errors_4xx(project_id, startTimestamp=TimeUTC.now(delta_days=-1),
                         GROUP BY resources.method, resources.url_hostpath
                         ORDER BY all_requests DESC
                         LIMIT 10;"""
-        cur.execute(cur.mogrify(pg_query, {"project_id": project_id,
-                                           "startTimestamp": startTimestamp,
-                                           "endTimestamp": endTimestamp, **__get_constraint_values(args)}))
-        rows = cur.fetchall()
+        await cur.execute(cur.mogrify(pg_query, {"project_id": project_id,
+                                                 "startTimestamp": startTimestamp,
+                                                 "endTimestamp": endTimestamp, **__get_constraint_values(args)}))
+        rows = await cur.fetchall()
     return helper.list_to_camel_case(rows)
 
 
 @dev.timed
-def get_calls_errors_5xx(project_id, startTimestamp=TimeUTC.now(delta_days=-1), endTimestamp=TimeUTC.now(),
-                         platform=None, **args):
-    pg_sub_query = __get_constraints(project_id=project_id, data=args)
+async def get_calls_errors_5xx(project_id, startTimestamp=TimeUTC.now(delta_days=-1), endTimestamp=TimeUTC.now(),
+                               platform=None, **args):
+    pg_sub_query = await __get_constraints_async(project_id=project_id, data=args)
     pg_sub_query.append("resources.type = 'fetch'")
     pg_sub_query.append("resources.method IS NOT NULL")
     pg_sub_query.append("resources.status/100 = 5")
 
-    with pg_client.PostgresClient() as cur:
+    async with pg_client.AsyncPostgresClient() as cur:
         pg_query = f"""SELECT  resources.method,
                                resources.url_hostpath,
                                COUNT(resources.session_id)                           AS all_requests
@@ -1933,33 +1944,33 @@ def get_calls_errors_5xx(project_id, startTimestamp=TimeUTC.now(delta_days=-1),
                         GROUP BY resources.method, resources.url_hostpath
                         ORDER BY all_requests DESC
                         LIMIT 10;"""
-        cur.execute(cur.mogrify(pg_query, {"project_id": project_id,
-                                           "startTimestamp": startTimestamp,
-                                           "endTimestamp": endTimestamp, **__get_constraint_values(args)}))
-        rows = cur.fetchall()
+        await cur.execute(cur.mogrify(pg_query, {"project_id": project_id,
+                                                 "startTimestamp": startTimestamp,
+                                                 "endTimestamp": endTimestamp, **__get_constraint_values(args)}))
+        rows = await cur.fetchall()
     return helper.list_to_camel_case(rows)
 
 
 @dev.timed
-def get_errors_per_type(project_id, startTimestamp=TimeUTC.now(delta_days=-1), endTimestamp=TimeUTC.now(),
-                        platform=None, density=7, **args):
+async def get_errors_per_type(project_id, startTimestamp=TimeUTC.now(delta_days=-1), endTimestamp=TimeUTC.now(),
+                              platform=None, density=7, **args):
     step_size = __get_step_size(startTimestamp, endTimestamp, density, factor=1)
 
-    pg_sub_query_subset = __get_constraints(project_id=project_id, data=args)
+    pg_sub_query_subset = await __get_constraints_async(project_id=project_id, data=args)
     pg_sub_query_subset.append("resources.timestamp>=%(startTimestamp)s")
     pg_sub_query_subset.append("resources.timestamp<%(endTimestamp)s")
     pg_sub_query_subset.append("resources.type != 'fetch'")
     pg_sub_query_subset.append("resources.status > 200")
 
-    pg_sub_query_subset_e = __get_constraints(project_id=project_id, data=args, duration=False, main_table="m_errors",
-                                            time_constraint=False)
-    pg_sub_query_chart = __get_constraints(project_id=project_id, time_constraint=False,
-                                           chart=True, data=args, main_table="", time_column="timestamp",
-                                           project=False, duration=False)
+    pg_sub_query_subset_e = await __get_constraints_async(project_id=project_id, data=args, duration=False, main_table="m_errors",
+                                                  time_constraint=False)
+    pg_sub_query_chart = await __get_constraints_async(project_id=project_id, time_constraint=False,
+                                                       chart=True, data=args, main_table="", time_column="timestamp",
+                                                       project=False, duration=False)
     pg_sub_query_subset_e.append("timestamp>=%(startTimestamp)s")
     pg_sub_query_subset_e.append("timestamp<%(endTimestamp)s")
 
-    with pg_client.PostgresClient() as cur:
+    async with pg_client.AsyncPostgresClient() as cur:
         pg_query = f"""WITH resources AS (SELECT status, timestamp
                                        FROM events.resources
                                                 INNER JOIN public.sessions USING (session_id)
@@ -1999,20 +2010,20 @@ def get_errors_per_type(project_id, startTimestamp=TimeUTC.now(delta_days=-1), e
                   "project_id": project_id,
                   "startTimestamp": startTimestamp,
                   "endTimestamp": endTimestamp, **__get_constraint_values(args)}
-        cur.execute(cur.mogrify(pg_query, params))
-        rows = cur.fetchall()
+        await cur.execute(cur.mogrify(pg_query, params))
+        rows = await cur.fetchall()
         rows = helper.list_to_camel_case(rows)
     return rows
 
 
 @dev.timed
-def resource_type_vs_response_end(project_id, startTimestamp=TimeUTC.now(delta_days=-1),
-                                  endTimestamp=TimeUTC.now(), density=7, **args):
+async def resource_type_vs_response_end(project_id, startTimestamp=TimeUTC.now(delta_days=-1),
+                                        endTimestamp=TimeUTC.now(), density=7, **args):
     step_size = __get_step_size(startTimestamp, endTimestamp, density, factor=1)
-    pg_sub_query_subset = __get_constraints(project_id=project_id, time_constraint=True, chart=False, data=args)
-    pg_sub_query_chart = __get_constraints(project_id=project_id, time_constraint=False, chart=True,
-                                           data=args, main_table="resources", time_column="timestamp", project=False,
-                                           duration=False)
+    pg_sub_query_subset = await __get_constraints_async(project_id=project_id, time_constraint=True, chart=False, data=args)
+    pg_sub_query_chart = await __get_constraints_async(project_id=project_id, time_constraint=False, chart=True,
+                                                       data=args, main_table="resources", time_column="timestamp", project=False,
+                                                       duration=False)
     pg_sub_query_subset.append("resources.timestamp>=%(startTimestamp)s")
     pg_sub_query_subset.append("resources.timestamp<%(endTimestamp)s")
 
@@ -2020,53 +2031,54 @@ def resource_type_vs_response_end(project_id, startTimestamp=TimeUTC.now(delta_d
               "project_id": project_id,
               "startTimestamp": startTimestamp,
               "endTimestamp": endTimestamp, **__get_constraint_values(args)}
-    with pg_client.PostgresClient() as cur:
-        pg_query = f"""WITH resources AS(SELECT resources.type, resources.timestamp 
-                                        FROM events.resources INNER JOIN public.sessions USING (session_id)
-                                        WHERE {" AND ".join(pg_sub_query_subset)})
-                        SELECT generated_timestamp AS timestamp,
-                            COUNT(resources.*) AS total,
-                            SUM(CASE WHEN resources.type='fetch' THEN 1 ELSE 0 END) AS xhr
-                        FROM generate_series(%(startTimestamp)s, %(endTimestamp)s, %(step_size)s) AS generated_timestamp
-                             LEFT JOIN LATERAL (SELECT resources.type 
-                                                FROM resources
-                                                WHERE {" AND ".join(pg_sub_query_chart)}) AS resources ON (TRUE)
-                        GROUP BY generated_timestamp
-                        ORDER BY generated_timestamp;"""
-        cur.execute(cur.mogrify(pg_query, params))
-        actions = cur.fetchall()
-        pg_sub_query_subset = __get_constraints(project_id=project_id, time_constraint=True, chart=False, data=args)
-        pg_sub_query_chart = __get_constraints(project_id=project_id, time_constraint=False, chart=True,
-                                               data=args, main_table="pages", time_column="timestamp",
-                                               project=False,
-                                               duration=False)
-        pg_sub_query_subset.append("pages.timestamp>=%(startTimestamp)s")
-        pg_sub_query_subset.append("pages.timestamp<%(endTimestamp)s")
-        pg_sub_query_subset.append("pages.response_end IS NOT NULL")
-        pg_sub_query_subset.append("pages.response_end>0")
-        pg_query = f"""WITH pages AS(SELECT pages.response_end, timestamp 
-                                    FROM events.pages INNER JOIN public.sessions USING (session_id)
+    pg_query = f"""WITH resources AS(SELECT resources.type, resources.timestamp 
+                                    FROM events.resources INNER JOIN public.sessions USING (session_id)
                                     WHERE {" AND ".join(pg_sub_query_subset)})
-                        SELECT generated_timestamp AS timestamp, 
-                            COALESCE(AVG(pages.response_end),0) AS avg_response_end
-                        FROM generate_series(%(startTimestamp)s, %(endTimestamp)s, %(step_size)s) AS generated_timestamp
-                             LEFT JOIN LATERAL (SELECT pages.response_end 
-                                                FROM pages
-                                                WHERE {" AND ".join(pg_sub_query_chart)}) AS pages ON(TRUE)
-                        GROUP BY generated_timestamp
-                        ORDER BY generated_timestamp;"""
-        cur.execute(cur.mogrify(pg_query, params))
-        response_end = cur.fetchall()
+                    SELECT generated_timestamp AS timestamp,
+                        COUNT(resources.*) AS total,
+                        SUM(CASE WHEN resources.type='fetch' THEN 1 ELSE 0 END) AS xhr
+                    FROM generate_series(%(startTimestamp)s, %(endTimestamp)s, %(step_size)s) AS generated_timestamp
+                         LEFT JOIN LATERAL (SELECT resources.type 
+                                            FROM resources
+                                            WHERE {" AND ".join(pg_sub_query_chart)}) AS resources ON (TRUE)
+                    GROUP BY generated_timestamp
+                    ORDER BY generated_timestamp;"""
+    async with pg_client.AsyncPostgresClient() as cur:
+        await cur.execute(cur.mogrify(pg_query, params))
+        actions = await cur.fetchall()
+    pg_sub_query_subset = await __get_constraints_async(project_id=project_id, time_constraint=True, chart=False, data=args)
+    pg_sub_query_chart = await __get_constraints_async(project_id=project_id, time_constraint=False, chart=True,
+                                                       data=args, main_table="pages", time_column="timestamp",
+                                                       project=False,
+                                                       duration=False)
+    pg_sub_query_subset.append("pages.timestamp>=%(startTimestamp)s")
+    pg_sub_query_subset.append("pages.timestamp<%(endTimestamp)s")
+    pg_sub_query_subset.append("pages.response_end IS NOT NULL")
+    pg_sub_query_subset.append("pages.response_end>0")
+    pg_query = f"""WITH pages AS(SELECT pages.response_end, timestamp 
+                                FROM events.pages INNER JOIN public.sessions USING (session_id)
+                                WHERE {" AND ".join(pg_sub_query_subset)})
+                    SELECT generated_timestamp AS timestamp, 
+                        COALESCE(AVG(pages.response_end),0) AS avg_response_end
+                    FROM generate_series(%(startTimestamp)s, %(endTimestamp)s, %(step_size)s) AS generated_timestamp
+                         LEFT JOIN LATERAL (SELECT pages.response_end 
+                                            FROM pages
+                                            WHERE {" AND ".join(pg_sub_query_chart)}) AS pages ON(TRUE)
+                    GROUP BY generated_timestamp
+                    ORDER BY generated_timestamp;"""
+    async with pg_client.AsyncPostgresClient() as cur:
+        await cur.execute(cur.mogrify(pg_query, params))
+        response_end = await cur.fetchall()
     return helper.list_to_camel_case(__merge_charts(response_end, actions))
 
 
 @dev.timed
-def get_impacted_sessions_by_js_errors(project_id, startTimestamp=TimeUTC.now(delta_days=-1),
-                                       endTimestamp=TimeUTC.now(), density=7, **args):
+async def get_impacted_sessions_by_js_errors(project_id, startTimestamp=TimeUTC.now(delta_days=-1),
+                                             endTimestamp=TimeUTC.now(), density=7, **args):
     step_size = __get_step_size(startTimestamp, endTimestamp, density, factor=1)
-    pg_sub_query = __get_constraints(project_id=project_id, data=args)
-    pg_sub_query_chart = __get_constraints(project_id=project_id, time_constraint=True,
-                                           chart=True, data=args)
+    pg_sub_query = await __get_constraints_async(project_id=project_id, data=args)
+    pg_sub_query_chart = await __get_constraints_async(project_id=project_id, time_constraint=True,
+                                                       chart=True, data=args)
     pg_sub_query.append("m_errors.source = 'js_exception'")
     pg_sub_query.append("m_errors.project_id = %(project_id)s")
     pg_sub_query.append("errors.timestamp >= %(startTimestamp)s")
@@ -2076,16 +2088,16 @@ def get_impacted_sessions_by_js_errors(project_id, startTimestamp=TimeUTC.now(de
     pg_sub_query_chart.append("errors.timestamp >= generated_timestamp")
     pg_sub_query_chart.append("errors.timestamp < generated_timestamp+ %(step_size)s")
 
-    pg_sub_query_subset = __get_constraints(project_id=project_id, data=args, duration=False, main_table="m_errors",
-                                            time_constraint=False)
-    pg_sub_query_chart = __get_constraints(project_id=project_id, time_constraint=False,
-                                           chart=True, data=args, main_table="errors", time_column="timestamp",
-                                           project=False, duration=False)
+    pg_sub_query_subset = await __get_constraints_async(project_id=project_id, data=args, duration=False, main_table="m_errors",
+                                                        time_constraint=False)
+    pg_sub_query_chart = await __get_constraints_async(project_id=project_id, time_constraint=False,
+                                                       chart=True, data=args, main_table="errors", time_column="timestamp",
+                                                       project=False, duration=False)
     pg_sub_query_subset.append("m_errors.source = 'js_exception'")
     pg_sub_query_subset.append("errors.timestamp>=%(startTimestamp)s")
     pg_sub_query_subset.append("errors.timestamp<%(endTimestamp)s")
 
-    with pg_client.PostgresClient() as cur:
+    async with pg_client.AsyncPostgresClient() as cur:
         pg_query = f"""WITH errors AS (SELECT DISTINCT ON (session_id,timestamp) session_id, timestamp
                                         FROM events.errors
                                                  INNER JOIN public.errors AS m_errors USING (error_id)
@@ -2105,12 +2117,12 @@ def get_impacted_sessions_by_js_errors(project_id, startTimestamp=TimeUTC.now(de
                                         ) AS sessions ON (TRUE)
                                     GROUP BY generated_timestamp
                                     ORDER BY generated_timestamp) AS chart) AS chart ON (TRUE);"""
-        cur.execute(cur.mogrify(pg_query, {"step_size": step_size,
-                                           "project_id": project_id,
-                                           "startTimestamp": startTimestamp,
-                                           "endTimestamp": endTimestamp,
-                                           **__get_constraint_values(args)}))
-        row_sessions = cur.fetchone()
+        await cur.execute(cur.mogrify(pg_query, {"step_size": step_size,
+                                                 "project_id": project_id,
+                                                 "startTimestamp": startTimestamp,
+                                                 "endTimestamp": endTimestamp,
+                                                 **__get_constraint_values(args)}))
+        row_sessions = await cur.fetchone()
         pg_query = f"""WITH errors AS ( SELECT DISTINCT ON(errors.error_id,timestamp) errors.error_id,timestamp
                                          FROM events.errors
                                                   INNER JOIN public.errors AS m_errors USING (error_id)
@@ -2130,12 +2142,12 @@ def get_impacted_sessions_by_js_errors(project_id, startTimestamp=TimeUTC.now(de
                                     ) AS errors ON (TRUE)
                                 GROUP BY generated_timestamp
                                 ORDER BY generated_timestamp) AS chart) AS chart ON (TRUE);"""
-        cur.execute(cur.mogrify(pg_query, {"step_size": step_size,
-                                           "project_id": project_id,
-                                           "startTimestamp": startTimestamp,
-                                           "endTimestamp": endTimestamp,
-                                           **__get_constraint_values(args)}))
-        row_errors = cur.fetchone()
+        await cur.execute(cur.mogrify(pg_query, {"step_size": step_size,
+                                                 "project_id": project_id,
+                                                 "startTimestamp": startTimestamp,
+                                                 "endTimestamp": endTimestamp,
+                                                 **__get_constraint_values(args)}))
+        row_errors = await cur.fetchone()
         chart = __merge_charts(row_sessions.pop("chart"), row_errors.pop("chart"))
         row_sessions = helper.dict_to_camel_case(row_sessions)
         row_errors = helper.dict_to_camel_case(row_errors)
@@ -2143,16 +2155,16 @@ def get_impacted_sessions_by_js_errors(project_id, startTimestamp=TimeUTC.now(de
 
 
 @dev.timed
-def get_resources_vs_visually_complete(project_id, startTimestamp=TimeUTC.now(delta_days=-1),
-                                       endTimestamp=TimeUTC.now(), density=7, **args):
+async def get_resources_vs_visually_complete(project_id, startTimestamp=TimeUTC.now(delta_days=-1),
+                                             endTimestamp=TimeUTC.now(), density=7, **args):
     step_size = __get_step_size(startTimestamp, endTimestamp, density, factor=1)
-    pg_sub_query_subset = __get_constraints(project_id=project_id, time_constraint=True, chart=False, data=args)
-    pg_sub_query_chart = __get_constraints(project_id=project_id, time_constraint=False, chart=True,
-                                           data=args, main_table="", time_column="timestamp", project=False,
-                                           duration=False)
+    pg_sub_query_subset = await __get_constraints_async(project_id=project_id, time_constraint=True, chart=False, data=args)
+    pg_sub_query_chart = await __get_constraints_async(project_id=project_id, time_constraint=False, chart=True,
+                                                       data=args, main_table="", time_column="timestamp", project=False,
+                                                       duration=False)
     pg_sub_query_subset.append("timestamp>=%(startTimestamp)s")
     pg_sub_query_subset.append("timestamp<%(endTimestamp)s")
-    with pg_client.PostgresClient() as cur:
+    async with pg_client.AsyncPostgresClient() as cur:
         pg_query = f"""WITH resources AS (SELECT resources.type, timestamp, session_id
                                            FROM events.resources
                                                     INNER JOIN public.sessions USING (session_id)
@@ -2182,11 +2194,11 @@ def get_resources_vs_visually_complete(project_id, startTimestamp=TimeUTC.now(de
                             ) AS time_to_render ON (TRUE)
                         GROUP BY generated_timestamp
                         ORDER BY generated_timestamp;"""
-        cur.execute(cur.mogrify(pg_query, {"step_size": step_size,
-                                           "project_id": project_id,
-                                           "startTimestamp": startTimestamp,
-                                           "endTimestamp": endTimestamp, **__get_constraint_values(args)}))
-        rows = cur.fetchall()
+        await cur.execute(cur.mogrify(pg_query, {"step_size": step_size,
+                                                 "project_id": project_id,
+                                                 "startTimestamp": startTimestamp,
+                                                 "endTimestamp": endTimestamp, **__get_constraint_values(args)}))
+        rows = await cur.fetchall()
     for r in rows:
         r["types"] = {t["type"]: t["avg_count"] for t in r["types"]}
 
@@ -2194,15 +2206,15 @@ def get_resources_vs_visually_complete(project_id, startTimestamp=TimeUTC.now(de
 
 
 @dev.timed
-def get_resources_count_by_type(project_id, startTimestamp=TimeUTC.now(delta_days=-1),
-                                endTimestamp=TimeUTC.now(), density=7, **args):
+async def get_resources_count_by_type(project_id, startTimestamp=TimeUTC.now(delta_days=-1),
+                                      endTimestamp=TimeUTC.now(), density=7, **args):
     step_size = __get_step_size(startTimestamp, endTimestamp, density, factor=1)
-    pg_sub_query_subset = __get_constraints(project_id=project_id, time_constraint=True, chart=False, data=args)
-    pg_sub_query_chart = __get_constraints(project_id=project_id, time_constraint=False, chart=True,
-                                           data=args, main_table="resources", time_column="timestamp", project=False,
-                                           duration=False)
+    pg_sub_query_subset = await __get_constraints_async(project_id=project_id, time_constraint=True, chart=False, data=args)
+    pg_sub_query_chart = await __get_constraints_async(project_id=project_id, time_constraint=False, chart=True,
+                                                       data=args, main_table="resources", time_column="timestamp", project=False,
+                                                       duration=False)
 
-    with pg_client.PostgresClient() as cur:
+    async with pg_client.AsyncPostgresClient() as cur:
         pg_query = f"""WITH resources AS (SELECT  resources.type, timestamp 
                                             FROM events.resources INNER JOIN public.sessions USING (session_id)
                                             WHERE {" AND ".join(pg_sub_query_subset)} 
@@ -2217,11 +2229,11 @@ def get_resources_count_by_type(project_id, startTimestamp=TimeUTC.now(delta_day
                                             ) AS t ON(TRUE)
                         GROUP BY timestamp
                         ORDER BY timestamp;"""
-        cur.execute(cur.mogrify(pg_query, {"step_size": step_size,
-                                           "project_id": project_id,
-                                           "startTimestamp": startTimestamp,
-                                           "endTimestamp": endTimestamp, **__get_constraint_values(args)}))
-        rows = cur.fetchall()
+        await cur.execute(cur.mogrify(pg_query, {"step_size": step_size,
+                                                 "project_id": project_id,
+                                                 "startTimestamp": startTimestamp,
+                                                 "endTimestamp": endTimestamp, **__get_constraint_values(args)}))
+        rows = await cur.fetchall()
         for r in rows:
             for t in r["types"]:
                 r[t["type"]] = t["count"]
@@ -2231,19 +2243,19 @@ def get_resources_count_by_type(project_id, startTimestamp=TimeUTC.now(delta_day
 
 
 @dev.timed
-def get_resources_by_party(project_id, startTimestamp=TimeUTC.now(delta_days=-1),
-                           endTimestamp=TimeUTC.now(), density=7, **args):
+async def get_resources_by_party(project_id, startTimestamp=TimeUTC.now(delta_days=-1),
+                                 endTimestamp=TimeUTC.now(), density=7, **args):
     step_size = __get_step_size(startTimestamp, endTimestamp, density, factor=1)
-    pg_sub_query_subset = __get_constraints(project_id=project_id, time_constraint=True,
-                                            chart=False, data=args)
-    pg_sub_query_chart = __get_constraints(project_id=project_id, time_constraint=False, project=False,
-                                           chart=True, data=args, main_table="resources", time_column="timestamp",
-                                           duration=False)
+    pg_sub_query_subset = await __get_constraints_async(project_id=project_id, time_constraint=True,
+                                                        chart=False, data=args)
+    pg_sub_query_chart = await __get_constraints_async(project_id=project_id, time_constraint=False, project=False,
+                                                       chart=True, data=args, main_table="resources", time_column="timestamp",
+                                                       duration=False)
     pg_sub_query_subset.append("resources.timestamp >= %(startTimestamp)s")
     pg_sub_query_subset.append("resources.timestamp < %(endTimestamp)s")
     pg_sub_query_subset.append("resources.success = FALSE")
 
-    with pg_client.PostgresClient() as cur:
+    async with pg_client.AsyncPostgresClient() as cur:
         pg_query = f"""WITH resources AS (
                             SELECT resources.url_host, timestamp
                             FROM events.resources
@@ -2277,10 +2289,10 @@ def get_resources_by_party(project_id, startTimestamp=TimeUTC.now(delta_days=-1)
                             ) AS sub_resources ON (TRUE)
                         GROUP BY generated_timestamp
                         ORDER BY generated_timestamp;"""
-        cur.execute(cur.mogrify(pg_query, {"step_size": step_size,
-                                           "project_id": project_id,
-                                           "startTimestamp": startTimestamp,
-                                           "endTimestamp": endTimestamp, **__get_constraint_values(args)}))
+        await cur.execute(cur.mogrify(pg_query, {"step_size": step_size,
+                                                 "project_id": project_id,
+                                                 "startTimestamp": startTimestamp,
+                                                 "endTimestamp": endTimestamp, **__get_constraint_values(args)}))
 
-        rows = cur.fetchall()
+        rows = await cur.fetchall()
     return rows
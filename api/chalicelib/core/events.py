@@ -6,9 +6,9 @@ from chalicelib.utils.TimeUTC import TimeUTC
 from chalicelib.utils.event_filter_definition import SupportedFilter, Event
 
 
-def get_customs_by_sessionId2_pg(session_id, project_id):
-    with pg_client.PostgresClient() as cur:
-        cur.execute(cur.mogrify("""\
+async def get_customs_by_sessionId2_pg(session_id, project_id):
+    async with pg_client.AsyncPostgresClient() as cur:
+        await cur.execute(cur.mogrify("""\
             SELECT 
                 c.*,
                 'CUSTOM' AS type
@@ -16,9 +16,9 @@ def get_customs_by_sessionId2_pg(session_id, project_id):
             WHERE 
               c.session_id = %(session_id)s
             ORDER BY c.timestamp;""",
-                                {"project_id": project_id, "session_id": session_id})
-                    )
-        rows = cur.fetchall()
+                                      {"project_id": project_id, "session_id": session_id})
+                          )
+        rows = await cur.fetchall()
     return helper.dict_to_camel_case(rows)
 
 
@@ -28,8 +28,7 @@ def __merge_cells(rows, start, count, replacement):
     return rows
 
 
-def __get_grouped_clickrage(rows, session_id):
-    click_rage_issues = issues.get_by_session_id(session_id=session_id, issue_type="click_rage")
+def __get_grouped_clickrage(rows, click_rage_issues):
     if len(click_rage_issues) == 0:
         return rows
 
@@ -49,34 +48,28 @@ def __get_grouped_clickrage(rows, session_id):
     return rows
 
 
-def get_by_sessionId2_pg(session_id, project_id, group_clickrage=False):
-    with pg_client.PostgresClient() as cur:
-        cur.execute(cur.mogrify("""\
+def __get_by_sessionId2_queries(cur, session_id, project_id):
+    """
+    :return: the queries of the clicks, the inputs and the pages of a session
+    """
+    params = {"project_id": project_id, "session_id": session_id}
+    return cur.mogrify("""\
             SELECT 
                 c.*,
                 'CLICK' AS type
             FROM events.clicks AS c
             WHERE 
               c.session_id = %(session_id)s
-            ORDER BY c.timestamp;""",
-                                {"project_id": project_id, "session_id": session_id})
-                    )
-        rows = cur.fetchall()
-        if group_clickrage:
-            rows = __get_grouped_clickrage(rows=rows, session_id=session_id)
-
-        cur.execute(cur.mogrify("""
+            ORDER BY c.timestamp;""", params), \
+        cur.mogrify("""
             SELECT 
                 i.*,
                 'INPUT' AS type
             FROM events.inputs AS i
             WHERE 
               i.session_id = %(session_id)s
-            ORDER BY i.timestamp;""",
-                                {"project_id": project_id, "session_id": session_id})
-                    )
-        rows += cur.fetchall()
-        cur.execute(cur.mogrify("""\
+            ORDER BY i.timestamp;""", params), \
+        cur.mogrify("""\
             SELECT 
                 l.*,
                 l.path AS value,
@@ -85,11 +78,43 @@ def get_by_sessionId2_pg(session_id, project_id, group_clickrage=False):
             FROM events.pages AS l
             WHERE 
               l.session_id = %(session_id)s
-            ORDER BY l.timestamp;""", {"project_id": project_id, "session_id": session_id}))
+            ORDER BY l.timestamp;""", params)
+
+
+def get_by_sessionId2_pg(session_id, project_id, group_clickrage=False):
+    with pg_client.PostgresClient() as cur:
+        clicks_query, inputs_query, pages_query = __get_by_sessionId2_queries(cur, session_id, project_id)
+        cur.execute(clicks_query)
+        rows = cur.fetchall()
+        if group_clickrage:
+            rows = __get_grouped_clickrage(rows=rows,
+                                           click_rage_issues=issues.get_by_session_id(session_id=session_id,
+                                                                                      issue_type="click_rage"))
+        cur.execute(inputs_query)
         rows += cur.fetchall()
-        rows = helper.list_to_camel_case(rows)
-        rows = sorted(rows, key=lambda k: k["messageId"])
-    return rows
+        cur.execute(pages_query)
+        rows += cur.fetchall()
+    rows = helper.list_to_camel_case(rows)
+    return sorted(rows, key=lambda k: k["messageId"])
+
+
+async def get_by_sessionId2_pg_async(session_id, project_id, group_clickrage=False):
+    # read before taking a connection, a task holding one while waiting for another can exhaust the pool
+    click_rage_issues = None
+    if group_clickrage:
+        click_rage_issues = await issues.get_by_session_id_async(session_id=session_id, issue_type="click_rage")
+    async with pg_client.AsyncPostgresClient() as cur:
+        clicks_query, inputs_query, pages_query = __get_by_sessionId2_queries(cur, session_id, project_id)
+        await cur.execute(clicks_query)
+        rows = await cur.fetchall()
+        if group_clickrage:
+            rows = __get_grouped_clickrage(rows=rows, click_rage_issues=click_rage_issues)
+        await cur.execute(inputs_query)
+        rows += await cur.fetchall()
+        await cur.execute(pages_query)
+        rows += await cur.fetchall()
+    rows = helper.list_to_camel_case(rows)
+    return sorted(rows, key=lambda k: k["messageId"])
 
 
 def __get_data_for_extend(data):
@@ -171,23 +196,23 @@ def __pg_errors_query(source=None, value_length=None):
                 LIMIT 5));"""
 
 
-def __search_pg_errors(project_id, value, key=None, source=None):
+async def __search_pg_errors(project_id, value, key=None, source=None):
     now = TimeUTC.now()
 
-    with pg_client.PostgresClient() as cur:
-        cur.execute(
+    async with pg_client.AsyncPostgresClient() as cur:
+        await cur.execute(
             cur.mogrify(__pg_errors_query(source,
                                           value_length=len(value) \
                                               if SUPPORTED_TYPES[event_type.ERROR.ui_type].change_by_length else None),
                         {"project_id": project_id, "value": helper.string_to_sql_like(value),
                          "svalue": helper.string_to_sql_like("^" + value),
                          "source": source}))
-        results = helper.list_to_camel_case(cur.fetchall())
+        results = helper.list_to_camel_case(await cur.fetchall())
     print(f"{TimeUTC.now() - now} : errors")
     return results
 
 
-def __search_pg_errors_ios(project_id, value, key=None, source=None):
+async def __search_pg_errors_ios(project_id, value, key=None, source=None):
     now = TimeUTC.now()
     if SUPPORTED_TYPES[event_type.ERROR_IOS.ui_type].change_by_length is False or len(value) > 2:
         query = f"""(SELECT DISTINCT ON(lg.reason)
@@ -249,16 +274,16 @@ def __search_pg_errors_ios(project_id, value, key=None, source=None):
                           AND lg.project_id = %(project_id)s
                           AND lg.name ILIKE %(svalue)s
                         LIMIT 5);"""
-    with pg_client.PostgresClient() as cur:
-        cur.execute(cur.mogrify(query, {"project_id": project_id, "value": helper.string_to_sql_like(value),
-                                        "svalue": helper.string_to_sql_like("^" + value)}))
-        results = helper.list_to_camel_case(cur.fetchall())
+    async with pg_client.AsyncPostgresClient() as cur:
+        await cur.execute(cur.mogrify(query, {"project_id": project_id, "value": helper.string_to_sql_like(value),
+                                              "svalue": helper.string_to_sql_like("^" + value)}))
+        results = helper.list_to_camel_case(await cur.fetchall())
     print(f"{TimeUTC.now() - now} : errors")
     return results
 
 
-def __search_pg_metadata(project_id, value, key=None, source=None):
-    meta_keys = metadata.get(project_id=project_id)
+async def __search_pg_metadata(project_id, value, key=None, source=None):
+    meta_keys = await metadata.get_async(project_id=project_id)
     meta_keys = {m["key"]: m["index"] for m in meta_keys}
     if len(meta_keys) == 0 or key is not None and key not in meta_keys.keys():
         return []
@@ -284,13 +309,13 @@ def __search_pg_metadata(project_id, value, key=None, source=None):
                                 FROM public.sessions 
                                 WHERE project_id = %(project_id)s 
                                 AND {colname} ILIKE %(svalue)s LIMIT 5)""")
-    with pg_client.PostgresClient() as cur:
-        cur.execute(cur.mogrify(f"""\
+    async with pg_client.AsyncPostgresClient() as cur:
+        await cur.execute(cur.mogrify(f"""\
                     SELECT key, value, 'METADATA' AS TYPE
                     FROM({" UNION ALL ".join(sub_from)}) AS all_metas
                     LIMIT 5;""", {"project_id": project_id, "value": helper.string_to_sql_like(value),
                                   "svalue": helper.string_to_sql_like("^" + value)}))
-        results = helper.list_to_camel_case(cur.fetchall())
+        results = helper.list_to_camel_case(await cur.fetchall())
     return results
 
 
@@ -321,9 +346,9 @@ def __generic_query(typename, value_length=None):
 
 
 def __generic_autocomplete(event: Event):
-    def f(project_id, value, key=None, source=None):
-        with pg_client.PostgresClient() as cur:
-            cur.execute(
+    async def f(project_id, value, key=None, source=None):
+        async with pg_client.AsyncPostgresClient() as cur:
+            await cur.execute(
                 cur.mogrify(
                     __generic_query(event.ui_type,
                                     value_length=len(value) \
@@ -331,7 +356,7 @@ def __generic_autocomplete(event: Event):
                                         else None),
                     {"project_id": project_id, "value": helper.string_to_sql_like(value),
                      "svalue": helper.string_to_sql_like("^" + value)}))
-            return helper.list_to_camel_case(cur.fetchall())
+            return helper.list_to_camel_case(await cur.fetchall())
 
     return f
 
@@ -404,7 +429,7 @@ SUPPORTED_TYPES = {
 }
 
 
-def __get_autocomplete_table(value, project_id):
+async def __get_autocomplete_table(value, project_id):
     autocomplete_events = [schemas.FilterType.rev_id,
                            schemas.EventType.click,
                            schemas.FilterType.user_device,
@@ -431,48 +456,48 @@ def __get_autocomplete_table(value, project_id):
                                         AND type= '{e}' 
                                         AND value ILIKE %(value)s
                                     LIMIT 5)""")
-    with pg_client.PostgresClient() as cur:
+    async with pg_client.AsyncPostgresClient() as cur:
         query = cur.mogrify(" UNION ".join(sub_queries) + ";",
                             {"project_id": project_id, "value": helper.string_to_sql_like(value),
                              "svalue": helper.string_to_sql_like("^" + value)})
-        cur.execute(query)
-        results = helper.list_to_camel_case(cur.fetchall())
+        await cur.execute(query)
+        results = helper.list_to_camel_case(await cur.fetchall())
         return results
 
 
-def search(text, event_type, project_id, source, key):
+async def search(text, event_type, project_id, source, key):
     if not event_type:
-        return {"data": __get_autocomplete_table(text, project_id)}
+        return {"data": await __get_autocomplete_table(text, project_id)}
 
     if event_type in SUPPORTED_TYPES.keys():
-        rows = SUPPORTED_TYPES[event_type].get(project_id=project_id, value=text, key=key, source=source)
+        rows = await SUPPORTED_TYPES[event_type].get(project_id=project_id, value=text, key=key, source=source)
         # for IOS events autocomplete
         # if event_type + "_IOS" in SUPPORTED_TYPES.keys():
         #     rows += SUPPORTED_TYPES[event_type + "_IOS"].get(project_id=project_id, value=text, key=key,
         #                                                      source=source)
     elif event_type + "_IOS" in SUPPORTED_TYPES.keys():
-        rows = SUPPORTED_TYPES[event_type + "_IOS"].get(project_id=project_id, value=text, key=key,
-                                                        source=source)
+        rows = await SUPPORTED_TYPES[event_type + "_IOS"].get(project_id=project_id, value=text, key=key,
+                                                              source=source)
     elif event_type in sessions_metas.SUPPORTED_TYPES.keys():
-        return sessions_metas.search(text, event_type, project_id)
+        return await sessions_metas.search(text, event_type, project_id)
     elif event_type.endswith("_IOS") \
             and event_type[:-len("_IOS")] in sessions_metas.SUPPORTED_TYPES.keys():
-        return sessions_metas.search(text, event_type, project_id)
+        return await sessions_metas.search(text, event_type, project_id)
     else:
         return {"errors": ["unsupported event"]}
 
     return {"data": rows}
 
 
-def get_errors_by_session_id(session_id):
-    with pg_client.PostgresClient() as cur:
-        cur.execute(cur.mogrify(f"""\
+async def get_errors_by_session_id(session_id):
+    async with pg_client.AsyncPostgresClient() as cur:
+        await cur.execute(cur.mogrify(f"""\
                     SELECT er.*,ur.*, er.timestamp - s.start_ts AS time
                     FROM {event_type.ERROR.table} AS er INNER JOIN public.errors AS ur USING (error_id) INNER JOIN public.sessions AS s USING (session_id)
                     WHERE
                       er.session_id = %(session_id)s
                     ORDER BY timestamp;""", {"session_id": session_id}))
-        errors = cur.fetchall()
+        errors = await cur.fetchall()
         for e in errors:
             e["stacktrace_parsed_at"] = TimeUTC.datetime_to_timestamp(e["stacktrace_parsed_at"])
         return helper.list_to_camel_case(errors)
@@ -2,9 +2,9 @@ from chalicelib.utils import pg_client, helper
 from chalicelib.core import events
 
 
-def get_customs_by_sessionId(session_id, project_id):
-    with pg_client.PostgresClient() as cur:
-        cur.execute(cur.mogrify(f"""\
+async def get_customs_by_sessionId(session_id, project_id):
+    async with pg_client.AsyncPostgresClient() as cur:
+        await cur.execute(cur.mogrify(f"""\
             SELECT 
                 c.*,
                 '{events.event_type.CUSTOM_IOS.ui_type}' AS type
@@ -12,15 +12,15 @@ def get_customs_by_sessionId(session_id, project_id):
             WHERE 
               c.session_id = %(session_id)s
             ORDER BY c.timestamp;""",
-                                {"project_id": project_id, "session_id": session_id})
-                    )
-        rows = cur.fetchall()
+                                      {"project_id": project_id, "session_id": session_id})
+                          )
+        rows = await cur.fetchall()
     return helper.dict_to_camel_case(rows)
 
 
-def get_by_sessionId(session_id, project_id):
-    with pg_client.PostgresClient() as cur:
-        cur.execute(cur.mogrify(f"""
+async def get_by_sessionId(session_id, project_id):
+    async with pg_client.AsyncPostgresClient() as cur:
+        await cur.execute(cur.mogrify(f"""
             SELECT 
                 c.*,
                 '{events.event_type.CLICK_IOS.ui_type}' AS type
@@ -28,11 +28,11 @@ def get_by_sessionId(session_id, project_id):
             WHERE 
               c.session_id = %(session_id)s
             ORDER BY c.timestamp;""",
-                                {"project_id": project_id, "session_id": session_id})
-                    )
-        rows = cur.fetchall()
+                                      {"project_id": project_id, "session_id": session_id})
+                          )
+        rows = await cur.fetchall()
 
-        cur.execute(cur.mogrify(f"""
+        await cur.execute(cur.mogrify(f"""
             SELECT 
                 i.*,
                 '{events.event_type.INPUT_IOS.ui_type}' AS type
@@ -40,10 +40,10 @@ def get_by_sessionId(session_id, project_id):
             WHERE 
               i.session_id = %(session_id)s
             ORDER BY i.timestamp;""",
-                                {"project_id": project_id, "session_id": session_id})
-                    )
-        rows += cur.fetchall()
-        cur.execute(cur.mogrify(f"""
+                                      {"project_id": project_id, "session_id": session_id})
+                          )
+        rows += await cur.fetchall()
+        await cur.execute(cur.mogrify(f"""
             SELECT 
                 v.*,
                 '{events.event_type.VIEW_IOS.ui_type}' AS type
@@ -51,19 +51,19 @@ def get_by_sessionId(session_id, project_id):
             WHERE 
               v.session_id = %(session_id)s
             ORDER BY v.timestamp;""", {"project_id": project_id, "session_id": session_id}))
-        rows += cur.fetchall()
+        rows += await cur.fetchall()
         rows = helper.list_to_camel_case(rows)
         rows = sorted(rows, key=lambda k: k["timestamp"])
     return rows
 
 
-def get_crashes_by_session_id(session_id):
-    with pg_client.PostgresClient() as cur:
-        cur.execute(cur.mogrify(f"""
+async def get_crashes_by_session_id(session_id):
+    async with pg_client.AsyncPostgresClient() as cur:
+        await cur.execute(cur.mogrify(f"""
                     SELECT cr.*,uc.*, cr.timestamp - s.start_ts AS time
                     FROM {events.event_type.ERROR_IOS.table} AS cr INNER JOIN public.crashes_ios AS uc USING (crash_id) INNER JOIN public.sessions AS s USING (session_id)
                     WHERE
                       cr.session_id = %(session_id)s
                     ORDER BY timestamp;""", {"session_id": session_id}))
-        errors = cur.fetchall()
+        errors = await cur.fetchall()
         return helper.list_to_camel_case(errors)
@@ -44,20 +44,28 @@ def get(project_id, issue_id):
     return helper.dict_to_camel_case(data)
 
 
-def get_by_session_id(session_id, issue_type=None):
-    with pg_client.PostgresClient() as cur:
-        cur.execute(
-            cur.mogrify(f"""\
+def __get_by_session_id_query(cur, session_id, issue_type):
+    return cur.mogrify(f"""\
                     SELECT *
                     FROM events_common.issues
                              INNER JOIN public.issues USING (issue_id)
                     WHERE session_id = %(session_id)s {"AND type = %(type)s" if issue_type is not None else ""}
                     ORDER BY timestamp;""",
-                        {"session_id": session_id, "type": issue_type})
-        )
+                       {"session_id": session_id, "type": issue_type})
+
+
+def get_by_session_id(session_id, issue_type=None):
+    with pg_client.PostgresClient() as cur:
+        cur.execute(__get_by_session_id_query(cur, session_id, issue_type))
         return helper.list_to_camel_case(cur.fetchall())
 
 
+async def get_by_session_id_async(session_id, issue_type=None):
+    async with pg_client.AsyncPostgresClient() as cur:
+        await cur.execute(__get_by_session_id_query(cur, session_id, issue_type))
+        return helper.list_to_camel_case(await cur.fetchall())
+
+
 def get_types_by_project(project_id):
     with pg_client.PostgresClient() as cur:
         cur.execute(
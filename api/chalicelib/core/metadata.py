@@ -10,24 +10,37 @@ def _get_column_names():
     return [f"metadata_{i}" for i in range(1, MAX_INDEXES + 1)]
 
 
-def get(project_id):
-    with pg_client.PostgresClient() as cur:
-        cur.execute(
-            cur.mogrify(
-                f"""\
+def __get_query(cur, project_id):
+    return cur.mogrify(
+        f"""\
             SELECT  
                 {",".join(_get_column_names())}
             FROM public.projects
             WHERE project_id = %(project_id)s AND deleted_at ISNULL 
             LIMIT 1;""", {"project_id": project_id})
-        )
+
+
+def __format_metas(metas):
+    results = []
+    if metas is not None:
+        for i, k in enumerate(metas.keys()):
+            if metas[k] is not None:
+                results.append({"key": metas[k], "index": i + 1})
+    return results
+
+
+def get(project_id):
+    with pg_client.PostgresClient() as cur:
+        cur.execute(__get_query(cur, project_id))
         metas = cur.fetchone()
-        results = []
-        if metas is not None:
-            for i, k in enumerate(metas.keys()):
-                if metas[k] is not None:
-                    results.append({"key": metas[k], "index": i + 1})
-        return results
+    return __format_metas(metas)
+
+
+async def get_async(project_id):
+    async with pg_client.AsyncPostgresClient() as cur:
+        await cur.execute(__get_query(cur, project_id))
+        metas = await cur.fetchone()
+    return __format_metas(metas)
 
 
 def get_batch(project_ids):
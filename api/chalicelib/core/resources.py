@@ -1,8 +1,8 @@
 from chalicelib.utils import helper, pg_client
 
 
-def get_by_session_id(session_id):
-    with pg_client.PostgresClient() as cur:
+async def get_by_session_id(session_id):
+    async with pg_client.AsyncPostgresClient() as cur:
         ch_query = """\
                 SELECT
                       timestamp AS datetime,
@@ -18,6 +18,6 @@ def get_by_session_id(session_id):
                 FROM events.resources
                 WHERE session_id = %(session_id)s;"""
         params = {"session_id": session_id}
-        cur.execute(cur.mogrify(ch_query, params))
-        rows = cur.fetchall()
+        await cur.execute(cur.mogrify(ch_query, params))
+        rows = await cur.fetchall()
         return helper.list_to_camel_case(rows)
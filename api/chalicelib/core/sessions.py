@@ -1,5 +1,8 @@
+import asyncio
 from typing import List
 
+from fastapi.concurrency import run_in_threadpool
+
 import schemas
 from chalicelib.core import events, metadata, events_ios, \
     sessions_mobs, issues, projects, errors, resources, assist, performance_event
@@ -39,71 +42,80 @@ def __group_metadata(session, project_metadata):
     return meta
 
 
-def get_by_id2_pg(project_id, session_id, user_id, full_data=False, include_fav_viewed=False, group_metadata=False):
-    with pg_client.PostgresClient() as cur:
-        extra_query = []
-        if include_fav_viewed:
-            extra_query.append("""COALESCE((SELECT TRUE
-                                 FROM public.user_favorite_sessions AS fs
-                                 WHERE s.session_id = fs.session_id
-                                   AND fs.user_id = %(userId)s), FALSE) AS favorite""")
-            extra_query.append("""COALESCE((SELECT TRUE
-                                 FROM public.user_viewed_sessions AS fs
-                                 WHERE s.session_id = fs.session_id
-                                   AND fs.user_id = %(userId)s), FALSE) AS viewed""")
-        query = cur.mogrify(
-            f"""\
-            SELECT
-                s.*,
-                s.session_id::text AS session_id,
-                (SELECT project_key FROM public.projects WHERE project_id = %(project_id)s LIMIT 1) AS project_key
-                {"," if len(extra_query) > 0 else ""}{",".join(extra_query)}
-                {(",json_build_object(" + ",".join([f"'{m}',p.{m}" for m in metadata._get_column_names()]) + ") AS project_metadata") if group_metadata else ''}
-            FROM public.sessions AS s {"INNER JOIN public.projects AS p USING (project_id)" if group_metadata else ""}
-            WHERE s.project_id = %(project_id)s
-                AND s.session_id = %(session_id)s;""",
-            {"project_id": project_id, "session_id": session_id, "userId": user_id}
-        )
+def __get_session_query(cur, project_id, session_id, user_id, include_fav_viewed, group_metadata):
+    extra_query = []
+    if include_fav_viewed:
+        extra_query.append("""COALESCE((SELECT TRUE
+                             FROM public.user_favorite_sessions AS fs
+                             WHERE s.session_id = fs.session_id
+                               AND fs.user_id = %(userId)s), FALSE) AS favorite""")
+        extra_query.append("""COALESCE((SELECT TRUE
+                             FROM public.user_viewed_sessions AS fs
+                             WHERE s.session_id = fs.session_id
+                               AND fs.user_id = %(userId)s), FALSE) AS viewed""")
+    return cur.mogrify(
+        f"""\
+        SELECT
+            s.*,
+            s.session_id::text AS session_id,
+            (SELECT project_key FROM public.projects WHERE project_id = %(project_id)s LIMIT 1) AS project_key
+            {"," if len(extra_query) > 0 else ""}{",".join(extra_query)}
+            {(",json_build_object(" + ",".join([f"'{m}',p.{m}" for m in metadata._get_column_names()]) + ") AS project_metadata") if group_metadata else ''}
+        FROM public.sessions AS s {"INNER JOIN public.projects AS p USING (project_id)" if group_metadata else ""}
+        WHERE s.project_id = %(project_id)s
+            AND s.session_id = %(session_id)s;""",
+        {"project_id": project_id, "session_id": session_id, "userId": user_id}
+    )
+
+
+async def get_by_id2_pg(project_id, session_id, user_id, full_data=False, include_fav_viewed=False,
+                        group_metadata=False):
+    async with pg_client.AsyncPostgresClient() as cur:
+        query = __get_session_query(cur, project_id=project_id, session_id=session_id, user_id=user_id,
+                                    include_fav_viewed=include_fav_viewed, group_metadata=group_metadata)
         # print("===============")
         # print(query)
-        cur.execute(query=query)
-
-        data = cur.fetchone()
-        if data is not None:
-            data = helper.dict_to_camel_case(data)
-            if full_data:
-                if data["platform"] == 'ios':
-                    data['events'] = events_ios.get_by_sessionId(project_id=project_id, session_id=session_id)
-                    for e in data['events']:
-                        if e["type"].endswith("_IOS"):
-                            e["type"] = e["type"][:-len("_IOS")]
-                    data['crashes'] = events_ios.get_crashes_by_session_id(session_id=session_id)
-                    data['userEvents'] = events_ios.get_customs_by_sessionId(project_id=project_id,
-                                                                             session_id=session_id)
-                    data['mobsUrl'] = sessions_mobs.get_ios(sessionId=session_id)
-                else:
-                    data['events'] = events.get_by_sessionId2_pg(project_id=project_id, session_id=session_id,
-                                                                 group_clickrage=True)
-                    all_errors = events.get_errors_by_session_id(session_id=session_id)
-                    data['stackEvents'] = [e for e in all_errors if e['source'] != "js_exception"]
-                    # to keep only the first stack
-                    data['errors'] = [errors.format_first_stack_frame(e) for e in all_errors if
-                                      e['source'] == "js_exception"][
-                                     :500]  # limit the number of errors to reduce the response-body size
-                    data['userEvents'] = events.get_customs_by_sessionId2_pg(project_id=project_id,
-                                                                             session_id=session_id)
-                    data['mobsUrl'] = sessions_mobs.get_web(sessionId=session_id)
-                    data['resources'] = resources.get_by_session_id(session_id=session_id)
-
-                data['metadata'] = __group_metadata(project_metadata=data.pop("projectMetadata"), session=data)
-                data['issues'] = issues.get_by_session_id(session_id=session_id)
-                data['live'] = assist.is_live(project_id=project_id,
-                                              session_id=session_id,
-                                              project_key=data["projectKey"])
-            data["inDB"] = True
-            return data
-        else:
-            return assist.get_live_session_by_id(project_id=project_id, session_id=session_id)
+        await cur.execute(query=query)
+
+        data = await cur.fetchone()
+    if data is not None:
+        data = helper.dict_to_camel_case(data)
+        if full_data:
+            if data["platform"] == 'ios':
+                data['events'] = await events_ios.get_by_sessionId(project_id=project_id, session_id=session_id)
+                for e in data['events']:
+                    if e["type"].endswith("_IOS"):
+                        e["type"] = e["type"][:-len("_IOS")]
+                data['crashes'] = await events_ios.get_crashes_by_session_id(session_id=session_id)
+                data['userEvents'] = await events_ios.get_customs_by_sessionId(project_id=project_id,
+                                                                               session_id=session_id)
+                data['mobsUrl'] = sessions_mobs.get_ios(sessionId=session_id)
+                data['issues'] = await issues.get_by_session_id_async(session_id=session_id)
+            else:
+                # the parts of the replay are independent queries, each one runs on its own connection
+                data['events'], all_errors, data['userEvents'], data['resources'], data['issues'] = \
+                    await asyncio.gather(
+                        events.get_by_sessionId2_pg_async(project_id=project_id, session_id=session_id,
+                                                          group_clickrage=True),
+                        events.get_errors_by_session_id(session_id=session_id),
+                        events.get_customs_by_sessionId2_pg(project_id=project_id, session_id=session_id),
+                        resources.get_by_session_id(session_id=session_id),
+                        issues.get_by_session_id_async(session_id=session_id))
+                data['stackEvents'] = [e for e in all_errors if e['source'] != "js_exception"]
+                # to keep only the first stack
+                data['errors'] = [errors.format_first_stack_frame(e) for e in all_errors if
+                                  e['source'] == "js_exception"][
+                                 :500]  # limit the number of errors to reduce the response-body size
+                data['mobsUrl'] = sessions_mobs.get_web(sessionId=session_id)
+
+            data['metadata'] = __group_metadata(project_metadata=data.pop("projectMetadata"), session=data)
+            data['live'] = await run_in_threadpool(assist.is_live, project_id=project_id,
+                                                   session_id=session_id,
+                                                   project_key=data["projectKey"])
+        data["inDB"] = True
+        return data
+    else:
+        return await run_in_threadpool(assist.get_live_session_by_id, project_id=project_id, session_id=session_id)
 
 
 def __get_sql_operator(op: schemas.SearchEventOperator):
@@ -167,109 +179,103 @@ def _isUndefined_operator(op: schemas.SearchEventOperator):
     return op in [schemas.SearchEventOperator._is_undefined]
 
 
-@dev.timed
-def search2_pg(data: schemas.SessionsSearchPayloadSchema, project_id, user_id, errors_only=False,
-               error_status=schemas.ErrorStatus.all, count_only=False, issue=None):
+def __search_args(data: schemas.SessionsSearchPayloadSchema, project_id, user_id, errors_only, error_status, issue,
+                  meta_keys):
     full_args, query_part = search_query_parts(data=data, error_status=error_status, errors_only=errors_only,
                                                favorite_only=data.bookmarked, issue=issue, project_id=project_id,
-                                               user_id=user_id)
+                                               user_id=user_id, meta_keys=meta_keys)
     if data.limit is not None and data.page is not None:
         full_args["sessions_limit_s"] = (data.page - 1) * data.limit
         full_args["sessions_limit_e"] = data.page * data.limit
     else:
         full_args["sessions_limit_s"] = 1
         full_args["sessions_limit_e"] = 200
+    return full_args, query_part
 
-    meta_keys = []
-    with pg_client.PostgresClient() as cur:
-        if errors_only:
-            main_query = cur.mogrify(f"""SELECT DISTINCT er.error_id, ser.status, ser.parent_error_id, ser.payload,
-                                        COALESCE((SELECT TRUE
-                                         FROM public.user_favorite_sessions AS fs
-                                         WHERE s.session_id = fs.session_id
-                                           AND fs.user_id = %(userId)s), FALSE)   AS favorite,
-                                        COALESCE((SELECT TRUE
-                                                     FROM public.user_viewed_errors AS ve
-                                                     WHERE er.error_id = ve.error_id
-                                                       AND ve.user_id = %(userId)s LIMIT 1), FALSE) AS viewed
-                                {query_part};""", full_args)
-
-        elif count_only:
-            main_query = cur.mogrify(f"""SELECT COUNT(DISTINCT s.session_id) AS count_sessions, 
-                                                COUNT(DISTINCT s.user_uuid) AS count_users
-                                        {query_part};""", full_args)
-        elif data.group_by_user:
-            g_sort = "count(full_sessions)"
-            if data.order is None:
-                data.order = "DESC"
-            else:
-                data.order = data.order.upper()
-            if data.sort is not None and data.sort != 'sessionsCount':
-                sort = helper.key_to_snake_case(data.sort)
-                g_sort = f"{'MIN' if data.order == 'DESC' else 'MAX'}({sort})"
-            else:
-                sort = 'start_ts'
-
-            meta_keys = metadata.get(project_id=project_id)
-            main_query = cur.mogrify(f"""SELECT COUNT(*) AS count,
-                                                COALESCE(JSONB_AGG(users_sessions) 
-                                                    FILTER (WHERE rn>%(sessions_limit_s)s AND rn<=%(sessions_limit_e)s), '[]'::JSONB) AS sessions
-                                        FROM (SELECT user_id,
-                                                 count(full_sessions)                                   AS user_sessions_count,
-                                                 jsonb_agg(full_sessions) FILTER (WHERE rn <= 1)        AS last_session,
-                                                 MIN(full_sessions.start_ts)                            AS first_session_ts,
-                                                 ROW_NUMBER() OVER (ORDER BY {g_sort} {data.order}) AS rn
-                                            FROM (SELECT *, ROW_NUMBER() OVER (PARTITION BY user_id ORDER BY {sort} {data.order}) AS rn 
-                                                FROM (SELECT DISTINCT ON(s.session_id) {SESSION_PROJECTION_COLS} 
-                                                                    {"," if len(meta_keys) > 0 else ""}{",".join([f'metadata_{m["index"]}' for m in meta_keys])}
-                                                    {query_part}
-                                                    ) AS filtred_sessions
-                                                ) AS full_sessions
-                                                GROUP BY user_id
-                                            ) AS users_sessions;""",
-                                     full_args)
+
+def __search_query(cur, data: schemas.SessionsSearchPayloadSchema, full_args, query_part, meta_keys, errors_only,
+                   count_only):
+    if errors_only:
+        main_query = cur.mogrify(f"""SELECT DISTINCT er.error_id, ser.status, ser.parent_error_id, ser.payload,
+                                    COALESCE((SELECT TRUE
+                                     FROM public.user_favorite_sessions AS fs
+                                     WHERE s.session_id = fs.session_id
+                                       AND fs.user_id = %(userId)s), FALSE)   AS favorite,
+                                    COALESCE((SELECT TRUE
+                                                 FROM public.user_viewed_errors AS ve
+                                                 WHERE er.error_id = ve.error_id
+                                                   AND ve.user_id = %(userId)s LIMIT 1), FALSE) AS viewed
+                            {query_part};""", full_args)
+
+    elif count_only:
+        main_query = cur.mogrify(f"""SELECT COUNT(DISTINCT s.session_id) AS count_sessions, 
+                                            COUNT(DISTINCT s.user_uuid) AS count_users
+                                    {query_part};""", full_args)
+    elif data.group_by_user:
+        g_sort = "count(full_sessions)"
+        if data.order is None:
+            data.order = "DESC"
         else:
-            if data.order is None:
-                data.order = "DESC"
-            sort = 'session_id'
-            if data.sort is not None and data.sort != "session_id":
-                sort += " " + data.order + "," + helper.key_to_snake_case(data.sort)
-            else:
-                sort = 'session_id'
-
-            meta_keys = metadata.get(project_id=project_id)
-            main_query = cur.mogrify(f"""SELECT COUNT(full_sessions) AS count, 
-                                                COALESCE(JSONB_AGG(full_sessions) 
-                                                    FILTER (WHERE rn>%(sessions_limit_s)s AND rn<=%(sessions_limit_e)s), '[]'::JSONB) AS sessions
-                                            FROM (SELECT *, ROW_NUMBER() OVER (ORDER BY issue_score DESC, {sort} {data.order}, session_id desc) AS rn
-                                            FROM (SELECT DISTINCT ON(s.session_id) {SESSION_PROJECTION_COLS}
+            data.order = data.order.upper()
+        if data.sort is not None and data.sort != 'sessionsCount':
+            sort = helper.key_to_snake_case(data.sort)
+            g_sort = f"{'MIN' if data.order == 'DESC' else 'MAX'}({sort})"
+        else:
+            sort = 'start_ts'
+
+        main_query = cur.mogrify(f"""SELECT COUNT(*) AS count,
+                                            COALESCE(JSONB_AGG(users_sessions) 
+                                                FILTER (WHERE rn>%(sessions_limit_s)s AND rn<=%(sessions_limit_e)s), '[]'::JSONB) AS sessions
+                                    FROM (SELECT user_id,
+                                             count(full_sessions)                                   AS user_sessions_count,
+                                             jsonb_agg(full_sessions) FILTER (WHERE rn <= 1)        AS last_session,
+                                             MIN(full_sessions.start_ts)                            AS first_session_ts,
+                                             ROW_NUMBER() OVER (ORDER BY {g_sort} {data.order}) AS rn
+                                        FROM (SELECT *, ROW_NUMBER() OVER (PARTITION BY user_id ORDER BY {sort} {data.order}) AS rn 
+                                            FROM (SELECT DISTINCT ON(s.session_id) {SESSION_PROJECTION_COLS} 
                                                                 {"," if len(meta_keys) > 0 else ""}{",".join([f'metadata_{m["index"]}' for m in meta_keys])}
-                                            {query_part}
-                                            ORDER BY s.session_id desc) AS filtred_sessions
-                                            ORDER BY issue_score DESC, {sort} {data.order}) AS full_sessions;""",
-                                     full_args)
-        # print("--------------------")
-        # print(main_query)
-        # print("--------------------")
-        try:
-            cur.execute(main_query)
-        except Exception as err:
-            print("--------- SESSIONS SEARCH QUERY EXCEPTION -----------")
-            print(main_query)
-            print("--------- PAYLOAD -----------")
-            print(data.dict())
-            print("--------------------")
-            raise err
-        if errors_only:
-            return helper.list_to_camel_case(cur.fetchall())
-
-        sessions = cur.fetchone()
-        if count_only:
-            return helper.dict_to_camel_case(sessions)
-
-        total = sessions["count"]
-        sessions = sessions["sessions"]
+                                                {query_part}
+                                                ) AS filtred_sessions
+                                            ) AS full_sessions
+                                            GROUP BY user_id
+                                        ) AS users_sessions;""",
+                                 full_args)
+    else:
+        if data.order is None:
+            data.order = "DESC"
+        sort = 'session_id'
+        if data.sort is not None and data.sort != "session_id":
+            sort += " " + data.order + "," + helper.key_to_snake_case(data.sort)
+        else:
+            sort = 'session_id'
 
+        main_query = cur.mogrify(f"""SELECT COUNT(full_sessions) AS count, 
+                                            COALESCE(JSONB_AGG(full_sessions) 
+                                                FILTER (WHERE rn>%(sessions_limit_s)s AND rn<=%(sessions_limit_e)s), '[]'::JSONB) AS sessions
+                                        FROM (SELECT *, ROW_NUMBER() OVER (ORDER BY issue_score DESC, {sort} {data.order}, session_id desc) AS rn
+                                        FROM (SELECT DISTINCT ON(s.session_id) {SESSION_PROJECTION_COLS}
+                                                            {"," if len(meta_keys) > 0 else ""}{",".join([f'metadata_{m["index"]}' for m in meta_keys])}
+                                        {query_part}
+                                        ORDER BY s.session_id desc) AS filtred_sessions
+                                        ORDER BY issue_score DESC, {sort} {data.order}) AS full_sessions;""",
+                                 full_args)
+    # print("--------------------")
+    # print(main_query)
+    # print("--------------------")
+    return main_query
+
+
+def __print_search_error(main_query, data: schemas.SessionsSearchPayloadSchema):
+    print("--------- SESSIONS SEARCH QUERY EXCEPTION -----------")
+    print(main_query)
+    print("--------- PAYLOAD -----------")
+    print(data.dict())
+    print("--------------------")
+
+
+def __format_sessions(data: schemas.SessionsSearchPayloadSchema, sessions, meta_keys):
+    total = sessions["count"]
+    sessions = sessions["sessions"]
     if data.group_by_user:
         for i, s in enumerate(sessions):
             sessions[i] = {**s.pop("last_session")[0], **s}
@@ -289,6 +295,54 @@ def search2_pg(data: schemas.SessionsSearchPayloadSchema, project_id, user_id, e
     }
 
 
+@dev.timed
+def search2_pg(data: schemas.SessionsSearchPayloadSchema, project_id, user_id, errors_only=False,
+               error_status=schemas.ErrorStatus.all, count_only=False, issue=None):
+    meta_keys = None
+    if not errors_only and not count_only:
+        meta_keys = metadata.get(project_id=project_id)
+    full_args, query_part = __search_args(data=data, project_id=project_id, user_id=user_id, errors_only=errors_only,
+                                          error_status=error_status, issue=issue, meta_keys=meta_keys)
+    with pg_client.PostgresClient() as cur:
+        main_query = __search_query(cur, data=data, full_args=full_args, query_part=query_part, meta_keys=meta_keys,
+                                    errors_only=errors_only, count_only=count_only)
+        try:
+            cur.execute(main_query)
+        except Exception as err:
+            __print_search_error(main_query, data)
+            raise err
+        if errors_only:
+            return helper.list_to_camel_case(cur.fetchall())
+
+        sessions = cur.fetchone()
+    if count_only:
+        return helper.dict_to_camel_case(sessions)
+    return __format_sessions(data=data, sessions=sessions, meta_keys=meta_keys)
+
+
+@dev.timed
+async def search2_pg_async(data: schemas.SessionsSearchPayloadSchema, project_id, user_id, errors_only=False,
+                           error_status=schemas.ErrorStatus.all, count_only=False, issue=None):
+    meta_keys = await metadata.get_async(project_id=project_id)
+    full_args, query_part = __search_args(data=data, project_id=project_id, user_id=user_id, errors_only=errors_only,
+                                          error_status=error_status, issue=issue, meta_keys=meta_keys)
+    async with pg_client.AsyncPostgresClient() as cur:
+        main_query = __search_query(cur, data=data, full_args=full_args, query_part=query_part, meta_keys=meta_keys,
+                                    errors_only=errors_only, count_only=count_only)
+        try:
+            await cur.execute(main_query)
+        except Exception as err:
+            __print_search_error(main_query, data)
+            raise err
+        if errors_only:
+            return helper.list_to_camel_case(await cur.fetchall())
+
+        sessions = await cur.fetchone()
+    if count_only:
+        return helper.dict_to_camel_case(sessions)
+    return __format_sessions(data=data, sessions=sessions, meta_keys=meta_keys)
+
+
 def search2_series(data: schemas.SessionsSearchPayloadSchema, project_id: int, density: int,
                    view_type: schemas.MetricTimeseriesViewType, metric_type: schemas.MetricType,
                    metric_of: schemas.TableMetricOfType, metric_value: List):
@@ -398,7 +452,11 @@ def __is_valid_event(is_any: bool, event: schemas._SessionSearchEventSchema):
                         event.filters is None or len(event.filters) == 0))
 
 
-def search_query_parts(data, error_status, errors_only, favorite_only, issue, project_id, user_id, extra_event=None):
+def search_query_parts(data, error_status, errors_only, favorite_only, issue, project_id, user_id, extra_event=None,
+                       meta_keys=None):
+    """
+    :param meta_keys: metadata of the project, read when a metadata filter needs it if not given
+    """
     ss_constraints = []
     full_args = {"project_id": project_id, "startDate": data.startDate, "endDate": data.endDate,
                  "projectId": project_id, "userId": user_id}
@@ -409,7 +467,8 @@ def search_query_parts(data, error_status, errors_only, favorite_only, issue, pr
     extra_from = ""
     events_query_part = ""
     if len(data.filters) > 0:
-        meta_keys = None
+        if meta_keys is not None:
+            meta_keys = {m["key"]: m["index"] for m in meta_keys}
         for i, f in enumerate(data.filters):
             if not isinstance(f.value, list):
                 f.value = [f.value]
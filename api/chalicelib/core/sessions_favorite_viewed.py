@@ -2,9 +2,9 @@ from chalicelib.core import sessions
 from chalicelib.utils import pg_client
 
 
-def add_favorite_session(project_id, user_id, session_id):
-    with pg_client.PostgresClient() as cur:
-        cur.execute(
+async def add_favorite_session(project_id, user_id, session_id):
+    async with pg_client.AsyncPostgresClient() as cur:
+        await cur.execute(
             cur.mogrify(f"""\
                 INSERT INTO public.user_favorite_sessions 
                     (user_id, session_id) 
@@ -12,13 +12,13 @@ def add_favorite_session(project_id, user_id, session_id):
                     (%(userId)s,%(sessionId)s);""",
                         {"userId": user_id, "sessionId": session_id})
         )
-    return sessions.get_by_id2_pg(project_id=project_id, session_id=session_id, user_id=user_id, full_data=False,
-                                  include_fav_viewed=True)
+    return await sessions.get_by_id2_pg(project_id=project_id, session_id=session_id, user_id=user_id,
+                                        full_data=False, include_fav_viewed=True)
 
 
-def remove_favorite_session(project_id, user_id, session_id):
-    with pg_client.PostgresClient() as cur:
-        cur.execute(
+async def remove_favorite_session(project_id, user_id, session_id):
+    async with pg_client.AsyncPostgresClient() as cur:
+        await cur.execute(
             cur.mogrify(f"""\
                         DELETE FROM public.user_favorite_sessions                          
                         WHERE 
@@ -26,13 +26,13 @@ def remove_favorite_session(project_id, user_id, session_id):
                             AND session_id = %(sessionId)s;""",
                         {"userId": user_id, "sessionId": session_id})
         )
-    return sessions.get_by_id2_pg(project_id=project_id, session_id=session_id, user_id=user_id, full_data=False,
-                                  include_fav_viewed=True)
+    return await sessions.get_by_id2_pg(project_id=project_id, session_id=session_id, user_id=user_id,
+                                        full_data=False, include_fav_viewed=True)
 
 
-def add_viewed_session(project_id, user_id, session_id):
-    with pg_client.PostgresClient() as cur:
-        cur.execute(
+async def add_viewed_session(project_id, user_id, session_id):
+    async with pg_client.AsyncPostgresClient() as cur:
+        await cur.execute(
             cur.mogrify("""\
                 INSERT INTO public.user_viewed_sessions 
                     (user_id, session_id) 
@@ -43,20 +43,20 @@ def add_viewed_session(project_id, user_id, session_id):
         )
 
 
-def favorite_session(project_id, user_id, session_id):
-    if favorite_session_exists(user_id=user_id, session_id=session_id):
-        return remove_favorite_session(project_id=project_id, user_id=user_id, session_id=session_id)
+async def favorite_session(project_id, user_id, session_id):
+    if await favorite_session_exists(user_id=user_id, session_id=session_id):
+        return await remove_favorite_session(project_id=project_id, user_id=user_id, session_id=session_id)
 
-    return add_favorite_session(project_id=project_id, user_id=user_id, session_id=session_id)
+    return await add_favorite_session(project_id=project_id, user_id=user_id, session_id=session_id)
 
 
-def view_session(project_id, user_id, session_id):
-    return add_viewed_session(project_id=project_id, user_id=user_id, session_id=session_id)
+async def view_session(project_id, user_id, session_id):
+    return await add_viewed_session(project_id=project_id, user_id=user_id, session_id=session_id)
 
 
-def favorite_session_exists(user_id, session_id):
-    with pg_client.PostgresClient() as cur:
-        cur.execute(
+async def favorite_session_exists(user_id, session_id):
+    async with pg_client.AsyncPostgresClient() as cur:
+        await cur.execute(
             cur.mogrify(
                 """SELECT 
                         session_id                                                
@@ -66,5 +66,5 @@ def favorite_session_exists(user_id, session_id):
                      AND session_id = %(sessionId)s""",
                 {"userId": user_id, "sessionId": session_id})
         )
-        r = cur.fetchone()
+        r = await cur.fetchone()
         return r is not None
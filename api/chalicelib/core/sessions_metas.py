@@ -110,16 +110,16 @@ def __generic_query(typename, value_length=None):
 
 
 def __generic_autocomplete(typename):
-    def f(project_id, text):
-        with pg_client.PostgresClient() as cur:
+    async def f(project_id, text):
+        async with pg_client.AsyncPostgresClient() as cur:
             query = cur.mogrify(__generic_query(typename,
                                                 value_length=len(text) \
                                                     if SUPPORTED_TYPES[typename].change_by_length else None),
                                 {"project_id": project_id, "value": helper.string_to_sql_like(text),
                                  "svalue": helper.string_to_sql_like("^" + text)})
 
-            cur.execute(query)
-            rows = cur.fetchall()
+            await cur.execute(query)
+            rows = await cur.fetchall()
         return rows
 
     return f
@@ -200,11 +200,11 @@ SUPPORTED_TYPES = {
 }
 
 
-def search(text, meta_type, project_id):
+async def search(text, meta_type, project_id):
     rows = []
     if meta_type not in list(SUPPORTED_TYPES.keys()):
         return {"errors": ["unsupported type"]}
-    rows += SUPPORTED_TYPES[meta_type].get(project_id=project_id, text=text)
+    rows += await SUPPORTED_TYPES[meta_type].get(project_id=project_id, text=text)
     # for IOS events autocomplete
     # if meta_type + "_IOS" in list(SUPPORTED_TYPES.keys()):
     #     rows += SUPPORTED_TYPES[meta_type + "_IOS"].get(project_id=project_id, text=text)
@@ -1,8 +1,13 @@
 from threading import Semaphore
 
+import psycopg
 import psycopg2
 import psycopg2.extras
+import psycopg_pool
 from decouple import config
+from psycopg import sql
+from psycopg.adapt import Dumper
+from psycopg.rows import dict_row
 from psycopg2 import pool
 
 _PG_CONFIG = {"host": config("pg_host"),
@@ -13,6 +18,9 @@ _PG_CONFIG = {"host": config("pg_host"),
 PG_CONFIG = dict(_PG_CONFIG)
 if config("pg_timeout", cast=int, default=0) > 0:
     PG_CONFIG["options"] = f"-c statement_timeout={config('pg_timeout', cast=int) * 1000}"
+# psycopg (3) takes the libpq parameter names
+_ASYNC_PG_CONFIG = {("dbname" if k == "database" else k): v for k, v in _PG_CONFIG.items()}
+ASYNC_PG_CONFIG = {("dbname" if k == "database" else k): v for k, v in PG_CONFIG.items()}
 
 
 class ORThreadedConnectionPool(psycopg2.pool.ThreadedConnectionPool):
@@ -91,5 +99,82 @@ class PostgresClient:
                 postgreSQL_pool.putconn(self.connection)
 
 
+class _TupleDumper(Dumper):
+    """
+    Quotes tuples the way psycopg2 does, `(v1, v2, ...)`, for the `IN %(values)s`
+    conditions of the queries shared with PostgresClient
+    """
+
+    def dump(self, obj):
+        raise psycopg.DataError("tuples are only quoted by client-side cursors")
+
+    def quote(self, obj):
+        return b"(" + b", ".join(sql.Literal(v).as_bytes(self.connection) for v in obj) + b")"
+
+
+psycopg.adapters.register_dumper(tuple, _TupleDumper)
+
+async_pool: psycopg_pool.AsyncConnectionPool = None
+
+
+async def make_async_pool():
+    """
+    Open the pool of AsyncPostgresClient, from the event loop of the app (startup)
+    """
+    global async_pool
+    async_pool = psycopg_pool.AsyncConnectionPool(kwargs=ASYNC_PG_CONFIG, open=False,
+                                                  min_size=config("pg_aio_minconn", cast=int, default=10),
+                                                  max_size=config("pg_aio_maxconn", cast=int, default=50))
+    await async_pool.open()
+    print("Async connection pool created successfully")
+
+
+async def close_async_pool():
+    if async_pool is not None:
+        await async_pool.close()
+
+
+class AsyncPostgresClient:
+    """
+    PostgresClient for the async routes, used the same way:
+
+        async with pg_client.AsyncPostgresClient() as cur:
+            await cur.execute(cur.mogrify(query, params))
+            rows = await cur.fetchall()
+
+    mogrify builds the query on the client side with psycopg2 quoting rules and
+    rows are dicts, so the queries and their results are shared with PostgresClient.
+    """
+
+    def __init__(self, long_query=False):
+        self.long_query = long_query
+        self.connection = None
+        self.cursor = None
+
+    async def __aenter__(self):
+        if self.long_query:
+            self.connection = await psycopg.AsyncConnection.connect(**_ASYNC_PG_CONFIG)
+        else:
+            self.connection = await async_pool.getconn()
+        self.cursor = psycopg.AsyncClientCursor(self.connection, row_factory=dict_row)
+        return self.cursor
+
+    async def __aexit__(self, exc_type, *args):
+        try:
+            if exc_type is None:
+                await self.connection.commit()
+            else:
+                await self.connection.rollback()
+            await self.cursor.close()
+        except Exception as error:
+            print("Error while committing/closing PG-connection", error)
+            raise error
+        finally:
+            if self.long_query:
+                await self.connection.close()
+            else:
+                await async_pool.putconn(self.connection)
+
+
 def close():
     pass
@@ -22,26 +22,28 @@ public_app, app, app_apikey = get_routers()
 
 
 @app.get('/{projectId}/sessions2/{sessionId}', tags=["sessions"])
-def get_session2(projectId: int, sessionId: Union[int, str], context: schemas.CurrentContext = Depends(OR_context)):
+async def get_session2(projectId: int, sessionId: Union[int, str],
+                       context: schemas.CurrentContext = Depends(OR_context)):
     if isinstance(sessionId, str):
         return {"errors": ["session not found"]}
-    data = sessions.get_by_id2_pg(project_id=projectId, session_id=sessionId, full_data=True, user_id=context.user_id,
-                                  include_fav_viewed=True, group_metadata=True)
+    data = await sessions.get_by_id2_pg(project_id=projectId, session_id=sessionId, full_data=True,
+                                        user_id=context.user_id, include_fav_viewed=True, group_metadata=True)
     if data is None:
         return {"errors": ["session not found"]}
     if data.get("inDB"):
-        sessions_favorite_viewed.view_session(project_id=projectId, user_id=context.user_id, session_id=sessionId)
+        await sessions_favorite_viewed.view_session(project_id=projectId, user_id=context.user_id,
+                                                    session_id=sessionId)
     return {
         'data': data
     }
 
 
 @app.get('/{projectId}/sessions2/{sessionId}/favorite', tags=["sessions"])
-def add_remove_favorite_session2(projectId: int, sessionId: int,
-                                 context: schemas.CurrentContext = Depends(OR_context)):
+async def add_remove_favorite_session2(projectId: int, sessionId: int,
+                                       context: schemas.CurrentContext = Depends(OR_context)):
     return {
-        "data": sessions_favorite_viewed.favorite_session(project_id=projectId, user_id=context.user_id,
-                                                          session_id=sessionId)}
+        "data": await sessions_favorite_viewed.favorite_session(project_id=projectId, user_id=context.user_id,
+                                                                session_id=sessionId)}
 
 
 @app.get('/{projectId}/sessions2/{sessionId}/assign', tags=["sessions"])
@@ -94,12 +96,12 @@ def comment_assignment(projectId: int, sessionId: int, issueId: str, data: schem
 
 
 @app.get('/{projectId}/events/search', tags=["events"])
-def events_search(projectId: int, q: str,
-                  type: Union[schemas.FilterType, schemas.EventType,
-                              schemas.PerformanceEventType, schemas.FetchFilterType,
-                              schemas.GraphqlFilterType] = None,
-                  key: str = None,
-                  source: str = None, context: schemas.CurrentContext = Depends(OR_context)):
+async def events_search(projectId: int, q: str,
+                        type: Union[schemas.FilterType, schemas.EventType,
+                                    schemas.PerformanceEventType, schemas.FetchFilterType,
+                                    schemas.GraphqlFilterType] = None,
+                        key: str = None,
+                        source: str = None, context: schemas.CurrentContext = Depends(OR_context)):
     if len(q) == 0:
         return {"data": []}
     if type in [schemas.FetchFilterType._url]:
@@ -119,14 +121,14 @@ def events_search(projectId: int, q: str,
         else:
             return {"data": []}
 
-    result = events.search(text=q, event_type=type, project_id=projectId, source=source, key=key)
+    result = await events.search(text=q, event_type=type, project_id=projectId, source=source, key=key)
     return result
 
 
 @app.post('/{projectId}/sessions/search2', tags=["sessions"])
-def sessions_search2(projectId: int, data: schemas.FlatSessionsSearchPayloadSchema = Body(...),
-                     context: schemas.CurrentContext = Depends(OR_context)):
-    data = sessions.search2_pg(data=data, project_id=projectId, user_id=context.user_id)
+async def sessions_search2(projectId: int, data: schemas.FlatSessionsSearchPayloadSchema = Body(...),
+                           context: schemas.CurrentContext = Depends(OR_context)):
+    data = await sessions.search2_pg_async(data=data, project_id=projectId, user_id=context.user_id)
     return {'data': data}
 
 
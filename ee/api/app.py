@@ -69,6 +69,17 @@ app.include_router(dashboard.app)
 app.include_router(v1_api.app_apikey)
 app.include_router(v1_api_ee.app_apikey)
 
+
+@app.on_event("startup")
+async def startup():
+    await pg_client.make_async_pool()
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    await pg_client.close_async_pool()
+
+
 app.queue_system = queue.Queue()
 app.schedule = AsyncIOScheduler()
 app.schedule.start()
@@ -1,6 +1,9 @@
+import functools
 import math
 import random
 
+from fastapi.concurrency import run_in_threadpool
+
 from chalicelib.utils import pg_client
 from chalicelib.utils import args_transformer
 from chalicelib.utils import helper
@@ -10,6 +13,14 @@ from math import isnan
 from chalicelib.utils.metrics_helper import __get_step_size
 
 
+def __threadpool(f):
+    # the ClickHouse driver is blocking, the async routes run the queries in the threadpool
+    @functools.wraps(f)
+    async def wrapper(*args, **kwargs):
+        return await run_in_threadpool(f, *args, **kwargs)
+
+    return wrapper
+
 def __get_basic_constraints(table_name=None, time_constraint=True, round_start=False, data={}, identifier="project_id"):
     if table_name:
         table_name += "."
@@ -156,6 +167,7 @@ def __get_generic_constraint(data, table_name):
     return __get_constraint(data=data, fields=SESSIONS_META_FIELDS, table_name=table_name)
 
 
+@__threadpool
 def get_processed_sessions(project_id, startTimestamp=TimeUTC.now(delta_days=-1),
                            endTimestamp=TimeUTC.now(),
                            density=7, **args):
@@ -208,6 +220,7 @@ def get_processed_sessions(project_id, startTimestamp=TimeUTC.now(delta_days=-1)
     return results
 
 
+@__threadpool
 def get_errors(project_id, startTimestamp=TimeUTC.now(delta_days=-1), endTimestamp=TimeUTC.now(),
                density=7, **args):
     step_size = __get_step_size(startTimestamp, endTimestamp, density)
@@ -267,6 +280,7 @@ def __count_distinct_errors(cur, project_id, startTimestamp, endTimestamp, ch_su
     return 0
 
 
+@__threadpool
 def get_errors_trend(project_id, startTimestamp=TimeUTC.now(delta_days=-1),
                      endTimestamp=TimeUTC.now(),
                      density=7, **args):
@@ -325,6 +339,7 @@ def get_errors_trend(project_id, startTimestamp=TimeUTC.now(delta_days=-1),
     return rows
 
 
+@__threadpool
 def get_page_metrics(project_id, startTimestamp=TimeUTC.now(delta_days=-1),
                      endTimestamp=TimeUTC.now(), **args):
     with ch_client.ClickHouseClient() as ch:
@@ -360,6 +375,7 @@ def __get_page_metrics(ch, project_id, startTimestamp, endTimestamp, **args):
     return rows
 
 
+@__threadpool
 def get_application_activity(project_id, startTimestamp=TimeUTC.now(delta_days=-1),
                              endTimestamp=TimeUTC.now(), **args):
     with ch_client.ClickHouseClient() as ch:
@@ -414,6 +430,7 @@ def __get_application_activity(ch, project_id, startTimestamp, endTimestamp, **a
     return result
 
 
+@__threadpool
 def get_user_activity(project_id, startTimestamp=TimeUTC.now(delta_days=-1),
                       endTimestamp=TimeUTC.now(), **args):
     results = {}
@@ -456,6 +473,7 @@ def __get_user_activity(cur, project_id, startTimestamp, endTimestamp, **args):
     return rows
 
 
+@__threadpool
 def get_slowest_images(project_id, startTimestamp=TimeUTC.now(delta_days=-1),
                        endTimestamp=TimeUTC.now(),
                        density=7, **args):
@@ -516,6 +534,7 @@ def __get_performance_constraint(l):
     return f"AND ({' OR '.join(l)})"
 
 
+@__threadpool
 def get_performance(project_id, startTimestamp=TimeUTC.now(delta_days=-1), endTimestamp=TimeUTC.now(),
                     density=19, resources=None, **args):
     step_size = __get_step_size(endTimestamp=endTimestamp, startTimestamp=startTimestamp, density=density)
@@ -627,8 +646,8 @@ def __get_resource_db_type_from_type(resource_type):
     return {v: k for k, v in RESOURCS_TYPE_TO_DB_TYPE.items()}.get(resource_type, resource_type)
 
 
-def search(text, resource_type, project_id, performance=False, pages_only=False, events_only=False,
-           metadata=False, key=None, platform=None):
+def __search(text, resource_type, project_id, performance=False, pages_only=False, events_only=False,
+             metadata=False, key=None, platform=None):
     if not resource_type:
         data = []
         if metadata:
@@ -637,9 +656,9 @@ def search(text, resource_type, project_id, performance=False, pages_only=False,
             resource_type = "LOCATION"
         else:
             resource_type = "ALL"
-        data.extend(search(text=text, resource_type=resource_type, project_id=project_id,
-                           performance=performance, pages_only=pages_only, events_only=events_only, key=key,
-                           platform=platform))
+        data.extend(__search(text=text, resource_type=resource_type, project_id=project_id,
+                             performance=performance, pages_only=pages_only, events_only=events_only, key=key,
+                             platform=platform))
         return data
 
     ch_sub_query = __get_basic_constraints(time_constraint=False,
@@ -787,6 +806,9 @@ def search(text, resource_type, project_id, performance=False, pages_only=False,
     return [helper.dict_to_camel_case(row) for row in rows]
 
 
+search = __threadpool(__search)
+
+
 # def frustration_sessions(project_id, startTimestamp=TimeUTC.now(delta_days=-1),
 #                          endTimestamp=TimeUTC.now(), **args):
 #     with pg_client.PostgresClient() as cur:
@@ -815,6 +837,7 @@ def search(text, resource_type, project_id, performance=False, pages_only=False,
 #         return helper.list_to_camel_case(cur.fetchall())
 
 
+@__threadpool
 def get_missing_resources_trend(project_id, startTimestamp=TimeUTC.now(delta_days=-1),
                                 endTimestamp=TimeUTC.now(),
                                 density=7, **args):
@@ -870,6 +893,7 @@ def get_missing_resources_trend(project_id, startTimestamp=TimeUTC.now(delta_day
     return rows
 
 
+@__threadpool
 def get_network(project_id, startTimestamp=TimeUTC.now(delta_days=-1),
                 endTimestamp=TimeUTC.now(),
                 density=7, **args):
@@ -922,6 +946,7 @@ def dashboard_args(params):
     return args
 
 
+@__threadpool
 def get_resources_loading_time(project_id, startTimestamp=TimeUTC.now(delta_days=-1),
                                endTimestamp=TimeUTC.now(),
                                density=19, type=None, url=None, **args):
@@ -957,6 +982,7 @@ def get_resources_loading_time(project_id, startTimestamp=TimeUTC.now(delta_days
                                                           neutral={"avg": 0})}
 
 
+@__threadpool
 def get_pages_dom_build_time(project_id, startTimestamp=TimeUTC.now(delta_days=-1),
                              endTimestamp=TimeUTC.now(), density=19, url=None, **args):
     step_size = __get_step_size(startTimestamp, endTimestamp, density)
@@ -991,6 +1017,7 @@ def get_pages_dom_build_time(project_id, startTimestamp=TimeUTC.now(delta_days=-
                                               density=density, neutral={"avg": 0})}
 
 
+@__threadpool
 def get_slowest_resources(project_id, startTimestamp=TimeUTC.now(delta_days=-1),
                           endTimestamp=TimeUTC.now(), type="all", density=19, **args):
     step_size = __get_step_size(startTimestamp, endTimestamp, density)
@@ -1062,6 +1089,7 @@ def get_slowest_resources(project_id, startTimestamp=TimeUTC.now(delta_days=-1),
     return results
 
 
+@__threadpool
 def get_sessions_location(project_id, startTimestamp=TimeUTC.now(delta_days=-1),
                           endTimestamp=TimeUTC.now(), **args):
     ch_sub_query = __get_basic_constraints(table_name="sessions", data=args)
@@ -1081,6 +1109,7 @@ def get_sessions_location(project_id, startTimestamp=TimeUTC.now(delta_days=-1),
     return {"count": sum(i["count"] for i in rows), "chart": helper.list_to_camel_case(rows)}
 
 
+@__threadpool
 def get_speed_index_location(project_id, startTimestamp=TimeUTC.now(delta_days=-1),
                              endTimestamp=TimeUTC.now(), **args):
     ch_sub_query = __get_basic_constraints(table_name="pages", data=args)
@@ -1106,6 +1135,7 @@ def get_speed_index_location(project_id, startTimestamp=TimeUTC.now(delta_days=-
     return {"avg": avg, "chart": helper.list_to_camel_case(rows)}
 
 
+@__threadpool
 def get_pages_response_time(project_id, startTimestamp=TimeUTC.now(delta_days=-1),
                             endTimestamp=TimeUTC.now(), density=7, url=None, **args):
     step_size = __get_step_size(startTimestamp, endTimestamp, density)
@@ -1140,6 +1170,7 @@ def get_pages_response_time(project_id, startTimestamp=TimeUTC.now(delta_days=-1
                                               density=density, neutral={"avg": 0})}
 
 
+@__threadpool
 def get_pages_response_time_distribution(project_id, startTimestamp=TimeUTC.now(delta_days=-1),
                                          endTimestamp=TimeUTC.now(), density=20, **args):
     ch_sub_query = __get_basic_constraints(table_name="pages", data=args)
@@ -1261,6 +1292,7 @@ def get_pages_response_time_distribution(project_id, startTimestamp=TimeUTC.now(
     return result
 
 
+@__threadpool
 def get_busiest_time_of_day(project_id, startTimestamp=TimeUTC.now(delta_days=-1),
                             endTimestamp=TimeUTC.now(), **args):
     ch_sub_query = __get_basic_constraints(table_name="sessions", data=args)
@@ -1284,6 +1316,7 @@ def get_busiest_time_of_day(project_id, startTimestamp=TimeUTC.now(delta_days=-1
                                     time_key="hour", time_coefficient=1)
 
 
+@__threadpool
 def get_top_metrics(project_id, startTimestamp=TimeUTC.now(delta_days=-1),
                     endTimestamp=TimeUTC.now(), value=None, **args):
     ch_sub_query = __get_basic_constraints(table_name="pages", data=args)
@@ -1307,8 +1340,8 @@ def get_top_metrics(project_id, startTimestamp=TimeUTC.now(delta_days=-1),
     return helper.dict_to_camel_case(rows[0])
 
 
-def get_time_to_render(project_id, startTimestamp=TimeUTC.now(delta_days=-1),
-                       endTimestamp=TimeUTC.now(), density=7, url=None, **args):
+def __get_time_to_render(project_id, startTimestamp=TimeUTC.now(delta_days=-1),
+                         endTimestamp=TimeUTC.now(), density=7, url=None, **args):
     step_size = __get_step_size(startTimestamp, endTimestamp, density)
     ch_sub_query_chart = __get_basic_constraints(table_name="pages", round_start=True, data=args)
     ch_sub_query_chart.append("isNotNull(pages.visually_complete)")
@@ -1339,6 +1372,10 @@ def get_time_to_render(project_id, startTimestamp=TimeUTC.now(delta_days=-1),
                                                           neutral={"avg": 0})}
 
 
+get_time_to_render = __threadpool(__get_time_to_render)
+
+
+@__threadpool
 def get_impacted_sessions_by_slow_pages(project_id, startTimestamp=TimeUTC.now(delta_days=-1),
                                         endTimestamp=TimeUTC.now(), value=None, density=7, **args):
     step_size = __get_step_size(startTimestamp, endTimestamp, density)
@@ -1372,6 +1409,7 @@ def get_impacted_sessions_by_slow_pages(project_id, startTimestamp=TimeUTC.now(d
                                     neutral={"count": 0})
 
 
+@__threadpool
 def get_memory_consumption(project_id, startTimestamp=TimeUTC.now(delta_days=-1),
                            endTimestamp=TimeUTC.now(), density=7, **args):
     step_size = __get_step_size(startTimestamp, endTimestamp, density)
@@ -1403,6 +1441,7 @@ def get_memory_consumption(project_id, startTimestamp=TimeUTC.now(delta_days=-1)
                                                                         neutral={"avg_used_js_heap_size": 0}))}
 
 
+@__threadpool
 def get_avg_cpu(project_id, startTimestamp=TimeUTC.now(delta_days=-1),
                 endTimestamp=TimeUTC.now(), density=7, **args):
     step_size = __get_step_size(startTimestamp, endTimestamp, density)
@@ -1434,6 +1473,7 @@ def get_avg_cpu(project_id, startTimestamp=TimeUTC.now(delta_days=-1),
                                                                         neutral={"avg_cpu": 0}))}
 
 
+@__threadpool
 def get_avg_fps(project_id, startTimestamp=TimeUTC.now(delta_days=-1),
                 endTimestamp=TimeUTC.now(), density=7, **args):
     step_size = __get_step_size(startTimestamp, endTimestamp, density)
@@ -1481,6 +1521,7 @@ def __get_crashed_sessions_ids(project_id, startTimestamp, endTimestamp):
         return [r["session_id"] for r in cur.fetchall()]
 
 
+@__threadpool
 def get_crashes(project_id, startTimestamp=TimeUTC.now(delta_days=-1),
                 endTimestamp=TimeUTC.now(), density=7, **args):
     step_size = __get_step_size(startTimestamp, endTimestamp, density)
@@ -1570,6 +1611,7 @@ def __merge_rows_with_neutral(rows, neutral):
     return rows
 
 
+@__threadpool
 def get_domains_errors(project_id, startTimestamp=TimeUTC.now(delta_days=-1),
                        endTimestamp=TimeUTC.now(), density=6, **args):
     step_size = __get_step_size(startTimestamp, endTimestamp, density)
@@ -1613,6 +1655,7 @@ def get_domains_errors(project_id, startTimestamp=TimeUTC.now(delta_days=-1),
     return result
 
 
+@__threadpool
 def get_domains_errors_4xx(project_id, startTimestamp=TimeUTC.now(delta_days=-1),
                            endTimestamp=TimeUTC.now(), density=6, **args):
     step_size = __get_step_size(startTimestamp, endTimestamp, density)
@@ -1647,6 +1690,7 @@ def get_domains_errors_4xx(project_id, startTimestamp=TimeUTC.now(delta_days=-1)
                                         density=density, neutral=neutral)
 
 
+@__threadpool
 def get_domains_errors_5xx(project_id, startTimestamp=TimeUTC.now(delta_days=-1),
                            endTimestamp=TimeUTC.now(), density=6, **args):
     step_size = __get_step_size(startTimestamp, endTimestamp, density)
@@ -1689,6 +1733,7 @@ def __nested_array_to_dict_array(rows):
     return rows
 
 
+@__threadpool
 def get_slowest_domains(project_id, startTimestamp=TimeUTC.now(delta_days=-1),
                         endTimestamp=TimeUTC.now(), **args):
     ch_sub_query = __get_basic_constraints(table_name="resources", data=args)
@@ -1717,6 +1762,7 @@ def get_slowest_domains(project_id, startTimestamp=TimeUTC.now(delta_days=-1),
     return {"avg": avg, "partition": rows}
 
 
+@__threadpool
 def get_errors_per_domains(project_id, startTimestamp=TimeUTC.now(delta_days=-1),
                            endTimestamp=TimeUTC.now(), **args):
     ch_sub_query = __get_basic_constraints(table_name="resources", data=args)
@@ -1740,6 +1786,7 @@ def get_errors_per_domains(project_id, startTimestamp=TimeUTC.now(delta_days=-1)
     return helper.list_to_camel_case(rows)
 
 
+@__threadpool
 def get_sessions_per_browser(project_id, startTimestamp=TimeUTC.now(delta_days=-1), endTimestamp=TimeUTC.now(),
                              platform=None, **args):
     ch_sub_query = __get_basic_constraints(table_name="sessions", data=args)
@@ -1792,6 +1839,7 @@ def get_sessions_per_browser(project_id, startTimestamp=TimeUTC.now(delta_days=-
     return {"count": sum(i["count"] for i in rows), "chart": rows}
 
 
+@__threadpool
 def get_calls_errors(project_id, startTimestamp=TimeUTC.now(delta_days=-1), endTimestamp=TimeUTC.now(),
                      platform=None, **args):
     ch_sub_query = __get_basic_constraints(table_name="resources", data=args)
@@ -1818,6 +1866,7 @@ def get_calls_errors(project_id, startTimestamp=TimeUTC.now(delta_days=-1), endT
     return helper.list_to_camel_case(rows)
 
 
+@__threadpool
 def get_calls_errors_4xx(project_id, startTimestamp=TimeUTC.now(delta_days=-1), endTimestamp=TimeUTC.now(),
                          platform=None, **args):
     ch_sub_query = __get_basic_constraints(table_name="resources", data=args)
@@ -1842,6 +1891,7 @@ def get_calls_errors_4xx(project_id, startTimestamp=TimeUTC.now(delta_days=-1),
     return helper.list_to_camel_case(rows)
 
 
+@__threadpool
 def get_calls_errors_5xx(project_id, startTimestamp=TimeUTC.now(delta_days=-1), endTimestamp=TimeUTC.now(),
                          platform=None, **args):
     ch_sub_query = __get_basic_constraints(table_name="resources", data=args)
@@ -1866,6 +1916,7 @@ def get_calls_errors_5xx(project_id, startTimestamp=TimeUTC.now(delta_days=-1),
     return helper.list_to_camel_case(rows)
 
 
+@__threadpool
 def get_errors_per_type(project_id, startTimestamp=TimeUTC.now(delta_days=-1), endTimestamp=TimeUTC.now(),
                         platform=None, density=7, **args):
     step_size = __get_step_size(startTimestamp, endTimestamp, density)
@@ -1917,6 +1968,7 @@ def get_errors_per_type(project_id, startTimestamp=TimeUTC.now(delta_days=-1), e
                                              "integrations": 0})
 
 
+@__threadpool
 def resource_type_vs_response_end(project_id, startTimestamp=TimeUTC.now(delta_days=-1),
                                   endTimestamp=TimeUTC.now(), density=7, **args):
     step_size = __get_step_size(startTimestamp, endTimestamp, density)
@@ -1959,6 +2011,7 @@ def resource_type_vs_response_end(project_id, startTimestamp=TimeUTC.now(delta_d
     return helper.list_to_camel_case(__merge_charts(response_end, actions))
 
 
+@__threadpool
 def get_impacted_sessions_by_js_errors(project_id, startTimestamp=TimeUTC.now(delta_days=-1),
                                        endTimestamp=TimeUTC.now(), density=7, **args):
     step_size = __get_step_size(startTimestamp, endTimestamp, density)
@@ -1998,6 +2051,7 @@ def get_impacted_sessions_by_js_errors(project_id, startTimestamp=TimeUTC.now(de
                                                                                  "errors_count": 0}))}
 
 
+@__threadpool
 def get_resources_vs_visually_complete(project_id, startTimestamp=TimeUTC.now(delta_days=-1),
                                        endTimestamp=TimeUTC.now(), density=7, **args):
     step_size = __get_step_size(startTimestamp, endTimestamp, density)
@@ -2050,9 +2104,9 @@ def get_resources_vs_visually_complete(project_id, startTimestamp=TimeUTC.now(de
                                          end_time=endTimestamp,
                                          density=density,
                                          neutral={"avg": 0, "types": {}})
-    time_to_render = get_time_to_render(project_id=project_id, startTimestamp=startTimestamp,
-                                        endTimestamp=endTimestamp, density=density,
-                                        **args)
+    time_to_render = __get_time_to_render(project_id=project_id, startTimestamp=startTimestamp,
+                                          endTimestamp=endTimestamp, density=density,
+                                          **args)
 
     return helper.list_to_camel_case(
         __merge_charts(
@@ -2061,6 +2115,7 @@ def get_resources_vs_visually_complete(project_id, startTimestamp=TimeUTC.now(de
              time_to_render["chart"]]))
 
 
+@__threadpool
 def get_resources_count_by_type(project_id, startTimestamp=TimeUTC.now(delta_days=-1),
                                 endTimestamp=TimeUTC.now(), density=7, **args):
     step_size = __get_step_size(startTimestamp, endTimestamp, density)
@@ -2094,6 +2149,7 @@ def get_resources_count_by_type(project_id, startTimestamp=TimeUTC.now(delta_day
                                     neutral={k: 0 for k in RESOURCS_TYPE_TO_DB_TYPE.keys()})
 
 
+@__threadpool
 def get_resources_by_party(project_id, startTimestamp=TimeUTC.now(delta_days=-1),
                            endTimestamp=TimeUTC.now(), density=7, **args):
     step_size = __get_step_size(startTimestamp, endTimestamp, density)
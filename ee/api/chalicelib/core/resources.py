@@ -1,9 +1,11 @@
+from fastapi.concurrency import run_in_threadpool
+
 from chalicelib.utils import helper
 from chalicelib.utils import ch_client
 from chalicelib.utils.TimeUTC import TimeUTC
 
 
-def get_by_session_id(session_id):
+def __get_by_session_id(session_id):
     with ch_client.ClickHouseClient() as ch:
         ch_query = """\
                 SELECT
@@ -23,3 +25,8 @@ def get_by_session_id(session_id):
                     continue
             results.append(r)
         return helper.list_to_camel_case(results)
+
+
+async def get_by_session_id(session_id):
+    # the ClickHouse driver is blocking
+    return await run_in_threadpool(__get_by_session_id, session_id)
@@ -0,0 +1,96 @@
+"""
+Batch building: SQLAlchemy model rows turned into a DataFrame (the previous
+path) vs db.columnar.ColumnarBatch fed with the handler rows.
+Reports time and peak traced memory per batch.
+
+Run from the connector root:
+    python -m benchmarks.bench_batch [batch_size]
+"""
+import sys
+import time
+import tracemalloc
+
+from benchmarks.bench_codec import payloads, setup_env
+from msgcodec.codec import MessageCodec
+
+setup_env()
+
+import handler
+from db.models import DetailedEvent, Event
+from db.utils import get_df_from_batch, get_df_from_objects, new_events_batch
+
+
+def build_objects(rows, model, level):
+    # every value of the handler row is set, the DataFrame keeps the model columns
+    batch = []
+    for row in rows:
+        n = model()
+        for k, v in row.items():
+            setattr(n, k, v)
+        batch.append(n)
+    return get_df_from_objects(batch, level)
+
+
+def build_columnar(rows, level):
+    batch = new_events_batch(level)
+    for row in rows:
+        batch.append(row)
+    return get_df_from_batch(batch, level)
+
+
+def events_df(rows, destination):
+    """
+    Normal level events DataFrame of `rows` rows, as built for the destination
+    """
+    codec = MessageCodec()
+    batch = new_events_batch('normal')
+    messages = (m for m in map(codec.decode, payloads(rows * 20)) if m)
+    for i, message in enumerate(messages):
+        n = handler.handle_normal_message(message)
+        if n:
+            n['sessionid'] = i
+            n['received_at'] = 1650000000000
+            n['batch_order_number'] = len(batch)
+            batch.append(n)
+        if len(batch) == rows:
+            break
+    return get_df_from_batch(batch, 'normal', destination=destination)
+
+
+def measure(build):
+    tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        build()
+    except Exception as e:
+        tracemalloc.stop()
+        return f"failed: {e!r}"
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return f"{elapsed * 1000:.0f} ms, peak {peak / 2 ** 20:.1f} MiB"
+
+
+def bench(batch_size=4000):
+    codec = MessageCodec()
+    messages = [m for m in map(codec.decode, payloads(batch_size * 10)) if m]
+    cases = (('normal', handler.handle_normal_message, Event),
+             ('detailed', handler.handle_message, DetailedEvent))
+    for level, handle, model in cases:
+        rows = []
+        for i, message in enumerate(messages):
+            n = handle(message)
+            if n:
+                n['sessionid'] = i
+                n['received_at'] = 1650000000000
+                n['batch_order_number'] = len(rows)
+                rows.append(n)
+            if len(rows) == batch_size:
+                break
+        print(f"{level}, {len(rows)} rows:")
+        print(f"  model objects + DataFrame: {measure(lambda: build_objects(rows, model, level))}")
+        print(f"  columnar batch: {measure(lambda: build_columnar(rows, level))}")
+
+
+if __name__ == '__main__':
+    bench(int(sys.argv[1]) if len(sys.argv) > 1 else 4000)
@@ -0,0 +1,56 @@
+"""
+Rows/s of the clickhouse loaders, to_sql vs native columnar blocks with and
+without compression, against a local clickhouse. Uses the clickhouse
+configuration of the connector (connect_str) and creates a scratch copy of
+the events table. Compression needs the clickhouse-driver lz4/zstd extras.
+
+Run from the connector root:
+    DATABASE_NAME=clickhouse python -m benchmarks.bench_clickhouse_loader [rows]
+"""
+import os
+import sys
+import time
+
+from benchmarks.bench_codec import setup_env
+
+setup_env()
+
+from benchmarks.bench_batch import events_df
+from db.api import DBConnection
+from db.loaders import clickhouse_loader
+from db.loaders.clickhouse_loader import insert_native_to_clickhouse, insert_to_clickhouse
+from db.tables import base_path
+
+TABLE = 'connector_events_bench'
+
+
+def bench(rows=100000, repeat=3):
+    db = DBConnection('clickhouse')
+    with open(base_path / 'sql' / 'clickhouse_events.sql') as f:
+        db.engine.execute(f.read().replace('connector_events', TABLE))
+    df = events_df(rows, destination='clickhouse')
+    clickhouse_loader.USE_BUFFER_TABLES = False
+    runs = (('to_sql', insert_to_clickhouse, None),
+            ('native', insert_native_to_clickhouse, None),
+            ('native lz4', insert_native_to_clickhouse, 'lz4'),
+            ('native zstd', insert_native_to_clickhouse, 'zstd'))
+    try:
+        for name, load, compression in runs:
+            os.environ.pop('clickhouse_compression', None)
+            if compression:
+                os.environ['clickhouse_compression'] = compression
+            db.native_client = None
+            best = None
+            for _ in range(repeat):
+                db.engine.execute(f'TRUNCATE TABLE {TABLE}')
+                start = time.perf_counter()
+                load(db=db, df=df, table=TABLE)
+                elapsed = time.perf_counter() - start
+                best = elapsed if best is None else min(best, elapsed)
+            print(f"{name}: {len(df)} rows in {best:.2f}s, {len(df) / best:,.0f} rows/s")
+    finally:
+        db.engine.execute(f'DROP TABLE IF EXISTS {TABLE}')
+
+
+if __name__ == '__main__':
+    bench(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,78 @@
+"""
+Micro-benchmark of MessageCodec.decode.
+
+Run from the connector root:
+    python -m benchmarks.bench_codec [n_messages] [level]
+
+With `level` (normal/detailed) the codec only decodes the messages that level
+needs and skips the rest, as the consumer does.
+"""
+import os
+import random
+import sys
+import time
+
+from msgcodec.codec import MessageCodec
+from msgcodec.messages import (ConsoleLog, CreateElementNode, CSSInsertRule, MouseClick, MouseMove, PageEvent,
+                               ResourceTiming, SetNodeAttribute, SetNodeData, SetViewportScroll, Timestamp)
+
+
+encode = MessageCodec().encode
+ts = 1650000000000
+
+# (weight, payload) pairs, roughly the mix of a detailed web replay
+SAMPLES = [
+    (30, encode(SetNodeAttribute(4521, "class", "btn btn-primary"))),
+    (20, encode(CreateElementNode(4522, 4500, 3, "div", False))),
+    (15, encode(MouseMove(640, 480))),
+    (10, encode(SetNodeData(4523, "Add to cart"))),
+    (8, encode(Timestamp(ts))),
+    (5, encode(CSSInsertRule(2, ".nav > li { display: inline-block; }", 14))),
+    (4, encode(MouseClick(4521, 350, "Add to cart"))),
+    (3, encode(ResourceTiming(ts, 120, 30, 300, 15000, 45000,
+                              "https://example.com/static/app.js", "script"))),
+    (2, encode(PageEvent(1, ts, "https://example.com/products?id=1", "https://google.com/",
+                         True, *range(12)))),
+    (2, encode(ConsoleLog("log", "cart updated"))),
+    (1, encode(SetViewportScroll(0, -350))),
+]
+
+
+def payloads(n, seed=0):
+    rnd = random.Random(seed)
+    weights = [w for w, _ in SAMPLES]
+    return [p for _, p in rnd.choices(SAMPLES, weights=weights, k=n)]
+
+
+def setup_env():
+    # handler imports the db models, which are configured through the environment
+    os.environ.setdefault('DATABASE_NAME', 'pg')
+    os.environ.setdefault('sessions_table', 'connector_user_sessions')
+    os.environ.setdefault('events_table_name', 'connector_events')
+    os.environ.setdefault('events_detailed_table_name', 'connector_events_detailed')
+
+
+def level_message_ids(level):
+    setup_env()
+    from handler import message_ids_for_level
+    return message_ids_for_level(level)
+
+
+def bench(n=200000, repeat=3, level=None):
+    codec = MessageCodec(message_ids=level_message_ids(level) if level else None)
+    data = payloads(n)
+    decode = codec.decode
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for p in data:
+            decode(p)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    print(f"decode ({level or 'all'}): {n} messages in {best:.3f}s, {n / best:,.0f} messages/s")
+    return n / best
+
+
+if __name__ == '__main__':
+    bench(int(sys.argv[1]) if len(sys.argv) > 1 else 200000,
+          level=sys.argv[2] if len(sys.argv) > 2 else None)
@@ -0,0 +1,77 @@
+"""
+Compares the type -> handler dispatch of handler.py with an isinstance ladder
+walking the same handlers in their declaration order, as the handlers were
+written before.
+
+Run from the connector root:
+    python -m benchmarks.bench_handler [n_messages]
+"""
+import sys
+import time
+
+from benchmarks.bench_codec import payloads, setup_env
+from msgcodec.codec import MessageCodec
+
+setup_env()
+
+import handler
+from db.models import Session
+
+
+def isinstance_ladder(handlers):
+    handlers = list(handlers.items())
+
+    def handle(message):
+        n = {}
+        for cls, h in handlers:
+            if isinstance(message, cls):
+                h(n, message)
+                return n
+        return None
+    return handle
+
+
+def isinstance_session_ladder(handlers):
+    handlers = list(handlers.items())
+
+    def handle(n, message):
+        for cls, h in handlers:
+            if isinstance(message, cls):
+                if not n:
+                    n = Session()
+                h(n, message)
+                return n
+        return n
+    return handle
+
+
+def run(messages, handle, handle_session, repeat=3):
+    best = None
+    for _ in range(repeat):
+        session = None
+        start = time.perf_counter()
+        for message in messages:
+            handle(message)
+            session = handle_session(session, message)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return len(messages) / best
+
+
+def bench(n=100000):
+    codec = MessageCodec()
+    messages = [m for m in map(codec.decode, payloads(n)) if m]
+    session_ladder = isinstance_session_ladder(handler.SESSION_HANDLERS)
+    cases = [
+        ('normal', handler.handle_normal_message, isinstance_ladder(handler.NORMAL_HANDLERS)),
+        ('detailed', handler.handle_message, isinstance_ladder(handler.DETAILED_HANDLERS)),
+    ]
+    for level, dispatch, ladder in cases:
+        ladder_rate = run(messages, ladder, session_ladder)
+        dispatch_rate = run(messages, dispatch, handler.handle_session)
+        print(f"{level}: isinstance ladder {ladder_rate:,.0f} messages/s, "
+              f"dispatch table {dispatch_rate:,.0f} messages/s ({dispatch_rate / ladder_rate:.2f}x)")
+
+
+if __name__ == '__main__':
+    bench(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
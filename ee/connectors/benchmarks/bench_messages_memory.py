@@ -0,0 +1,44 @@
+"""
+Bytes allocated per decoded message, slotted message classes vs the same
+classes with a per-instance __dict__ (the previous layout).
+
+Run from the connector root:
+    python -m benchmarks.bench_messages_memory [n_messages]
+"""
+import sys
+import tracemalloc
+
+from benchmarks.bench_codec import payloads
+from msgcodec.codec import MESSAGE_LAYOUTS, MessageCodec
+
+
+def dict_class(cls):
+    fields = cls.__slots__
+
+    def __init__(self, *args):
+        for name, value in zip(fields, args):
+            setattr(self, name, value)
+    return type(cls.__name__, (), {'__init__': __init__, '__id__': cls.__id__})
+
+
+def measure(codec, data):
+    tracemalloc.start()
+    messages = [codec.decode(p) for p in data]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del messages
+    return size / len(data)
+
+
+def bench(n=100000):
+    data = payloads(n)
+    slotted = MessageCodec()
+    with_dict = MessageCodec()
+    with_dict.layouts = {k: (dict_class(cls), readers) for k, (cls, readers) in MESSAGE_LAYOUTS.items()}
+
+    for name, codec in (('__dict__', with_dict), ('__slots__', slotted)):
+        print(f"{name}: {measure(codec, data):,.0f} bytes per decoded message")
+
+
+if __name__ == '__main__':
+    bench(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,44 @@
+"""
+Rows/s of the postgres loaders, to_sql vs COPY, against a local postgres.
+Uses the pg configuration of the connector (connect_str, user, password,
+address, port, database) and creates a scratch copy of the events table.
+
+Run from the connector root:
+    DATABASE_NAME=pg python -m benchmarks.bench_postgres_loader [rows]
+"""
+import sys
+import time
+
+from benchmarks.bench_codec import setup_env
+
+setup_env()
+
+from benchmarks.bench_batch import events_df
+from db.api import DBConnection
+from db.loaders.postgres_loader import copy_to_postgres, insert_to_postgres
+from db.tables import base_path
+
+TABLE = 'connector_events_bench'
+
+
+def bench(rows=20000, repeat=3):
+    db = DBConnection('pg')
+    with open(base_path / 'sql' / 'postgres_events.sql') as f:
+        db.engine.execute(f.read().replace('connector_events', TABLE))
+    df = events_df(rows, destination='pg')
+    try:
+        for name, load in (('to_sql', insert_to_postgres), ('copy', copy_to_postgres)):
+            best = None
+            for _ in range(repeat):
+                db.engine.execute(f'TRUNCATE {TABLE}')
+                start = time.perf_counter()
+                load(db=db, df=df, table=TABLE)
+                elapsed = time.perf_counter() - start
+                best = elapsed if best is None else min(best, elapsed)
+            print(f"{name}: {len(df)} rows in {best:.2f}s, {len(df) / best:,.0f} rows/s")
+    finally:
+        db.engine.execute(f'DROP TABLE IF EXISTS {TABLE}')
+
+
+if __name__ == '__main__':
+    bench(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
@@ -0,0 +1,96 @@
+"""
+Cost of loading batches into Redshift through the manifest loader: upload
+time of a batch as 1 to 8 parallel parts, gzip csv vs Parquet, and how the
+fixed cost of a COPY is amortized over the batches it loads.
+
+Uses the redshift configuration of the connector (bucket, subdirectory,
+aws keys); s3_endpoint_url points the uploads to MinIO or another S3
+stand-in. The COPY runs only when `address` (the cluster) is set, against a
+scratch copy of the events table; otherwise only the staging is measured.
+
+Run from the connector root:
+    DATABASE_NAME=redshift python -m benchmarks.bench_redshift_loader [rows per batch] [batches]
+"""
+import os
+import sys
+import time
+
+from benchmarks.bench_codec import setup_env
+
+setup_env()
+
+import boto3
+
+from benchmarks.bench_batch import events_df
+from db.loaders.redshift_loader import ManifestLoader
+from db.tables import base_path
+
+TABLE = 'connector_events_bench'
+COPY = bool(os.environ.get('address'))
+
+
+def _columns(df):
+    types = {'Int64': 'bigint', 'boolean': 'boolean'}
+    return [(c, types.get(str(df[c].dtype), 'character varying')) for c in df.columns]
+
+
+def _loader(engine, part_format, parts, copy_rows, columns):
+    s3 = boto3.client('s3', aws_access_key_id=os.environ['aws_access_key_id'],
+                      aws_secret_access_key=os.environ['aws_secret_access_key'],
+                      region_name=os.environ.get('region_name'),
+                      endpoint_url=os.environ.get('s3_endpoint_url'))
+    credentials = (f"ACCESS_KEY_ID '{os.environ['aws_access_key_id']}' "
+                   f"SECRET_ACCESS_KEY '{os.environ['aws_secret_access_key']}'")
+    return ManifestLoader(engine, s3, os.environ['bucket'],
+                          prefix=f"{os.environ.get('subdirectory', '').strip('/')}/staging/bench",
+                          credentials=credentials, part_format=part_format, parts=parts,
+                          copy_rows=copy_rows, copy_interval=float('inf'), columns=columns)
+
+
+def bench_staging(df, batches):
+    columns = {TABLE: _columns(df)}
+    for part_format in ('csv', 'parquet'):
+        for parts in (1, 4, 8):
+            loader = _loader(None, part_format, parts, copy_rows=float('inf'), columns=columns)
+            start = time.perf_counter()
+            for _ in range(batches):
+                loader.stage(df, TABLE)
+            elapsed = time.perf_counter() - start
+            size = sum(s for _, s, _ in loader._staged[TABLE])
+            print(f"stage {part_format:>7} x{parts}: {elapsed / batches * 1000:7.1f} ms per batch, "
+                  f"{len(df) * batches / elapsed:>10,.0f} rows/s, {size / batches / 1024:8.1f} KiB per batch")
+            loader._delete([k for k, _, _ in loader._staged[TABLE]])
+            loader._staged[TABLE] = []
+
+
+def bench_copy(df, batches):
+    from db.api import DBConnection
+
+    db = DBConnection('redshift')
+    with open(base_path / 'sql' / 'redshift_events.sql') as f:
+        db.engine.execute(f.read().replace('connector_events', TABLE))
+    try:
+        for part_format in ('csv', 'parquet'):
+            # one COPY per batch, as pandas_redshift does, then one COPY for all of them
+            for batches_per_copy in (1, batches):
+                loader = _loader(db.engine, part_format, 4, len(df) * batches_per_copy, None)
+                loader.insert(df.iloc[:0], TABLE)
+                start = time.perf_counter()
+                for _ in range(batches):
+                    loader.insert(df, TABLE)
+                elapsed = time.perf_counter() - start
+                print(f"load {part_format:>7}, {batches_per_copy:>3} batches per COPY: {loader.copies} COPYs, "
+                      f"{elapsed / batches * 1000:7.1f} ms per batch, {len(df) * batches / elapsed:>10,.0f} rows/s")
+    finally:
+        db.engine.execute(f'DROP TABLE IF EXISTS {TABLE}')
+
+
+if __name__ == '__main__':
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 4000
+    batches = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    df = events_df(rows, destination='redshift')
+    bench_staging(df, batches)
+    if COPY:
+        bench_copy(df, batches)
+    else:
+        print("COPY skipped, set address and the redshift settings to run it")
@@ -0,0 +1,122 @@
+"""
+Throughput of every stage of the connector over a replay file: read (mmap
+replay source), decode, handle (events and sessions), batch build (columnar
+batch to DataFrame) and load (insert into the destination).
+
+Run from the connector root:
+    python -m benchmarks.bench_stages [replay file] [sessions]
+
+When the file doesn't exist, or without one, a workload of `sessions` sessions
+(default 200) is generated first, see workload.py. The load stage runs only
+when DATABASE_NAME is set, with the settings of that destination;
+DATABASE_NAME=parquet parquet_path=/tmp/lake needs no server.
+`level` (normal/detailed) defaults to normal.
+"""
+import os
+import sys
+import tempfile
+import time
+
+from benchmarks.bench_codec import setup_env
+
+LOAD = 'DATABASE_NAME' in os.environ
+setup_env()
+os.environ.setdefault('level', 'normal')
+
+import handler
+from db.models import DATABASE
+from db.utils import get_df_from_batch, new_events_batch
+from msgcodec.codec import MessageCodec
+from msgcodec.messages import SessionEnd
+from replay import ReplaySource
+from session_store import SessionStore
+from workload import generate
+
+LEVEL = os.environ['level']
+BATCH_SIZE = int(os.environ.get('events_batch_size', 4000))
+
+
+def report(stage, count, unit, seconds):
+    print(f"{stage:>12}: {count:>9} {unit} in {seconds:7.3f}s, {count / seconds:>12,.0f} {unit}/s")
+
+
+def bench(path):
+    source = ReplaySource(path)
+    start = time.perf_counter()
+    polls = []
+    while not source.exhausted:
+        polls.append(source.poll(max_records=1000))
+    report('read', sum(len(r) for p in polls for r in p.values()), 'records', time.perf_counter() - start)
+
+    codec = MessageCodec(message_ids=handler.message_ids_for_level(LEVEL))
+    start = time.perf_counter()
+    decoded = []
+    for records in polls:
+        event_keys = []
+        decoded.append((*codec.decode_batch(records, event_keys=event_keys), event_keys))
+    report('decode', sum(len(r) for p in polls for r in p.values()), 'records', time.perf_counter() - start)
+    print(f"{'':>14}{sum(len(d[0]) for d in decoded)} messages decoded for the {LEVEL} level")
+
+    handle = handler.handle_message if LEVEL == 'detailed' else handler.handle_normal_message
+    handle_session = handler.handle_session
+    sessions = SessionStore()
+    rows = []
+    ended = 0
+    start = time.perf_counter()
+    for messages, session_ids, _, event_keys in decoded:
+        for message, session_id, key in zip(messages, session_ids, event_keys):
+            n = handle(message)
+            session = handle_session(sessions.get(session_id), message)
+            if session:
+                if isinstance(message, SessionEnd):
+                    sessions.pop(session_id)
+                    ended += 1
+                else:
+                    sessions.put(session_id, session)
+            if n:
+                n['sessionid'] = session_id
+                n['project_id'] = getattr(session, 'project_id', None)
+                n['received_at'] = 1650000000000
+                n['event_key'] = key
+                rows.append(n)
+    report('handle', sum(len(d[0]) for d in decoded), 'messages', time.perf_counter() - start)
+    print(f"{'':>14}{len(rows)} rows, {ended} sessions ended")
+
+    destination = DATABASE
+    start = time.perf_counter()
+    batches = []
+    for i in range(0, len(rows), BATCH_SIZE):
+        batch = new_events_batch(LEVEL)
+        for row in rows[i:i + BATCH_SIZE]:
+            row['batch_order_number'] = len(batch)
+            batch.append(row)
+        get_df_from_batch(batch, LEVEL, destination=destination)
+        batches.append(batch)
+    report('batch build', len(rows), 'rows', time.perf_counter() - start)
+
+    if not LOAD:
+        print(f"{'load':>12}: skipped, set DATABASE_NAME and the destination settings to run it")
+        return
+    from db.api import DBConnection
+    from db.models import events_detailed_table_name, events_table_name
+    from db.writer import insert_batch
+
+    db = DBConnection(destination)
+    table = events_detailed_table_name if LEVEL == 'detailed' else events_table_name
+    start = time.perf_counter()
+    for batch in batches:
+        insert_batch(db, batch, table=table, level=LEVEL)
+    report(f'load {destination}', len(rows), 'rows', time.perf_counter() - start)
+
+
+if __name__ == '__main__':
+    sessions = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    if len(sys.argv) > 1:
+        if not os.path.exists(sys.argv[1]):
+            print(f"{generate(sys.argv[1], sessions)} messages generated")
+        bench(sys.argv[1])
+    else:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'workload.bin')
+            print(f"{generate(path, sessions)} messages generated")
+            bench(path)
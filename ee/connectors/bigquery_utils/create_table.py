@@ -125,7 +125,8 @@ def create_events_table(creds_file, table_id):
         bigquery.SchemaField("customissue_name", "STRING"),
         bigquery.SchemaField("customissue_payload", "STRING"),
         bigquery.SchemaField("received_at", "INT64"),
-        bigquery.SchemaField("batch_order_number", "INT64")]
+        bigquery.SchemaField("batch_order_number", "INT64"),
+        bigquery.SchemaField("event_key", "INT64")]
     create_table(creds_file, table_id, schema)
 
 
@@ -347,7 +348,8 @@ def create_table_negatives(creds_file, table_id):
         bigquery.SchemaField("vuex_mutation", "STRING"),
         bigquery.SchemaField("vuex_state", "STRING"),
         bigquery.SchemaField("received_at", "INT64", mode="REQUIRED"),
-        bigquery.SchemaField("batch_order_number", "INT64", mode="REQUIRED")
+        bigquery.SchemaField("batch_order_number", "INT64", mode="REQUIRED"),
+        bigquery.SchemaField("event_key", "INT64")
         ]
 
     table = bigquery.Table(table_id, schema=schema)
@@ -0,0 +1,97 @@
+import json
+import os
+import sqlite3
+
+
+class SessionCheckpoint:
+    """
+    Local sqlite checkpoint of the in-flight sessions, kept in step with the
+    committed Kafka offsets, so a restarted connector picks up its sessions
+    and resumes from the offsets they correspond to.
+
+    Changes are taken as deltas when an events batch is sealed (delta()) and
+    saved together with the offsets of that batch once it is written (save()),
+    right before the offsets are committed to Kafka. The checkpoint is written
+    first, so its offsets are never behind the committed ones.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._dirty = set()
+        self._conn = sqlite3.connect(path)
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS sessions
+            (
+                session_id TEXT PRIMARY KEY,
+                ended      INTEGER NOT NULL,
+                data       TEXT    NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS offsets
+            (
+                topic       TEXT    NOT NULL,
+                partition   INTEGER NOT NULL,
+                next_offset INTEGER NOT NULL,
+                PRIMARY KEY (topic, partition)
+            );
+        """)
+
+    @classmethod
+    def from_env(cls, worker=None):
+        """
+        :param worker: index of the supervisor worker, each one keeps its own file
+        """
+        path = os.environ.get('checkpoint_path')
+        if not path:
+            return None
+        return cls(path if worker is None else f'{path}.{worker}')
+
+    def mark(self, session_ids):
+        """
+        Sessions that changed, were ended or left the connector since the last delta
+        """
+        self._dirty.update(session_ids)
+
+    def delta(self, store, pending) -> tuple:
+        """
+        State of the changed sessions: the ones in `store` are in flight, the
+        ones in `pending` (session id -> session) ended but are not submitted
+        for insertion yet, any other one is gone.
+        """
+        upserts = []
+        deletes = []
+        for session_id in self._dirty:
+            session = store.get(session_id)
+            ended = session is None
+            if ended:
+                session = pending.get(session_id)
+            if session is None:
+                deletes.append((str(session_id),))
+                continue
+            data = {k: v for k, v in vars(session).items() if not k.startswith('_')}
+            upserts.append((str(session_id), int(ended), json.dumps(data, default=str)))
+        self._dirty = set()
+        return upserts, deletes
+
+    def save(self, delta, offsets):
+        """
+        Apply a delta and the offsets it corresponds to in one transaction
+        """
+        upserts, deletes = delta
+        with self._conn:
+            self._conn.executemany("INSERT OR REPLACE INTO sessions VALUES (?, ?, ?)", upserts)
+            self._conn.executemany("DELETE FROM sessions WHERE session_id = ?", deletes)
+            self._conn.executemany("INSERT OR REPLACE INTO offsets VALUES (?, ?, ?)",
+                                   [(tp.topic, tp.partition, offset) for tp, offset in offsets.items()])
+
+    def load(self) -> tuple:
+        """
+        :return: ({session id: (session columns, ended)}, {(topic, partition): next offset})
+        """
+        sessions = {int(session_id): (json.loads(data), bool(ended))
+                    for session_id, ended, data in self._conn.execute("SELECT session_id, ended, data FROM sessions")}
+        offsets = {(topic, partition): offset
+                   for topic, partition, offset in self._conn.execute("SELECT * FROM offsets")}
+        return sessions, offsets
+
+    def close(self):
+        self._conn.close()
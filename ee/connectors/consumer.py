@@ -1,119 +1,315 @@
 import os
+import time
 from kafka import KafkaConsumer
+from kafka.consumer.subscription_state import ConsumerRebalanceListener
+from kafka.structs import OffsetAndMetadata
+from kafka.errors import CommitFailedError
+from collections import Counter
 from datetime import datetime
-from collections import defaultdict
 
 from msgcodec.codec import MessageCodec
 from msgcodec.messages import SessionEnd
 from db.api import DBConnection
-from db.models import events_detailed_table_name, events_table_name, sessions_table_name
-from db.writer import insert_batch
-from handler import handle_message, handle_normal_message, handle_session
+from db.models import DATABASES, events_detailed_table_name, events_table_name, sessions_table_name, Session
+from db.utils import new_events_batch
+from handler import handle_message, handle_normal_message, handle_session, message_ids_for_level
+import metrics
+import profiling
+from checkpoint import SessionCheckpoint
+from pipeline import BatchWriter, FanoutWriter, FlushPolicy
+from replay import ReplaySource
+from session_store import SessionStore
 
-DATABASE = os.environ['DATABASE_NAME']
-LEVEL = os.environ['level']
+# 'normal', 'detailed', or both ("normal,detailed") written from one decode into their own tables
+LEVELS = [level.strip() for level in os.environ['level'].split(',') if level.strip()]
+if os.environ.get('spool_path'):
+    from spool import Spool
 
-db = DBConnection(DATABASE)
+level_tables = {'normal': events_table_name, 'detailed': events_detailed_table_name}
+level_handlers = {'normal': handle_normal_message, 'detailed': handle_message}
+for level in LEVELS:
+    if level not in level_tables:
+        raise ValueError(f"Unknown events level {level}")
 
-if LEVEL == 'detailed':
-    table_name = events_detailed_table_name
-elif LEVEL == 'normal':
-    table_name = events_table_name
 
-
-def main():
-    batch_size = 4000
-    sessions_batch_size = 400
-    batch = []
-    sessions = defaultdict(lambda: None)
+def main(worker=None, stats_queue=None, stop=None):
+    """
+    Consume, decode and load until interrupted, or until `stop` is set.
+    :param worker: index of the worker process when run by the supervisor
+    :param stats_queue: queue the worker stats are put on every `metrics_interval` seconds
+    :param stop: multiprocessing.Event asking the worker to shut down
+    """
+    # with both levels every table has its own policy, `normal_events_*` and `detailed_events_*`
+    events_policies = {level: FlushPolicy.from_env('events' if len(LEVELS) == 1 else f'{level}_events',
+                                                   default_size=4000)
+                       for level in LEVELS}
+    sessions_policy = FlushPolicy.from_env('sessions', default_size=400)
+    max_poll_records = int(os.environ.get('max_poll_records', 1000))
+    pipelined = os.environ.get('pipelined', 'true').lower() == 'true'
+    writer_queue_size = int(os.environ.get('writer_queue_size', 2))
+    metrics_interval = float(os.environ.get('metrics_interval', 10))
+    insert_max_retries = int(os.environ.get('insert_max_retries', 10))
+    dead_letter_path = os.environ.get('dead_letter_path', 'dead_letter')
+    batches = {level: new_events_batch(level) for level in LEVELS}
+    checkpoint = SessionCheckpoint.from_env(worker)
+    sessions = SessionStore.from_env(track_changes=checkpoint is not None, worker=worker)
     sessions_batch = []
+    # next offset to consume per partition, for the records handled so far
+    offsets = {}
+    # offsets of the last flush of every level, its rows up to there are submitted
+    flushed_offsets = {level: {} for level in LEVELS}
+    resume_offsets = {}
+    if checkpoint:
+        resume_offsets = restore_sessions(checkpoint, sessions, sessions_batch)
+
+    codec = MessageCodec(message_ids=frozenset().union(*(message_ids_for_level(level) for level in LEVELS)))
+    writers = {name: BatchWriter(DBConnection(name), max_pending=writer_queue_size, threaded=pipelined,
+                                 spool=Spool.from_env(name, worker) if os.environ.get('spool_path') else None,
+                                 max_retries=insert_max_retries,
+                                 dead_letter_path=os.path.join(dead_letter_path,
+                                                               name if worker is None else f'{name}.{worker}'))
+               for name in DATABASES}
+    # with several destinations batches are built once and inserted into all of them
+    writer = writers[DATABASES[0]] if len(writers) == 1 else FanoutWriter(writers)
+    counters = {'consumed': 0, 'decoded': 0, 'events': 0}
+    reported_at = time.monotonic()
+    metrics.start(worker)
+    profiling.install()
+    evictions = metrics.StoreEvictions()
+
+    def flush_sessions():
+        nonlocal sessions_batch
+        writer.submit(sessions_batch, table=sessions_table_name, level='sessions',
+                      policy=sessions_policy)
+        sessions_policy.flushed()
+        if checkpoint:
+            checkpoint.mark(s.sessionid for s in sessions_batch)
+        sessions_batch = []
+
+    def flush_events(level):
+        # the offsets handed with the batch must not cover records that are still waiting,
+        # so this only runs between polls. A lingered batch may be empty, it still gets
+        # its offsets committed
+        flushed_offsets[level] = dict(offsets)
+        batch_offsets = covered_offsets()
+        state = None
+        # the checkpoint must match the offsets it is saved with
+        if checkpoint and batch_offsets == offsets:
+            state = checkpoint.delta(sessions, {s.sessionid: s for s in sessions_batch})
+        writer.submit(batches[level], table=level_tables[level], level=level, offsets=batch_offsets,
+                      policy=events_policies[level], state=state)
+        events_policies[level].flushed()
+        counters['events'] += len(batches[level])
+        batches[level] = new_events_batch(level)
+
+    def covered_offsets():
+        # offsets up to which the rows of every level are submitted: the batches are
+        # written in submission order, so once this one is written everything before
+        # these offsets is. A level with an empty batch has nothing waiting
+        covered = dict(offsets)
+        for level in LEVELS:
+            if len(batches[level]):
+                covered = {tp: min(offset, flushed_offsets[level][tp]) for tp, offset in covered.items()
+                           if tp in flushed_offsets[level]}
+        return covered
+
+    def flush_all_events():
+        for level in LEVELS:
+            flush_events(level)
+
+    def on_revoked(revoked):
+        # write and commit everything handled from the revoked partitions
+        # before their new owner starts from the committed offsets
+        if not any(tp in offsets for tp in revoked):
+            return
+        flush_all_events()
+        writer.drain()
+        commit_written(consumer, writer, checkpoint)
+        for tp in revoked:
+            offsets.pop(tp, None)
+            for level_offsets in flushed_offsets.values():
+                level_offsets.pop(tp, None)
 
-    codec = MessageCodec()
-    consumer = KafkaConsumer(security_protocol="SSL",
-                             bootstrap_servers=[os.environ['KAFKA_SERVER_1'],
-                                                os.environ['KAFKA_SERVER_2']],
-                             group_id=f"connector_{DATABASE}",
-                             auto_offset_reset="earliest",
-                             enable_auto_commit=False)
+    replay_path = os.environ.get('replay_path')
+    if replay_path:
+        # a replay file (see workload.py) instead of the topics, the connector stops at its end
+        consumer = ReplaySource(replay_path)
+    else:
+        consumer = KafkaConsumer(security_protocol="SSL",
+                                 bootstrap_servers=[os.environ['KAFKA_SERVER_1'],
+                                                    os.environ['KAFKA_SERVER_2']],
+                                 group_id=f"connector_{'_'.join(DATABASES)}",
+                                 auto_offset_reset="earliest",
+                                 enable_auto_commit=False)
 
-    consumer.subscribe(topics=["events", "messages"])
+    consumer.subscribe(topics=["events", "messages"],
+                       listener=ResumeFromCheckpoint(consumer, resume_offsets, on_revoked))
     print("Kafka consumer subscribed")
-    for msg in consumer:
-        message = codec.decode(msg.value)
-        if message is None:
-            print('-')
-            continue
-
-        if LEVEL == 'detailed':
-            n = handle_message(message)
-        elif LEVEL == 'normal':
-            n = handle_normal_message(message)
-
-        session_id = codec.decode_key(msg.key)
-        sessions[session_id] = handle_session(sessions[session_id], message)
-        if sessions[session_id]:
-            sessions[session_id].sessionid = session_id
-
-        # put in a batch for insertion if received a SessionEnd
-        if isinstance(message, SessionEnd):
-            if sessions[session_id]:
-                sessions_batch.append(sessions[session_id])
-
-        # try to insert sessions
-        if len(sessions_batch) >= sessions_batch_size:
-            attempt_session_insert(sessions_batch)
-            for s in sessions_batch:
-                try:
-                    del sessions[s.sessionid]
-                except KeyError  as e:
-                    print(repr(e))
-            sessions_batch = []
-
-        if n:
-            n.sessionid = session_id
-            n.received_at = int(datetime.now().timestamp() * 1000)
-            n.batch_order_number = len(batch)
-            batch.append(n)
+    try:
+        while stop is None or not stop.is_set():
+            commit_written(consumer, writer, checkpoint)
+            if writer.error is not None:
+                # the destination kept failing: stop, what is not committed is consumed again on restart
+                raise writer.error
+            # backpressure: stop fetching while the writer queue is full,
+            # polling paused partitions keeps the consumer in the group
+            if writer.full():
+                consumer.pause(*consumer.assignment())
+            elif consumer.paused():
+                consumer.resume(*consumer.paused())
+
+            records = consumer.poll(timeout_ms=1000, max_records=max_poll_records)
+            if not records and replay_path and consumer.exhausted:
+                flush_sessions()
+                flush_all_events()
+                break
+            for tp, partition_records in records.items():
+                offsets[tp] = partition_records[-1].offset + 1
+            records_count = 0
+            if records:
+                for policy in events_policies.values():
+                    policy.touch()
+                records_count = sum(len(r) for r in records.values())
+                counters['consumed'] += records_count
+            decode_start = time.perf_counter()
+            skipped = Counter() if metrics.ENABLED else None
+            event_keys = []
+            messages, session_ids, message_ids = codec.decode_batch(records, skipped=skipped, event_keys=event_keys)
+            handle_start = time.perf_counter()
+            counters['decoded'] += len(messages)
+
+            for message, session_id, key in zip(messages, session_ids, event_keys):
+                session = handle_session(sessions.get(session_id), message)
+                if session:
+                    session.sessionid = session_id
+                    # put in a batch for insertion if received a SessionEnd
+                    if isinstance(message, SessionEnd):
+                        sessions.pop(session_id)
+                        sessions_batch.append(session)
+                        sessions_policy.touch()
+                    else:
+                        sessions.put(session_id, session)
+
+                for level in LEVELS:
+                    n = level_handlers[level](message)
+                    if n:
+                        batch = batches[level]
+                        n['sessionid'] = session_id
+                        n['project_id'] = getattr(session, 'project_id', None)
+                        n['received_at'] = int(datetime.now().timestamp() * 1000)
+                        n['batch_order_number'] = len(batch)
+                        n['event_key'] = key
+                        batch.append(n)
+
+            if metrics.ENABLED and records:
+                metrics.HANDLE_SECONDS.observe(time.perf_counter() - handle_start)
+                metrics.DECODE_SECONDS.observe(handle_start - decode_start)
+                metrics.count_messages(records_count, message_ids, skipped)
+
+            # sessions idle for too long or over the capacity are inserted as they are
+            sessions.expire()
+            evicted = sessions.pop_evicted()
+            if evicted:
+                sessions_batch.extend(evicted)
+                sessions_policy.touch()
+
+            if checkpoint:
+                checkpoint.mark(sessions.pop_changed())
+
+            # try to insert sessions. While the writer is full the batches stay in place,
+            # submitting would block on its queue and stop the polling that keeps us in the group
+            if not writer.full() and sessions_policy.should_flush(len(sessions_batch)):
+                flush_sessions()
+
+            # insert a batch of events, checked once per poll
+            for level in LEVELS:
+                if not writer.full() and events_policies[level].should_flush(len(batches[level])):
+                    flush_events(level)
+                    print("sessions in cache:", len(sessions), "evicted:", sessions.evictions)
+                    print("writers:", writer.stats())
+
+            if time.monotonic() - reported_at >= metrics_interval:
+                reported_at = time.monotonic()
+                metrics.SESSIONS.set(len(sessions))
+                if metrics.ENABLED:
+                    metrics.SESSION_BYTES.set(sessions.memory_per_session())
+                evictions.update(sessions.evictions)
+                metrics.update_consumer_lag(consumer, offsets)
+                writers_stats = {name: w.stats() for name, w in writers.items()}
+                if stats_queue is not None:
+                    stats_queue.put({'worker': worker, 'partitions': len(consumer.assignment()),
+                                     'sessions': len(sessions), 'evictions': dict(sessions.evictions),
+                                     'writers': writers_stats, **counters})
+        if stop is not None and stop.is_set():
+            # asked to stop: submit the batches in progress, they are written and committed below
+            flush_sessions()
+            flush_all_events()
+    finally:
+        writer.close()
+        commit_written(consumer, writer, checkpoint)
+        consumer.close(autocommit=False)
+        if checkpoint:
+            checkpoint.close()
+
+
+class ResumeFromCheckpoint(ConsumerRebalanceListener):
+    """
+    Seeks the partitions to the offsets of the restored checkpoint on their
+    first assignment, they may be ahead of the committed ones, and hands the
+    revoked partitions to `on_revoked` before they are reassigned
+    """
+
+    def __init__(self, consumer, offsets, on_revoked=None):
+        self.consumer = consumer
+        self.offsets = offsets
+        self.on_revoked = on_revoked
+
+    def on_partitions_revoked(self, revoked):
+        if self.on_revoked is not None:
+            self.on_revoked(revoked)
+
+    def on_partitions_assigned(self, assigned):
+        for tp in assigned:
+            offset = self.offsets.pop((tp.topic, tp.partition), None)
+            if offset is not None:
+                self.consumer.seek(tp, offset)
+
+
+def restore_sessions(checkpoint, sessions, sessions_batch) -> dict:
+    """
+    Load the checkpointed sessions, the ended ones go back to the sessions batch
+    :return: {(topic, partition): offset} the sessions state corresponds to
+    """
+    restored, offsets = checkpoint.load()
+    for session_id, (columns, ended) in restored.items():
+        session = Session()
+        for k, v in columns.items():
+            setattr(session, k, v)
+        if ended:
+            sessions_batch.append(session)
         else:
-            continue
-
-        # insert a batch of events
-        if len(batch) >= batch_size:
-            attempt_batch_insert(batch)
-            batch = []
-            consumer.commit()
-            print("sessions in cache:", len(sessions))
-
-
-def attempt_session_insert(sess_batch):
-    if sess_batch:
-        try:
-            print("inserting sessions...")
-            insert_batch(db, sess_batch, table=sessions_table_name, level='sessions')
-            print("inserted sessions succesfully")
-        except TypeError as e:
-            print("Type conversion error")
-            print(repr(e))
-        except ValueError as e:
-            print("Message value could not be processed or inserted correctly")
-            print(repr(e))
-        except Exception as e:
-            print(repr(e))
-
-
-def attempt_batch_insert(batch):
-    # insert a batch
+            sessions.put(session_id, session)
+    # restored sessions are already in the checkpoint
+    sessions.pop_changed()
+    print(f"restored {len(restored)} sessions from {checkpoint.path}")
+    return offsets
+
+
+def commit_written(consumer, writer, checkpoint=None):
+    """
+    Checkpoint the sessions state and commit the offsets of the batches the writer has finished
+    """
+    offsets = {}
+    for batch_offsets, state in writer.written():
+        if checkpoint and state is not None:
+            checkpoint.save(state, batch_offsets)
+        offsets.update(batch_offsets)
+    if not offsets:
+        return
     try:
-        print("inserting...")
-        insert_batch(db=db, batch=batch, table=table_name, level=LEVEL)
-        print("inserted succesfully")
-    except TypeError as e:
-        print("Type conversion error")
-        print(repr(e))
-    except ValueError as e:
-        print("Message value could not be processed or inserted correctly")
-        print(repr(e))
-    except Exception as e:
+        consumer.commit({tp: OffsetAndMetadata(offset, None) for tp, offset in offsets.items()})
+    except CommitFailedError as e:
+        # the partitions were reassigned, their new owner restarts from the last commit
         print(repr(e))
 
 
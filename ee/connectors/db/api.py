@@ -6,14 +6,13 @@ import logging
 import os
 from pathlib import Path
 
-DATABASE = os.environ['DATABASE_NAME']
-if DATABASE == 'redshift':
+from db.models import Base, DATABASES
+
+if 'redshift' in DATABASES:
     import pandas_redshift as pr
 
 base_path = Path(__file__).parent.parent
 
-from db.models import Base
-
 logger = logging.getLogger(__file__)
 
 
@@ -81,6 +80,10 @@ class DBConnection:
             self.engine = create_engine(self.connect_str)
         elif config == 'bigquery':
             pass
+        elif config == 'parquet':
+            # local directory (or mounted volume) the files are written to
+            self.connect_str = os.environ.get('parquet_path', str(base_path / 'data'))
+            self.engine = None
         elif config == 'snowflake':
             self.connect_str = os.environ['connect_str'].format(
                 user=os.environ['user'],
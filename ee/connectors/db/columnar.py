@@ -0,0 +1,140 @@
+from array import array
+
+INT = 'q'
+BOOL = 'b'
+OBJECT = None
+
+_kinds = {'Int64': INT, 'boolean': BOOL}
+
+
+class Column:
+    """
+    Growable typed storage of one column plus its validity mask.
+    Integers and booleans live in an `array.array`, anything else in a list.
+    Rows that never set the column are filled lazily, so a sparse row only
+    costs the columns it actually has.
+    """
+    __slots__ = ('kind', 'values', 'valid', '_null')
+
+    def __init__(self, kind):
+        self.kind = kind
+        if kind is OBJECT:
+            self.values = []
+            self._null = [None]
+        else:
+            self.values = array(kind)
+            self._null = array(kind, [0])
+        self.valid = bytearray()
+
+    def fill(self, size: int):
+        missing = size - len(self.values)
+        if missing > 0:
+            self.values.extend(self._null * missing)
+            self.valid.extend(bytes(missing))
+
+    def set(self, row: int, value):
+        """
+        Set the value at `row`, which must be past the rows already set.
+        Values that don't fit the column type are stored as null.
+        """
+        if len(self.values) < row:
+            self.fill(row)
+        try:
+            self.values.append(value)
+        except (TypeError, OverflowError):
+            self.values.append(self._null[0])
+            self.valid.append(0)
+            return
+        self.valid.append(1)
+
+
+class ColumnarBatch:
+    """
+    Accumulates event rows column by column.
+    Rows are dicts of column -> value, as built by the handlers; columns
+    missing from a row and None values are null, unknown columns are ignored.
+    """
+
+    def __init__(self, dtypes: dict):
+        """
+        :param dtypes: column name -> pandas dtype ("Int64", "boolean", "string", "object"),
+            in the order of the table columns
+        """
+        self.dtypes = dtypes
+        self.columns = {name: Column(_kinds.get(dtype, OBJECT)) for name, dtype in dtypes.items()}
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def append(self, row: dict):
+        r = self.size
+        columns = self.columns
+        for name, value in row.items():
+            if value is None:
+                continue
+            column = columns.get(name)
+            if column is not None:
+                column.set(r, value)
+        self.size = r + 1
+
+    def seal(self):
+        """
+        Pad every column to the batch size. Conversions only read a sealed
+        batch, so several loaders can convert it concurrently.
+        """
+        for column in self.columns.values():
+            column.fill(self.size)
+
+    @staticmethod
+    def _clean_strings(values, max_length, delimiter):
+        if delimiter:
+            return [v[:max_length].replace(delimiter, '') if v.__class__ is str else v for v in values]
+        return [v[:max_length] if v.__class__ is str else v for v in values]
+
+    def _filled(self, max_lengths=None, delimiter=None):
+        """
+        Columns padded to the batch size, with the values of string columns
+        cut to `max_lengths` and stripped of `delimiter`, in a single pass
+        """
+        max_lengths = max_lengths or {}
+        for name, column in self.columns.items():
+            column.fill(self.size)
+            values = column.values
+            if column.kind is OBJECT and (name in max_lengths or delimiter):
+                values = self._clean_strings(values, max_lengths.get(name), delimiter)
+            yield name, column, values
+
+    def to_dataframe(self, max_lengths=None, delimiter=None):
+        import numpy as np
+        import pandas as pd
+
+        data = {}
+        for name, column, values in self._filled(max_lengths, delimiter):
+            mask = np.frombuffer(column.valid, dtype=np.uint8) == 0
+            if column.kind == INT:
+                data[name] = pd.arrays.IntegerArray(np.array(values, dtype=np.int64), mask)
+            elif column.kind == BOOL:
+                data[name] = pd.arrays.BooleanArray(np.array(values, dtype=np.bool_), mask)
+            elif self.dtypes[name] == 'string':
+                data[name] = pd.array(values, dtype='string')
+            else:
+                data[name] = pd.array(values, dtype=object)
+        return pd.DataFrame(data, columns=list(self.columns))
+
+    def to_arrow(self, max_lengths=None, delimiter=None):
+        import numpy as np
+        import pyarrow as pa
+
+        arrays = []
+        for name, column, values in self._filled(max_lengths, delimiter):
+            mask = np.frombuffer(column.valid, dtype=np.uint8) == 0
+            if column.kind == INT:
+                arrays.append(pa.array(np.array(values, dtype=np.int64), mask=mask))
+            elif column.kind == BOOL:
+                arrays.append(pa.array(np.array(values, dtype=np.bool_), mask=mask))
+            elif self.dtypes[name] == 'string':
+                arrays.append(pa.array(values, type=pa.string(), from_pandas=True))
+            else:
+                arrays.append(pa.array(values, from_pandas=True))
+        return pa.Table.from_arrays(arrays, names=list(self.columns))
@@ -1,8 +1,19 @@
+import atexit
+import hashlib
+import io
 import os
+import time
+import uuid
 from pathlib import Path
 
+import pyarrow as pa
+import pyarrow.parquet as pq
+from google.api_core.exceptions import BadRequest, Conflict
+from google.cloud import bigquery
 from google.oauth2.service_account import Credentials
 
+from db.loaders.parquet_loader import write_parquet_file
+
 # obtain the JSON file:
 # In the Cloud Console, go to the Create service account key page.
 #
@@ -32,3 +43,370 @@ def insert_to_bigquery(df, table):
 def transit_insert_to_bigquery(db, batch):
     ...
 
+
+def staged_insert_to_bigquery(db, df, table):
+    _get_loader(db, 'load_job_loader', StagedLoader).insert(df, table)
+
+
+def write_to_bigquery(db, df, table):
+    _get_loader(db, 'storage_write_loader', StorageWriteLoader).insert(df, table)
+
+
+def _get_loader(db, attribute, cls):
+    """
+    Loader kept on the connection for the process lifetime
+    """
+    loader = getattr(db, attribute, None)
+    if loader is None:
+        loader = cls.from_env()
+        setattr(db, attribute, loader)
+    return loader
+
+
+# BigQuery column types -> Arrow types, the others are strings
+ARROW_TYPES = {'INTEGER': pa.int64(), 'INT64': pa.int64(), 'BOOLEAN': pa.bool_(), 'BOOL': pa.bool_(),
+               'FLOAT': pa.float64(), 'FLOAT64': pa.float64()}
+
+
+class _TableSchemas:
+    """
+    Arrow schemas of the BigQuery tables, so the batches are sent with the
+    types of the table rather than the ones pandas infers (all null columns)
+    """
+
+    def __init__(self, client, dataset):
+        self.client = client
+        self.dataset = dataset
+        self._schemas = {}
+
+    def table_id(self, table):
+        return f"{self.client.project}.{self.dataset}.{table}"
+
+    def schema(self, table) -> pa.Schema:
+        if table not in self._schemas:
+            fields = self.client.get_table(self.table_id(table)).schema
+            self._schemas[table] = pa.schema([(f.name, ARROW_TYPES.get(f.field_type, pa.string()))
+                                              for f in fields])
+        return self._schemas[table]
+
+    def to_arrow(self, df, table) -> pa.Table:
+        schema = self.schema(table)
+        unknown = set(df.columns) - set(schema.names)
+        if unknown:
+            raise ValueError(f"Columns {sorted(unknown)} are not in the BigQuery table {table}")
+        schema = pa.schema([schema.field(c) for c in df.columns])
+        return pa.Table.from_pandas(df, schema=schema, preserve_index=False)
+
+
+class StagedLoader:
+    """
+    Loads batches into BigQuery with one load job for several batches,
+    instead of one to_gbq load job per batch, which runs into the load job
+    quotas (1500 per table and day) and waits seconds for every batch.
+
+    Every batch is written as a Parquet file under `path`/{table}/ and synced,
+    and counts as loaded from there. When `load_rows` rows are staged, or the
+    oldest file is `load_interval` seconds old, the files are combined and
+    appended to the table with a single load job, then removed. A failed job
+    leaves them staged for the next one, and the files a previous run left
+    are loaded at start. The job id is derived from the files it loads, so
+    loading the same files again after a crash is refused by BigQuery rather
+    than appended twice. For the same reason the files of a job whose outcome
+    is unknown are loaded again as they are, the files staged since wait for
+    the next job.
+
+    When a job fails on the data, the files are loaded one by one to find the
+    bad ones, and a file failing `max_failures` times is moved under
+    `path`/{table}/errors/.
+    """
+
+    def __init__(self, client, dataset, path, load_rows=500000, load_interval=120, max_failures=3):
+        self.client = client
+        self.schemas = _TableSchemas(client, dataset)
+        self.path = Path(path)
+        self.load_rows = load_rows
+        self.load_interval = load_interval
+        self.max_failures = max_failures
+        self.jobs = 0
+        # table -> [(path, rows)] of the files not loaded yet
+        self._staged = {}
+        # table -> [(path, rows)] of the files of the last job, until it is known to have failed or loaded them
+        self._loading = {}
+        # file path -> jobs failed on its data
+        self._failures = {}
+        # table -> monotonic time of the oldest staged file
+        self._staged_since = {}
+        atexit.register(self.flush)
+
+    @classmethod
+    def from_env(cls):
+        path = Path(os.environ.get('bigquery_stage_path', base_path / 'bigquery_stage'))
+        if os.environ.get('connector_worker'):
+            path = path / os.environ['connector_worker']
+        return cls(bigquery.Client(project=os.environ['project_id'], credentials=credentials),
+                   os.environ['dataset'], path,
+                   load_rows=int(os.environ.get('bigquery_load_rows', 500000)),
+                   load_interval=float(os.environ.get('bigquery_load_interval', 120)),
+                   max_failures=int(os.environ.get('bigquery_max_load_failures', 3)))
+
+    def insert(self, df, table):
+        if table not in self._staged:
+            self._recover(table)
+        if len(df):
+            self.stage(df, table)
+        if self._load_due(table):
+            self.load(table)
+
+    def stage(self, df, table):
+        """
+        Write the batch as a Parquet file, returns once it is synced
+        """
+        data = self.schemas.to_arrow(df, table)
+        path = self.path / table / f"part-{time.strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:8]}.parquet"
+        write_parquet_file(path, data)
+        self._staged.setdefault(table, []).append((path, len(df)))
+        self._staged_since.setdefault(table, time.monotonic())
+
+    def load(self, table):
+        """
+        Append the staged files of `table` with one load job. It doesn't
+        raise: the batches are already staged, a failed job is tried again later
+        """
+        parts = self._loading.get(table) or list(self._staged.get(table, []))
+        if not parts:
+            return
+        start = time.perf_counter()
+        try:
+            rows = self._load(table, parts)
+        except BadRequest as e:
+            print(repr(e))
+            print(f"load job of {len(parts)} staged files into {table} failed on the data, "
+                  "loading them one by one")
+            self._isolate(table, parts)
+            return
+        except Exception as e:
+            print(repr(e))
+            print(f"load job of {len(parts)} staged files into {table} failed, they stay staged")
+            self._staged_since[table] = time.monotonic()
+            return
+        if rows is not None:
+            self.jobs += 1
+            print(f"load job of {rows} rows ({len(parts)} batches) into {table} "
+                  f"in {time.perf_counter() - start:.2f}s")
+
+    def _load(self, table, parts):
+        """
+        Append `parts` with one load job and remove them. Until the job is
+        known to have failed, `parts` are the files loaded next
+        :return: the rows loaded, None when the files were loaded by an earlier job
+        """
+        paths = [p for p, _ in parts]
+        if self._loading.get(table) != parts:
+            self._freeze(table, paths)
+            self._loading[table] = parts
+        job_id = f"connector_{table}_{hashlib.sha1(' '.join(p.name for p in paths).encode()).hexdigest()}"
+        data = pa.concat_tables([pq.read_table(p) for p in paths])
+        buffer = io.BytesIO()
+        pq.write_table(data, buffer, compression='zstd')
+        try:
+            loaded = self._run_job(buffer, table, job_id)
+        except BadRequest:
+            # the job failed, the files can go in other jobs
+            self._thaw(table)
+            raise
+        self._unstage(table, paths)
+        self._thaw(table)
+        return data.num_rows if loaded else None
+
+    def _freeze(self, table, paths):
+        """
+        Keep the files of the job on disk too, so a restarted run loads them
+        again with the same job id
+        """
+        loading = self.path / table / 'loading'
+        tmp = loading.with_name('.loading.tmp')
+        with open(tmp, 'w') as f:
+            f.write('\n'.join(p.name for p in paths))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, loading)
+
+    def _thaw(self, table):
+        del self._loading[table]
+        (self.path / table / 'loading').unlink(missing_ok=True)
+
+    def _isolate(self, table, parts):
+        """
+        Load the files one by one after a job failed on the data, the files
+        failing `max_failures` times are quarantined
+        """
+        for part in parts:
+            path = part[0]
+            try:
+                self._load(table, [part])
+            except BadRequest as e:
+                self._failures[path] = self._failures.get(path, 0) + 1
+                print(repr(e))
+                print(f"load job of {path} into {table} failed on the data ({self._failures[path]} times)")
+                if self._failures[path] >= self.max_failures:
+                    self._quarantine(table, path)
+            except Exception as e:
+                print(repr(e))
+                print(f"load job of {path} into {table} failed, the files left stay staged")
+                break
+        if self._staged[table]:
+            self._staged_since[table] = time.monotonic()
+
+    def _quarantine(self, table, path):
+        error_path = self.path / table / 'errors' / path.name
+        error_path.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(path, error_path)
+        self._unstage(table, [path])
+        print(f"{path} failed {self.max_failures} load jobs into {table}, moved to {error_path}")
+
+    def _unstage(self, table, paths):
+        paths = set(paths)
+        for path in paths:
+            path.unlink(missing_ok=True)
+            self._failures.pop(path, None)
+        self._staged[table] = [part for part in self._staged[table] if part[0] not in paths]
+        if not self._staged[table]:
+            self._staged_since.pop(table, None)
+
+    def _run_job(self, buffer, table, base_id):
+        """
+        Run the load job `base_id`_N with the first N that is not a failed job:
+        when a job of these files already succeeded, nothing is loaded again
+        :return: False when the files were loaded by an earlier job
+        """
+        config = bigquery.LoadJobConfig(source_format=bigquery.SourceFormat.PARQUET,
+                                        write_disposition=bigquery.WriteDisposition.WRITE_APPEND)
+        attempt = 0
+        while True:
+            job_id = f"{base_id}_{attempt}"
+            try:
+                job = self.client.load_table_from_file(buffer, self.schemas.table_id(table), rewind=True,
+                                                       job_id=job_id, job_config=config)
+            except Conflict:
+                job = self.client.get_job(job_id)
+                try:
+                    job.result()
+                except Exception:
+                    if job.state != 'DONE' or not job.error_result:
+                        # outcome still unknown
+                        raise
+                    attempt += 1
+                    continue
+                print(f"load job {job_id} already ran, the files of {table} were loaded before")
+                return False
+            job.result()
+            return True
+
+    def flush(self):
+        """
+        Load everything staged, at exit. What fails stays staged for the next run
+        """
+        for table in list(self._staged):
+            self.load(table)
+
+    def _load_due(self, table):
+        staged = self._staged[table]
+        if not staged:
+            return False
+        return (sum(r for _, r in staged) >= self.load_rows
+                or time.monotonic() - self._staged_since[table] >= self.load_interval)
+
+    def _recover(self, table):
+        """
+        Stage the files a previous run wrote and did not load, the files of
+        its last job first
+        """
+        directory = self.path / table
+        directory.mkdir(parents=True, exist_ok=True)
+        self._staged[table] = [(p, pq.read_metadata(p).num_rows) for p in sorted(directory.glob('part-*.parquet'))]
+        loading = directory / 'loading'
+        if loading.exists():
+            paths = [directory / name for name in loading.read_text().split()]
+            if all(p.exists() for p in paths):
+                # outcome unknown, loaded first with the same job id
+                rows = dict(self._staged[table])
+                self._loading[table] = [(p, rows[p]) for p in paths]
+            else:
+                # files are removed once the job loaded them
+                print(f"files of the last load job of {table} were loaded, removing the ones left")
+                self._unstage(table, paths)
+                loading.unlink()
+        if self._staged[table]:
+            print(f"{len(self._staged[table])} files left staged for {table}, loading them")
+            self._staged_since[table] = float('-inf')
+
+
+class StorageWriteLoader:
+    """
+    Appends every batch to a committed stream of the Storage Write API as
+    Arrow record batches: rows are visible as soon as the append returns,
+    without load jobs. Appends carry the stream offset, so an append retried
+    after a lost response is refused by BigQuery instead of written twice.
+    """
+
+    def __init__(self, client, write_client, dataset):
+        self.schemas = _TableSchemas(client, dataset)
+        self.write_client = write_client
+        # table -> [write stream name, rows appended, AppendRowsStream or None]
+        self._streams = {}
+
+    @classmethod
+    def from_env(cls):
+        from google.cloud.bigquery_storage_v1 import BigQueryWriteClient
+
+        return cls(bigquery.Client(project=os.environ['project_id'], credentials=credentials),
+                   BigQueryWriteClient(credentials=credentials), os.environ['dataset'])
+
+    def insert(self, df, table):
+        from google.api_core.exceptions import AlreadyExists
+        from google.cloud.bigquery_storage_v1 import types
+
+        if not len(df):
+            return
+        data = self.schemas.to_arrow(df, table)
+        stream = self._stream(table, data.schema)
+        for batch in data.to_batches(max_chunksize=50000):
+            request = types.AppendRowsRequest()
+            request.offset = stream[1]
+            request.arrow_rows.rows.serialized_record_batch = batch.serialize().to_pybytes()
+            request.arrow_rows.rows.row_count = batch.num_rows
+            try:
+                stream[2].send(request).result()
+            except AlreadyExists:
+                # written by an append whose response was lost
+                pass
+            except Exception:
+                # reconnected to the same stream and offset on the next attempt
+                self._close(stream)
+                raise
+            stream[1] += batch.num_rows
+
+    def _stream(self, table, schema):
+        from google.cloud.bigquery_storage_v1 import types, writer
+
+        stream = self._streams.get(table)
+        if stream is None:
+            table_path = self.write_client.table_path(*self.schemas.table_id(table).split('.'))
+            write_stream = self.write_client.create_write_stream(
+                parent=table_path, write_stream=types.WriteStream(type_=types.WriteStream.Type.COMMITTED))
+            stream = self._streams[table] = [write_stream.name, 0, None]
+        if stream[2] is None:
+            template = types.AppendRowsRequest()
+            template.write_stream = stream[0]
+            template.arrow_rows.writer_schema.serialized_schema = schema.serialize().to_pybytes()
+            stream[2] = writer.AppendRowsStream(self.write_client, template)
+        return stream
+
+    @staticmethod
+    def _close(stream):
+        try:
+            stream[2].close()
+        except Exception:
+            pass
+        stream[2] = None
+
@@ -1,4 +1,48 @@
+import os
+
+import pandas as pd
+from clickhouse_driver import Client
+
+# Insert into the Buffer tables of sql/clickhouse_*_buffer.sql instead of the MergeTree ones
+USE_BUFFER_TABLES = os.environ.get('clickhouse_buffer_tables', 'false').lower() == 'true'
+
 
 def insert_to_clickhouse(db, df, table: str):
     df.to_sql(table, db.engine, if_exists='append', index=False)
 
+
+def get_native_client(db) -> Client:
+    """
+    clickhouse_driver client kept on the connection for the process lifetime.
+    `clickhouse_compression` (lz4, zstd) compresses the blocks sent to the server.
+    """
+    client = getattr(db, 'native_client', None)
+    if client is None:
+        url = db.connect_str.replace('clickhouse+native://', 'clickhouse://', 1)
+        compression = os.environ.get('clickhouse_compression')
+        if compression:
+            url += ('&' if '?' in url else '?') + f'compression={compression}'
+        client = Client.from_url(url)
+        db.native_client = client
+    return client
+
+
+def _column_values(series):
+    if series.dtype == object and series.map(lambda v: isinstance(v, list)).any():
+        # Array columns, the sessions urls and issues
+        return [v if isinstance(v, list) else [] for v in series]
+    return series.astype(object).where(series.notna(), None).tolist()
+
+
+def insert_native_to_clickhouse(db, df, table: str):
+    """
+    Send the batch as native columnar blocks, one list of values per column,
+    instead of the row-wise INSERT text of to_sql
+    """
+    if USE_BUFFER_TABLES and not table.endswith('_buffer'):
+        table = f'{table}_buffer'
+    columns = ', '.join(f'`{c}`' for c in df.columns)
+    client = get_native_client(db)
+    client.execute(f'INSERT INTO {table} ({columns}) VALUES',
+                   [_column_values(df[c]) for c in df.columns],
+                   columnar=True, types_check=False)
@@ -0,0 +1,93 @@
+import os
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+COMPRESSION = os.environ.get('parquet_compression', 'zstd')
+# column the date partition is taken from, epoch milliseconds, first one present
+DATE_COLUMNS = ('received_at', 'session_start_timestamp')
+# hive name of the partition of null values
+NULL_PARTITION = '__HIVE_DEFAULT_PARTITION__'
+# object columns of the sessions holding lists of strings, the other object columns hold strings
+LIST_COLUMNS = ('issues', 'urls')
+
+
+def _arrow_schema(df) -> pa.Schema:
+    """
+    Schema of a batch from its column dtypes, so every file of a table gets the
+    same one: inferred from the values, a column null in a file would be typed null
+    """
+    fields = []
+    for name, dtype in df.dtypes.items():
+        if isinstance(dtype, pd.Int64Dtype):
+            arrow_type = pa.int64()
+        elif isinstance(dtype, pd.BooleanDtype):
+            arrow_type = pa.bool_()
+        elif isinstance(dtype, pd.StringDtype):
+            arrow_type = pa.string()
+        elif dtype == object:
+            arrow_type = pa.list_(pa.string()) if name in LIST_COLUMNS else pa.string()
+        else:
+            arrow_type = pa.from_numpy_dtype(dtype)
+        fields.append(pa.field(name, arrow_type))
+    return pa.schema(fields)
+
+
+def _partition_dates(df):
+    today = datetime.now(timezone.utc).strftime('%Y-%m-%d')
+    for col in DATE_COLUMNS:
+        if col in df.columns:
+            dates = pd.to_datetime(df[col].astype('float64'), unit='ms', utc=True)
+            return dates.dt.strftime('%Y-%m-%d').fillna(today).values
+    return [today] * len(df)
+
+
+def _fsync_dir(path: Path):
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def write_parquet_file(path: Path, table: pa.Table):
+    """
+    Write `table` to `path` and make it durable. The file is written under a
+    temporary name and renamed once synced, so readers never see a partial file.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f'.{path.name}.tmp')
+    with open(tmp, 'wb') as f:
+        pq.write_table(table, f, compression=COMPRESSION)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    _fsync_dir(path.parent)
+
+
+def insert_to_parquet(db, df, table: str):
+    """
+    Write the batch under {parquet_path}/{table}/date=YYYY-MM-DD/project_id=N/,
+    one file per partition, all with the schema of the table. It returns once
+    every file is closed and synced, so the offsets of the batch are committed
+    only after that.
+    """
+    root = Path(db.connect_str) / table
+    keys = {'date': _partition_dates(df)}
+    if 'project_id' in df.columns:
+        keys['project_id'] = df['project_id'].astype(object).where(df['project_id'].notna(), NULL_PARTITION).values
+    data = df.drop(columns=[c for c in keys if c in df.columns])
+    schema = _arrow_schema(data)
+    name = f'part-{datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S")}-{uuid.uuid4().hex[:12]}.parquet'
+    for partition, rows in data.groupby(list(keys.values()), sort=False).groups.items():
+        if not isinstance(partition, tuple):
+            partition = (partition,)
+        path = root
+        for key, value in zip(keys, partition):
+            path = path / f'{key}={value}'
+        part = pa.Table.from_pandas(data.loc[rows], schema=schema, preserve_index=False)
+        write_parquet_file(path / name, part)
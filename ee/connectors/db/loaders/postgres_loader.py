@@ -1,3 +1,74 @@
+import io
 
-def insert_to_postgres(db, df, table: str):
-    df.to_sql(table, db.engine, if_exists='append', index=False)
+from psycopg2 import DataError, IntegrityError
+from sqlalchemy.dialects.postgresql import insert
+
+
+def _insert_on_conflict_do_nothing(table, conn, keys, data_iter):
+    """
+    to_sql method skipping the rows that violate a unique index
+    """
+    rows = [dict(zip(keys, row)) for row in data_iter]
+    conn.execute(insert(table.table).values(rows).on_conflict_do_nothing())
+
+
+def insert_to_postgres(db, df, table: str, dedup=False):
+    """
+    :param dedup: skip the rows already in the table, needs the unique index of sql/postgres_events_dedup.sql
+    """
+    df.to_sql(table, db.engine, if_exists='append', index=False,
+              method=_insert_on_conflict_do_nothing if dedup else None)
+
+
+def _pg_array(values):
+    items = ('NULL' if v is None else '"' + str(v).replace('\\', '\\\\').replace('"', '\\"') + '"'
+             for v in values)
+    return '{' + ','.join(items) + '}'
+
+
+def _prepare_for_copy(df):
+    """
+    Turn list columns (sessions urls/issues) into postgres array literals
+    """
+    list_columns = [c for c in df.columns
+                    if df[c].dtype == object and df[c].map(lambda v: isinstance(v, list)).any()]
+    if not list_columns:
+        return df
+    df = df.copy()
+    for c in list_columns:
+        df[c] = df[c].map(lambda v: _pg_array(v) if isinstance(v, list) else None)
+    return df
+
+
+def copy_to_postgres(db, df, table: str, dedup=False):
+    """
+    Stream the batch with COPY ... FROM STDIN as csv over a pooled connection,
+    which avoids the per row INSERT statements of to_sql.
+    When postgres rejects the data the batch goes through insert_to_postgres.
+    :param dedup: COPY into a temporary table and move the rows with
+        INSERT ... ON CONFLICT DO NOTHING, skipping the rows already in the table
+    """
+    buffer = io.StringIO()
+    _prepare_for_copy(df).to_csv(buffer, index=False, header=False, na_rep='\\N')
+    buffer.seek(0)
+    columns = ', '.join(f'"{c}"' for c in df.columns)
+    target = f'"{table}_stage"' if dedup else f'"{table}"'
+    query = f'COPY {target} ({columns}) FROM STDIN WITH (FORMAT csv, NULL \'\\N\')'
+
+    connection = db.engine.raw_connection()
+    try:
+        with connection.cursor() as cursor:
+            if dedup:
+                cursor.execute(f'CREATE TEMPORARY TABLE {target} (LIKE "{table}") ON COMMIT DROP')
+            cursor.copy_expert(query, buffer)
+            if dedup:
+                cursor.execute(f'INSERT INTO "{table}" ({columns}) SELECT {columns} FROM {target} '
+                               'ON CONFLICT DO NOTHING')
+        connection.commit()
+    except (DataError, IntegrityError) as e:
+        connection.rollback()
+        print(repr(e))
+        print("COPY rejected the batch, inserting it with to_sql")
+        insert_to_postgres(db, df, table, dedup=dedup)
+    finally:
+        connection.close()
@@ -1,6 +1,24 @@
-from db.models import DetailedEvent
+import atexit
+import gzip
+import io
+import json
+import os
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import boto3
+import pyarrow as pa
+import pyarrow.parquet as pq
+from psycopg2 import DataError, InternalError
 from psycopg2.errors import InternalError_
 
+# information_schema data types -> Parquet types COPY loads into them, the others are strings
+ARROW_TYPES = {'bigint': pa.int64(), 'integer': pa.int32(), 'smallint': pa.int16(),
+               'boolean': pa.bool_(), 'double precision': pa.float64(), 'real': pa.float32()}
+# a COPY failing with these failed on the data of a part, the others (connection, S3) are retried as is
+LOAD_ERRORS = (DataError, InternalError)
+
 
 def transit_insert_to_redshift(db, df, table):
 
@@ -17,3 +35,364 @@ def insert_df(pr, df, table):
                           redshift_table_name=table,
                           append=True,
                           delimiter='|')
+
+
+def manifest_insert_to_redshift(db, df, table):
+    get_manifest_loader(db).insert(df, table)
+
+
+def get_manifest_loader(db):
+    """
+    ManifestLoader kept on the connection for the process lifetime
+    """
+    loader = getattr(db, 'manifest_loader', None)
+    if loader is None:
+        loader = ManifestLoader.from_env(db)
+        db.manifest_loader = loader
+    return loader
+
+
+class ManifestLoader:
+    """
+    Loads batches into Redshift through S3 with one COPY for several batches.
+
+    Every batch is split into `parts` gzip csv or Parquet files uploaded in
+    parallel under s3://{bucket}/{prefix}/{table}/, and counts as loaded once
+    they are uploaded: the staged parts are durable, the next COPY picks them
+    up, and the parts a previous run left are picked up at start. When
+    `copy_rows` rows are staged, or the oldest part is `copy_interval` seconds
+    old, a manifest listing the parts is uploaded and loaded with a single
+    COPY, then the parts are deleted. A COPY that fails leaves the parts
+    staged for the next one.
+
+    The COPY records the keys of its parts in `loads_table` in the same
+    transaction, so the parts a crash or a failed delete left after their
+    COPY are deleted at start instead of being loaded twice. When a COPY
+    fails on the data, the parts are loaded one by one to find the bad ones,
+    and a part failing `max_failures` times is moved under
+    s3://{bucket}/{prefix}/{table}/errors/.
+
+    `endpoint_url` points the uploads to an S3 compatible store (e.g. MinIO);
+    the COPY itself reads from S3.
+    """
+
+    def __init__(self, engine, s3, bucket, prefix, credentials, part_format='parquet', parts=4,
+                 copy_rows=100000, copy_interval=60, compression='snappy', columns=None,
+                 loads_table='connector_staged_loads', max_failures=3):
+        if part_format not in ('parquet', 'csv'):
+            raise ValueError(f"Unknown part format {part_format}")
+        self.engine = engine
+        self.s3 = s3
+        self.bucket = bucket
+        self.prefix = prefix.strip('/')
+        self.credentials = credentials
+        self.part_format = part_format
+        self.parts = parts
+        self.copy_rows = copy_rows
+        self.copy_interval = copy_interval
+        self.compression = compression
+        self.loads_table = loads_table
+        self.max_failures = max_failures
+        self.copies = 0
+        # table -> [(key, size, rows)] of the parts uploaded and not loaded yet
+        self._staged = {}
+        # table -> monotonic time of the oldest staged part
+        self._staged_since = {}
+        self._batches = {}
+        # part key -> COPYs failed on its data
+        self._failures = {}
+        self._loads_table_created = False
+        # table -> [(column, data_type)] in table order, read from information_schema when missing
+        self._columns = dict(columns or {})
+        self._executor = ThreadPoolExecutor(max_workers=parts, thread_name_prefix='redshift-upload')
+        atexit.register(self.flush)
+
+    @classmethod
+    def from_env(cls, db):
+        s3 = boto3.client('s3', aws_access_key_id=os.environ['aws_access_key_id'],
+                          aws_secret_access_key=os.environ['aws_secret_access_key'],
+                          region_name=os.environ.get('region_name'),
+                          endpoint_url=os.environ.get('s3_endpoint_url'))
+        if os.environ.get('redshift_iam_role'):
+            credentials = f"IAM_ROLE '{os.environ['redshift_iam_role']}'"
+        else:
+            credentials = (f"ACCESS_KEY_ID '{os.environ['aws_access_key_id']}' "
+                           f"SECRET_ACCESS_KEY '{os.environ['aws_secret_access_key']}'")
+        # one staging area per process, so a restarted worker loads what it left: the offsets of
+        # the staged batches are committed, the id has to outlive the host (e.g. a StatefulSet pod name)
+        stage = os.environ.get('redshift_stage_id')
+        if not stage:
+            raise ValueError("redshift_stage_id is required by redshift_insert_method=manifest, "
+                             "stable across restarts and unique per connector")
+        if os.environ.get('connector_worker'):
+            stage += f".{os.environ['connector_worker']}"
+        return cls(db.engine, s3, os.environ['bucket'],
+                   prefix=f"{os.environ.get('subdirectory', '').strip('/')}/staging/{stage}",
+                   credentials=credentials,
+                   part_format=os.environ.get('redshift_part_format', 'parquet'),
+                   parts=int(os.environ.get('redshift_parts', 4)),
+                   copy_rows=int(os.environ.get('redshift_copy_rows', 100000)),
+                   copy_interval=float(os.environ.get('redshift_copy_interval', 60)),
+                   compression=os.environ.get('redshift_parquet_compression', 'snappy'),
+                   loads_table=os.environ.get('redshift_loads_table', 'connector_staged_loads'),
+                   max_failures=int(os.environ.get('redshift_max_copy_failures', 3)))
+
+    def insert(self, df, table):
+        if table not in self._staged:
+            self._recover(table)
+        if len(df):
+            self.stage(df, table)
+        if self._copy_due(table):
+            self.copy(table)
+
+    def stage(self, df, table):
+        """
+        Upload the batch as parts, returns once all of them are in S3
+        """
+        df = self._reorder(df, table)
+        step = -(-len(df) // min(self.parts, len(df)))
+        batch_id = f"{time.strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        suffix = '.parquet' if self.part_format == 'parquet' else '.csv.gz'
+        chunks = [(f"{self.prefix}/{table}/part-{batch_id}-{i:03d}{suffix}", df.iloc[start:start + step])
+                  for i, start in enumerate(range(0, len(df), step))]
+        parts = list(self._executor.map(lambda chunk: self._upload_part(table, *chunk), chunks))
+        self._staged.setdefault(table, []).extend(parts)
+        self._staged_since.setdefault(table, time.monotonic())
+        self._batches[table] = self._batches.get(table, 0) + 1
+
+    def copy(self, table):
+        """
+        Load the staged parts of `table` with one COPY. It doesn't raise: the
+        batches are already staged, a failed COPY is tried again later
+        """
+        parts = self._staged.get(table)
+        if not parts:
+            return
+        rows = sum(r for _, _, r in parts)
+        batches = self._batches.get(table, 0)
+        start = time.perf_counter()
+        try:
+            self._load(table, list(parts))
+        except LOAD_ERRORS as e:
+            print(repr(e))
+            print(f"COPY of {len(parts)} staged parts into {table} failed on the data, "
+                  "loading them one by one. check stl_load_errors")
+            self._isolate(table)
+            return
+        except Exception as e:
+            print(repr(e))
+            print(f"COPY of {len(parts)} staged parts into {table} failed, they stay staged. "
+                  "check stl_load_errors")
+            self._staged_since[table] = time.monotonic()
+            return
+        elapsed = time.perf_counter() - start
+        self.copies += 1
+        print(f"COPY of {rows} rows ({batches} batches, {len(parts)} parts) into {table} in {elapsed:.2f}s"
+              + (f", {elapsed / batches * 1000:.0f} ms per batch" if batches else ""))
+        self._batches[table] = 0
+
+    def _load(self, table, parts):
+        """
+        COPY `parts` through a manifest and record their keys in `loads_table`
+        in the same transaction, then unstage and delete them
+        """
+        manifest_key = f"{self.prefix}/{table}/manifest-{time.strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        manifest = {'entries': [{'url': f's3://{self.bucket}/{key}', 'mandatory': True,
+                                 'meta': {'content_length': size}} for key, size, _ in parts]}
+        if self.part_format == 'parquet':
+            query = (f"COPY {table} FROM 's3://{self.bucket}/{manifest_key}' {self.credentials} "
+                     "FORMAT AS PARQUET MANIFEST")
+        else:
+            columns = ', '.join(c for c, _ in self._table_columns(table))
+            query = (f"COPY {table} ({columns}) FROM 's3://{self.bucket}/{manifest_key}' {self.credentials} "
+                     "CSV GZIP NULL AS '\\N' MANIFEST")
+        keys = [key for key, _, _ in parts]
+        self.s3.put_object(Bucket=self.bucket, Key=manifest_key, Body=json.dumps(manifest).encode())
+        try:
+            self._execute(query, f"INSERT INTO {self.loads_table} (part_key) VALUES "
+                          + ', '.join(f"('{key}')" for key in keys))
+        except Exception:
+            try:
+                self.s3.delete_object(Bucket=self.bucket, Key=manifest_key)
+            except Exception:
+                # deleted at start otherwise
+                pass
+            raise
+        self._unstage(table, keys)
+        try:
+            self._delete(keys + [manifest_key])
+            self._forget(keys)
+        except Exception as e:
+            # recorded as loaded, the next run deletes them
+            print(repr(e))
+            print(f"could not delete the loaded parts of {table} from s3://{self.bucket}/{self.prefix}")
+
+    def _isolate(self, table):
+        """
+        Load the staged parts one by one after a COPY failed on the data, the
+        parts failing `max_failures` times are quarantined
+        """
+        for part in list(self._staged[table]):
+            key = part[0]
+            try:
+                self._load(table, [part])
+            except LOAD_ERRORS as e:
+                self._failures[key] = self._failures.get(key, 0) + 1
+                print(repr(e))
+                print(f"COPY of {key} into {table} failed on the data ({self._failures[key]} times)")
+                if self._failures[key] >= self.max_failures:
+                    self._quarantine(table, key)
+            except Exception as e:
+                print(repr(e))
+                print(f"COPY of {key} into {table} failed, the parts left stay staged")
+                break
+        if self._staged[table]:
+            self._staged_since[table] = time.monotonic()
+
+    def _quarantine(self, table, key):
+        error_key = f"{self.prefix}/{table}/errors/{key.rsplit('/', 1)[-1]}"
+        try:
+            self.s3.copy_object(Bucket=self.bucket, Key=error_key, CopySource={'Bucket': self.bucket, 'Key': key})
+            self.s3.delete_object(Bucket=self.bucket, Key=key)
+        except Exception as e:
+            print(repr(e))
+            print(f"could not move {key} to s3://{self.bucket}/{error_key}, it stays staged")
+            return
+        self._unstage(table, [key])
+        print(f"{key} failed {self.max_failures} COPYs into {table}, moved to s3://{self.bucket}/{error_key}. "
+              "check stl_load_errors")
+
+    def _unstage(self, table, keys):
+        keys = set(keys)
+        self._staged[table] = [part for part in self._staged[table] if part[0] not in keys]
+        for key in keys:
+            self._failures.pop(key, None)
+        if not self._staged[table]:
+            self._staged_since.pop(table, None)
+
+    def flush(self):
+        """
+        COPY everything staged, at exit. What fails stays staged for the next run
+        """
+        for table in list(self._staged):
+            self.copy(table)
+
+    def _copy_due(self, table):
+        staged = self._staged[table]
+        if not staged:
+            return False
+        return (sum(r for _, _, r in staged) >= self.copy_rows
+                or time.monotonic() - self._staged_since[table] >= self.copy_interval)
+
+    def _recover(self, table):
+        """
+        Stage the parts a previous run uploaded and did not load, and delete
+        the ones it loaded without deleting them. Tried again on the next
+        insert when it fails
+        """
+        if not self._loads_table_created:
+            self._execute(f"CREATE TABLE IF NOT EXISTS {self.loads_table} "
+                          "(part_key VARCHAR(1024) NOT NULL, loaded_at TIMESTAMP DEFAULT GETDATE())")
+            self._loads_table_created = True
+        parts = []
+        paginator = self.s3.get_paginator('list_objects_v2')
+        # the delimiter leaves out errors/
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=f"{self.prefix}/{table}/", Delimiter='/'):
+            for item in page.get('Contents', []):
+                if item['Key'].rsplit('/', 1)[-1].startswith('manifest-'):
+                    self.s3.delete_object(Bucket=self.bucket, Key=item['Key'])
+                else:
+                    parts.append((item['Key'], item['Size']))
+        loaded = self._loaded([key for key, _ in parts]) if parts else []
+        if loaded:
+            print(f"{len(loaded)} parts left staged for {table} are already loaded, deleting them")
+            self._delete(loaded)
+            self._forget(loaded)
+        # rows unknown, the next COPY is due right away
+        self._staged[table] = [(key, size, 0) for key, size in parts if key not in loaded]
+        if self._staged[table]:
+            print(f"{len(self._staged[table])} parts left staged for {table}, loading them")
+            self._staged_since[table] = float('-inf')
+
+    def _table_columns(self, table):
+        """
+        (column, data_type) of the Redshift table, in table order
+        """
+        if table not in self._columns:
+            with self.engine.connect() as connection:
+                self._columns[table] = [tuple(r) for r in connection.execute(
+                    "SELECT column_name, data_type FROM information_schema.columns "
+                    f"WHERE table_name = '{table}' ORDER BY ordinal_position")]
+        return self._columns[table]
+
+    def _reorder(self, df, table):
+        """
+        The batch with the columns of the Redshift table, in table order, as
+        COPY of Parquet maps the file columns to the table ones by position
+        """
+        columns = [c for c, _ in self._table_columns(table)]
+        unknown = set(df.columns) - set(columns)
+        if unknown:
+            raise ValueError(f"Columns {sorted(unknown)} are not in the Redshift table {table}")
+        return df.reindex(columns=columns)
+
+    def _upload_part(self, table, key, df):
+        if self.part_format == 'parquet':
+            body = self._parquet_part(table, df)
+        else:
+            text = df.to_csv(index=False, header=False, na_rep='\\N')
+            body = gzip.compress(text.encode(), compresslevel=6)
+        self.s3.put_object(Bucket=self.bucket, Key=key, Body=body)
+        return key, len(body), len(df)
+
+    def _parquet_part(self, table, df):
+        schema = pa.schema([(c, ARROW_TYPES.get(t, pa.string())) for c, t in self._table_columns(table)])
+        buffer = io.BytesIO()
+        pq.write_table(pa.Table.from_pandas(df, schema=schema, preserve_index=False), buffer,
+                       compression=self.compression)
+        return buffer.getvalue()
+
+    def _delete(self, keys):
+        for i in range(0, len(keys), 1000):
+            self.s3.delete_objects(Bucket=self.bucket,
+                                   Delete={'Objects': [{'Key': k} for k in keys[i:i + 1000]], 'Quiet': True})
+
+    def _loaded(self, keys):
+        """
+        The keys recorded as loaded in `loads_table`
+        """
+        loaded = []
+        connection = self.engine.raw_connection()
+        try:
+            with connection.cursor() as cursor:
+                for i in range(0, len(keys), 1000):
+                    cursor.execute(f"SELECT part_key FROM {self.loads_table} WHERE part_key IN ("
+                                   + ', '.join(f"'{key}'" for key in keys[i:i + 1000]) + ")")
+                    loaded.extend(r[0] for r in cursor.fetchall())
+        finally:
+            connection.close()
+        return loaded
+
+    def _forget(self, keys):
+        """
+        Drop the records of loaded parts once they are deleted from S3
+        """
+        for i in range(0, len(keys), 1000):
+            self._execute(f"DELETE FROM {self.loads_table} WHERE part_key IN ("
+                          + ', '.join(f"'{key}'" for key in keys[i:i + 1000]) + ")")
+
+    def _execute(self, *queries):
+        """
+        Run the queries in one transaction
+        """
+        connection = self.engine.raw_connection()
+        try:
+            with connection.cursor() as cursor:
+                for query in queries:
+                    cursor.execute(query)
+            connection.commit()
+        except Exception:
+            connection.rollback()
+            raise
+        finally:
+            connection.close()
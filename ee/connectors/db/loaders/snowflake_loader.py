@@ -1,5 +1,22 @@
 
-def insert_to_snowflake(db, df, table):
-    df.to_sql(table, db.engine, if_exists='append', index=False)
+def insert_to_snowflake(db, df, table, dedup=False):
+    if not dedup:
+        df.to_sql(table, db.engine, if_exists='append', index=False)
+        return
+    merge_to_snowflake(db, df, table)
 
 
+def merge_to_snowflake(db, df, table, key='event_key'):
+    """
+    Load the batch into a temporary table and MERGE the rows whose `key`
+    is not in `table` yet, so loading a batch again adds nothing
+    """
+    stage = f'{table}_stage'
+    columns = ', '.join(df.columns)
+    values = ', '.join(f's.{c}' for c in df.columns)
+    with db.engine.connect() as connection:
+        connection.execute(f'CREATE OR REPLACE TEMPORARY TABLE {stage} LIKE {table}')
+        df.to_sql(stage, connection, if_exists='append', index=False)
+        connection.execute(f'MERGE INTO {table} t USING {stage} s ON t.{key} = s.{key} '
+                           f'WHEN NOT MATCHED THEN INSERT ({columns}) VALUES ({values})')
+        connection.execute(f'DROP TABLE IF EXISTS {stage}')
@@ -4,7 +4,9 @@ from sqlalchemy.ext.declarative import declarative_base
 from pathlib import Path
 import os
 
-DATABASE = os.environ['DATABASE_NAME']
+# one destination or a comma separated list of them, e.g. "clickhouse,parquet"
+DATABASES = [name.strip() for name in os.environ['DATABASE_NAME'].split(',') if name.strip()]
+DATABASE = DATABASES[0]
 
 Base = declarative_base()
 metadata = Base.metadata
@@ -24,6 +26,12 @@ except KeyError as e:
     events_detailed_table_name = None
 sessions_table_name = os.environ['sessions_table']
 
+# dedup=true makes the events loads idempotent: rows whose event_key is
+# already in the destination are skipped, so consuming records again is safe.
+# Only the events table is deduplicated, the detailed events table has no
+# unique event_key and keeps the rows consumed again
+DEDUP = os.environ.get('dedup', 'false').lower() == 'true'
+
 
 class Session(Base):
     __tablename__ = sessions_table_name
@@ -132,6 +140,7 @@ class Event(Base):
     customissue_payload = Column(VARCHAR(5000))
     received_at = Column(BigInteger)
     batch_order_number = Column(BigInteger)
+    event_key = Column(BigInteger)
 
 
 class DetailedEvent(Base):
@@ -373,4 +382,5 @@ class DetailedEvent(Base):
     pageclose = Column(Boolean)
     received_at = Column(BigInteger)
     batch_order_number = Column(BigInteger)
+    event_key = Column(BigInteger)
 
@@ -1,10 +1,13 @@
 from pathlib import Path
 
+from db.models import DEDUP
+
 base_path = Path(__file__).parent.parent
 
 
 def create_tables_clickhouse(db):
-    with open(base_path / 'sql' / 'clickhouse_events.sql') as f:
+    events_sql = 'clickhouse_events_dedup.sql' if DEDUP else 'clickhouse_events.sql'
+    with open(base_path / 'sql' / events_sql) as f:
         q = f.read()
     db.engine.execute(q)
     print(f"`connector_user_events` table created succesfully.")
@@ -31,6 +34,12 @@ def create_tables_postgres(db):
     db.engine.execute(q)
     print(f"`connector_user_events` table created succesfully.")
 
+    if DEDUP:
+        with open(base_path / 'sql' / 'postgres_events_dedup.sql') as f:
+            q = f.read()
+        db.engine.execute(q)
+        print(f"`connector_user_events` unique index on event_key created succesfully.")
+
     with open(base_path / 'sql' / 'postgres_sessions.sql') as f:
         q = f.read()
     db.engine.execute(q)
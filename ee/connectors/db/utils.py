@@ -1,4 +1,9 @@
+import os
+
 import pandas as pd
+from sqlalchemy import Boolean, Integer, String
+
+from db.columnar import ColumnarBatch
 from db.models import DetailedEvent, Event, Session, DATABASE
 
 dtypes_events = {'sessionid': "Int64",
@@ -49,7 +54,8 @@ dtypes_events = {'sessionid': "Int64",
                  'customissue_name': "string",
                  'customissue_payload': "string",
                  'received_at': "Int64",
-                 'batch_order_number': "Int64"}
+                 'batch_order_number': "Int64",
+                 'event_key': "Int64"}
 dtypes_detailed_events = {
     "sessionid": "Int64",
     "clickevent_hesitationtime": "Int64",
@@ -264,7 +270,8 @@ dtypes_detailed_events = {
     "vuex_mutation": "object",
     "vuex_state": "string",
     "received_at": "Int64",
-    "batch_order_number": "Int64"
+    "batch_order_number": "Int64",
+    "event_key": "Int64"
 }
 dtypes_sessions = {'sessionid': 'Int64',
                    'user_agent': 'string',
@@ -309,10 +316,6 @@ dtypes_sessions = {'sessionid': 'Int64',
                    'urls_count': 'Int64',
                    'urls': 'object'}
 
-if DATABASE == 'bigquery':
-    dtypes_sessions['urls'] = 'string'
-    dtypes_sessions['issues'] = 'string'
-
 detailed_events_col = []
 for col in DetailedEvent.__dict__:
     if not col.startswith('_'):
@@ -329,7 +332,120 @@ for col in Session.__dict__:
         sessions_col.append(col)
 
 
-def get_df_from_batch(batch, level):
+def get_columns_dtypes(model, columns, dtypes):
+    """
+    dtypes of the table columns, in table order. Columns without an explicit
+    dtype get one from their SQLAlchemy type.
+    """
+    result = {}
+    for col in columns:
+        if col in dtypes:
+            result[col] = dtypes[col]
+            continue
+        column = model.__table__.columns.get(col)
+        if column is not None and isinstance(column.type, Boolean):
+            result[col] = 'boolean'
+        elif column is not None and isinstance(column.type, Integer):
+            result[col] = 'Int64'
+        else:
+            result[col] = 'string'
+    return result
+
+
+events_columns_dtypes = get_columns_dtypes(Event, events_col, dtypes_events)
+detailed_events_columns_dtypes = get_columns_dtypes(DetailedEvent, detailed_events_col, dtypes_detailed_events)
+
+
+# Destinations that lay out the rows by project, they get the project of the
+# session with every row, the others have no project column
+partitioned_destinations = {'parquet'}
+partition_columns_dtypes = {'project_id': 'Int64'}
+
+
+def new_events_batch(level) -> ColumnarBatch:
+    """
+    Empty batch for the events rows of `level` built by the handlers
+    """
+    if level == 'normal':
+        return ColumnarBatch({**events_columns_dtypes, **partition_columns_dtypes})
+    if level == 'detailed':
+        return ColumnarBatch({**detailed_events_columns_dtypes, **partition_columns_dtypes})
+    raise ValueError(f"Unknown events level {level}")
+
+
+# How each destination needs string values prepared before loading:
+# max_length caps the width of the model columns (the redshift DDL uses VARCHAR(300)
+# which counts bytes, not characters), delimiter is removed from the values of
+# loaders that upload delimiter separated files.
+sanitize_policies = {
+    # only the pandas_redshift method uploads '|' delimited files, the manifest parts are Parquet or quoted csv
+    'redshift': {'max_length': 255,
+                 'delimiter': '|' if os.environ.get('redshift_insert_method', 'manifest') == 'pandas_redshift' else None},
+}
+default_sanitize_policy = {'max_length': None, 'delimiter': None}
+
+
+def get_columns_widths(model, columns):
+    widths = {}
+    for col in columns:
+        column = model.__table__.columns.get(col)
+        if column is not None and isinstance(column.type, String) and column.type.length:
+            widths[col] = column.type.length
+    return widths
+
+
+columns_widths = {
+    'normal': get_columns_widths(Event, events_col),
+    'detailed': get_columns_widths(DetailedEvent, detailed_events_col),
+    'sessions': get_columns_widths(Session, sessions_col),
+}
+
+
+def get_sanitize_params(level, destination):
+    """
+    Width of every string column and the delimiter to strip for `destination`
+    """
+    policy = sanitize_policies.get(destination, default_sanitize_policy)
+    widths = columns_widths[level]
+    if policy['max_length']:
+        widths = {col: min(width, policy['max_length']) for col, width in widths.items()}
+    return widths, policy['delimiter']
+
+
+def sanitize_df(df, widths, delimiter=None):
+    for x, width in widths.items():
+        if x not in df.columns or df[x].dtype not in ('string', 'object'):
+            continue
+        df[x] = df[x].str.slice(0, width)
+        if delimiter:
+            df[x] = df[x].str.replace(delimiter, "", regex=False)
+    return df
+
+
+def get_df_from_batch(batch, level, destination=DATABASE):
+    widths, delimiter = get_sanitize_params(level, destination)
+    if isinstance(batch, ColumnarBatch):
+        df = batch.to_dataframe(max_lengths=widths, delimiter=delimiter)
+        if level == 'detailed':
+            df['inputevent_value'] = pd.Series(None, index=df.index, dtype=batch.dtypes['inputevent_value'])
+            df['customevent_payload'] = pd.Series(None, index=df.index, dtype=batch.dtypes['customevent_payload'])
+        if destination not in partitioned_destinations:
+            df = df.drop(columns=list(partition_columns_dtypes))
+    else:
+        df = sanitize_df(get_df_from_objects(batch, level), widths, delimiter)
+        if destination in partitioned_destinations:
+            df['project_id'] = pd.array([getattr(b, 'project_id', None) for b in batch], dtype='Int64')
+
+    if destination in ('bigquery', 'redshift') and level == 'sessions':
+        df['urls'] = df['urls'].astype('string')
+        df['issues'] = df['issues'].astype('string')
+    if destination == 'clickhouse' and level == 'sessions':
+        df['issues'] = df['issues'].fillna('')
+        df['urls'] = df['urls'].fillna('')
+    return df
+
+
+def get_df_from_objects(batch, level):
     if level == 'normal':
         df = pd.DataFrame([b.__dict__ for b in batch], columns=events_col)
     if level == 'detailed':
@@ -347,22 +463,8 @@ def get_df_from_batch(batch, level):
     if level == 'detailed':
         df['inputevent_value'] = None
         df['customevent_payload'] = None
-        df = df.astype(dtypes_detailed_events)
+        # dtypes_detailed_events also lists the longtasks_* values the model has no column for
+        df = df.astype({c: t for c, t in dtypes_detailed_events.items() if c in df.columns})
     if level == 'sessions':
         df = df.astype(dtypes_sessions)
-
-    if DATABASE == 'clickhouse' and level == 'sessions':
-        df['issues'] = df['issues'].fillna('')
-        df['urls'] = df['urls'].fillna('')
-
-    for x in df.columns:
-        try:
-            if df[x].dtype == 'string':
-                df[x] = df[x].str.slice(0, 255)
-                df[x] = df[x].str.replace("|", "")
-        except TypeError as e:
-            print(repr(e))
-            if df[x].dtype == 'str':
-                df[x] = df[x].str.slice(0, 255)
-                df[x] = df[x].str.replace("|", "")
     return df
@@ -1,63 +1,121 @@
 import os
-DATABASE = os.environ['DATABASE_NAME']
+import time
 
-from db.api import DBConnection
+from db.api import DBConnection, DATABASES
+from db.models import DEDUP, events_table_name
+from metrics import BATCH_BUILD_SECONDS, INSERT_SECONDS, ROWS_WRITTEN
 from db.utils import get_df_from_batch
 from db.tables import *
 
-if DATABASE == 'redshift':
-    from db.loaders.redshift_loader import transit_insert_to_redshift
-if DATABASE == 'clickhouse':
-    from db.loaders.clickhouse_loader import insert_to_clickhouse
-if DATABASE == 'pg':
-    from db.loaders.postgres_loader import insert_to_postgres
-if DATABASE == 'bigquery':
-    from db.loaders.bigquery_loader import insert_to_bigquery
+if 'redshift' in DATABASES:
+    from db.loaders.redshift_loader import transit_insert_to_redshift, manifest_insert_to_redshift
+    # 'manifest' stages Parquet or gzip csv parts in S3 and loads several batches with one COPY,
+    # 'pandas_redshift' uploads and COPYs every batch as a delimited file
+    REDSHIFT_INSERT_METHOD = os.environ.get('redshift_insert_method', 'manifest')
+if 'clickhouse' in DATABASES:
+    from db.loaders.clickhouse_loader import insert_to_clickhouse, insert_native_to_clickhouse
+    # 'native' sends columnar blocks with clickhouse_driver, 'to_sql' goes through SQLAlchemy
+    CLICKHOUSE_INSERT_METHOD = os.environ.get('clickhouse_insert_method', 'native')
+if 'pg' in DATABASES:
+    from db.loaders.postgres_loader import insert_to_postgres, copy_to_postgres
+    # 'copy' streams batches with COPY FROM STDIN, 'to_sql' uses batched INSERTs
+    PG_INSERT_METHOD = os.environ.get('pg_insert_method', 'copy')
+if 'bigquery' in DATABASES:
+    from db.loaders.bigquery_loader import insert_to_bigquery, staged_insert_to_bigquery, write_to_bigquery
+    # 'load_job' stages batches as local Parquet files and appends them with one load job per interval,
+    # 'storage_write' appends every batch to a committed stream, 'to_gbq' runs a load job per batch
+    BIGQUERY_INSERT_METHOD = os.environ.get('bigquery_insert_method', 'load_job')
     from bigquery_utils.create_table import create_tables_bigquery
-if DATABASE == 'snowflake':
+if 'snowflake' in DATABASES:
     from db.loaders.snowflake_loader import insert_to_snowflake
+if 'parquet' in DATABASES:
+    from db.loaders.parquet_loader import insert_to_parquet
 
 
 # create tables if don't exist
-try:
-    db = DBConnection(DATABASE)
-    if DATABASE == 'pg':
-        create_tables_postgres(db)
-    if DATABASE == 'clickhouse':
-        create_tables_clickhouse(db)
-    if DATABASE == 'snowflake':
-        create_tables_snowflake(db)
-    if DATABASE == 'bigquery':
-        create_tables_bigquery()
-    if DATABASE == 'redshift':
-        create_tables_redshift(db)
-    db.engine.dispose()
-    db = None
-except Exception as e:
-    print(repr(e))
-    print("Please create the tables with scripts provided in "
-          "'/sql/{DATABASE}_sessions.sql' and '/sql/{DATABASE}_events.sql'")
+for destination in DATABASES:
+    try:
+        db = DBConnection(destination)
+        if destination == 'pg':
+            create_tables_postgres(db)
+        if destination == 'clickhouse':
+            create_tables_clickhouse(db)
+        if destination == 'snowflake':
+            create_tables_snowflake(db)
+        if destination == 'bigquery':
+            create_tables_bigquery()
+        if destination == 'redshift':
+            create_tables_redshift(db)
+        if destination == 'parquet':
+            os.makedirs(db.connect_str, exist_ok=True)
+        if getattr(db, 'engine', None) is not None:
+            db.engine.dispose()
+        db = None
+    except Exception as e:
+        print(repr(e))
+        print("Please create the tables with scripts provided in "
+              f"'/sql/{destination}_sessions.sql' and '/sql/{destination}_events.sql'")
 
 
 def insert_batch(db: DBConnection, batch, table, level='normal'):
 
     if len(batch) == 0:
         return
-    df = get_df_from_batch(batch, level=level)
+    insert_df(db, batch_to_df(db, batch, level), table, level)
+
+
+def batch_to_df(db: DBConnection, batch, level='normal'):
+    start = time.perf_counter()
+    df = get_df_from_batch(batch, level=level, destination=db.config)
+    BATCH_BUILD_SECONDS.labels(db.config, level).observe(time.perf_counter() - start)
+    return df
+
+
+def insert_df(db: DBConnection, df, table, level='normal'):
+    """
+    Load a DataFrame built by batch_to_df for the destination of `db`
+    """
+    start = time.perf_counter()
+    _insert_df(db, df, table)
+    INSERT_SECONDS.labels(db.config, level).observe(time.perf_counter() - start)
+    ROWS_WRITTEN.labels(db.config, level).inc(len(df))
+
+
+def _insert_df(db: DBConnection, df, table):
+    # only the events table gets the unique event_key of sql/*_events_dedup.sql,
+    # sessions and detailed events are loaded as before
+    dedup = DEDUP and table == events_table_name
 
     if db.config == 'redshift':
-        transit_insert_to_redshift(db=db, df=df, table=table)
+        if REDSHIFT_INSERT_METHOD == 'manifest':
+            manifest_insert_to_redshift(db=db, df=df, table=table)
+        else:
+            transit_insert_to_redshift(db=db, df=df, table=table)
         return
 
     if db.config == 'clickhouse':
-        insert_to_clickhouse(db=db, df=df, table=table)
+        if CLICKHOUSE_INSERT_METHOD == 'native':
+            insert_native_to_clickhouse(db=db, df=df, table=table)
+        else:
+            insert_to_clickhouse(db=db, df=df, table=table)
 
     if db.config == 'pg':
-        insert_to_postgres(db=db, df=df, table=table)
+        if PG_INSERT_METHOD == 'copy':
+            copy_to_postgres(db=db, df=df, table=table, dedup=dedup)
+        else:
+            insert_to_postgres(db=db, df=df, table=table, dedup=dedup)
 
     if db.config == 'bigquery':
-        insert_to_bigquery(df=df, table=table)
+        if BIGQUERY_INSERT_METHOD == 'load_job':
+            staged_insert_to_bigquery(db=db, df=df, table=table)
+        elif BIGQUERY_INSERT_METHOD == 'storage_write':
+            write_to_bigquery(db=db, df=df, table=table)
+        else:
+            insert_to_bigquery(df=df, table=table)
 
     if db.config == 'snowflake':
-        insert_to_snowflake(db=db, df=df, table=table)
+        insert_to_snowflake(db=db, df=df, table=table, dedup=dedup)
+
+    if db.config == 'parquet':
+        insert_to_parquet(db=db, df=df, table=table)
 
@@ -1,647 +1,767 @@
-from typing import Optional, Union
+import os
+from sys import intern
+from typing import Optional
 
-from db.models import Event, DetailedEvent, Session
+from db.models import Session
 from msgcodec.messages import *
 
+# Handlers are looked up by the exact message type, each one writes the fields
+# of its message straight into the row it is given. Event rows are plain dicts
+# of column -> value, appended as is to a db.columnar.ColumnarBatch.
 
-def handle_normal_message(message: Message) -> Optional[Event]:
+# PageEvent urls kept per session: 'all', 'first' (the first `session_urls_limit`),
+# 'distinct' (the first `session_urls_limit` distinct ones) or 'none' (urls_count only)
+SESSION_URLS = os.environ.get('session_urls', 'all')
+SESSION_URLS_LIMIT = int(os.environ.get('session_urls_limit', 100))
 
-    n = Event()
 
-    if isinstance(message, ConnectionInformation):
-        n.connectioninformation_downlink = message.downlink
-        n.connectioninformation_type = message.type
-        return n
+def _normal_connection_information(n, message):
+    n['connectioninformation_downlink'] = message.downlink
+    n['connectioninformation_type'] = message.type
 
-    if isinstance(message, ConsoleLog):
-        n.consolelog_level = message.level
-        n.consolelog_value = message.value
-        return n
 
-    if isinstance(message, CustomEvent):
-        n.customevent_messageid = message.message_id
-        n.customevent_name = message.name
-        n.customevent_timestamp = message.timestamp
-        n.customevent_payload = message.payload
-        return n
+def _normal_console_log(n, message):
+    n['consolelog_level'] = message.level
+    n['consolelog_value'] = message.value
 
-    if isinstance(message, ErrorEvent):
-        n.errorevent_message = message.message
-        n.errorevent_messageid = message.message_id
-        n.errorevent_name = message.name
-        n.errorevent_payload = message.payload
-        n.errorevent_source = message.source
-        n.errorevent_timestamp = message.timestamp
-        return n
 
-    if isinstance(message, JSException):
-        n.jsexception_name = message.name
-        n.jsexception_payload = message.payload
-        n.jsexception_message = message.message
-        return n
+def _normal_custom_event(n, message):
+    n['customevent_messageid'] = message.message_id
+    n['customevent_name'] = message.name
+    n['customevent_timestamp'] = message.timestamp
+    n['customevent_payload'] = message.payload
 
-    if isinstance(message, Metadata):
-        n.metadata_key = message.key
-        n.metadata_value = message.value
-        return n
 
-    if isinstance(message, MouseClick):
-        n.mouseclick_hesitationtime = message.hesitation_time
-        n.mouseclick_id = message.id
-        n.mouseclick_label = message.label
-        return n
+def _normal_error_event(n, message):
+    n['errorevent_message'] = message.message
+    n['errorevent_messageid'] = message.message_id
+    n['errorevent_name'] = message.name
+    n['errorevent_payload'] = message.payload
+    n['errorevent_source'] = message.source
+    n['errorevent_timestamp'] = message.timestamp
 
-    if isinstance(message, PageEvent):
-        n.pageevent_firstcontentfulpaint = message.first_contentful_paint
-        n.pageevent_firstpaint = message.first_paint
-        n.pageevent_messageid = message.message_id
-        n.pageevent_referrer = message.referrer
-        n.pageevent_speedindex = message.speed_index
-        n.pageevent_timestamp = message.timestamp
-        n.pageevent_url = message.url
-        return n
 
-    if isinstance(message, PageRenderTiming):
-        n.pagerendertiming_timetointeractive = message.time_to_interactive
-        n.pagerendertiming_visuallycomplete = message.visually_complete
-        return n
+def _normal_js_exception(n, message):
+    n['jsexception_name'] = message.name
+    n['jsexception_payload'] = message.payload
+    n['jsexception_message'] = message.message
 
-    if isinstance(message, RawCustomEvent):
-        n.rawcustomevent_name = message.name
-        n.rawcustomevent_payload = message.payload
-        return n
 
-    if isinstance(message, SetViewportSize):
-        n.setviewportsize_height = message.height
-        n.setviewportsize_width = message.width
-        return n
+def _normal_metadata(n, message):
+    n['metadata_key'] = message.key
+    n['metadata_value'] = message.value
 
-    if isinstance(message, Timestamp):
-        n.timestamp_timestamp = message.timestamp
-        return n
 
-    if isinstance(message, UserAnonymousID):
-        n.user_anonymous_id = message.id
-        return n
+def _normal_mouse_click(n, message):
+    n['mouseclick_hesitationtime'] = message.hesitation_time
+    n['mouseclick_id'] = message.id
+    n['mouseclick_label'] = message.label
 
-    if isinstance(message, UserID):
-        n.user_id = message.id
-        return n
 
-    if isinstance(message, IssueEvent):
-        n.issueevent_messageid = message.message_id
-        n.issueevent_timestamp = message.timestamp
-        n.issueevent_type = message.type
-        n.issueevent_contextstring = message.context_string
-        n.issueevent_context = message.context
-        n.issueevent_payload = message.payload
-        return n
+def _normal_page_event(n, message):
+    n['pageevent_firstcontentfulpaint'] = message.first_contentful_paint
+    n['pageevent_firstpaint'] = message.first_paint
+    n['pageevent_messageid'] = message.message_id
+    n['pageevent_referrer'] = message.referrer
+    n['pageevent_speedindex'] = message.speed_index
+    n['pageevent_timestamp'] = message.timestamp
+    n['pageevent_url'] = message.url
 
-    if isinstance(message, CustomIssue):
-        n.customissue_name = message.name
-        n.customissue_payload = message.payload
-        return n
 
+def _normal_page_render_timing(n, message):
+    n['pagerendertiming_timetointeractive'] = message.time_to_interactive
+    n['pagerendertiming_visuallycomplete'] = message.visually_complete
 
-def handle_session(n: Session, message: Message) -> Optional[Session]:
 
-    if not n:
-        n = Session()
+def _normal_raw_custom_event(n, message):
+    n['rawcustomevent_name'] = message.name
+    n['rawcustomevent_payload'] = message.payload
 
-    if isinstance(message, SessionStart):
-        n.session_start_timestamp = message.timestamp
-
-        n.user_uuid = message.user_uuid
-        n.user_agent = message.user_agent
-        n.user_os = message.user_os
-        n.user_os_version = message.user_os_version
-        n.user_browser = message.user_browser
-        n.user_browser_version = message.user_browser_version
-        n.user_device = message.user_device
-        n.user_device_type = message.user_device_type
-        n.user_device_memory_size = message.user_device_memory_size
-        n.user_device_heap_size = message.user_device_heap_size
-        n.user_country = message.user_country
-        return n
 
-    if isinstance(message, SessionEnd):
-        n.session_end_timestamp = message.timestamp
-        try:
-            n.session_duration = n.session_end_timestamp - n.session_start_timestamp
-        except TypeError:
-            pass
-        return n
+def _normal_set_viewport_size(n, message):
+    n['setviewportsize_height'] = message.height
+    n['setviewportsize_width'] = message.width
 
-    if isinstance(message, ConnectionInformation):
-        n.connection_effective_bandwidth = message.downlink
-        n.connection_type = message.type
-        return n
 
-    if isinstance(message, Metadata):
-        n.metadata_key = message.key
-        n.metadata_value = message.value
-        return n
+def _normal_timestamp(n, message):
+    n['timestamp_timestamp'] = message.timestamp
 
-    if isinstance(message, PageEvent):
-        n.referrer = message.referrer
-        n.first_contentful_paint = message.first_contentful_paint
-        n.speed_index = message.speed_index
-        n.timing_time_to_interactive = message.time_to_interactive
-        n.visually_complete = message.visually_complete
-        try:
-            n.urls_count += 1
-        except TypeError:
-            n.urls_count = 1
-        try:
-            n.urls.append(message.url)
-        except AttributeError:
-            n.urls = [message.url]
-        return n
 
-    if isinstance(message, PerformanceTrackAggr):
-        n.avg_cpu = message.avg_cpu
-        n.avg_fps = message.avg_fps
-        n.max_cpu = message.max_cpu
-        n.max_fps = message.max_fps
-        n.max_total_js_heap_size = message.max_total_js_heap_size
-        n.max_used_js_heap_size = message.max_used_js_heap_size
-        return n
+def _normal_user_anonymous_id(n, message):
+    n['user_anonymous_id'] = message.id
 
-    if isinstance(message, UserID):
-        n.user_id = message.id
-        return n
 
-    if isinstance(message, UserAnonymousID):
-        n.user_anonymous_id = message.id
-        return n
+def _normal_user_id(n, message):
+    n['user_id'] = message.id
 
-    if isinstance(message, JSException):
-        try:
-            n.js_exceptions_count += 1
-        except TypeError:
-            n.js_exceptions_count = 1
-        return n
 
-    if isinstance(message, LongTask):
-        try:
-            n.long_tasks_total_duration += message.duration
-        except TypeError:
-            n.long_tasks_total_duration = message.duration
+def _normal_issue_event(n, message):
+    n['issueevent_messageid'] = message.message_id
+    n['issueevent_timestamp'] = message.timestamp
+    n['issueevent_type'] = message.type
+    n['issueevent_contextstring'] = message.context_string
+    n['issueevent_context'] = message.context
+    n['issueevent_payload'] = message.payload
+
+
+def _normal_custom_issue(n, message):
+    n['customissue_name'] = message.name
+    n['customissue_payload'] = message.payload
+
+
+NORMAL_HANDLERS = {
+    ConnectionInformation: _normal_connection_information,
+    ConsoleLog: _normal_console_log,
+    CustomEvent: _normal_custom_event,
+    ErrorEvent: _normal_error_event,
+    JSException: _normal_js_exception,
+    Metadata: _normal_metadata,
+    MouseClick: _normal_mouse_click,
+    PageEvent: _normal_page_event,
+    PageRenderTiming: _normal_page_render_timing,
+    RawCustomEvent: _normal_raw_custom_event,
+    SetViewportSize: _normal_set_viewport_size,
+    Timestamp: _normal_timestamp,
+    UserAnonymousID: _normal_user_anonymous_id,
+    UserID: _normal_user_id,
+    IssueEvent: _normal_issue_event,
+    CustomIssue: _normal_custom_issue,
+}
+
+
+def _session_start(n, message):
+    # not a table column, tags the session rows of partitioned destinations
+    n.project_id = message.project_id
+    n.session_start_timestamp = message.timestamp
+    n.user_uuid = message.user_uuid
+    # the same few values repeat across the sessions in memory, interned they are stored once
+    n.user_agent = intern(message.user_agent)
+    n.user_os = intern(message.user_os)
+    n.user_os_version = intern(message.user_os_version)
+    n.user_browser = intern(message.user_browser)
+    n.user_browser_version = intern(message.user_browser_version)
+    n.user_device = intern(message.user_device)
+    n.user_device_type = intern(message.user_device_type)
+    n.user_device_memory_size = message.user_device_memory_size
+    n.user_device_heap_size = message.user_device_heap_size
+    n.user_country = intern(message.user_country)
+
+
+def _session_end(n, message):
+    n.session_end_timestamp = message.timestamp
+    try:
+        n.session_duration = n.session_end_timestamp - n.session_start_timestamp
+    except TypeError:
+        pass
+
 
-        try:
-            if n.long_tasks_max_duration > message.duration:
-                n.long_tasks_max_duration = message.duration
-        except TypeError:
+def _session_connection_information(n, message):
+    n.connection_effective_bandwidth = message.downlink
+    n.connection_type = intern(message.type)
+
+
+def _session_metadata(n, message):
+    n.metadata_key = intern(message.key)
+    n.metadata_value = message.value
+
+
+def _session_page_event(n, message):
+    n.referrer = message.referrer
+    n.first_contentful_paint = message.first_contentful_paint
+    n.speed_index = message.speed_index
+    n.timing_time_to_interactive = message.time_to_interactive
+    n.visually_complete = message.visually_complete
+    try:
+        n.urls_count += 1
+    except TypeError:
+        n.urls_count = 1
+    _keep_url(n, message.url)
+
+
+def _keep_all_urls(n, url):
+    try:
+        n.urls.append(url)
+    except AttributeError:
+        n.urls = [url]
+
+
+def _keep_first_urls(n, url):
+    try:
+        if len(n.urls) < SESSION_URLS_LIMIT:
+            n.urls.append(url)
+    except TypeError:
+        n.urls = [url]
+
+
+def _keep_distinct_urls(n, url):
+    try:
+        if len(n.urls) < SESSION_URLS_LIMIT and url not in n.urls:
+            n.urls.append(url)
+    except TypeError:
+        n.urls = [url]
+
+
+def _keep_no_urls(n, url):
+    pass
+
+
+_keep_url = {'all': _keep_all_urls, 'first': _keep_first_urls,
+             'distinct': _keep_distinct_urls, 'none': _keep_no_urls}[SESSION_URLS]
+
+
+def _session_performance_track_aggr(n, message):
+    n.avg_cpu = message.avg_cpu
+    n.avg_fps = message.avg_fps
+    n.max_cpu = message.max_cpu
+    n.max_fps = message.max_fps
+    n.max_total_js_heap_size = message.max_total_js_heap_size
+    n.max_used_js_heap_size = message.max_used_js_heap_size
+
+
+def _session_user_id(n, message):
+    n.user_id = message.id
+
+
+def _session_user_anonymous_id(n, message):
+    n.user_anonymous_id = message.id
+
+
+def _session_js_exception(n, message):
+    try:
+        n.js_exceptions_count += 1
+    except TypeError:
+        n.js_exceptions_count = 1
+
+
+def _session_long_task(n, message):
+    try:
+        n.long_tasks_total_duration += message.duration
+    except TypeError:
+        n.long_tasks_total_duration = message.duration
+
+    try:
+        if n.long_tasks_max_duration < message.duration:
             n.long_tasks_max_duration = message.duration
+    except TypeError:
+        n.long_tasks_max_duration = message.duration
 
-        try:
-            n.long_tasks_count += 1
-        except TypeError:
-            n.long_tasks_count = 1
-        return n
+    try:
+        n.long_tasks_count += 1
+    except TypeError:
+        n.long_tasks_count = 1
 
-    if isinstance(message, InputEvent):
-        try:
-            n.inputs_count += 1
-        except TypeError:
-            n.inputs_count = 1
-        return n
 
-    if isinstance(message, MouseClick):
-        try:
-            n.inputs_count += 1
-        except TypeError:
-            n.inputs_count = 1
-        return n
+def _session_input(n, message):
+    try:
+        n.inputs_count += 1
+    except TypeError:
+        n.inputs_count = 1
 
-    if isinstance(message, IssueEvent):
-        try:
-            n.issues_count += 1
-        except TypeError:
-            n.issues_count = 1
 
+def _session_issue_event(n, message):
+    try:
+        n.issues_count += 1
+    except TypeError:
+        n.issues_count = 1
 
-            n.inputs_count = 1
-        return n
+    try:
+        n.issues.append(intern(message.type))
+    except AttributeError:
+        n.issues = [intern(message.type)]
 
-    if isinstance(message, MouseClick):
-        try:
-            n.inputs_count += 1
-        except TypeError:
-            n.inputs_count = 1
-        return n
 
-    if isinstance(message, IssueEvent):
-        try:
-            n.issues_count += 1
-        except TypeError:
-            n.issues_count = 1
+SESSION_HANDLERS = {
+    SessionStart: _session_start,
+    SessionEnd: _session_end,
+    ConnectionInformation: _session_connection_information,
+    Metadata: _session_metadata,
+    PageEvent: _session_page_event,
+    PerformanceTrackAggr: _session_performance_track_aggr,
+    UserID: _session_user_id,
+    UserAnonymousID: _session_user_anonymous_id,
+    JSException: _session_js_exception,
+    LongTask: _session_long_task,
+    InputEvent: _session_input,
+    MouseClick: _session_input,
+    IssueEvent: _session_issue_event,
+}
 
-        try:
-            n.issues.append(message.type)
-        except AttributeError:
-            n.issues = [message.type]
-        return n
 
+def _detailed_session_end(n, message):
+    n['sessionend'] = True
+    n['sessionend_timestamp'] = message.timestamp
 
-def handle_message(message: Message) -> Optional[DetailedEvent]:
-    n = DetailedEvent()
 
-    if isinstance(message, SessionEnd):
-        n.sessionend = True
-        n.sessionend_timestamp = message.timestamp
-        return n
+def _detailed_timestamp(n, message):
+    n['timestamp_timestamp'] = message.timestamp
 
-    if isinstance(message, Timestamp):
-        n.timestamp_timestamp = message.timestamp
-        return n
 
-    if isinstance(message, SessionDisconnect):
-        n.sessiondisconnect = True
-        n.sessiondisconnect_timestamp = message.timestamp
-        return n
+def _detailed_session_disconnect(n, message):
+    n['sessiondisconnect'] = True
+    n['sessiondisconnect_timestamp'] = message.timestamp
 
-    if isinstance(message, SessionStart):
-        n.sessionstart_trackerversion = message.tracker_version
-        n.sessionstart_revid = message.rev_id
-        n.sessionstart_timestamp = message.timestamp
-        n.sessionstart_useruuid = message.user_uuid
-        n.sessionstart_useragent = message.user_agent
-        n.sessionstart_useros = message.user_os
-        n.sessionstart_userosversion = message.user_os_version
-        n.sessionstart_userbrowser = message.user_browser
-        n.sessionstart_userbrowserversion = message.user_browser_version
-        n.sessionstart_userdevice = message.user_device
-        n.sessionstart_userdevicetype = message.user_device_type
-        n.sessionstart_userdevicememorysize = message.user_device_memory_size
-        n.sessionstart_userdeviceheapsize = message.user_device_heap_size
-        n.sessionstart_usercountry = message.user_country
-        return n
 
-    if isinstance(message, SetViewportSize):
-        n.setviewportsize_width = message.width
-        n.setviewportsize_height = message.height
-        return n
+def _detailed_session_start(n, message):
+    n['sessionstart_trackerversion'] = message.tracker_version
+    n['sessionstart_revid'] = message.rev_id
+    n['sessionstart_timestamp'] = message.timestamp
+    n['sessionstart_useruuid'] = message.user_uuid
+    n['sessionstart_useragent'] = message.user_agent
+    n['sessionstart_useros'] = message.user_os
+    n['sessionstart_userosversion'] = message.user_os_version
+    n['sessionstart_userbrowser'] = message.user_browser
+    n['sessionstart_userbrowserversion'] = message.user_browser_version
+    n['sessionstart_userdevice'] = message.user_device
+    n['sessionstart_userdevicetype'] = message.user_device_type
+    n['sessionstart_userdevicememorysize'] = message.user_device_memory_size
+    n['sessionstart_userdeviceheapsize'] = message.user_device_heap_size
+    n['sessionstart_usercountry'] = message.user_country
 
-    if isinstance(message, SetViewportScroll):
-        n.setviewportscroll_x = message.x
-        n.setviewportscroll_y = message.y
-        return n
 
-    if isinstance(message, SetNodeScroll):
-        n.setnodescroll_id = message.id
-        n.setnodescroll_x = message.x
-        n.setnodescroll_y = message.y
-        return n
+def _detailed_set_viewport_size(n, message):
+    n['setviewportsize_width'] = message.width
+    n['setviewportsize_height'] = message.height
 
-    if isinstance(message, ConsoleLog):
-        n.consolelog_level = message.level
-        n.consolelog_value = message.value
-        return n
 
-    if isinstance(message, PageLoadTiming):
-        n.pageloadtiming_requeststart = message.request_start
-        n.pageloadtiming_responsestart = message.response_start
-        n.pageloadtiming_responseend = message.response_end
-        n.pageloadtiming_domcontentloadedeventstart = message.dom_content_loaded_event_start
-        n.pageloadtiming_domcontentloadedeventend = message.dom_content_loaded_event_end
-        n.pageloadtiming_loadeventstart = message.load_event_start
-        n.pageloadtiming_loadeventend = message.load_event_end
-        n.pageloadtiming_firstpaint = message.first_paint
-        n.pageloadtiming_firstcontentfulpaint = message.first_contentful_paint
-        return n
+def _detailed_set_viewport_scroll(n, message):
+    n['setviewportscroll_x'] = message.x
+    n['setviewportscroll_y'] = message.y
 
-    if isinstance(message, PageRenderTiming):
-        n.pagerendertiming_speedindex = message.speed_index
-        n.pagerendertiming_visuallycomplete = message.visually_complete
-        n.pagerendertiming_timetointeractive = message.time_to_interactive
-        return n
 
-    if isinstance(message, ResourceTiming):
-        n.resourcetiming_timestamp = message.timestamp
-        n.resourcetiming_duration = message.duration
-        n.resourcetiming_ttfb = message.ttfb
-        n.resourcetiming_headersize = message.header_size
-        n.resourcetiming_encodedbodysize = message.encoded_body_size
-        n.resourcetiming_decodedbodysize = message.decoded_body_size
-        n.resourcetiming_url = message.url
-        n.resourcetiming_initiator = message.initiator
-        return n
+def _detailed_set_node_scroll(n, message):
+    n['setnodescroll_id'] = message.id
+    n['setnodescroll_x'] = message.x
+    n['setnodescroll_y'] = message.y
 
-    if isinstance(message, JSException):
-        n.jsexception_name = message.name
-        n.jsexception_message = message.message
-        n.jsexception_payload = message.payload
-        return n
 
-    if isinstance(message, RawErrorEvent):
-        n.rawerrorevent_timestamp = message.timestamp
-        n.rawerrorevent_source = message.source
-        n.rawerrorevent_name = message.name
-        n.rawerrorevent_message = message.message
-        n.rawerrorevent_payload = message.payload
-        return n
+def _detailed_console_log(n, message):
+    n['consolelog_level'] = message.level
+    n['consolelog_value'] = message.value
 
-    if isinstance(message, RawCustomEvent):
-        n.rawcustomevent_name = message.name
-        n.rawcustomevent_payload = message.payload
-        return n
 
-    if isinstance(message, UserID):
-        n.userid_id = message.id
-        return n
+def _detailed_page_load_timing(n, message):
+    n['pageloadtiming_requeststart'] = message.request_start
+    n['pageloadtiming_responsestart'] = message.response_start
+    n['pageloadtiming_responseend'] = message.response_end
+    n['pageloadtiming_domcontentloadedeventstart'] = message.dom_content_loaded_event_start
+    n['pageloadtiming_domcontentloadedeventend'] = message.dom_content_loaded_event_end
+    n['pageloadtiming_loadeventstart'] = message.load_event_start
+    n['pageloadtiming_loadeventend'] = message.load_event_end
+    n['pageloadtiming_firstpaint'] = message.first_paint
+    n['pageloadtiming_firstcontentfulpaint'] = message.first_contentful_paint
 
-    if isinstance(message, UserAnonymousID):
-        n.useranonymousid_id = message.id
-        return n
 
-    if isinstance(message, Metadata):
-        n.metadata_key = message.key
-        n.metadata_value = message.value
-        return n
+def _detailed_page_render_timing(n, message):
+    n['pagerendertiming_speedindex'] = message.speed_index
+    n['pagerendertiming_visuallycomplete'] = message.visually_complete
+    n['pagerendertiming_timetointeractive'] = message.time_to_interactive
 
-    if isinstance(message, PerformanceTrack):
-        n.performancetrack_frames = message.frames
-        n.performancetrack_ticks = message.ticks
-        n.performancetrack_totaljsheapsize = message.total_js_heap_size
-        n.performancetrack_usedjsheapsize = message.used_js_heap_size
-        return n
 
-    if isinstance(message, PerformanceTrackAggr):
-        n.performancetrackaggr_timestampstart = message.timestamp_start
-        n.performancetrackaggr_timestampend = message.timestamp_end
-        n.performancetrackaggr_minfps = message.min_fps
-        n.performancetrackaggr_avgfps = message.avg_fps
-        n.performancetrackaggr_maxfps = message.max_fps
-        n.performancetrackaggr_mincpu = message.min_cpu
-        n.performancetrackaggr_avgcpu = message.avg_cpu
-        n.performancetrackaggr_maxcpu = message.max_cpu
-        n.performancetrackaggr_mintotaljsheapsize = message.min_total_js_heap_size
-        n.performancetrackaggr_avgtotaljsheapsize = message.avg_total_js_heap_size
-        n.performancetrackaggr_maxtotaljsheapsize = message.max_total_js_heap_size
-        n.performancetrackaggr_minusedjsheapsize = message.min_used_js_heap_size
-        n.performancetrackaggr_avgusedjsheapsize = message.avg_used_js_heap_size
-        n.performancetrackaggr_maxusedjsheapsize = message.max_used_js_heap_size
-        return n
+def _detailed_resource_timing(n, message):
+    n['resourcetiming_timestamp'] = message.timestamp
+    n['resourcetiming_duration'] = message.duration
+    n['resourcetiming_ttfb'] = message.ttfb
+    n['resourcetiming_headersize'] = message.header_size
+    n['resourcetiming_encodedbodysize'] = message.encoded_body_size
+    n['resourcetiming_decodedbodysize'] = message.decoded_body_size
+    n['resourcetiming_url'] = message.url
+    n['resourcetiming_initiator'] = message.initiator
 
-    if isinstance(message, ConnectionInformation):
-        n.connectioninformation_downlink = message.downlink
-        n.connectioninformation_type = message.type
-        return n
 
-    if isinstance(message, PageEvent):
-        n.pageevent_messageid = message.message_id
-        n.pageevent_timestamp = message.timestamp
-        n.pageevent_url = message.url
-        n.pageevent_referrer = message.referrer
-        n.pageevent_loaded = message.loaded
-        n.pageevent_requeststart = message.request_start
-        n.pageevent_responsestart = message.response_start
-        n.pageevent_responseend = message.response_end
-        n.pageevent_domcontentloadedeventstart = message.dom_content_loaded_event_start
-        n.pageevent_domcontentloadedeventend = message.dom_content_loaded_event_end
-        n.pageevent_loadeventstart = message.load_event_start
-        n.pageevent_loadeventend = message.load_event_end
-        n.pageevent_firstpaint = message.first_paint
-        n.pageevent_firstcontentfulpaint = message.first_contentful_paint
-        n.pageevent_speedindex = message.speed_index
-        return n
+def _detailed_js_exception(n, message):
+    n['jsexception_name'] = message.name
+    n['jsexception_message'] = message.message
+    n['jsexception_payload'] = message.payload
 
-    if isinstance(message, InputEvent):
-        n.inputevent_messageid = message.message_id
-        n.inputevent_timestamp = message.timestamp
-        n.inputevent_value = message.value
-        n.inputevent_valuemasked = message.value_masked
-        n.inputevent_label = message.label
-        return n
 
-    if isinstance(message, ClickEvent):
-        n.clickevent_messageid = message.message_id
-        n.clickevent_timestamp = message.timestamp
-        n.clickevent_hesitationtime = message.hesitation_time
-        n.clickevent_label = message.label
-        return n
+def _detailed_raw_error_event(n, message):
+    n['rawerrorevent_timestamp'] = message.timestamp
+    n['rawerrorevent_source'] = message.source
+    n['rawerrorevent_name'] = message.name
+    n['rawerrorevent_message'] = message.message
+    n['rawerrorevent_payload'] = message.payload
 
-    if isinstance(message, ErrorEvent):
-        n.errorevent_messageid = message.message_id
-        n.errorevent_timestamp = message.timestamp
-        n.errorevent_source = message.source
-        n.errorevent_name = message.name
-        n.errorevent_message = message.message
-        n.errorevent_payload = message.payload
-        return n
 
-    if isinstance(message, ResourceEvent):
-        n.resourceevent_messageid = message.message_id
-        n.resourceevent_timestamp = message.timestamp
-        n.resourceevent_duration = message.duration
-        n.resourceevent_ttfb = message.ttfb
-        n.resourceevent_headersize = message.header_size
-        n.resourceevent_encodedbodysize = message.encoded_body_size
-        n.resourceevent_decodedbodysize = message.decoded_body_size
-        n.resourceevent_url = message.url
-        n.resourceevent_type = message.type
-        n.resourceevent_success = message.success
-        n.resourceevent_method = message.method
-        n.resourceevent_status = message.status
-        return n
+def _detailed_raw_custom_event(n, message):
+    n['rawcustomevent_name'] = message.name
+    n['rawcustomevent_payload'] = message.payload
 
-    if isinstance(message, CustomEvent):
-        n.customevent_messageid = message.message_id
-        n.customevent_timestamp = message.timestamp
-        n.customevent_name = message.name
-        n.customevent_payload = message.payload
-        return n
 
-    # if isinstance(message, CreateDocument):
-    #     n.createdocument = True
-    #     return n
-    #
-    # if isinstance(message, CreateElementNode):
-    #     n.createelementnode_id = message.id
-    #     if isinstance(message.parent_id, tuple):
-    #         n.createelementnode_parentid = message.parent_id[0]
-    #     else:
-    #         n.createelementnode_parentid = message.parent_id
-    #     return n
-
-    # if isinstance(message, CSSInsertRule):
-    #     n.cssinsertrule_stylesheetid = message.id
-    #     n.cssinsertrule_rule = message.rule
-    #     n.cssinsertrule_index = message.index
-    #     return n
-    #
-    # if isinstance(message, CSSDeleteRule):
-    #     n.cssdeleterule_stylesheetid = message.id
-    #     n.cssdeleterule_index = message.index
-    #     return n
-
-    if isinstance(message, Fetch):
-        n.fetch_method = message.method
-        n.fetch_url = message.url
-        n.fetch_request = message.request
-        n.fetch_status = message.status
-        n.fetch_timestamp = message.timestamp
-        n.fetch_duration = message.duration
-        return n
+def _detailed_user_id(n, message):
+    n['userid_id'] = message.id
 
-    if isinstance(message, Profiler):
-        n.profiler_name = message.name
-        n.profiler_duration = message.duration
-        n.profiler_args = message.args
-        n.profiler_result = message.result
-        return n
 
-    if isinstance(message, GraphQL):
-        n.graphql_operationkind = message.operation_kind
-        n.graphql_operationname = message.operation_name
-        n.graphql_variables = message.variables
-        n.graphql_response = message.response
-        return n
+def _detailed_user_anonymous_id(n, message):
+    n['useranonymousid_id'] = message.id
 
-    if isinstance(message, GraphQLEvent):
-        n.graphqlevent_messageid = message.message_id
-        n.graphqlevent_timestamp = message.timestamp
-        n.graphqlevent_name = message.name
-        return n
 
-    if isinstance(message, DomDrop):
-        n.domdrop_timestamp = message.timestamp
-        return n
+def _detailed_metadata(n, message):
+    n['metadata_key'] = message.key
+    n['metadata_value'] = message.value
+
+
+def _detailed_performance_track(n, message):
+    n['performancetrack_frames'] = message.frames
+    n['performancetrack_ticks'] = message.ticks
+    n['performancetrack_totaljsheapsize'] = message.total_js_heap_size
+    n['performancetrack_usedjsheapsize'] = message.used_js_heap_size
+
+
+def _detailed_performance_track_aggr(n, message):
+    n['performancetrackaggr_timestampstart'] = message.timestamp_start
+    n['performancetrackaggr_timestampend'] = message.timestamp_end
+    n['performancetrackaggr_minfps'] = message.min_fps
+    n['performancetrackaggr_avgfps'] = message.avg_fps
+    n['performancetrackaggr_maxfps'] = message.max_fps
+    n['performancetrackaggr_mincpu'] = message.min_cpu
+    n['performancetrackaggr_avgcpu'] = message.avg_cpu
+    n['performancetrackaggr_maxcpu'] = message.max_cpu
+    n['performancetrackaggr_mintotaljsheapsize'] = message.min_total_js_heap_size
+    n['performancetrackaggr_avgtotaljsheapsize'] = message.avg_total_js_heap_size
+    n['performancetrackaggr_maxtotaljsheapsize'] = message.max_total_js_heap_size
+    n['performancetrackaggr_minusedjsheapsize'] = message.min_used_js_heap_size
+    n['performancetrackaggr_avgusedjsheapsize'] = message.avg_used_js_heap_size
+    n['performancetrackaggr_maxusedjsheapsize'] = message.max_used_js_heap_size
 
-    if isinstance(message, MouseClick):
-        n.mouseclick_id = message.id
-        n.mouseclick_hesitationtime = message.hesitation_time
-        n.mouseclick_label = message.label
-        return n
 
-    if isinstance(message, SetPageLocation):
-        n.setpagelocation_url = message.url
-        n.setpagelocation_referrer = message.referrer
-        n.setpagelocation_navigationstart = message.navigation_start
-        return n
+def _detailed_connection_information(n, message):
+    n['connectioninformation_downlink'] = message.downlink
+    n['connectioninformation_type'] = message.type
 
-    if isinstance(message, MouseMove):
-        n.mousemove_x = message.x
-        n.mousemove_y = message.y
-        return n
 
-    if isinstance(message, LongTask):
-        n.longtasks_timestamp = message.timestamp
-        n.longtasks_duration = message.duration
-        n.longtask_context = message.context
-        n.longtask_containertype = message.container_type
-        n.longtasks_containersrc = message.container_src
-        n.longtasks_containerid = message.container_id
-        n.longtasks_containername = message.container_name
-        return n
+def _detailed_page_event(n, message):
+    n['pageevent_messageid'] = message.message_id
+    n['pageevent_timestamp'] = message.timestamp
+    n['pageevent_url'] = message.url
+    n['pageevent_referrer'] = message.referrer
+    n['pageevent_loaded'] = message.loaded
+    n['pageevent_requeststart'] = message.request_start
+    n['pageevent_responsestart'] = message.response_start
+    n['pageevent_responseend'] = message.response_end
+    n['pageevent_domcontentloadedeventstart'] = message.dom_content_loaded_event_start
+    n['pageevent_domcontentloadedeventend'] = message.dom_content_loaded_event_end
+    n['pageevent_loadeventstart'] = message.load_event_start
+    n['pageevent_loadeventend'] = message.load_event_end
+    n['pageevent_firstpaint'] = message.first_paint
+    n['pageevent_firstcontentfulpaint'] = message.first_contentful_paint
+    n['pageevent_speedindex'] = message.speed_index
 
-    if isinstance(message, SetNodeURLBasedAttribute):
-        n.setnodeurlbasedattribute_id = message.id
-        n.setnodeurlbasedattribute_name = message.name
-        n.setnodeurlbasedattribute_value = message.value
-        n.setnodeurlbasedattribute_baseurl = message.base_url
-        return n
 
-    if isinstance(message, SetStyleData):
-        n.setstyledata_id = message.id
-        n.setstyledata_data = message.data
-        n.setstyledata_baseurl = message.base_url
-        return n
+def _detailed_input_event(n, message):
+    n['inputevent_messageid'] = message.message_id
+    n['inputevent_timestamp'] = message.timestamp
+    n['inputevent_value'] = message.value
+    n['inputevent_valuemasked'] = message.value_masked
+    n['inputevent_label'] = message.label
 
-    if isinstance(message, IssueEvent):
-        n.issueevent_messageid = message.message_id
-        n.issueevent_timestamp = message.timestamp
-        n.issueevent_type = message.type
-        n.issueevent_contextstring = message.context_string
-        n.issueevent_context = message.context
-        n.issueevent_payload = message.payload
-        return n
 
-    if isinstance(message, TechnicalInfo):
-        n.technicalinfo_type = message.type
-        n.technicalinfo_value = message.value
-        return n
+def _detailed_click_event(n, message):
+    n['clickevent_messageid'] = message.message_id
+    n['clickevent_timestamp'] = message.timestamp
+    n['clickevent_hesitationtime'] = message.hesitation_time
+    n['clickevent_label'] = message.label
 
-    if isinstance(message, CustomIssue):
-        n.customissue_name = message.name
-        n.customissue_payload = message.payload
-        return n
 
-    if isinstance(message, PageClose):
-        n.pageclose = True
-        return n
+def _detailed_error_event(n, message):
+    n['errorevent_messageid'] = message.message_id
+    n['errorevent_timestamp'] = message.timestamp
+    n['errorevent_source'] = message.source
+    n['errorevent_name'] = message.name
+    n['errorevent_message'] = message.message
+    n['errorevent_payload'] = message.payload
 
-    if isinstance(message, IOSSessionStart):
-        n.iossessionstart_timestamp = message.timestamp
-        n.iossessionstart_projectid = message.project_id
-        n.iossessionstart_trackerversion = message.tracker_version
-        n.iossessionstart_revid = message.rev_id
-        n.iossessionstart_useruuid = message.user_uuid
-        n.iossessionstart_useros = message.user_os
-        n.iossessionstart_userosversion = message.user_os_version
-        n.iossessionstart_userdevice = message.user_device
-        n.iossessionstart_userdevicetype = message.user_device_type
-        n.iossessionstart_usercountry = message.user_country
-        return n
 
-    if isinstance(message, IOSSessionEnd):
-        n.iossessionend_timestamp = message.timestamp
-        return n
+def _detailed_resource_event(n, message):
+    n['resourceevent_messageid'] = message.message_id
+    n['resourceevent_timestamp'] = message.timestamp
+    n['resourceevent_duration'] = message.duration
+    n['resourceevent_ttfb'] = message.ttfb
+    n['resourceevent_headersize'] = message.header_size
+    n['resourceevent_encodedbodysize'] = message.encoded_body_size
+    n['resourceevent_decodedbodysize'] = message.decoded_body_size
+    n['resourceevent_url'] = message.url
+    n['resourceevent_type'] = message.type
+    n['resourceevent_success'] = message.success
+    n['resourceevent_method'] = message.method
+    n['resourceevent_status'] = message.status
 
-    if isinstance(message, IOSMetadata):
-        n.iosmetadata_timestamp = message.timestamp
-        n.iosmetadata_length = message.length
-        n.iosmetadata_key = message.key
-        n.iosmetadata_value = message.value
-        return n
 
-    if isinstance(message, IOSUserID):
-        n.iosuserid_timestamp = message.timestamp
-        n.iosuserid_length = message.length
-        n.iosuserid_value = message.value
-        return n
+def _detailed_custom_event(n, message):
+    n['customevent_messageid'] = message.message_id
+    n['customevent_timestamp'] = message.timestamp
+    n['customevent_name'] = message.name
+    n['customevent_payload'] = message.payload
 
-    if isinstance(message, IOSUserAnonymousID):
-        n.iosuseranonymousid_timestamp = message.timestamp
-        n.iosuseranonymousid_length = message.length
-        n.iosuseranonymousid_value = message.value
-        return n
 
-    if isinstance(message, IOSScreenLeave):
-        n.iosscreenleave_timestamp = message.timestamp
-        n.iosscreenleave_length = message.length
-        n.iosscreenleave_title = message.title
-        n.iosscreenleave_viewname = message.view_name
-        return n
+def _detailed_fetch(n, message):
+    n['fetch_method'] = message.method
+    n['fetch_url'] = message.url
+    n['fetch_request'] = message.request
+    n['fetch_status'] = message.status
+    n['fetch_timestamp'] = message.timestamp
+    n['fetch_duration'] = message.duration
+
 
-    if isinstance(message, IOSLog):
-        n.ioslog_timestamp = message.timestamp
-        n.ioslog_length = message.length
-        n.ioslog_severity = message.severity
-        n.ioslog_content = message.content
-        return n
+def _detailed_profiler(n, message):
+    n['profiler_name'] = message.name
+    n['profiler_duration'] = message.duration
+    n['profiler_args'] = message.args
+    n['profiler_result'] = message.result
 
-    if isinstance(message, IOSInternalError):
-        n.iosinternalerror_timestamp = message.timestamp
-        n.iosinternalerror_length = message.length
-        n.iosinternalerror_content = message.content
-        return n
 
-    if isinstance(message, IOSPerformanceAggregated):
-        n.iosperformanceaggregated_timestampstart = message.timestamp_start
-        n.iosperformanceaggregated_timestampend = message.timestamp_end
-        n.iosperformanceaggregated_minfps = message.min_fps
-        n.iosperformanceaggregated_avgfps = message.avg_fps
-        n.iosperformanceaggregated_maxfps = message.max_fps
-        n.iosperformanceaggregated_mincpu = message.min_cpu
-        n.iosperformanceaggregated_avgcpu = message.avg_cpu
-        n.iosperformanceaggregated_maxcpu = message.max_cpu
-        n.iosperformanceaggregated_minmemory = message.min_memory
-        n.iosperformanceaggregated_avgmemory = message.avg_memory
-        n.iosperformanceaggregated_maxmemory = message.max_memory
-        n.iosperformanceaggregated_minbattery = message.min_battery
-        n.iosperformanceaggregated_avgbattery = message.avg_battery
-        n.iosperformanceaggregated_maxbattery = message.max_battery
+def _detailed_graphql(n, message):
+    n['graphql_operationkind'] = message.operation_kind
+    n['graphql_operationname'] = message.operation_name
+    n['graphql_variables'] = message.variables
+    n['graphql_response'] = message.response
+
+
+def _detailed_graphql_event(n, message):
+    n['graphqlevent_messageid'] = message.message_id
+    n['graphqlevent_timestamp'] = message.timestamp
+    n['graphqlevent_name'] = message.name
+
+
+def _detailed_dom_drop(n, message):
+    n['domdrop_timestamp'] = message.timestamp
+
+
+def _detailed_mouse_click(n, message):
+    n['mouseclick_id'] = message.id
+    n['mouseclick_hesitationtime'] = message.hesitation_time
+    n['mouseclick_label'] = message.label
+
+
+def _detailed_set_page_location(n, message):
+    n['setpagelocation_url'] = message.url
+    n['setpagelocation_referrer'] = message.referrer
+    n['setpagelocation_navigationstart'] = message.navigation_start
+
+
+def _detailed_mouse_move(n, message):
+    n['mousemove_x'] = message.x
+    n['mousemove_y'] = message.y
+
+
+def _detailed_long_task(n, message):
+    n['longtasks_timestamp'] = message.timestamp
+    n['longtasks_duration'] = message.duration
+    n['longtask_context'] = message.context
+    n['longtask_containertype'] = message.container_type
+    n['longtasks_containersrc'] = message.container_src
+    n['longtasks_containerid'] = message.container_id
+    n['longtasks_containername'] = message.container_name
+
+
+def _detailed_set_node_url_based_attribute(n, message):
+    n['setnodeurlbasedattribute_id'] = message.id
+    n['setnodeurlbasedattribute_name'] = message.name
+    n['setnodeurlbasedattribute_value'] = message.value
+    n['setnodeurlbasedattribute_baseurl'] = message.base_url
+
+
+def _detailed_set_style_data(n, message):
+    n['setstyledata_id'] = message.id
+    n['setstyledata_data'] = message.data
+    n['setstyledata_baseurl'] = message.base_url
+
+
+def _detailed_issue_event(n, message):
+    n['issueevent_messageid'] = message.message_id
+    n['issueevent_timestamp'] = message.timestamp
+    n['issueevent_type'] = message.type
+    n['issueevent_contextstring'] = message.context_string
+    n['issueevent_context'] = message.context
+    n['issueevent_payload'] = message.payload
+
+
+def _detailed_technical_info(n, message):
+    n['technicalinfo_type'] = message.type
+    n['technicalinfo_value'] = message.value
+
+
+def _detailed_custom_issue(n, message):
+    n['customissue_name'] = message.name
+    n['customissue_payload'] = message.payload
+
+
+def _detailed_page_close(n, message):
+    n['pageclose'] = True
+
+
+def _detailed_ios_session_start(n, message):
+    n['iossessionstart_timestamp'] = message.timestamp
+    n['iossessionstart_projectid'] = message.project_id
+    n['iossessionstart_trackerversion'] = message.tracker_version
+    n['iossessionstart_revid'] = message.rev_id
+    n['iossessionstart_useruuid'] = message.user_uuid
+    n['iossessionstart_useros'] = message.user_os
+    n['iossessionstart_userosversion'] = message.user_os_version
+    n['iossessionstart_userdevice'] = message.user_device
+    n['iossessionstart_userdevicetype'] = message.user_device_type
+    n['iossessionstart_usercountry'] = message.user_country
+
+
+def _detailed_ios_session_end(n, message):
+    n['iossessionend_timestamp'] = message.timestamp
+
+
+def _detailed_ios_metadata(n, message):
+    n['iosmetadata_timestamp'] = message.timestamp
+    n['iosmetadata_length'] = message.length
+    n['iosmetadata_key'] = message.key
+    n['iosmetadata_value'] = message.value
+
+
+def _detailed_ios_user_id(n, message):
+    n['iosuserid_timestamp'] = message.timestamp
+    n['iosuserid_length'] = message.length
+    n['iosuserid_value'] = message.value
+
+
+def _detailed_ios_user_anonymous_id(n, message):
+    n['iosuseranonymousid_timestamp'] = message.timestamp
+    n['iosuseranonymousid_length'] = message.length
+    n['iosuseranonymousid_value'] = message.value
+
+
+def _detailed_ios_screen_leave(n, message):
+    n['iosscreenleave_timestamp'] = message.timestamp
+    n['iosscreenleave_length'] = message.length
+    n['iosscreenleave_title'] = message.title
+    n['iosscreenleave_viewname'] = message.view_name
+
+
+def _detailed_ios_log(n, message):
+    n['ioslog_timestamp'] = message.timestamp
+    n['ioslog_length'] = message.length
+    n['ioslog_severity'] = message.severity
+    n['ioslog_content'] = message.content
+
+
+def _detailed_ios_internal_error(n, message):
+    n['iosinternalerror_timestamp'] = message.timestamp
+    n['iosinternalerror_length'] = message.length
+    n['iosinternalerror_content'] = message.content
+
+
+def _detailed_ios_performance_aggregated(n, message):
+    n['iosperformanceaggregated_timestampstart'] = message.timestamp_start
+    n['iosperformanceaggregated_timestampend'] = message.timestamp_end
+    n['iosperformanceaggregated_minfps'] = message.min_fps
+    n['iosperformanceaggregated_avgfps'] = message.avg_fps
+    n['iosperformanceaggregated_maxfps'] = message.max_fps
+    n['iosperformanceaggregated_mincpu'] = message.min_cpu
+    n['iosperformanceaggregated_avgcpu'] = message.avg_cpu
+    n['iosperformanceaggregated_maxcpu'] = message.max_cpu
+    n['iosperformanceaggregated_minmemory'] = message.min_memory
+    n['iosperformanceaggregated_avgmemory'] = message.avg_memory
+    n['iosperformanceaggregated_maxmemory'] = message.max_memory
+    n['iosperformanceaggregated_minbattery'] = message.min_battery
+    n['iosperformanceaggregated_avgbattery'] = message.avg_battery
+    n['iosperformanceaggregated_maxbattery'] = message.max_battery
+
+
+DETAILED_HANDLERS = {
+    SessionEnd: _detailed_session_end,
+    Timestamp: _detailed_timestamp,
+    SessionDisconnect: _detailed_session_disconnect,
+    SessionStart: _detailed_session_start,
+    SetViewportSize: _detailed_set_viewport_size,
+    SetViewportScroll: _detailed_set_viewport_scroll,
+    SetNodeScroll: _detailed_set_node_scroll,
+    ConsoleLog: _detailed_console_log,
+    PageLoadTiming: _detailed_page_load_timing,
+    PageRenderTiming: _detailed_page_render_timing,
+    ResourceTiming: _detailed_resource_timing,
+    JSException: _detailed_js_exception,
+    RawErrorEvent: _detailed_raw_error_event,
+    RawCustomEvent: _detailed_raw_custom_event,
+    UserID: _detailed_user_id,
+    UserAnonymousID: _detailed_user_anonymous_id,
+    Metadata: _detailed_metadata,
+    PerformanceTrack: _detailed_performance_track,
+    PerformanceTrackAggr: _detailed_performance_track_aggr,
+    ConnectionInformation: _detailed_connection_information,
+    PageEvent: _detailed_page_event,
+    InputEvent: _detailed_input_event,
+    ClickEvent: _detailed_click_event,
+    ErrorEvent: _detailed_error_event,
+    ResourceEvent: _detailed_resource_event,
+    CustomEvent: _detailed_custom_event,
+    Fetch: _detailed_fetch,
+    Profiler: _detailed_profiler,
+    GraphQL: _detailed_graphql,
+    GraphQLEvent: _detailed_graphql_event,
+    DomDrop: _detailed_dom_drop,
+    MouseClick: _detailed_mouse_click,
+    SetPageLocation: _detailed_set_page_location,
+    MouseMove: _detailed_mouse_move,
+    LongTask: _detailed_long_task,
+    SetNodeURLBasedAttribute: _detailed_set_node_url_based_attribute,
+    SetStyleData: _detailed_set_style_data,
+    IssueEvent: _detailed_issue_event,
+    TechnicalInfo: _detailed_technical_info,
+    CustomIssue: _detailed_custom_issue,
+    PageClose: _detailed_page_close,
+    IOSSessionStart: _detailed_ios_session_start,
+    IOSSessionEnd: _detailed_ios_session_end,
+    IOSMetadata: _detailed_ios_metadata,
+    IOSUserID: _detailed_ios_user_id,
+    IOSUserAnonymousID: _detailed_ios_user_anonymous_id,
+    IOSScreenLeave: _detailed_ios_screen_leave,
+    IOSLog: _detailed_ios_log,
+    IOSInternalError: _detailed_ios_internal_error,
+    IOSPerformanceAggregated: _detailed_ios_performance_aggregated,
+}
+
+
+# Message types each handler reads, used to skip decoding everything else
+NORMAL_MESSAGE_TYPES = tuple(NORMAL_HANDLERS)
+SESSION_MESSAGE_TYPES = tuple(SESSION_HANDLERS)
+DETAILED_MESSAGE_TYPES = tuple(DETAILED_HANDLERS)
+
+
+def message_ids_for_level(level: str) -> frozenset:
+    """
+    Ids of the messages needed by the `level` events handler and by handle_session
+    """
+    if level == 'detailed':
+        types = DETAILED_MESSAGE_TYPES
+    elif level == 'normal':
+        types = NORMAL_MESSAGE_TYPES
+    else:
+        types = ()
+    return frozenset(cls.__id__ for cls in types + SESSION_MESSAGE_TYPES)
+
+
+def handle_normal_message(message: Message) -> Optional[dict]:
+    handler = NORMAL_HANDLERS.get(type(message))
+    if handler is None:
+        return None
+    n = {}
+    handler(n, message)
+    return n
+
+
+def handle_session(n: Session, message: Message) -> Optional[Session]:
+    """
+    Update the session `n` with the message. Messages that don't affect
+    sessions leave `n` as it is, a new Session is created on the first one that does.
+    """
+    handler = SESSION_HANDLERS.get(type(message))
+    if handler is None:
         return n
-    return None
+    if not n:
+        n = Session()
+    handler(n, message)
+    return n
+
+
+def handle_message(message: Message) -> Optional[dict]:
+    handler = DETAILED_HANDLERS.get(type(message))
+    if handler is None:
+        return None
+    n = {}
+    handler(n, message)
+    return n
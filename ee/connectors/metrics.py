@@ -0,0 +1,122 @@
+"""
+Prometheus metrics of the connector, served over HTTP on `metrics_port`.
+
+Metrics are opt-in: without `metrics_port` every metric is a no-op and
+prometheus_client is not needed. Under the supervisor the workers write their
+metrics to PROMETHEUS_MULTIPROC_DIR and the supervisor serves them all.
+"""
+import os
+from collections import Counter
+
+from msgcodec.codec import MESSAGE_LAYOUTS
+
+METRICS_PORT = os.environ.get('metrics_port')
+ENABLED = bool(METRICS_PORT)
+
+if ENABLED:
+    from prometheus_client import Counter as _Counter, Gauge as _Gauge, Histogram as _Histogram
+else:
+    class _Noop:
+        def __init__(self, *args, **kwargs):
+            pass
+
+        def labels(self, *args, **kwargs):
+            return self
+
+        def inc(self, amount=1):
+            pass
+
+        def set(self, value):
+            pass
+
+        def observe(self, value):
+            pass
+
+    _Counter = _Gauge = _Histogram = _Noop
+
+_latency_buckets = (.001, .0025, .005, .01, .025, .05, .1, .25, .5, 1, 2.5, 5, 10, 30, 60, 120)
+
+MESSAGES_CONSUMED = _Counter('connector_messages_consumed_total', 'Messages read from the topics', ['type'])
+MESSAGES_DECODED = _Counter('connector_messages_decoded_total', 'Messages decoded and handled', ['type'])
+MESSAGES_SKIPPED = _Counter('connector_messages_skipped_total', 'Messages left out by the level filter', ['type'])
+MESSAGES_INVALID = _Counter('connector_messages_invalid_total', 'Messages with an unknown id or a truncated payload')
+DECODE_SECONDS = _Histogram('connector_decode_seconds', 'Decoding time of a polled batch of records',
+                            buckets=_latency_buckets)
+HANDLE_SECONDS = _Histogram('connector_handle_seconds', 'Handling time of a polled batch of messages',
+                            buckets=_latency_buckets)
+BATCH_BUILD_SECONDS = _Histogram('connector_batch_build_seconds', 'Conversion time of a batch for a destination',
+                                 ['destination', 'level'], buckets=_latency_buckets)
+INSERT_SECONDS = _Histogram('connector_insert_seconds', 'Insertion time of a batch into a destination',
+                            ['destination', 'level'], buckets=_latency_buckets)
+ROWS_WRITTEN = _Counter('connector_rows_written_total', 'Rows written', ['destination', 'level'])
+INSERT_RETRIES = _Counter('connector_insert_retries_total', 'Failed inserts that are retried', ['destination'])
+BATCHES_DROPPED = _Counter('connector_batches_dropped_total', 'Batches dropped on data errors', ['destination'])
+BATCHES_SPOOLED = _Counter('connector_batches_spooled_total', 'Batches written to the local spool', ['destination'])
+SPOOL_BYTES = _Gauge('connector_spool_bytes', 'Size of the local spool', ['destination'], multiprocess_mode='livesum')
+BATCH_SIZE = _Gauge('connector_batch_size', 'Rows a batch is flushed at, set by the adaptive batch size',
+                   ['name'], multiprocess_mode='max')
+WRITER_LAG = _Gauge('connector_writer_lag_seconds', 'Age of the oldest batch not written yet',
+                    ['destination'], multiprocess_mode='max')
+SESSIONS = _Gauge('connector_sessions_in_store', 'In-flight sessions', multiprocess_mode='livesum')
+SESSION_BYTES = _Gauge('connector_session_bytes', 'Approximate memory held per in-flight session',
+                      multiprocess_mode='max')
+SESSIONS_EVICTED = _Counter('connector_sessions_evicted_total', 'Sessions evicted before their end', ['reason'])
+CONSUMER_LAG = _Gauge('connector_consumer_lag', 'Records between the last one handled and the end of the partition',
+                      ['topic', 'partition'], multiprocess_mode='max')
+
+_type_names = {message_id: cls.__name__ for message_id, (cls, _) in MESSAGE_LAYOUTS.items()}
+
+
+def start(worker=None):
+    """
+    Serve the metrics, except in supervisor workers, served by the supervisor
+    """
+    if ENABLED and worker is None:
+        from prometheus_client import start_http_server
+        start_http_server(int(METRICS_PORT))
+
+
+def count_messages(records_count: int, message_ids, skipped: Counter):
+    """
+    :param records_count: records polled
+    :param message_ids: ids of the decoded messages
+    :param skipped: message id -> count of the records skipped by the level filter
+    """
+    decoded = Counter(message_ids)
+    for message_id, count in decoded.items():
+        name = _type_names[message_id]
+        MESSAGES_DECODED.labels(name).inc(count)
+        MESSAGES_CONSUMED.labels(name).inc(count)
+    for message_id, count in skipped.items():
+        name = _type_names[message_id]
+        MESSAGES_SKIPPED.labels(name).inc(count)
+        MESSAGES_CONSUMED.labels(name).inc(count)
+    invalid = records_count - len(message_ids) - sum(skipped.values())
+    if invalid:
+        MESSAGES_INVALID.inc(invalid)
+
+
+class StoreEvictions:
+    """
+    Turns the eviction counters of a SessionStore into counter increments
+    """
+
+    def __init__(self):
+        self._last = {}
+
+    def update(self, evictions: dict):
+        for reason, count in evictions.items():
+            new = count - self._last.get(reason, 0)
+            if new:
+                SESSIONS_EVICTED.labels(reason).inc(new)
+        self._last = dict(evictions)
+
+
+def update_consumer_lag(consumer, offsets: dict):
+    """
+    Lag of the assigned partitions, from the high watermarks of the last fetches
+    """
+    for tp, offset in offsets.items():
+        highwater = consumer.highwater(tp)
+        if highwater is not None:
+            CONSUMER_LAG.labels(tp.topic, str(tp.partition)).set(max(highwater - offset, 0))
@@ -1,42 +1,42 @@
-import io
+from zlib import crc32
 
 from msgcodec.messages import *
 
 
 class Codec:
     """
-    Implements encode/decode primitives
+    Implements encode/decode primitives.
+
+    Readers work directly over a memoryview: they take the buffer and the
+    current offset and return the decoded value together with the new offset,
+    so no intermediate file-like object or per-byte slices are created.
     """
 
     @staticmethod
-    def read_boolean(reader: io.BytesIO):
-        b = reader.read(1)
-        return b == 1
+    def read_boolean(buf: memoryview, pos: int):
+        return buf[pos] == 1, pos + 1
 
     @staticmethod
-    def read_uint(reader: io.BytesIO):
+    def read_uint(buf: memoryview, pos: int):
         """
-        The ending "big" doesn't play any role here,
-        since we're dealing with data per one byte
+        Varint (LEB128) decoding, 7 bits per byte, least significant group first
         """
-        x = 0  # the result
-        s = 0  # the shift (our result is big-ending)
-        i = 0  # n of byte (max 9 for uint64)
+        b = buf[pos]
+        pos += 1
+        if b < 0x80:
+            return b, pos
+        x = b & 0x7f
+        s = 7
         while True:
-            b = reader.read(1)
-            num = int.from_bytes(b, "big", signed=False)
-            # print(i, x)
-
-            if num < 0x80:
-                if i > 9 | i == 9 & num > 1:
-                    raise OverflowError()
-                return int(x | num << s)
-            x |= (num & 0x7f) << s
+            b = buf[pos]
+            pos += 1
+            if b < 0x80:
+                return x | b << s, pos
+            x |= (b & 0x7f) << s
             s += 7
-            i += 1
 
     @staticmethod
-    def read_int(reader: io.BytesIO) -> int:
+    def read_int(buf: memoryview, pos: int):
         """
         ux, err := ReadUint(reader)
         x := int64(ux >> 1)
@@ -48,614 +48,272 @@ class Codec:
         }
         return x, err
         """
-        ux = Codec.read_uint(reader)
-        x = int(ux >> 1)
-
+        ux, pos = Codec.read_uint(buf, pos)
+        x = ux >> 1
         if ux & 1 != 0:
             x = - x - 1
-        return x
+        return x, pos
 
     @staticmethod
-    def read_string(reader: io.BytesIO) -> str:
-        length = Codec.read_uint(reader)
-        s = reader.read(length)
-        try:
-            return s.decode("utf-8", errors="replace").replace("\x00", "\uFFFD")
-        except UnicodeDecodeError:
-            return None
+    def read_string(buf: memoryview, pos: int):
+        length, pos = Codec.read_uint(buf, pos)
+        end = pos + length
+        if end > len(buf):
+            raise IndexError("string is out of the message bounds")
+        return str(buf[pos:end], "utf-8", "replace").replace("\x00", "\uFFFD"), end
+
+    @staticmethod
+    def read_timestamp(buf: memoryview, pos: int):
+        """
+        Same as read_uint, but drops values that can't be a millisecond timestamp
+        """
+        ts, pos = Codec.read_uint(buf, pos)
+        if ts > 9999999999999:
+            ts = None
+        return ts, pos
+
+    @staticmethod
+    def write_boolean(out: bytearray, x):
+        out.append(1 if x else 0)
+
+    @staticmethod
+    def write_uint(out: bytearray, x):
+        x = x or 0
+        while x >= 0x80:
+            out.append((x & 0x7f) | 0x80)
+            x >>= 7
+        out.append(x)
+
+    @staticmethod
+    def write_int(out: bytearray, x):
+        x = x or 0
+        Codec.write_uint(out, x << 1 if x >= 0 else (-x - 1) << 1 | 1)
+
+    @staticmethod
+    def write_string(out: bytearray, x):
+        b = (x or '').encode("utf-8")
+        Codec.write_uint(out, len(b))
+        out += b
+
+    @staticmethod
+    def write_timestamp(out: bytearray, x):
+        Codec.write_uint(out, x)
+
+
+_u = Codec.read_uint
+_i = Codec.read_int
+_s = Codec.read_string
+_b = Codec.read_boolean
+_t = Codec.read_timestamp
+
+# message_id -> (message class, readers of the constructor arguments in wire order)
+MESSAGE_LAYOUTS = {
+    0: (Timestamp, (_u,)),
+    1: (SessionStart, (_u, _u, _s, _s, _s, _s, _s, _s, _s, _s, _s, _s, _u, _u, _s)),
+    2: (SessionDisconnect, (_u,)),
+    3: (SessionEnd, (_u,)),
+    4: (SetPageLocation, (_s, _s, _u)),
+    5: (SetViewportSize, (_u, _u)),
+    6: (SetViewportScroll, (_i, _i)),
+    7: (CreateDocument, ()),
+    8: (CreateElementNode, (_u, _u, _u, _s, _b)),
+    9: (CreateTextNode, (_u, _u, _u)),
+    10: (MoveNode, (_u, _u, _u)),
+    11: (RemoveNode, (_u,)),
+    12: (SetNodeAttribute, (_u, _s, _s)),
+    13: (RemoveNodeAttribute, (_u, _s)),
+    14: (SetNodeData, (_u, _s)),
+    15: (SetCSSData, (_u, _s)),
+    16: (SetNodeScroll, (_u, _i, _i)),
+    17: (SetInputTarget, (_u, _s)),
+    18: (SetInputValue, (_u, _s, _i)),
+    19: (SetInputChecked, (_u, _b)),
+    20: (MouseMove, (_u, _u)),
+    21: (MouseClick, (_u, _u, _s)),
+    22: (ConsoleLog, (_s, _s)),
+    23: (PageLoadTiming, (_u, _u, _u, _u, _u, _u, _u, _u, _u)),
+    24: (PageRenderTiming, (_u, _u, _u)),
+    25: (JSException, (_s, _s, _s)),
+    26: (RawErrorEvent, (_u, _s, _s, _s, _s)),
+    27: (RawCustomEvent, (_s, _s)),
+    28: (UserID, (_s,)),
+    29: (UserAnonymousID, (_s,)),
+    30: (Metadata, (_s, _s)),
+    31: (PageEvent, (_u, _u, _s, _s, _b, _u, _u, _u, _u, _u, _u, _u, _u, _u, _u, _u, _u)),
+    32: (InputEvent, (_u, _u, _s, _b, _s)),
+    33: (ClickEvent, (_u, _u, _u, _s)),
+    34: (ErrorEvent, (_u, _u, _s, _s, _s, _s)),
+    35: (ResourceEvent, (_u, _t, _u, _u, _u, _u, _u, _s, _s, _b, _s, _u)),
+    36: (CustomEvent, (_u, _u, _s, _s)),
+    37: (CSSInsertRule, (_u, _s, _u)),
+    38: (CSSDeleteRule, (_u, _u)),
+    39: (Fetch, (_s, _s, _s, _s, _u, _u, _u)),
+    40: (Profiler, (_s, _u, _s, _s)),
+    41: (OTable, (_s, _s)),
+    42: (StateAction, (_s,)),
+    43: (StateActionEvent, (_u, _u, _s)),
+    44: (Redux, (_s, _s, _u)),
+    45: (Vuex, (_s, _s)),
+    46: (MobX, (_s, _s)),
+    47: (NgRx, (_s, _s, _u)),
+    48: (GraphQL, (_s, _s, _s, _s)),
+    49: (PerformanceTrack, (_i, _i, _u, _u)),
+    50: (GraphQLEvent, (_u, _u, _s)),
+    52: (DomDrop, (_u,)),
+    53: (ResourceTiming, (_u, _u, _u, _u, _u, _u, _s, _s)),
+    54: (ConnectionInformation, (_u, _s)),
+    55: (SetPageVisibility, (_b,)),
+    56: (PerformanceTrackAggr, (_u, _u, _u, _u, _u, _u, _u, _u, _u, _u, _u, _u, _u, _u)),
+    59: (LongTask, (_u, _u, _u, _u, _s, _s, _s)),
+    60: (SetNodeURLBasedAttribute, (_u, _s, _s, _s)),
+    61: (SetStyleData, (_u, _s, _s)),
+    62: (IssueEvent, (_u, _u, _s, _s, _s, _s)),
+    63: (TechnicalInfo, (_s, _s)),
+    64: (CustomIssue, (_s, _s)),
+    65: (PageClose, ()),
+    90: (IOSSessionStart, (_u, _u, _s, _s, _s, _s, _s, _s, _s, _s)),
+    91: (IOSSessionEnd, (_u,)),
+    92: (IOSMetadata, (_u, _u, _s, _s)),
+    94: (IOSUserID, (_u, _u, _s)),
+    95: (IOSUserAnonymousID, (_u, _u, _s)),
+    99: (IOSScreenLeave, (_u, _u, _s, _s)),
+    103: (IOSLog, (_u, _u, _s, _s)),
+    104: (IOSInternalError, (_u, _u, _s)),
+    110: (IOSPerformanceAggregated, (_u, _u, _u, _u, _u, _u, _u, _u, _u, _u, _u, _u, _u, _u)),
+}
+
+
+_writers = {_u: Codec.write_uint, _i: Codec.write_int, _s: Codec.write_string,
+            _b: Codec.write_boolean, _t: Codec.write_timestamp}
+
+# message class -> (message_id, (attribute, writer) of the fields in wire order);
+# the attributes of a message are its __slots__, declared in constructor order
+MESSAGE_ENCODERS = {
+    cls: (message_id, tuple(zip(cls.__slots__, (_writers[read] for read in readers))))
+    for message_id, (cls, readers) in MESSAGE_LAYOUTS.items()
+}
+
+
+class _Skipped:
+    """
+    Returned by MessageCodec.decode for known messages left out by `message_ids`
+    """
+    __slots__ = ()
+
+    def __bool__(self):
+        return False
+
+    def __repr__(self):
+        return 'SKIPPED'
+
+
+SKIPPED = _Skipped()
+
+
+def event_key(topic: str, partition: int, offset: int) -> int:
+    """
+    Key of the message of a Kafka record, the same every time the record is
+    consumed: 7 bits of the topic name hash, 16 of the partition and 40 of
+    the offset, so it fits a signed BIGINT
+    """
+    return (crc32(topic.encode()) & 0x7f) << 56 | (partition & 0xffff) << 40 | offset & 0xffffffffff
 
 
 class MessageCodec(Codec):
 
+    def __init__(self, message_ids=None):
+        """
+        :param message_ids: ids of the messages to decode. Other messages are
+            recognized by their id only and returned as SKIPPED, without reading
+            their fields. By default all known messages are decoded.
+        """
+        if message_ids is None:
+            self.layouts = MESSAGE_LAYOUTS
+        else:
+            self.layouts = {k: v for k, v in MESSAGE_LAYOUTS.items() if k in message_ids}
+
     def encode(self, m: Message) -> bytes:
-        ...
+        """
+        Encode a message as it is read by decode(): its id followed by its fields.
+        None values are written as 0 or an empty string.
+        """
+        message_id, fields = MESSAGE_ENCODERS[m.__class__]
+        out = bytearray()
+        self.write_uint(out, message_id)
+        for name, write in fields:
+            write(out, getattr(m, name))
+        return bytes(out)
 
     def decode(self, b: bytes) -> Message:
-        reader = io.BytesIO(b)
-        message_id = self.read_message_id(reader)
-
-        if message_id == 0:
-            return Timestamp(
-                timestamp=self.read_uint(reader)
-            )
-        if message_id == 1:
-            return SessionStart(
-                timestamp=self.read_uint(reader),
-                project_id=self.read_uint(reader),
-                tracker_version=self.read_string(reader),
-                rev_id=self.read_string(reader),
-                user_uuid=self.read_string(reader),
-                user_agent=self.read_string(reader),
-                user_os=self.read_string(reader),
-                user_os_version=self.read_string(reader),
-                user_browser=self.read_string(reader),
-                user_browser_version=self.read_string(reader),
-                user_device=self.read_string(reader),
-                user_device_type=self.read_string(reader),
-                user_device_memory_size=self.read_uint(reader),
-                user_device_heap_size=self.read_uint(reader),
-                user_country=self.read_string(reader)
-            )
-
-        if message_id == 2:
-            return SessionDisconnect(
-                timestamp=self.read_uint(reader)
-            )
-
-        if message_id == 3:
-            return SessionEnd(
-                timestamp=self.read_uint(reader)
-            )
-
-        if message_id == 4:
-            return SetPageLocation(
-                url=self.read_string(reader),
-                referrer=self.read_string(reader),
-                navigation_start=self.read_uint(reader)
-            )
-
-        if message_id == 5:
-            return SetViewportSize(
-                width=self.read_uint(reader),
-                height=self.read_uint(reader)
-            )
-
-        if message_id == 6:
-            return SetViewportScroll(
-                x=self.read_int(reader),
-                y=self.read_int(reader)
-            )
-
-        if message_id == 7:
-            return CreateDocument()
-
-        if message_id == 8:
-            return CreateElementNode(
-                id=self.read_uint(reader),
-                parent_id=self.read_uint(reader),
-                index=self.read_uint(reader),
-                tag=self.read_string(reader),
-                svg=self.read_boolean(reader),
-            )
-
-        if message_id == 9:
-            return CreateTextNode(
-                id=self.read_uint(reader),
-                parent_id=self.read_uint(reader),
-                index=self.read_uint(reader)
-            )
-
-        if message_id == 10:
-            return MoveNode(
-                id=self.read_uint(reader),
-                parent_id=self.read_uint(reader),
-                index=self.read_uint(reader)
-            )
-
-        if message_id == 11:
-            return RemoveNode(
-                id=self.read_uint(reader)
-            )
-
-        if message_id == 12:
-            return SetNodeAttribute(
-                id=self.read_uint(reader),
-                name=self.read_string(reader),
-                value=self.read_string(reader)
-            )
-
-        if message_id == 13:
-            return RemoveNodeAttribute(
-                id=self.read_uint(reader),
-                name=self.read_string(reader)
-            )
-
-        if message_id == 14:
-            return SetNodeData(
-                id=self.read_uint(reader),
-                data=self.read_string(reader)
-            )
-
-        if message_id == 15:
-            return SetCSSData(
-                id=self.read_uint(reader),
-                data=self.read_string(reader)
-            )
-
-        if message_id == 16:
-            return SetNodeScroll(
-                id=self.read_uint(reader),
-                x=self.read_int(reader),
-                y=self.read_int(reader),
-            )
-
-        if message_id == 17:
-            return SetInputTarget(
-                id=self.read_uint(reader),
-                label=self.read_string(reader)
-            )
-
-        if message_id == 18:
-            return SetInputValue(
-                id=self.read_uint(reader),
-                value=self.read_string(reader),
-                mask=self.read_int(reader),
-            )
-
-        if message_id == 19:
-            return SetInputChecked(
-                id=self.read_uint(reader),
-                checked=self.read_boolean(reader)
-            )
-
-        if message_id == 20:
-            return MouseMove(
-                x=self.read_uint(reader),
-                y=self.read_uint(reader)
-            )
-
-        if message_id == 21:
-            return MouseClick(
-                id=self.read_uint(reader),
-                hesitation_time=self.read_uint(reader),
-                label=self.read_string(reader)
-            )
-
-        if message_id == 22:
-            return ConsoleLog(
-                level=self.read_string(reader),
-                value=self.read_string(reader)
-            )
-
-        if message_id == 23:
-            return PageLoadTiming(
-                request_start=self.read_uint(reader),
-                response_start=self.read_uint(reader),
-                response_end=self.read_uint(reader),
-                dom_content_loaded_event_start=self.read_uint(reader),
-                dom_content_loaded_event_end=self.read_uint(reader),
-                load_event_start=self.read_uint(reader),
-                load_event_end=self.read_uint(reader),
-                first_paint=self.read_uint(reader),
-                first_contentful_paint=self.read_uint(reader)
-            )
-
-        if message_id == 24:
-            return PageRenderTiming(
-                speed_index=self.read_uint(reader),
-                visually_complete=self.read_uint(reader),
-                time_to_interactive=self.read_uint(reader),
-            )
-
-        if message_id == 25:
-            return JSException(
-                name=self.read_string(reader),
-                message=self.read_string(reader),
-                payload=self.read_string(reader)
-            )
-
-        if message_id == 26:
-            return RawErrorEvent(
-                timestamp=self.read_uint(reader),
-                source=self.read_string(reader),
-                name=self.read_string(reader),
-                message=self.read_string(reader),
-                payload=self.read_string(reader)
-            )
-
-        if message_id == 27:
-            return RawCustomEvent(
-                name=self.read_string(reader),
-                payload=self.read_string(reader)
-            )
-
-        if message_id == 28:
-            return UserID(
-                id=self.read_string(reader)
-            )
-
-        if message_id == 29:
-            return UserAnonymousID(
-                id=self.read_string(reader)
-            )
-
-        if message_id == 30:
-            return Metadata(
-                key=self.read_string(reader),
-                value=self.read_string(reader)
-            )
-
-        if message_id == 31:
-            return PageEvent(
-                message_id=self.read_uint(reader),
-                timestamp=self.read_uint(reader),
-                url=self.read_string(reader),
-                referrer=self.read_string(reader),
-                loaded=self.read_boolean(reader),
-                request_start=self.read_uint(reader),
-                response_start=self.read_uint(reader),
-                response_end=self.read_uint(reader),
-                dom_content_loaded_event_start=self.read_uint(reader),
-                dom_content_loaded_event_end=self.read_uint(reader),
-                load_event_start=self.read_uint(reader),
-                load_event_end=self.read_uint(reader),
-                first_paint=self.read_uint(reader),
-                first_contentful_paint=self.read_uint(reader),
-                speed_index=self.read_uint(reader),
-                visually_complete=self.read_uint(reader),
-                time_to_interactive=self.read_uint(reader)
-            )
-
-        if message_id == 32:
-            return InputEvent(
-                message_id=self.read_uint(reader),
-                timestamp=self.read_uint(reader),
-                value=self.read_string(reader),
-                value_masked=self.read_boolean(reader),
-                label=self.read_string(reader),
-            )
-
-        if message_id == 33:
-            return ClickEvent(
-                message_id=self.read_uint(reader),
-                timestamp=self.read_uint(reader),
-                hesitation_time=self.read_uint(reader),
-                label=self.read_string(reader)
-            )
-
-        if message_id == 34:
-            return ErrorEvent(
-                message_id=self.read_uint(reader),
-                timestamp=self.read_uint(reader),
-                source=self.read_string(reader),
-                name=self.read_string(reader),
-                message=self.read_string(reader),
-                payload=self.read_string(reader)
-            )
-
-        if message_id == 35:
-
-            message_id = self.read_uint(reader)
-            ts = self.read_uint(reader)
-            if ts > 9999999999999:
-                ts = None
-            return ResourceEvent(
-                message_id=message_id,
-                timestamp=ts,
-                duration=self.read_uint(reader),
-                ttfb=self.read_uint(reader),
-                header_size=self.read_uint(reader),
-                encoded_body_size=self.read_uint(reader),
-                decoded_body_size=self.read_uint(reader),
-                url=self.read_string(reader),
-                type=self.read_string(reader),
-                success=self.read_boolean(reader),
-                method=self.read_string(reader),
-                status=self.read_uint(reader)
-            )
-
-        if message_id == 36:
-            return CustomEvent(
-                message_id=self.read_uint(reader),
-                timestamp=self.read_uint(reader),
-                name=self.read_string(reader),
-                payload=self.read_string(reader)
-            )
-
-        if message_id == 37:
-            return CSSInsertRule(
-                id=self.read_uint(reader),
-                rule=self.read_string(reader),
-                index=self.read_uint(reader)
-            )
-
-        if message_id == 38:
-            return CSSDeleteRule(
-                id=self.read_uint(reader),
-                index=self.read_uint(reader)
-            )
-
-        if message_id == 39:
-            return Fetch(
-                method=self.read_string(reader),
-                url=self.read_string(reader),
-                request=self.read_string(reader),
-                response=self.read_string(reader),
-                status=self.read_uint(reader),
-                timestamp=self.read_uint(reader),
-                duration=self.read_uint(reader)
-            )
-
-        if message_id == 40:
-            return Profiler(
-                name=self.read_string(reader),
-                duration=self.read_uint(reader),
-                args=self.read_string(reader),
-                result=self.read_string(reader)
-            )
-
-        if message_id == 41:
-            return OTable(
-                key=self.read_string(reader),
-                value=self.read_string(reader)
-            )
-
-        if message_id == 42:
-            return StateAction(
-                type=self.read_string(reader)
-            )
-
-        if message_id == 43:
-            return StateActionEvent(
-                message_id=self.read_uint(reader),
-                timestamp=self.read_uint(reader),
-                type=self.read_string(reader)
-            )
-
-        if message_id == 44:
-            return Redux(
-                action=self.read_string(reader),
-                state=self.read_string(reader),
-                duration=self.read_uint(reader)
-            )
-
-        if message_id == 45:
-            return Vuex(
-                mutation=self.read_string(reader),
-                state=self.read_string(reader),
-            )
-
-        if message_id == 46:
-            return MobX(
-                type=self.read_string(reader),
-                payload=self.read_string(reader),
-            )
-
-        if message_id == 47:
-            return NgRx(
-                action=self.read_string(reader),
-                state=self.read_string(reader),
-                duration=self.read_uint(reader)
-            )
-
-        if message_id == 48:
-            return GraphQL(
-                operation_kind=self.read_string(reader),
-                operation_name=self.read_string(reader),
-                variables=self.read_string(reader),
-                response=self.read_string(reader)
-            )
-
-        if message_id == 49:
-            return PerformanceTrack(
-                frames=self.read_int(reader),
-                ticks=self.read_int(reader),
-                total_js_heap_size=self.read_uint(reader),
-                used_js_heap_size=self.read_uint(reader)
-            )
-
-        if message_id == 50:
-            return GraphQLEvent(
-                message_id=self.read_uint(reader),
-                timestamp=self.read_uint(reader),
-                name=self.read_string(reader)
-            )
-
-        if message_id == 52:
-            return DomDrop(
-                timestamp=self.read_uint(reader)
-            )
-
-        if message_id == 53:
-            return ResourceTiming(
-                timestamp=self.read_uint(reader),
-                duration=self.read_uint(reader),
-                ttfb=self.read_uint(reader),
-                header_size=self.read_uint(reader),
-                encoded_body_size=self.read_uint(reader),
-                decoded_body_size=self.read_uint(reader),
-                url=self.read_string(reader),
-                initiator=self.read_string(reader)
-            )
-
-        if message_id == 54:
-            return ConnectionInformation(
-                downlink=self.read_uint(reader),
-                type=self.read_string(reader)
-            )
-
-        if message_id == 55:
-            return SetPageVisibility(
-                hidden=self.read_boolean(reader)
-            )
-
-        if message_id == 56:
-            return PerformanceTrackAggr(
-                timestamp_start=self.read_uint(reader),
-                timestamp_end=self.read_uint(reader),
-                min_fps=self.read_uint(reader),
-                avg_fps=self.read_uint(reader),
-                max_fps=self.read_uint(reader),
-                min_cpu=self.read_uint(reader),
-                avg_cpu=self.read_uint(reader),
-                max_cpu=self.read_uint(reader),
-                min_total_js_heap_size=self.read_uint(reader),
-                avg_total_js_heap_size=self.read_uint(reader),
-                max_total_js_heap_size=self.read_uint(reader),
-                min_used_js_heap_size=self.read_uint(reader),
-                avg_used_js_heap_size=self.read_uint(reader),
-                max_used_js_heap_size=self.read_uint(reader)
-            )
-
-        if message_id == 59:
-            return LongTask(
-                timestamp=self.read_uint(reader),
-                duration=self.read_uint(reader),
-                context=self.read_uint(reader),
-                container_type=self.read_uint(reader),
-                container_src=self.read_string(reader),
-                container_id=self.read_string(reader),
-                container_name=self.read_string(reader)
-            )
-
-        if message_id == 60:
-            return SetNodeURLBasedAttribute(
-                id=self.read_uint(reader),
-                name=self.read_string(reader),
-                value=self.read_string(reader),
-                base_url=self.read_string(reader)
-            )
-
-        if message_id == 61:
-            return SetStyleData(
-                id=self.read_uint(reader),
-                data=self.read_string(reader),
-                base_url=self.read_string(reader)
-            )
-
-        if message_id == 62:
-            return IssueEvent(
-                message_id=self.read_uint(reader),
-                timestamp=self.read_uint(reader),
-                type=self.read_string(reader),
-                context_string=self.read_string(reader),
-                context=self.read_string(reader),
-                payload=self.read_string(reader)
-            )
-
-        if message_id == 63:
-            return TechnicalInfo(
-                type=self.read_string(reader),
-                value=self.read_string(reader)
-            )
-
-        if message_id == 64:
-            return CustomIssue(
-                name=self.read_string(reader),
-                payload=self.read_string(reader)
-            )
-
-        if message_id == 65:
-            return PageClose()
-
-        if message_id == 90:
-            return IOSSessionStart(
-                timestamp=self.read_uint(reader),
-                project_id=self.read_uint(reader),
-                tracker_version=self.read_string(reader),
-                rev_id=self.read_string(reader),
-                user_uuid=self.read_string(reader),
-                user_os=self.read_string(reader),
-                user_os_version=self.read_string(reader),
-                user_device=self.read_string(reader),
-                user_device_type=self.read_string(reader),
-                user_country=self.read_string(reader)
-            )
-
-        if message_id == 91:
-            return IOSSessionEnd(
-                timestamp=self.read_uint(reader)
-            )
-
-        if message_id == 92:
-            return IOSMetadata(
-                timestamp=self.read_uint(reader),
-                length=self.read_uint(reader),
-                key=self.read_string(reader),
-                value=self.read_string(reader)
-            )
-
-        if message_id == 94:
-            return IOSUserID(
-                timestamp=self.read_uint(reader),
-                length=self.read_uint(reader),
-                value=self.read_string(reader)
-            )
-
-        if message_id == 95:
-            return IOSUserAnonymousID(
-                timestamp=self.read_uint(reader),
-                length=self.read_uint(reader),
-                value=self.read_string(reader)
-            )
-
-        if message_id == 99:
-            return IOSScreenLeave(
-                timestamp=self.read_uint(reader),
-                length=self.read_uint(reader),
-                title=self.read_string(reader),
-                view_name=self.read_string(reader)
-            )
-
-        if message_id == 103:
-            return IOSLog(
-                timestamp=self.read_uint(reader),
-                length=self.read_uint(reader),
-                severity=self.read_string(reader),
-                content=self.read_string(reader)
-            )
-
-        if message_id == 104:
-            return IOSInternalError(
-                timestamp=self.read_uint(reader),
-                length=self.read_uint(reader),
-                content=self.read_string(reader)
-            )
-
-        if message_id == 110:
-            return IOSPerformanceAggregated(
-                timestamp_start=self.read_uint(reader),
-                timestamp_end=self.read_uint(reader),
-                min_fps=self.read_uint(reader),
-                avg_fps=self.read_uint(reader),
-                max_fps=self.read_uint(reader),
-                min_cpu=self.read_uint(reader),
-                avg_cpu=self.read_uint(reader),
-                max_cpu=self.read_uint(reader),
-                min_memory=self.read_uint(reader),
-                avg_memory=self.read_uint(reader),
-                max_memory=self.read_uint(reader),
-                min_battery=self.read_uint(reader),
-                avg_battery=self.read_uint(reader),
-                max_battery=self.read_uint(reader)
-            )
-
-    def read_message_id(self, reader: io.BytesIO) -> int:
         """
-        Read and return the first byte where the message id is encoded
+        Decode a single message. One decode costs a table lookup by message id
+        plus the reads of its fields; unknown ids and truncated payloads give None.
+        """
+        buf = memoryview(b)
+        try:
+            message_id, pos = self.read_uint(buf, 0)
+            layout = self.layouts.get(message_id)
+            if layout is None:
+                return SKIPPED if message_id in MESSAGE_LAYOUTS else None
+            cls, readers = layout
+            args = []
+            append = args.append
+            read_uint = _u
+            for read in readers:
+                # inline the single-byte varint, by far the most common field
+                if read is read_uint:
+                    b = buf[pos]
+                    if b < 0x80:
+                        append(b)
+                        pos += 1
+                        continue
+                value, pos = read(buf, pos)
+                append(value)
+        except IndexError:
+            return None
+        return cls(*args)
+
+    def decode_batch(self, records, skipped=None, event_keys=None):
+        """
+        Decode a batch of Kafka records, as returned by KafkaConsumer.poll()
+        (a dict of partition -> records) or any iterable of records.
+        Returns parallel lists of decoded messages, session ids and message ids;
+        records that are skipped or can't be decoded are left out of all three.
+        :param skipped: optional Counter, gets the ids of the skipped messages counted
+        :param event_keys: optional list, gets the event_key of every decoded message appended
+        """
+        if isinstance(records, dict):
+            records = [record for partition in records.values() for record in partition]
+        decode = self.decode
+        messages = []
+        session_ids = []
+        message_ids = []
+        for record in records:
+            message = decode(record.value)
+            if not message:
+                if message is SKIPPED and skipped is not None:
+                    skipped[self.check_message_id(record.value)] += 1
+                continue
+            messages.append(message)
+            session_ids.append(int.from_bytes(record.key, "little", signed=False))
+            message_ids.append(message.__id__)
+            if event_keys is not None:
+                event_keys.append(event_key(record.topic, record.partition, record.offset))
+        return messages, session_ids, message_ids
+
+    def read_message_id(self, buf: memoryview) -> int:
         """
-        id_ = self.read_uint(reader)
+        Read and return the message id encoded at the beginning of the message
+        """
+        id_, _ = self.read_uint(buf, 0)
         return id_
 
     @staticmethod
     def check_message_id(b: bytes) -> int:
         """
-        todo: make it static and without reader. It's just the first byte
-        Read and return the first byte where the message id is encoded
+        Read and return the message id encoded at the beginning of the message
         """
-        reader = io.BytesIO(b)
-        id_ = Codec.read_uint(reader)
-
+        id_, _ = Codec.read_uint(memoryview(b), 0)
         return id_
 
     @staticmethod
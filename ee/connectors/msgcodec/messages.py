@@ -5,11 +5,12 @@ from abc import ABC
 
 
 class Message(ABC):
-    pass
+    __slots__ = ()
 
 
 class Timestamp(Message):
     __id__ = 0
+    __slots__ = ('timestamp',)
 
     def __init__(self, timestamp):
         self.timestamp = timestamp
@@ -17,6 +18,10 @@ class Timestamp(Message):
 
 class SessionStart(Message):
     __id__ = 1
+    __slots__ = ('timestamp', 'project_id', 'tracker_version', 'rev_id', 'user_uuid', 'user_agent',
+                 'user_os', 'user_os_version', 'user_browser', 'user_browser_version',
+                 'user_device', 'user_device_type', 'user_device_memory_size',
+                 'user_device_heap_size', 'user_country')
 
     def __init__(self, timestamp, project_id, tracker_version, rev_id, user_uuid,
                  user_agent, user_os, user_os_version, user_browser, user_browser_version,
@@ -41,6 +46,7 @@ class SessionStart(Message):
 
 class SessionDisconnect(Message):
     __id__ = 2
+    __slots__ = ('timestamp',)
 
     def __init__(self, timestamp):
         self.timestamp = timestamp
@@ -48,6 +54,7 @@ class SessionDisconnect(Message):
 
 class SessionEnd(Message):
     __id__ = 3
+    __slots__ = ('timestamp',)
     __name__ = 'SessionEnd'
 
     def __init__(self, timestamp):
@@ -56,6 +63,7 @@ class SessionEnd(Message):
 
 class SetPageLocation(Message):
     __id__ = 4
+    __slots__ = ('url', 'referrer', 'navigation_start')
 
     def __init__(self, url, referrer, navigation_start):
         self.url = url
@@ -65,6 +73,7 @@ class SetPageLocation(Message):
 
 class SetViewportSize(Message):
     __id__ = 5
+    __slots__ = ('width', 'height')
 
     def __init__(self, width, height):
         self.width = width
@@ -73,6 +82,7 @@ class SetViewportSize(Message):
 
 class SetViewportScroll(Message):
     __id__ = 6
+    __slots__ = ('x', 'y')
 
     def __init__(self, x, y):
         self.x = x
@@ -81,14 +91,16 @@ class SetViewportScroll(Message):
 
 class CreateDocument(Message):
     __id__ = 7
+    __slots__ = ()
 
 
 class CreateElementNode(Message):
     __id__ = 8
+    __slots__ = ('id', 'parent_id', 'index', 'tag', 'svg')
 
     def __init__(self, id, parent_id, index, tag, svg):
         self.id = id
-        self.parent_id = parent_id,
+        self.parent_id = parent_id
         self.index = index
         self.tag = tag
         self.svg = svg
@@ -96,6 +108,7 @@ class CreateElementNode(Message):
 
 class CreateTextNode(Message):
     __id__ = 9
+    __slots__ = ('id', 'parent_id', 'index')
 
     def __init__(self, id, parent_id, index):
         self.id = id
@@ -105,6 +118,7 @@ class CreateTextNode(Message):
 
 class MoveNode(Message):
     __id__ = 10
+    __slots__ = ('id', 'parent_id', 'index')
 
     def __init__(self, id, parent_id, index):
         self.id = id
@@ -114,6 +128,7 @@ class MoveNode(Message):
 
 class RemoveNode(Message):
     __id__ = 11
+    __slots__ = ('id',)
 
     def __init__(self, id):
         self.id = id
@@ -121,6 +136,7 @@ class RemoveNode(Message):
 
 class SetNodeAttribute(Message):
     __id__ = 12
+    __slots__ = ('id', 'name', 'value')
 
     def __init__(self, id, name: str, value: str):
         self.id = id
@@ -130,6 +146,7 @@ class SetNodeAttribute(Message):
 
 class RemoveNodeAttribute(Message):
     __id__ = 13
+    __slots__ = ('id', 'name')
 
     def __init__(self, id, name: str):
         self.id = id
@@ -138,6 +155,7 @@ class RemoveNodeAttribute(Message):
 
 class SetNodeData(Message):
     __id__ = 14
+    __slots__ = ('id', 'data')
 
     def __init__(self, id, data: str):
         self.id = id
@@ -146,6 +164,7 @@ class SetNodeData(Message):
 
 class SetCSSData(Message):
     __id__ = 15
+    __slots__ = ('id', 'data')
 
     def __init__(self, id, data: str):
         self.id = id
@@ -154,6 +173,7 @@ class SetCSSData(Message):
 
 class SetNodeScroll(Message):
     __id__ = 16
+    __slots__ = ('id', 'x', 'y')
 
     def __init__(self, id, x: int, y: int):
         self.id = id
@@ -163,6 +183,7 @@ class SetNodeScroll(Message):
 
 class SetInputTarget(Message):
     __id__ = 17
+    __slots__ = ('id', 'label')
 
     def __init__(self, id, label: str):
         self.id = id
@@ -171,6 +192,7 @@ class SetInputTarget(Message):
 
 class SetInputValue(Message):
     __id__ = 18
+    __slots__ = ('id', 'value', 'mask')
 
     def __init__(self, id, value: str, mask: int):
         self.id = id
@@ -180,6 +202,7 @@ class SetInputValue(Message):
 
 class SetInputChecked(Message):
     __id__ = 19
+    __slots__ = ('id', 'checked')
 
     def __init__(self, id, checked: bool):
         self.id = id
@@ -188,6 +211,7 @@ class SetInputChecked(Message):
 
 class MouseMove(Message):
     __id__ = 20
+    __slots__ = ('x', 'y')
 
     def __init__(self, x, y):
         self.x = x
@@ -196,6 +220,7 @@ class MouseMove(Message):
 
 class MouseClick(Message):
     __id__ = 21
+    __slots__ = ('id', 'hesitation_time', 'label')
 
     def __init__(self, id, hesitation_time, label: str):
         self.id = id
@@ -205,6 +230,7 @@ class MouseClick(Message):
 
 class ConsoleLog(Message):
     __id__ = 22
+    __slots__ = ('level', 'value')
 
     def __init__(self, level: str, value: str):
         self.level = level
@@ -213,6 +239,9 @@ class ConsoleLog(Message):
 
 class PageLoadTiming(Message):
     __id__ = 23
+    __slots__ = ('request_start', 'response_start', 'response_end',
+                 'dom_content_loaded_event_start', 'dom_content_loaded_event_end',
+                 'load_event_start', 'load_event_end', 'first_paint', 'first_contentful_paint')
 
     def __init__(self, request_start, response_start, response_end, dom_content_loaded_event_start,
                  dom_content_loaded_event_end, load_event_start, load_event_end,
@@ -230,6 +259,7 @@ class PageLoadTiming(Message):
 
 class PageRenderTiming(Message):
     __id__ = 24
+    __slots__ = ('speed_index', 'visually_complete', 'time_to_interactive')
 
     def __init__(self, speed_index, visually_complete, time_to_interactive):
         self.speed_index = speed_index
@@ -238,6 +268,7 @@ class PageRenderTiming(Message):
 
 class JSException(Message):
     __id__ = 25
+    __slots__ = ('name', 'message', 'payload')
 
     def __init__(self, name: str, message: str, payload: str):
         self.name = name
@@ -247,6 +278,7 @@ class JSException(Message):
 
 class RawErrorEvent(Message):
     __id__ = 26
+    __slots__ = ('timestamp', 'source', 'name', 'message', 'payload')
 
     def __init__(self, timestamp, source: str, name: str, message: str,
                  payload: str):
@@ -259,6 +291,7 @@ class RawErrorEvent(Message):
 
 class RawCustomEvent(Message):
     __id__ = 27
+    __slots__ = ('name', 'payload')
 
     def __init__(self, name: str, payload: str):
         self.name = name
@@ -267,6 +300,7 @@ class RawCustomEvent(Message):
 
 class UserID(Message):
     __id__ = 28
+    __slots__ = ('id',)
 
     def __init__(self, id: str):
         self.id = id
@@ -274,6 +308,7 @@ class UserID(Message):
 
 class UserAnonymousID(Message):
     __id__ = 29
+    __slots__ = ('id',)
 
     def __init__(self, id: str):
         self.id = id
@@ -281,25 +316,20 @@ class UserAnonymousID(Message):
 
 class Metadata(Message):
     __id__ = 30
+    __slots__ = ('key', 'value')
 
     def __init__(self, key: str, value: str):
         self.key = key
         self.value = value
 
 
-class PerformanceTrack(Message):
-    __id__ = 49
-
-    def __init__(self, frames: int, ticks: int, total_js_heap_size,
-                 used_js_heap_size):
-        self.frames = frames
-        self.ticks = ticks
-        self.total_js_heap_size = total_js_heap_size
-        self.used_js_heap_size = used_js_heap_size
-
-
 class PageEvent(Message):
     __id__ = 31
+    __slots__ = ('message_id', 'timestamp', 'url', 'referrer', 'loaded', 'request_start',
+                 'response_start', 'response_end', 'dom_content_loaded_event_start',
+                 'dom_content_loaded_event_end', 'load_event_start', 'load_event_end',
+                 'first_paint', 'first_contentful_paint', 'speed_index', 'visually_complete',
+                 'time_to_interactive')
 
     def __init__(self, message_id, timestamp, url: str, referrer: str,
                  loaded: bool, request_start, response_start, response_end,
@@ -327,6 +357,7 @@ class PageEvent(Message):
 
 class InputEvent(Message):
     __id__ = 32
+    __slots__ = ('message_id', 'timestamp', 'value', 'value_masked', 'label')
 
     def __init__(self, message_id, timestamp, value: str, value_masked: bool, label: str):
         self.message_id = message_id
@@ -338,6 +369,7 @@ class InputEvent(Message):
 
 class ClickEvent(Message):
     __id__ = 33
+    __slots__ = ('message_id', 'timestamp', 'hesitation_time', 'label')
 
     def __init__(self, message_id, timestamp, hesitation_time, label: str):
         self.message_id = message_id
@@ -348,6 +380,7 @@ class ClickEvent(Message):
 
 class ErrorEvent(Message):
     __id__ = 34
+    __slots__ = ('message_id', 'timestamp', 'source', 'name', 'message', 'payload')
 
     def __init__(self, message_id, timestamp, source: str, name: str, message: str,
                  payload: str):
@@ -361,6 +394,8 @@ class ErrorEvent(Message):
 
 class ResourceEvent(Message):
     __id__ = 35
+    __slots__ = ('message_id', 'timestamp', 'duration', 'ttfb', 'header_size', 'encoded_body_size',
+                 'decoded_body_size', 'url', 'type', 'success', 'method', 'status')
 
     def __init__(self, message_id, timestamp, duration, ttfb, header_size, encoded_body_size,
                  decoded_body_size, url: str, type: str, success: bool, method: str, status):
@@ -380,6 +415,7 @@ class ResourceEvent(Message):
 
 class CustomEvent(Message):
     __id__ = 36
+    __slots__ = ('message_id', 'timestamp', 'name', 'payload')
 
     def __init__(self, message_id, timestamp, name: str, payload: str):
         self.message_id = message_id
@@ -390,6 +426,7 @@ class CustomEvent(Message):
 
 class CSSInsertRule(Message):
     __id__ = 37
+    __slots__ = ('id', 'rule', 'index')
 
     def __init__(self, id, rule: str, index):
         self.id = id
@@ -399,6 +436,7 @@ class CSSInsertRule(Message):
 
 class CSSDeleteRule(Message):
     __id__ = 38
+    __slots__ = ('id', 'index')
 
     def __init__(self, id, index):
         self.id = id
@@ -407,6 +445,7 @@ class CSSDeleteRule(Message):
 
 class Fetch(Message):
     __id__ = 39
+    __slots__ = ('method', 'url', 'request', 'response', 'status', 'timestamp', 'duration')
 
     def __init__(self, method: str, url: str, request: str, response: str, status,
                  timestamp, duration):
@@ -421,6 +460,7 @@ class Fetch(Message):
 
 class Profiler(Message):
     __id__ = 40
+    __slots__ = ('name', 'duration', 'args', 'result')
 
     def __init__(self, name: str, duration, args: str, result: str):
         self.name = name
@@ -431,6 +471,7 @@ class Profiler(Message):
 
 class OTable(Message):
     __id__ = 41
+    __slots__ = ('key', 'value')
 
     def __init__(self, key: str, value: str):
         self.key = key
@@ -439,6 +480,7 @@ class OTable(Message):
 
 class StateAction(Message):
     __id__ = 42
+    __slots__ = ('type',)
 
     def __init__(self, type: str):
         self.type = type
@@ -446,6 +488,7 @@ class StateAction(Message):
 
 class StateActionEvent(Message):
     __id__ = 43
+    __slots__ = ('message_id', 'timestamp', 'type')
 
     def __init__(self, message_id, timestamp, type: str):
         self.message_id = message_id
@@ -455,6 +498,7 @@ class StateActionEvent(Message):
 
 class Redux(Message):
     __id__ = 44
+    __slots__ = ('action', 'state', 'duration')
 
     def __init__(self, action: str, state: str, duration):
         self.action = action
@@ -464,6 +508,7 @@ class Redux(Message):
 
 class Vuex(Message):
     __id__ = 45
+    __slots__ = ('mutation', 'state')
 
     def __init__(self, mutation: str, state: str):
         self.mutation = mutation
@@ -472,6 +517,7 @@ class Vuex(Message):
 
 class MobX(Message):
     __id__ = 46
+    __slots__ = ('type', 'payload')
 
     def __init__(self, type: str, payload: str):
         self.type = type
@@ -480,6 +526,7 @@ class MobX(Message):
 
 class NgRx(Message):
     __id__ = 47
+    __slots__ = ('action', 'state', 'duration')
 
     def __init__(self, action: str, state: str, duration):
         self.action = action
@@ -489,6 +536,7 @@ class NgRx(Message):
 
 class GraphQL(Message):
     __id__ = 48
+    __slots__ = ('operation_kind', 'operation_name', 'variables', 'response')
 
     def __init__(self, operation_kind: str, operation_name: str,
                  variables: str, response: str):
@@ -500,6 +548,7 @@ class GraphQL(Message):
 
 class PerformanceTrack(Message):
     __id__ = 49
+    __slots__ = ('frames', 'ticks', 'total_js_heap_size', 'used_js_heap_size')
 
     def __init__(self, frames: int, ticks: int,
                  total_js_heap_size, used_js_heap_size):
@@ -511,6 +560,7 @@ class PerformanceTrack(Message):
 
 class GraphQLEvent(Message):
     __id__ = 50
+    __slots__ = ('message_id', 'timestamp', 'name')
 
     def __init__(self, message_id, timestamp, name: str):
         self.message_id = message_id
@@ -520,6 +570,7 @@ class GraphQLEvent(Message):
 
 class DomDrop(Message):
     __id__ = 52
+    __slots__ = ('timestamp',)
 
     def __init__(self, timestamp):
         self.timestamp = timestamp
@@ -527,6 +578,8 @@ class DomDrop(Message):
 
 class ResourceTiming(Message):
     __id__ = 53
+    __slots__ = ('timestamp', 'duration', 'ttfb', 'header_size', 'encoded_body_size',
+                 'decoded_body_size', 'url', 'initiator')
 
     def __init__(self, timestamp, duration, ttfb, header_size, encoded_body_size,
                  decoded_body_size, url, initiator):
@@ -542,6 +595,7 @@ class ResourceTiming(Message):
 
 class ConnectionInformation(Message):
     __id__ = 54
+    __slots__ = ('downlink', 'type')
 
     def __init__(self, downlink, type: str):
         self.downlink = downlink
@@ -550,6 +604,7 @@ class ConnectionInformation(Message):
 
 class SetPageVisibility(Message):
     __id__ = 55
+    __slots__ = ('hidden',)
 
     def __init__(self, hidden: bool):
         self.hidden = hidden
@@ -557,6 +612,10 @@ class SetPageVisibility(Message):
 
 class PerformanceTrackAggr(Message):
     __id__ = 56
+    __slots__ = ('timestamp_start', 'timestamp_end', 'min_fps', 'avg_fps', 'max_fps', 'min_cpu',
+                 'avg_cpu', 'max_cpu', 'min_total_js_heap_size', 'avg_total_js_heap_size',
+                 'max_total_js_heap_size', 'min_used_js_heap_size', 'avg_used_js_heap_size',
+                 'max_used_js_heap_size')
 
     def __init__(self, timestamp_start, timestamp_end, min_fps, avg_fps,
                  max_fps, min_cpu, avg_cpu, max_cpu,
@@ -582,6 +641,8 @@ class PerformanceTrackAggr(Message):
 
 class LongTask(Message):
     __id__ = 59
+    __slots__ = ('timestamp', 'duration', 'context', 'container_type', 'container_src',
+                 'container_id', 'container_name')
 
     def __init__(self, timestamp, duration, context, container_type, container_src: str,
                  container_id: str, container_name: str):
@@ -596,6 +657,7 @@ class LongTask(Message):
 
 class SetNodeURLBasedAttribute(Message):
     __id__ = 60
+    __slots__ = ('id', 'name', 'value', 'base_url')
 
     def __init__(self, id, name: str, value: str, base_url: str):
         self.id = id
@@ -606,6 +668,7 @@ class SetNodeURLBasedAttribute(Message):
 
 class SetStyleData(Message):
     __id__ = 61
+    __slots__ = ('id', 'data', 'base_url')
 
     def __init__(self, id, data: str, base_url: str):
         self.id = id
@@ -615,6 +678,7 @@ class SetStyleData(Message):
 
 class IssueEvent(Message):
     __id__ = 62
+    __slots__ = ('message_id', 'timestamp', 'type', 'context_string', 'context', 'payload')
 
     def __init__(self, message_id, timestamp, type: str, context_string: str,
                  context: str, payload: str):
@@ -628,6 +692,7 @@ class IssueEvent(Message):
 
 class TechnicalInfo(Message):
     __id__ = 63
+    __slots__ = ('type', 'value')
 
     def __init__(self, type: str, value: str):
         self.type = type
@@ -636,6 +701,7 @@ class TechnicalInfo(Message):
 
 class CustomIssue(Message):
     __id__ = 64
+    __slots__ = ('name', 'payload')
 
     def __init__(self, name: str, payload: str):
         self.name = name
@@ -644,10 +710,13 @@ class CustomIssue(Message):
 
 class PageClose(Message):
     __id__ = 65
+    __slots__ = ()
 
 
 class IOSSessionStart(Message):
     __id__ = 90
+    __slots__ = ('timestamp', 'project_id', 'tracker_version', 'rev_id', 'user_uuid', 'user_os',
+                 'user_os_version', 'user_device', 'user_device_type', 'user_country')
 
     def __init__(self, timestamp, project_id, tracker_version: str,
                  rev_id: str, user_uuid: str, user_os: str, user_os_version: str,
@@ -666,6 +735,7 @@ class IOSSessionStart(Message):
 
 class IOSSessionEnd(Message):
     __id__ = 91
+    __slots__ = ('timestamp',)
 
     def __init__(self, timestamp):
         self.timestamp = timestamp
@@ -673,6 +743,7 @@ class IOSSessionEnd(Message):
 
 class IOSMetadata(Message):
     __id__ = 92
+    __slots__ = ('timestamp', 'length', 'key', 'value')
 
     def __init__(self, timestamp, length, key: str, value: str):
         self.timestamp = timestamp
@@ -683,6 +754,7 @@ class IOSMetadata(Message):
 
 class IOSUserID(Message):
     __id__ = 94
+    __slots__ = ('timestamp', 'length', 'value')
 
     def __init__(self, timestamp, length, value: str):
         self.timestamp = timestamp
@@ -692,6 +764,7 @@ class IOSUserID(Message):
 
 class IOSUserAnonymousID(Message):
     __id__ = 95
+    __slots__ = ('timestamp', 'length', 'value')
 
     def __init__(self, timestamp, length, value: str):
         self.timestamp = timestamp
@@ -701,6 +774,7 @@ class IOSUserAnonymousID(Message):
 
 class IOSScreenLeave(Message):
     __id__ = 99
+    __slots__ = ('timestamp', 'length', 'title', 'view_name')
 
     def __init__(self, timestamp, length, title: str, view_name: str):
         self.timestamp = timestamp
@@ -711,6 +785,7 @@ class IOSScreenLeave(Message):
 
 class IOSLog(Message):
     __id__ = 103
+    __slots__ = ('timestamp', 'length', 'severity', 'content')
 
     def __init__(self, timestamp, length, severity: str, content: str):
         self.timestamp = timestamp
@@ -721,6 +796,7 @@ class IOSLog(Message):
 
 class IOSInternalError(Message):
     __id__ = 104
+    __slots__ = ('timestamp', 'length', 'content')
 
     def __init__(self, timestamp, length, content: str):
         self.timestamp = timestamp
@@ -730,6 +806,9 @@ class IOSInternalError(Message):
 
 class IOSPerformanceAggregated(Message):
     __id__ = 110
+    __slots__ = ('timestamp_start', 'timestamp_end', 'min_fps', 'avg_fps', 'max_fps', 'min_cpu',
+                 'avg_cpu', 'max_cpu', 'min_memory', 'avg_memory', 'max_memory', 'min_battery',
+                 'avg_battery', 'max_battery')
 
     def __init__(self, timestamp_start, timestamp_end, min_fps, avg_fps,
                  max_fps, min_cpu, avg_cpu, max_cpu,
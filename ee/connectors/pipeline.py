@@ -0,0 +1,419 @@
+import os
+import pickle
+import queue
+import threading
+import time
+from collections import deque
+from pathlib import Path
+
+from db.columnar import ColumnarBatch
+from db.writer import batch_to_df, insert_batch, insert_df
+from metrics import BATCH_SIZE, BATCHES_DROPPED, BATCHES_SPOOLED, INSERT_RETRIES, SPOOL_BYTES, WRITER_LAG
+
+
+class FlushPolicy:
+    """
+    Decides when a batch is flushed: once it reaches `batch_size` rows, or
+    once `linger` seconds passed since its first record, so that at low
+    traffic rows don't sit in memory and offsets still get committed.
+
+    With `adaptive` the size follows the measured inserts of the destination:
+    it shrinks when an insert takes longer than `target_latency` and grows
+    while inserts are fast and rows/s doesn't drop, within [min_size, max_size].
+    """
+
+    def __init__(self, name, batch_size, linger=60, adaptive=False,
+                 min_size=None, max_size=None, target_latency=5.0):
+        self.name = name
+        self.batch_size = batch_size
+        self.linger = linger
+        self.adaptive = adaptive
+        self.min_size = min_size or max(batch_size // 10, 1)
+        self.max_size = max_size or batch_size * 10
+        self.target_latency = target_latency
+        self._throughput = None
+        self._opened_at = None
+        BATCH_SIZE.labels(name).set(batch_size)
+
+    @classmethod
+    def from_env(cls, name, default_size):
+        """
+        Policy configured by the `{name}_batch_size`, `{name}_batch_linger`,
+        `{name}_min_batch_size`, `{name}_max_batch_size` environment variables,
+        `adaptive_batch_size` and `target_insert_seconds` are shared
+        """
+        env = os.environ
+        return cls(name,
+                   batch_size=int(env.get(f'{name}_batch_size', default_size)),
+                   linger=float(env.get(f'{name}_batch_linger', 60)),
+                   adaptive=env.get('adaptive_batch_size', 'false').lower() == 'true',
+                   min_size=int(env.get(f'{name}_min_batch_size', 0)) or None,
+                   max_size=int(env.get(f'{name}_max_batch_size', 0)) or None,
+                   target_latency=float(env.get('target_insert_seconds', 5)))
+
+    def touch(self, now=None):
+        """
+        Mark that records went into the batch, starts the linger timer
+        """
+        if self._opened_at is None:
+            self._opened_at = time.monotonic() if now is None else now
+
+    def should_flush(self, size, now=None) -> bool:
+        if size >= self.batch_size:
+            return True
+        if self._opened_at is None:
+            return False
+        now = time.monotonic() if now is None else now
+        return now - self._opened_at >= self.linger
+
+    def flushed(self):
+        self._opened_at = None
+
+    def record_insert(self, rows, seconds):
+        """
+        Feed the result of an insert of this policy's batches to the size controller
+        """
+        if not self.adaptive or rows == 0 or rows < self.batch_size // 2:
+            # lingered batches say nothing about the cost of a full one
+            return
+        throughput = rows / max(seconds, 1e-6)
+        size = self.batch_size
+        if seconds > self.target_latency:
+            size = int(size * 0.75)
+        elif seconds < self.target_latency / 2 and (self._throughput is None or throughput >= self._throughput * 0.95):
+            size = int(size * 1.25)
+        self._throughput = throughput
+        size = min(max(size, self.min_size), self.max_size)
+        if size != self.batch_size:
+            self.batch_size = size
+            BATCH_SIZE.labels(self.name).set(size)
+            print(f"{self.name} batch size set to {size}")
+
+
+class WriteError(Exception):
+    """
+    A batch could not be written after the allowed retries
+    """
+
+
+def write_dead_letter(path: Path, batch, table, level):
+    """
+    Pickle a batch the destination rejected for its data, durably, so it can be
+    inspected and loaded again
+    """
+    path.mkdir(parents=True, exist_ok=True)
+    file = path / f'{time.strftime("%Y%m%d%H%M%S")}-{table}-{level}-{time.monotonic_ns()}.pickle'
+    tmp = file.with_name(f'.{file.name}.tmp')
+    with open(tmp, 'wb') as f:
+        pickle.dump(batch, f, protocol=pickle.HIGHEST_PROTOCOL)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, file)
+    print(f"batch kept in {file}")
+
+
+class BatchWriter:
+    """
+    Inserts finished batches in submission order, by default on a background
+    thread so consuming and handling go on during slow warehouse inserts.
+
+    Every batch can carry the Kafka offsets it completes, and any state to
+    persist along with them. They are handed back by written() only once the
+    batch and all the batches submitted before it are written, so the consumer
+    never commits past data that is not in the warehouse. Batches with data
+    errors (TypeError, ValueError) are kept in `dead_letter_path` before their
+    offsets are handed back. Any other error is retried with backoff, up to
+    `max_retries` times: then the writer stops and `error` is set, its batch
+    and the following ones are consumed again after a restart.
+
+    With a `spool` (see spool.py) a batch the destination fails to take is
+    written to the spool instead and counts as written, so consumption goes
+    on while the destination is down, until the spool is full. Batches with
+    data errors are kept in the spool's rejected directory.
+    """
+
+    def __init__(self, db, max_pending=2, threaded=True, max_backoff=60, spool=None,
+                 max_retries=10, dead_letter_path='dead_letter'):
+        self.db = db
+        self.threaded = threaded
+        self.max_backoff = max_backoff
+        self.max_retries = max_retries
+        self.spool = spool
+        self.dead_letter_path = spool.rejected_path if spool is not None else Path(dead_letter_path)
+        if spool is not None:
+            spool.start(lambda df, table, level: insert_df(db, df, table, level))
+        self.retries = 0
+        self.dropped = 0
+        self.error = None
+        self._pending = queue.Queue(maxsize=max_pending)
+        self._written = queue.Queue()
+        # submission time of the batches not written yet, oldest first
+        self._submitted = deque()
+        self._thread = None
+        if threaded:
+            self._thread = threading.Thread(target=self._run, name=f"batch-writer-{db.config}", daemon=True)
+            self._thread.start()
+
+    def full(self) -> bool:
+        return self.threaded and self._pending.full()
+
+    def submit(self, batch, table, level, offsets=None, policy=None, state=None):
+        """
+        Queue a batch for insertion, blocks while the queue is full.
+        :param offsets: {TopicPartition: next offset to consume} covered by this batch
+        :param policy: FlushPolicy that gets the measured insert latency
+        :param state: returned with the offsets once the batch is written
+        """
+        item = (batch, table, level, offsets, policy, state)
+        self._submitted.append(time.monotonic())
+        if self.threaded:
+            self._put(item)
+        else:
+            self._write(*item)
+
+    def written(self) -> list:
+        """
+        (offsets, state) of the batches written since the last call, in submission order
+        """
+        written = []
+        while True:
+            try:
+                written.append(self._written.get_nowait())
+            except queue.Empty:
+                return written
+
+    def lag(self) -> float:
+        """
+        Seconds the oldest batch not written yet has been waiting
+        """
+        try:
+            return time.monotonic() - self._submitted[0]
+        except IndexError:
+            return 0.0
+
+    def stats(self) -> dict:
+        lag = self.lag()
+        WRITER_LAG.labels(self.db.config).set(lag)
+        stats = {'lag': round(lag, 1), 'queued': len(self._submitted),
+                 'retries': self.retries, 'dropped': self.dropped}
+        if self.spool is not None:
+            SPOOL_BYTES.labels(self.db.config).set(self.spool.size)
+            stats['spooled'] = len(self.spool)
+        return stats
+
+    def drain(self, interval=0.05):
+        """
+        Wait until the batches submitted so far are written, the writer stays open
+        """
+        while self._submitted:
+            if self.error is not None:
+                raise self.error
+            time.sleep(interval)
+
+    def close(self):
+        """
+        Wait until every submitted batch is written, or the writer stopped on an error
+        """
+        if self.threaded:
+            try:
+                self._put(None)
+            except WriteError:
+                pass
+            self._thread.join()
+        if self.spool is not None:
+            self.spool.close()
+
+    def _put(self, item):
+        # a writer stopped on an error doesn't take items anymore
+        while True:
+            if self.error is not None:
+                raise self.error
+            try:
+                self._pending.put(item, timeout=1)
+                return
+            except queue.Full:
+                pass
+
+    def _run(self):
+        while True:
+            item = self._pending.get()
+            if item is None:
+                return
+            try:
+                self._write(*item)
+            except WriteError as e:
+                print(repr(e))
+                self.error = e
+                return
+
+    def _write(self, batch, table, level, offsets, policy, state):
+        if self.spool is not None:
+            if len(batch):
+                self._write_or_spool(batch, table, level, policy)
+            if offsets:
+                self._written.put((offsets, state))
+            self._submitted.popleft()
+            return
+        backoff = 1
+        attempts = 0
+        while len(batch):
+            try:
+                print(f"inserting {len(batch)} rows into {table}...")
+                start = time.monotonic()
+                insert_batch(db=self.db, batch=batch, table=table, level=level)
+                if policy is not None:
+                    policy.record_insert(len(batch), time.monotonic() - start)
+                print("inserted succesfully")
+                break
+            except (TypeError, ValueError) as e:
+                self._drop(e, table, level, batch=batch)
+                break
+            except Exception as e:
+                print(repr(e))
+                attempts += 1
+                if self.max_retries and attempts > self.max_retries:
+                    raise WriteError(f"{self.db.config}: {len(batch)} rows for {table} "
+                                     f"not written after {attempts} attempts") from e
+                print(f"{self.db.config}: retrying in {backoff}s")
+                self.retries += 1
+                INSERT_RETRIES.labels(self.db.config).inc()
+                time.sleep(backoff)
+                backoff = min(backoff * 2, self.max_backoff)
+        if offsets:
+            self._written.put((offsets, state))
+        self._submitted.popleft()
+
+    def _drop(self, e, table, level, batch=None, df=None):
+        """
+        Keep a batch rejected for its data, the DataFrame in the spool or else the
+        batch in the dead letter directory, so that its offsets can be committed
+        """
+        print("Batch could not be converted or inserted, dropped")
+        print(repr(e))
+        try:
+            if df is not None:
+                self.spool.reject(df, table, level)
+            else:
+                write_dead_letter(self.dead_letter_path, batch, table, level)
+        except Exception as keep_error:
+            raise WriteError(f"{self.db.config}: rejected batch for {table} could not be kept") from keep_error
+        self.dropped += 1
+        BATCHES_DROPPED.labels(self.db.config).inc()
+
+    def _write_or_spool(self, batch, table, level, policy):
+        try:
+            df = batch_to_df(self.db, batch, level)
+        except (TypeError, ValueError) as e:
+            self._drop(e, table, level, batch=batch)
+            return
+        backoff = 1
+        while True:
+            # while the spool drains, batches queue behind it to stay in order
+            if self.spool.empty():
+                try:
+                    print(f"inserting {len(df)} rows into {table}...")
+                    start = time.monotonic()
+                    insert_df(self.db, df, table, level)
+                    if policy is not None:
+                        policy.record_insert(len(df), time.monotonic() - start)
+                    print("inserted succesfully")
+                    return
+                except (TypeError, ValueError) as e:
+                    self._drop(e, table, level, df=df)
+                    return
+                except Exception as e:
+                    print(repr(e))
+                    self.retries += 1
+                    INSERT_RETRIES.labels(self.db.config).inc()
+            if not self.spool.full():
+                self.spool.put(df, table, level)
+                BATCHES_SPOOLED.labels(self.db.config).inc()
+                print(f"{len(df)} rows for {table} spooled, {len(self.spool)} batches in the spool")
+                return
+            # the spool is full: hold the batch, the writer queue fills up and consumption pauses
+            print(f"{self.db.config}: spool full, retrying in {backoff}s")
+            time.sleep(backoff)
+            backoff = min(backoff * 2, self.max_backoff)
+
+
+class SlowestInsert:
+    """
+    Stands for the FlushPolicy of a batch inserted into several destinations,
+    which insert it concurrently: the policy gets the insert time of the
+    slowest one, once every destination inserted the batch. A batch some
+    destination did not insert, dropped or spooled, is not reported.
+    """
+
+    def __init__(self, policy, destinations, lock):
+        self.policy = policy
+        self._left = destinations
+        self._seconds = 0.0
+        self._lock = lock
+
+    def record_insert(self, rows, seconds):
+        with self._lock:
+            self._seconds = max(self._seconds, seconds)
+            self._left -= 1
+            if self._left == 0:
+                self.policy.record_insert(rows, self._seconds)
+
+
+class FanoutWriter:
+    """
+    Hands every batch to one BatchWriter per destination, so batches built by
+    a single decode pass are inserted into all of them concurrently.
+
+    Same interface as BatchWriter: the offsets and state of a batch are handed
+    back by written() once every destination wrote it. The slowest destination
+    holds back the commits, full() throttles consumption while any writer
+    queue is full and `error` is set once any writer stopped. The flush policy
+    of the batches follows the slowest destination too, see SlowestInsert.
+    """
+
+    def __init__(self, writers: dict):
+        """
+        :param writers: destination name -> BatchWriter
+        """
+        self.writers = writers
+        # (offsets, state) of the submitted batches, in submission order
+        self._pending = deque()
+        # batches with offsets each destination wrote and that are still in _pending
+        self._acked = {name: 0 for name in writers}
+        # the writer threads report the insert times of the batches under it
+        self._policy_lock = threading.Lock()
+
+    def full(self) -> bool:
+        return any(w.full() for w in self.writers.values())
+
+    @property
+    def error(self):
+        return next((w.error for w in self.writers.values() if w.error is not None), None)
+
+    def submit(self, batch, table, level, offsets=None, policy=None, state=None):
+        if isinstance(batch, ColumnarBatch):
+            batch.seal()
+        if offsets:
+            self._pending.append((offsets, state))
+        if policy is not None:
+            policy = SlowestInsert(policy, len(self.writers), self._policy_lock)
+        for writer in self.writers.values():
+            writer.submit(batch, table, level, offsets=offsets, policy=policy)
+
+    def written(self) -> list:
+        for name, writer in self.writers.items():
+            self._acked[name] += len(writer.written())
+        done = min(self._acked.values())
+        for name in self._acked:
+            self._acked[name] -= done
+        return [self._pending.popleft() for _ in range(done)]
+
+    def stats(self) -> dict:
+        return {name: writer.stats() for name, writer in self.writers.items()}
+
+    def drain(self):
+        for writer in self.writers.values():
+            writer.drain()
+
+    def close(self):
+        for writer in self.writers.values():
+            writer.close()
@@ -0,0 +1,95 @@
+"""
+Opt-in profiling of a running connector, enabled with `profiling=true`:
+
+- SIGUSR1 starts tracemalloc, the next SIGUSR1 writes the top allocations
+  and the snapshot (readable with tracemalloc.Snapshot.load) to `profile_dir`,
+  and so on; tracing keeps running between dumps.
+- SIGUSR2 samples the stacks of all threads every `profile_interval` seconds
+  for `profile_seconds` and writes them in the collapsed format of flame
+  graph tools (e.g. flamegraph.pl, speedscope) to `profile_dir`.
+
+Under the supervisor, send the signals to the supervisor, it forwards them to the workers.
+"""
+import os
+import signal
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+
+PROFILING = os.environ.get('profiling', 'false').lower() == 'true'
+PROFILE_DIR = os.environ.get('profile_dir', '/tmp')
+PROFILE_SECONDS = float(os.environ.get('profile_seconds', 30))
+PROFILE_INTERVAL = float(os.environ.get('profile_interval', 0.01))
+TRACEMALLOC_FRAMES = int(os.environ.get('tracemalloc_frames', 10))
+
+
+def _path(kind, extension):
+    return os.path.join(PROFILE_DIR, f"{kind}-{os.getpid()}-{time.strftime('%Y%m%d%H%M%S')}.{extension}")
+
+
+def dump_tracemalloc(limit=50):
+    snapshot = tracemalloc.take_snapshot()
+    path = _path('tracemalloc', 'txt')
+    with open(path, 'w') as f:
+        for stat in snapshot.statistics('traceback')[:limit]:
+            f.write(f"{stat.size / 1024:.1f} KiB in {stat.count} blocks\n")
+            for line in stat.traceback.format():
+                f.write(line + '\n')
+            f.write('\n')
+    snapshot.dump(path[:-len('txt')] + 'snapshot')
+    print(f"tracemalloc dumped to {path}")
+
+
+def sample_stacks(seconds, interval) -> Counter:
+    """
+    Count the stacks of the other threads, sampled every `interval` seconds
+    """
+    stacks = Counter()
+    me = threading.get_ident()
+    names = {t.ident: t.name for t in threading.enumerate()}
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        for ident, frame in sys._current_frames().items():
+            if ident == me:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                frame = frame.f_back
+            stack.append(names.get(ident, str(ident)))
+            stacks[';'.join(reversed(stack))] += 1
+        time.sleep(interval)
+    return stacks
+
+
+def profile(seconds=PROFILE_SECONDS, interval=PROFILE_INTERVAL):
+    stacks = sample_stacks(seconds, interval)
+    path = _path('profile', 'folded')
+    with open(path, 'w') as f:
+        for stack, count in stacks.most_common():
+            f.write(f"{stack} {count}\n")
+    print(f"profile of {seconds}s written to {path}")
+
+
+def _on_sigusr1(signum, frame):
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(TRACEMALLOC_FRAMES)
+        print("tracemalloc started, send SIGUSR1 again to dump the allocations")
+    else:
+        dump_tracemalloc()
+
+
+def _on_sigusr2(signum, frame):
+    threading.Thread(target=profile, name="profiler", daemon=True).start()
+
+
+def install():
+    """
+    Register the signal handlers when profiling is enabled, from the main thread
+    """
+    if PROFILING:
+        signal.signal(signal.SIGUSR1, _on_sigusr1)
+        signal.signal(signal.SIGUSR2, _on_sigusr2)
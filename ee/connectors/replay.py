@@ -0,0 +1,115 @@
+"""
+Replay of recorded or generated message streams, so the connector can run and
+be benchmarked without Kafka.
+
+A replay file is a sequence of records, each one a little endian header with
+the session id (uint64) and the payload length (uint32), followed by the
+encoded message, as found in the Kafka record key and value.
+"""
+import mmap
+import struct
+from collections import namedtuple
+
+from kafka.structs import TopicPartition
+
+RECORD_HEADER = struct.Struct('<QI')
+_LENGTH = struct.Struct('<I')
+
+ReplayRecord = namedtuple('ReplayRecord', ('topic', 'partition', 'offset', 'key', 'value'))
+
+
+def write_record(f, session_id: int, payload: bytes):
+    f.write(RECORD_HEADER.pack(session_id, len(payload)))
+    f.write(payload)
+
+
+class ReplaySource:
+    """
+    Reads a replay file through mmap, with the subset of the KafkaConsumer
+    interface used by the consumer loop. Records are served as one partition
+    of `topic`, the offset of a record is its index in the file. Values are
+    memoryviews over the mapping, so no key or payload is copied.
+    """
+
+    def __init__(self, path, topic='replay'):
+        self.path = path
+        self.tp = TopicPartition(topic, 0)
+        self._file = open(path, 'rb')
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mmap)
+        # position in the file and offset of the next record
+        self._pos = 0
+        self._offset = 0
+        self._paused = False
+        self.committed = {}
+
+    @property
+    def exhausted(self) -> bool:
+        return self._pos >= len(self._mmap)
+
+    def subscribe(self, topics=None, listener=None):
+        if listener is not None:
+            listener.on_partitions_assigned({self.tp})
+
+    def assignment(self) -> set:
+        return {self.tp}
+
+    def pause(self, *partitions):
+        self._paused = True
+
+    def resume(self, *partitions):
+        self._paused = False
+
+    def paused(self) -> set:
+        return {self.tp} if self._paused else set()
+
+    def seek(self, partition, offset):
+        """
+        Move to the record at `offset`, records are scanned from the start of the file
+        """
+        self._pos = self._offset = 0
+        while self._offset < offset and not self.exhausted:
+            _, length = RECORD_HEADER.unpack_from(self._mmap, self._pos)
+            self._pos += RECORD_HEADER.size + length
+            self._offset += 1
+
+    def poll(self, timeout_ms=0, max_records=500) -> dict:
+        if self._paused or self.exhausted:
+            return {}
+        view = self._view
+        end = len(view)
+        unpack_length = _LENGTH.unpack_from
+        pos = self._pos
+        offset = self._offset
+        topic = self.tp.topic
+        records = []
+        append = records.append
+        for _ in range(max_records):
+            if pos >= end:
+                break
+            # the key is the session id as stored in the header, little endian
+            value_pos = pos + RECORD_HEADER.size
+            value_end = value_pos + unpack_length(view, pos + 8)[0]
+            append(ReplayRecord(topic, 0, offset, view[pos:pos + 8], view[value_pos:value_end]))
+            pos = value_end
+            offset += 1
+        self._pos = pos
+        self._offset = offset
+        return {self.tp: records}
+
+    def highwater(self, partition):
+        # unknown until the whole file is scanned
+        return None
+
+    def commit(self, offsets=None):
+        for tp, offset_and_metadata in (offsets or {}).items():
+            self.committed[tp] = offset_and_metadata.offset
+
+    def close(self, autocommit=False):
+        self._view.release()
+        try:
+            self._mmap.close()
+        except BufferError:
+            # records still referenced, the mapping goes away with them
+            pass
+        self._file.close()
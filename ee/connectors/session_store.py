@@ -0,0 +1,135 @@
+import json
+import os
+import sys
+import time
+from collections import OrderedDict
+
+
+class SessionStore:
+    """
+    In-flight sessions by session id, bounded by `capacity` and by an idle
+    `ttl` in seconds, so sessions that never get a SessionEnd don't stay in
+    memory forever.
+
+    Evicted sessions are kept until pop_evicted() so the caller can flush them
+    as partial sessions, or, with `spill_path`, appended to that file as JSON
+    lines instead. With `track_changes` the ids of the sessions put, popped or
+    evicted are collected for pop_changed(), e.g. to checkpoint them.
+    """
+
+    def __init__(self, capacity=100000, ttl=3600, spill_path=None, track_changes=False):
+        self.capacity = capacity
+        self.ttl = ttl
+        self.spill_path = spill_path
+        self.track_changes = track_changes
+        self._changed = set()
+        # session id -> (session, last update), least recently updated first
+        self._sessions = OrderedDict()
+        self._evicted = []
+        self.evictions = {'ttl': 0, 'capacity': 0}
+
+    @classmethod
+    def from_env(cls, track_changes=False, worker=None):
+        spill_path = os.environ.get('sessions_spill_path') or None
+        if spill_path and worker is not None:
+            spill_path = f'{spill_path}.{worker}'
+        return cls(capacity=int(os.environ.get('sessions_capacity', 100000)),
+                   ttl=float(os.environ.get('sessions_ttl', 3600)),
+                   spill_path=spill_path,
+                   track_changes=track_changes)
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def __contains__(self, session_id):
+        return session_id in self._sessions
+
+    def get(self, session_id):
+        entry = self._sessions.get(session_id)
+        return entry[0] if entry is not None else None
+
+    def put(self, session_id, session, now=None):
+        now = time.monotonic() if now is None else now
+        self._sessions[session_id] = (session, now)
+        self._sessions.move_to_end(session_id)
+        if self.track_changes:
+            self._changed.add(session_id)
+        while len(self._sessions) > self.capacity:
+            session_id, (evicted, _) = self._sessions.popitem(last=False)
+            self._evict(session_id, evicted, 'capacity')
+
+    def pop(self, session_id):
+        entry = self._sessions.pop(session_id, None)
+        if entry is None:
+            return None
+        if self.track_changes:
+            self._changed.add(session_id)
+        return entry[0]
+
+    def expire(self, now=None):
+        """
+        Evict the sessions without updates for longer than the ttl
+        """
+        now = time.monotonic() if now is None else now
+        deadline = now - self.ttl
+        while self._sessions:
+            session_id, (session, updated_at) = next(iter(self._sessions.items()))
+            if updated_at > deadline:
+                break
+            del self._sessions[session_id]
+            self._evict(session_id, session, 'ttl')
+
+    def memory_per_session(self, sample=100) -> float:
+        """
+        Approximate bytes held per session, from about `sample` of them: the
+        session, its attributes and the items of its lists, counting objects
+        shared between sessions (e.g. interned strings) once
+        """
+        if not self._sessions:
+            return 0.
+        step = max(len(self._sessions) // sample, 1)
+        seen = set()
+        size = 0
+        sampled = 0
+        for i, (session, _) in enumerate(self._sessions.values()):
+            if i % step:
+                continue
+            sampled += 1
+            objects = [session]
+            attributes = getattr(session, '__dict__', {})
+            objects.append(attributes)
+            for value in attributes.values():
+                objects.append(value)
+                if isinstance(value, list):
+                    objects.extend(value)
+            for o in objects:
+                if id(o) not in seen:
+                    seen.add(id(o))
+                    size += sys.getsizeof(o)
+        return size / sampled
+
+    def pop_evicted(self) -> list:
+        """
+        Sessions evicted since the last call, empty when they are spilled to a file
+        """
+        evicted, self._evicted = self._evicted, []
+        if self.spill_path and evicted:
+            self._spill(evicted)
+            return []
+        return evicted
+
+    def pop_changed(self) -> set:
+        changed, self._changed = self._changed, set()
+        return changed
+
+    def _evict(self, session_id, session, reason):
+        self.evictions[reason] += 1
+        self._evicted.append(session)
+        if self.track_changes:
+            self._changed.add(session_id)
+
+    def _spill(self, sessions):
+        with open(self.spill_path, 'a') as f:
+            for session in sessions:
+                row = {k: v for k, v in vars(session).items() if not k.startswith('_')}
+                f.write(json.dumps(row, default=str) + '\n')
@@ -0,0 +1,172 @@
+"""
+Local spool of the batches a destination could not take. Batches are kept
+as Arrow IPC segments, one per batch, and a background thread loads them
+back in order once the destination recovers.
+"""
+import os
+import threading
+import time
+from collections import deque
+from pathlib import Path
+
+import pyarrow as pa
+
+SEGMENT_SUFFIX = '.arrow'
+
+
+def _fsync_dir(path: Path):
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def write_segment(path: Path, df, table: str, level: str):
+    """
+    Write a batch DataFrame with the table and level it goes to, durably
+    """
+    data = pa.Table.from_pandas(df, preserve_index=False)
+    data = data.replace_schema_metadata({**(data.schema.metadata or {}),
+                                         b'connector_table': table.encode(),
+                                         b'connector_level': level.encode()})
+    tmp = path.with_name(f'.{path.name}.tmp')
+    with open(tmp, 'wb') as f:
+        with pa.ipc.new_file(f, data.schema, options=pa.ipc.IpcWriteOptions(compression='zstd')) as writer:
+            writer.write_table(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    _fsync_dir(path.parent)
+
+
+def read_segment(path: Path) -> tuple:
+    """
+    :return: (DataFrame, table, level) of a segment
+    """
+    with pa.memory_map(str(path)) as source:
+        data = pa.ipc.open_file(source).read_all()
+    metadata = data.schema.metadata
+    df = data.to_pandas()
+    # lists come back as numpy arrays, the loaders expect lists
+    for field in data.schema:
+        if pa.types.is_list(field.type):
+            df[field.name] = df[field.name].map(lambda v: list(v) if v is not None else None)
+    return df, metadata[b'connector_table'].decode(), metadata[b'connector_level'].decode()
+
+
+class Spool:
+    """
+    Ordered on-disk queue of batches waiting for a destination, bounded by
+    `max_bytes`. Segments left by a previous run are drained first.
+
+    While the spool is not empty new batches are appended to it rather than
+    inserted, so the destination receives the batches in consumption order.
+    Batches the destination rejects for their data are moved to `rejected/`
+    to be inspected, instead of being lost.
+    """
+
+    def __init__(self, path, max_bytes=1 << 30, max_backoff=300):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.max_backoff = max_backoff
+        self.rejected_path = self.path / 'rejected'
+        self.rejected_path.mkdir(parents=True, exist_ok=True)
+        # (path, size) of the segments, oldest first
+        self._segments = deque((p, p.stat().st_size) for p in sorted(self.path.glob(f'*{SEGMENT_SUFFIX}')))
+        self._bytes = sum(size for _, size in self._segments)
+        self._seq = int(self._segments[-1][0].stem) + 1 if self._segments else 0
+        self._cond = threading.Condition()
+        self._closing = False
+        self._thread = None
+        if self._segments:
+            print(f"{len(self._segments)} batches to drain from {self.path}")
+
+    @classmethod
+    def from_env(cls, destination, worker=None):
+        """
+        Spool of `destination` under `spool_path`, None when spooling is off
+        """
+        path = os.environ.get('spool_path')
+        if not path:
+            return None
+        path = os.path.join(path, destination if worker is None else f'{destination}.{worker}')
+        return cls(path, max_bytes=int(os.environ.get('spool_max_bytes', 1 << 30)),
+                   max_backoff=float(os.environ.get('spool_max_backoff', 300)))
+
+    def __len__(self):
+        return len(self._segments)
+
+    @property
+    def size(self) -> int:
+        return self._bytes
+
+    def empty(self) -> bool:
+        return not self._segments
+
+    def full(self) -> bool:
+        return self._bytes >= self.max_bytes
+
+    def put(self, df, table, level):
+        with self._cond:
+            path = self.path / f'{self._seq:012d}{SEGMENT_SUFFIX}'
+            self._seq += 1
+            write_segment(path, df, table, level)
+            size = path.stat().st_size
+            self._segments.append((path, size))
+            self._bytes += size
+            self._cond.notify()
+
+    def reject(self, df, table, level):
+        path = self.rejected_path / f'{time.strftime("%Y%m%d%H%M%S")}-{table}-{level}{SEGMENT_SUFFIX}'
+        write_segment(path, df, table, level)
+        print(f"batch kept in {path}")
+
+    def start(self, insert):
+        """
+        Drain the spool in the background
+        :param insert: callable(df, table, level) loading a batch into the destination
+        """
+        self._thread = threading.Thread(target=self._drain, args=(insert,),
+                                        name=f"spool-{self.path.name}", daemon=True)
+        self._thread.start()
+
+    def close(self):
+        """
+        Stop draining, the remaining segments are drained by the next run
+        """
+        with self._cond:
+            self._closing = True
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _drain(self, insert):
+        backoff = 1
+        while True:
+            with self._cond:
+                while not self._segments and not self._closing:
+                    self._cond.wait()
+                if self._closing:
+                    return
+                path, size = self._segments[0]
+            try:
+                df, table, level = read_segment(path)
+                insert(df, table, level)
+            except (TypeError, ValueError) as e:
+                print(repr(e))
+                os.replace(path, self.rejected_path / path.name)
+                print(f"batch rejected by the destination, moved to {self.rejected_path}")
+            except Exception as e:
+                print(repr(e))
+                print(f"{len(self._segments)} batches spooled in {self.path}, retrying in {backoff}s")
+                with self._cond:
+                    self._cond.wait(backoff)
+                backoff = min(backoff * 2, self.max_backoff)
+                continue
+            else:
+                path.unlink()
+            backoff = 1
+            with self._cond:
+                self._segments.popleft()
+                self._bytes -= size
@@ -48,7 +48,8 @@ CREATE TABLE IF NOT EXISTS connector_events
     customissue_name                   Nullable(String),
     customissue_payload                Nullable(String),
     received_at                        UInt64,
-    batch_order_number                 UInt64
+    batch_order_number                 UInt64,
+    event_key                          Nullable(UInt64)
 ) ENGINE = MergeTree()
 PARTITION BY intDiv(received_at, 100000)
 ORDER BY (received_at, batch_order_number, sessionid)
@@ -48,5 +48,6 @@ CREATE TABLE IF NOT EXISTS connector_events_buffer
     customissue_name                   Nullable(String),
     customissue_payload                Nullable(String),
     received_at                        UInt64,
-    batch_order_number                 UInt64
+    batch_order_number                 UInt64,
+    event_key                          Nullable(UInt64)
 ) ENGINE = Buffer(default, connector_events, 16, 10, 120, 10000, 1000000, 10000, 100000000);
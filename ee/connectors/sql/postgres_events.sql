@@ -48,5 +48,6 @@ CREATE TABLE IF NOT EXISTS connector_events
     customissue_name                   text,
     customissue_payload                text,
     received_at                        bigint,
-    batch_order_number                 bigint
+    batch_order_number                 bigint,
+    event_key                          bigint
 );
\ No newline at end of file
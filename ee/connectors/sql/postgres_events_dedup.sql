@@ -0,0 +1,2 @@
+-- for dedup=true, the loads skip the events already in the table (ON CONFLICT DO NOTHING)
+CREATE UNIQUE INDEX IF NOT EXISTS connector_events_event_key ON connector_events (event_key);
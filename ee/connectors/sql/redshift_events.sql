@@ -48,5 +48,6 @@ CREATE TABLE connector_events
     customissue_name                   VARCHAR(300),
     customissue_payload                VARCHAR(300),
     received_at                        BIGINT,
-    batch_order_number                 BIGINT
+    batch_order_number                 BIGINT,
+    event_key                          BIGINT
 );
\ No newline at end of file
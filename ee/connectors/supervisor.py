@@ -0,0 +1,173 @@
+"""
+Runs the connector as `workers` processes, each with its own KafkaConsumer in
+the same consumer group, session store and loaders, so the partitions of the
+topics are spread over several cores instead of one GIL-bound loop.
+
+    workers=4 python supervisor.py
+"""
+import multiprocessing
+import os
+import queue
+import shutil
+import signal
+import tempfile
+import time
+
+import profiling
+
+
+def run_worker(index, stats_queue, stop):
+    # the supervisor handles the signals and asks the workers to stop through `stop`
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+    # lets per process resources, like the redshift staging area, tell the workers apart
+    os.environ['connector_worker'] = str(index)
+    # imported here so each worker sets up its own connections
+    from consumer import main
+    main(worker=index, stats_queue=stats_queue, stop=stop)
+
+
+def aggregate(stats: dict) -> dict:
+    """
+    Totals of the last stats reported by every worker
+    """
+    total = {'workers': len(stats), 'partitions': 0, 'sessions': 0,
+             'consumed': 0, 'decoded': 0, 'events': 0, 'writers': {}}
+    for s in stats.values():
+        for key in ('partitions', 'sessions', 'consumed', 'decoded', 'events'):
+            total[key] += s[key]
+        for name, w in s['writers'].items():
+            t = total['writers'].setdefault(name, {'lag': 0, 'queued': 0, 'retries': 0, 'dropped': 0})
+            t['lag'] = max(t['lag'], w['lag'])
+            for key in ('queued', 'retries', 'dropped'):
+                t[key] += w[key]
+    return total
+
+
+class Supervisor:
+    """
+    Starts the workers, restarts the ones that die, collects their stats and
+    stops them on SIGTERM/SIGINT. A stopping worker writes and commits its
+    batches in progress and leaves the group, the remaining workers get its
+    partitions. Its sessions still open are kept only by the checkpoint.
+    """
+
+    def __init__(self, workers, metrics_interval=10, shutdown_timeout=120, restart_delay=5):
+        self.workers = workers
+        self.metrics_interval = metrics_interval
+        self.shutdown_timeout = shutdown_timeout
+        self.restart_delay = restart_delay
+        # spawn: workers don't inherit the connections and threads of this process
+        self._context = multiprocessing.get_context('spawn')
+        self._stats_queue = self._context.Queue()
+        self._stop = self._context.Event()
+        self._processes = {}
+        self._stats = {}
+
+    @classmethod
+    def from_env(cls):
+        return cls(workers=int(os.environ.get('workers', os.cpu_count() or 1)),
+                   metrics_interval=float(os.environ.get('metrics_interval', 10)),
+                   shutdown_timeout=float(os.environ.get('shutdown_timeout', 120)))
+
+    def _start(self, index):
+        process = self._context.Process(target=run_worker, name=f'connector-worker-{index}',
+                                        args=(index, self._stats_queue, self._stop))
+        # a worker inherits ignored signals, so a forwarded profiling trigger
+        # can't kill it before it installs the handlers
+        handlers = {signum: signal.signal(signum, signal.SIG_IGN) for signum in (signal.SIGUSR1, signal.SIGUSR2)}
+        try:
+            process.start()
+        finally:
+            for signum, handler in handlers.items():
+                signal.signal(signum, handler)
+        self._processes[index] = process
+        print(f"worker {index} started, pid {process.pid}")
+
+    def _collect(self, timeout):
+        try:
+            stats = self._stats_queue.get(timeout=timeout)
+        except queue.Empty:
+            return
+        self._stats[stats['worker']] = stats
+        while True:
+            try:
+                stats = self._stats_queue.get_nowait()
+            except queue.Empty:
+                return
+            self._stats[stats['worker']] = stats
+
+    def _handle_signal(self, signum, frame):
+        print(f"received signal {signum}, stopping the workers")
+        self._stop.set()
+
+    def _forward_signal(self, signum, frame):
+        # profiling triggers, see profiling.py
+        for process in self._processes.values():
+            if process.is_alive():
+                os.kill(process.pid, signum)
+
+    def _serve_metrics(self):
+        """
+        Workers write their prometheus metrics to PROMETHEUS_MULTIPROC_DIR, which
+        must be set before they start, the supervisor serves the aggregation
+        """
+        port = os.environ.get('metrics_port')
+        if not port:
+            return
+        path = os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', tempfile.mkdtemp(prefix='connector-metrics-'))
+        # values of previous runs would be added to the new ones
+        shutil.rmtree(path, ignore_errors=True)
+        os.makedirs(path)
+        from prometheus_client import CollectorRegistry, multiprocess, start_http_server
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        start_http_server(int(port), registry=registry)
+
+    def _mark_dead(self, process):
+        if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+            from prometheus_client import multiprocess
+            multiprocess.mark_process_dead(process.pid)
+
+    def run(self):
+        signal.signal(signal.SIGTERM, self._handle_signal)
+        signal.signal(signal.SIGINT, self._handle_signal)
+        if profiling.PROFILING:
+            # without profiling the workers have no handlers, the signals would kill them
+            signal.signal(signal.SIGUSR1, self._forward_signal)
+            signal.signal(signal.SIGUSR2, self._forward_signal)
+        self._serve_metrics()
+        for index in range(self.workers):
+            self._start(index)
+        reported_at = time.monotonic()
+        while not self._stop.is_set():
+            self._collect(timeout=1)
+            for index, process in list(self._processes.items()):
+                if process.is_alive() or self._stop.is_set():
+                    continue
+                print(f"worker {index} exited with code {process.exitcode}, "
+                      f"restarting in {self.restart_delay}s")
+                self._stats.pop(index, None)
+                self._mark_dead(process)
+                time.sleep(self.restart_delay)
+                self._start(index)
+            if time.monotonic() - reported_at >= self.metrics_interval:
+                reported_at = time.monotonic()
+                print("connector stats:", aggregate(self._stats))
+        self.shutdown()
+
+    def shutdown(self):
+        deadline = time.monotonic() + self.shutdown_timeout
+        # keep reading the stats, a worker can't exit while its queue has unread items
+        while time.monotonic() < deadline and any(p.is_alive() for p in self._processes.values()):
+            self._collect(timeout=0.5)
+        for index, process in self._processes.items():
+            if process.is_alive():
+                print(f"worker {index} did not stop in time, terminating it")
+                process.terminate()
+            process.join()
+        print("connector stopped:", aggregate(self._stats))
+
+
+if __name__ == '__main__':
+    Supervisor.from_env().run()
@@ -0,0 +1,11 @@
+import sys
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from google.oauth2.service_account import Credentials  # noqa: E402
+
+# bigquery_loader reads the service account file at import
+with mock.patch.object(Credentials, 'from_service_account_file'):
+    import db.loaders.bigquery_loader  # noqa: E402,F401
@@ -0,0 +1,207 @@
+import atexit
+from types import SimpleNamespace
+
+import pandas as pd
+import pyarrow.parquet as pq
+import pytest
+from google.api_core.exceptions import AlreadyExists, BadRequest, Conflict, ServiceUnavailable
+from google.cloud import bigquery
+
+from db.loaders.bigquery_loader import StagedLoader, StorageWriteLoader
+
+TABLE = 'connector_events'
+SCHEMA = [bigquery.SchemaField('sessionid', 'INTEGER'), bigquery.SchemaField('label', 'STRING')]
+
+
+class FakeJob:
+
+    def __init__(self, error=None, lose_response=False):
+        self.state = 'DONE'
+        self.error_result = {'reason': 'invalid', 'message': error} if error else None
+        self.lose_response = lose_response
+
+    def result(self):
+        if self.lose_response:
+            self.lose_response = False
+            raise ServiceUnavailable('response lost')
+        if self.error_result:
+            raise BadRequest(self.error_result['message'])
+
+
+class FakeClient:
+    """
+    Load jobs of BigQuery: job ids are unique, a job fails when a row is labeled 'bad'
+    """
+    project = 'project'
+
+    def __init__(self):
+        self.rows = []
+        self.jobs = {}
+        self.lose_response = False
+        self.unavailable = False
+
+    def get_table(self, table_id):
+        return SimpleNamespace(schema=SCHEMA)
+
+    def load_table_from_file(self, buffer, table_id, rewind, job_id, job_config):
+        if self.unavailable:
+            raise ServiceUnavailable('unavailable')
+        if job_id in self.jobs:
+            raise Conflict(f'Already Exists: Job {job_id}')
+        buffer.seek(0)
+        rows = pq.read_table(buffer).to_pylist()
+        if any(r['label'] == 'bad' for r in rows):
+            job = FakeJob(error='Error while reading data')
+        else:
+            self.rows.extend(rows)
+            job = FakeJob(lose_response=self.lose_response)
+        self.jobs[job_id] = job
+        return job
+
+    def get_job(self, job_id):
+        return self.jobs[job_id]
+
+
+def batch(start, rows=10, label='ok'):
+    return pd.DataFrame({'sessionid': pd.array(range(start, start + rows), dtype='Int64'),
+                         'label': [label] * rows})
+
+
+def staged_files(path):
+    return sorted(p.name for p in (path / TABLE).glob('part-*.parquet'))
+
+
+@pytest.fixture
+def client():
+    return FakeClient()
+
+
+def loader(client, path, **kwargs):
+    kwargs = {'load_rows': 30, 'load_interval': float('inf'), **kwargs}
+    staged = StagedLoader(client, 'dataset', path, **kwargs)
+    atexit.unregister(staged.flush)
+    return staged
+
+
+def test_batches_loaded_with_one_job(client, tmp_path):
+    staged = loader(client, tmp_path)
+    for i in range(3):
+        staged.insert(batch(i * 10), TABLE)
+    assert len(client.jobs) == 1
+    assert [r['sessionid'] for r in client.rows] == list(range(30))
+    assert staged_files(tmp_path) == []
+
+
+def test_load_due_after_interval(client, tmp_path):
+    staged = loader(client, tmp_path, load_rows=1000, load_interval=0)
+    staged.insert(batch(0), TABLE)
+    assert len(client.rows) == 10
+
+
+def test_failed_job_keeps_files_staged(client, tmp_path):
+    staged = loader(client, tmp_path)
+    client.unavailable = True
+    for i in range(3):
+        staged.insert(batch(i * 10), TABLE)
+    assert client.rows == [] and len(staged_files(tmp_path)) == 3
+    client.unavailable = False
+    staged.flush()
+    assert len(client.rows) == 30 and staged_files(tmp_path) == []
+
+
+def test_files_left_by_previous_run_loaded_at_start(client, tmp_path):
+    loader(client, tmp_path, load_rows=1000).insert(batch(0), TABLE)
+    loader(client, tmp_path).insert(batch(0, rows=0), TABLE)
+    assert len(client.rows) == 10 and staged_files(tmp_path) == []
+
+
+def test_lost_job_response_not_loaded_twice(client, tmp_path):
+    staged = loader(client, tmp_path)
+    client.lose_response = True
+    for i in range(3):
+        staged.insert(batch(i * 10), TABLE)
+    client.lose_response = False
+    # staged after the job, not part of its retry
+    staged.insert(batch(30), TABLE)
+    staged.flush()
+    staged.flush()
+    assert sorted(r['sessionid'] for r in client.rows) == list(range(40))
+    assert staged_files(tmp_path) == []
+
+
+def test_lost_job_response_not_loaded_twice_after_restart(client, tmp_path):
+    staged = loader(client, tmp_path)
+    client.lose_response = True
+    for i in range(3):
+        staged.insert(batch(i * 10), TABLE)
+    client.lose_response = False
+    staged.stage(batch(30), TABLE)
+    restarted = loader(client, tmp_path)
+    restarted.insert(batch(40), TABLE)
+    restarted.flush()
+    assert sorted(r['sessionid'] for r in client.rows) == list(range(50))
+    assert staged_files(tmp_path) == []
+
+
+def test_bad_file_quarantined(client, tmp_path):
+    staged = loader(client, tmp_path, max_failures=2)
+    staged.insert(batch(0), TABLE)
+    staged.insert(batch(10, label='bad'), TABLE)
+    staged.insert(batch(20), TABLE)
+    assert sorted(r['sessionid'] for r in client.rows) == list(range(0, 10)) + list(range(20, 30))
+    assert len(staged_files(tmp_path)) == 1
+    staged.flush()
+    assert staged_files(tmp_path) == []
+    assert len(list((tmp_path / TABLE / 'errors').glob('part-*.parquet'))) == 1
+    assert len(client.rows) == 20
+
+
+class FakeWriteClient:
+
+    def __init__(self):
+        self.rows = 0
+
+    def table_path(self, project, dataset, table):
+        return f'projects/{project}/datasets/{dataset}/tables/{table}'
+
+    def create_write_stream(self, parent, write_stream):
+        return SimpleNamespace(name=f'{parent}/streams/0')
+
+
+class FakeAppendRowsStream:
+    """
+    Appends at the stream offset, the response of the next append is lost once `lose_response` is set
+    """
+    lose_response = False
+
+    def __init__(self, client, template):
+        self.client = client
+
+    def send(self, request):
+        future = SimpleNamespace()
+        if request.offset < self.client.rows:
+            future.result = lambda: (_ for _ in ()).throw(AlreadyExists('offset already written'))
+        else:
+            self.client.rows += request.arrow_rows.rows.row_count
+            lost = FakeAppendRowsStream.lose_response
+            FakeAppendRowsStream.lose_response = False
+            future.result = lambda: (_ for _ in ()).throw(ServiceUnavailable('response lost')) if lost else None
+        return future
+
+    def close(self):
+        pass
+
+
+def test_append_retried_after_lost_response_not_written_twice(client, monkeypatch):
+    from google.cloud.bigquery_storage_v1 import writer
+
+    monkeypatch.setattr(writer, 'AppendRowsStream', FakeAppendRowsStream)
+    write_client = FakeWriteClient()
+    storage = StorageWriteLoader(client, write_client, 'dataset')
+    storage.insert(batch(0), TABLE)
+    FakeAppendRowsStream.lose_response = True
+    with pytest.raises(ServiceUnavailable):
+        storage.insert(batch(10), TABLE)
+    storage.insert(batch(10), TABLE)
+    storage.insert(batch(20), TABLE)
+    assert write_client.rows == 30
@@ -0,0 +1,203 @@
+import atexit
+import csv
+import gzip
+import io
+import json
+import re
+from types import SimpleNamespace
+
+import boto3
+import pandas as pd
+import psycopg2
+import pyarrow.parquet as pq
+import pytest
+from moto import mock_aws
+
+from db.loaders.redshift_loader import ManifestLoader
+
+BUCKET = 'connector-bucket'
+PREFIX = 'sub/staging/connector-0'
+TABLE = 'connector_events'
+COLUMNS = {TABLE: [('sessionid', 'bigint'), ('label', 'character varying')]}
+
+
+class FakeRedshift:
+    """
+    COPY reads the parts of the manifest from S3 and fails on a row labeled 'bad',
+    the loads table is kept in a set, both only once the transaction commits
+    """
+
+    def __init__(self, s3):
+        self.s3 = s3
+        self.rows = []
+        self.loads = set()
+        self.down = False
+
+    def raw_connection(self):
+        return FakeConnection(self)
+
+    def copy(self, query):
+        manifest_key = re.search(rf"FROM 's3://{BUCKET}/(\S+)'", query).group(1)
+        manifest = json.loads(self.s3.get_object(Bucket=BUCKET, Key=manifest_key)['Body'].read())
+        rows = []
+        for entry in manifest['entries']:
+            body = self.s3.get_object(Bucket=BUCKET, Key=entry['url'].split('/', 3)[3])['Body'].read()
+            if 'PARQUET' in query:
+                rows.extend(pq.read_table(io.BytesIO(body)).to_pylist())
+            else:
+                rows.extend({'sessionid': int(sessionid), 'label': label}
+                            for sessionid, label in csv.reader(io.StringIO(gzip.decompress(body).decode())))
+        if any(r['label'] == 'bad' for r in rows):
+            raise psycopg2.InternalError('Load into table failed, check stl_load_errors')
+        return rows
+
+
+class FakeConnection:
+
+    def __init__(self, db):
+        self.db = db
+        self.rows = []
+        self.loaded = set()
+        self.forgotten = set()
+        self.result = []
+
+    def cursor(self):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+    def execute(self, query):
+        if self.db.down:
+            raise psycopg2.OperationalError('could not connect to server')
+        keys = re.findall(r"'([^']+)'", query)
+        if query.startswith('COPY'):
+            self.rows.extend(self.db.copy(query))
+        elif query.startswith('INSERT'):
+            self.loaded.update(keys)
+        elif query.startswith('DELETE'):
+            self.forgotten.update(keys)
+        elif query.startswith('SELECT'):
+            self.result = [(key,) for key in keys if key in self.db.loads]
+
+    def fetchall(self):
+        return self.result
+
+    def commit(self):
+        self.db.rows.extend(self.rows)
+        self.db.loads = (self.db.loads | self.loaded) - self.forgotten
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def s3(monkeypatch):
+    for name in ('AWS_ACCESS_KEY_ID', 'AWS_SECRET_ACCESS_KEY'):
+        monkeypatch.setenv(name, 'testing')
+    with mock_aws():
+        client = boto3.client('s3', region_name='us-east-1')
+        client.create_bucket(Bucket=BUCKET)
+        yield client
+
+
+@pytest.fixture
+def redshift(s3):
+    return FakeRedshift(s3)
+
+
+def loader(redshift, s3, **kwargs):
+    kwargs = {'parts': 2, 'copy_rows': 30, 'copy_interval': float('inf'), **kwargs}
+    manifest = ManifestLoader(redshift, s3, BUCKET, PREFIX, "IAM_ROLE 'arn'", columns=COLUMNS, **kwargs)
+    atexit.unregister(manifest.flush)
+    return manifest
+
+
+def batch(start, rows=10, label='ok'):
+    return pd.DataFrame({'sessionid': pd.array(range(start, start + rows), dtype='Int64'),
+                         'label': [label] * rows})
+
+
+def keys(s3, prefix=f'{PREFIX}/{TABLE}/'):
+    return sorted(o['Key'] for o in s3.list_objects_v2(Bucket=BUCKET, Prefix=prefix).get('Contents', []))
+
+
+@pytest.mark.parametrize('part_format', ['parquet', 'csv'])
+def test_batches_loaded_with_one_manifest_copy(redshift, s3, part_format):
+    manifest = loader(redshift, s3, part_format=part_format)
+    for i in range(2):
+        manifest.insert(batch(i * 10), TABLE)
+    assert redshift.rows == [] and len(keys(s3)) == 4
+    manifest.insert(batch(20), TABLE)
+    assert manifest.copies == 1
+    assert sorted(r['sessionid'] for r in redshift.rows) == list(range(30))
+    assert keys(s3) == [] and redshift.loads == set()
+
+
+def test_failed_copy_keeps_parts_staged(redshift, s3):
+    manifest = loader(redshift, s3)
+    redshift.down = True
+    # the batch is not staged when the staging area can't be recovered
+    with pytest.raises(psycopg2.OperationalError):
+        manifest.insert(batch(0), TABLE)
+    assert keys(s3) == []
+    redshift.down = False
+    manifest.insert(batch(0), TABLE)
+    redshift.down = True
+    for i in range(1, 3):
+        manifest.insert(batch(i * 10), TABLE)
+    assert redshift.rows == [] and len(keys(s3)) == 6
+    redshift.down = False
+    manifest.flush()
+    assert len(redshift.rows) == 30 and keys(s3) == []
+
+
+def test_parts_left_by_previous_run_loaded_at_start(redshift, s3):
+    loader(redshift, s3, copy_rows=1000).insert(batch(0), TABLE)
+    loader(redshift, s3).insert(batch(0, rows=0), TABLE)
+    assert sorted(r['sessionid'] for r in redshift.rows) == list(range(10))
+    assert keys(s3) == []
+
+
+def test_loaded_parts_left_by_crash_not_loaded_twice(redshift, s3, monkeypatch):
+    manifest = loader(redshift, s3)
+    with monkeypatch.context() as m:
+        m.setattr(s3, 'delete_objects', lambda **kwargs: (_ for _ in ()).throw(RuntimeError('S3 down')))
+        for i in range(3):
+            manifest.insert(batch(i * 10), TABLE)
+    assert len(redshift.rows) == 30 and len(redshift.loads) == 6
+    loader(redshift, s3).insert(batch(0, rows=0), TABLE)
+    assert len(redshift.rows) == 30
+    assert keys(s3) == [] and redshift.loads == set()
+
+
+def test_bad_part_quarantined(redshift, s3):
+    manifest = loader(redshift, s3, parts=1, max_failures=2)
+    manifest.insert(batch(0), TABLE)
+    manifest.insert(batch(10, label='bad'), TABLE)
+    manifest.insert(batch(20), TABLE)
+    assert sorted(r['sessionid'] for r in redshift.rows) == list(range(0, 10)) + list(range(20, 30))
+    assert len(manifest._staged[TABLE]) == 1
+    manifest.flush()
+    assert manifest._staged[TABLE] == []
+    quarantined = keys(s3, f'{PREFIX}/{TABLE}/errors/')
+    assert len(quarantined) == 1 and keys(s3) == quarantined
+    # not picked up again at start
+    restarted = loader(redshift, s3)
+    restarted.insert(batch(0, rows=0), TABLE)
+    assert restarted._staged[TABLE] == [] and len(redshift.rows) == 20
+
+
+def test_stage_id_required(monkeypatch):
+    for name, value in (('aws_access_key_id', 'testing'), ('aws_secret_access_key', 'testing'),
+                        ('region_name', 'us-east-1'), ('bucket', BUCKET)):
+        monkeypatch.setenv(name, value)
+    monkeypatch.delenv('redshift_stage_id', raising=False)
+    with pytest.raises(ValueError, match='redshift_stage_id'):
+        ManifestLoader.from_env(SimpleNamespace(engine=None))
@@ -0,0 +1,142 @@
+"""
+Synthetic workload: interleaved web sessions written to a replay file
+(see replay.py) that the consumer and the benchmarks can read instead of Kafka.
+
+    python workload.py <path> [sessions] [concurrency] [seed]
+
+Every session starts with SessionStart, visits a few pages (PageEvent, a DOM
+snapshot, resources), then mostly DOM mutations, mouse moves and clicks,
+some inputs and console logs, and ends with SessionEnd. `concurrency` sessions
+are in flight at once and their messages are interleaved as in the topics.
+"""
+import random
+import sys
+
+from msgcodec.codec import MessageCodec
+from msgcodec.messages import *
+from replay import write_record
+
+BROWSERS = [('Chrome', '100.0.4896'), ('Firefox', '99.0'), ('Safari', '15.4'), ('Edge', '100.0.1185')]
+OS = [('Windows', '10'), ('Mac OS X', '10.15.7'), ('Linux', ''), ('iOS', '15.4'), ('Android', '12')]
+COUNTRIES = ['US', 'FR', 'DE', 'GB', 'IN', 'BR', 'JP']
+TAGS = ['div', 'span', 'a', 'li', 'button', 'img', 'p', 'input', 'svg', 'path']
+PATHS = ['/', '/products', '/products?id={}', '/cart', '/checkout', '/account', '/search?q={}']
+ATTRIBUTES = [('class', 'btn btn-primary'), ('class', 'card col-md-4'), ('href', '/products?id={}'),
+              ('style', 'display: none;'), ('id', 'item-{}'), ('src', '/static/img/{}.png')]
+LABELS = ['Add to cart', 'Buy now', 'Next', 'Search', 'Sign in', 'Close', 'More']
+
+
+def session_messages(rnd: random.Random, start_ts: int, project_id: int):
+    """
+    Messages of one session, in order
+    """
+    ts = start_ts
+    browser, browser_version = rnd.choice(BROWSERS)
+    os_name, os_version = rnd.choice(OS)
+    yield SessionStart(ts, project_id, '3.5.10', '', f'{rnd.getrandbits(64):016x}',
+                       f'Mozilla/5.0 ({os_name}) {browser}/{browser_version}', os_name, os_version,
+                       browser, browser_version, '', rnd.choice(['desktop', 'mobile']),
+                       rnd.choice([4096, 8192, 16384]), rnd.choice([2172649472, 4294705152]),
+                       rnd.choice(COUNTRIES))
+    yield ConnectionInformation(rnd.choice([1, 2, 10]), rnd.choice(['wifi', 'cellular', 'ethernet']))
+    yield SetViewportSize(rnd.choice([1280, 1440, 1920, 390]), rnd.choice([720, 900, 1080, 844]))
+    if rnd.random() < 0.3:
+        yield UserID(f'user-{rnd.randrange(100000)}@example.com')
+    if rnd.random() < 0.2:
+        yield Metadata('plan', rnd.choice(['free', 'pro', 'enterprise']))
+    message_id = 0
+    referrer = rnd.choice(['https://google.com/', '', 'https://twitter.com/'])
+    for _ in range(rnd.randint(1, 6)):
+        url = 'https://example.com' + rnd.choice(PATHS).format(rnd.randrange(1000))
+        message_id += 1
+        yield SetPageLocation(url, referrer, ts)
+        timings = sorted(rnd.randrange(2000) for _ in range(12))
+        yield PageEvent(message_id, ts, url, referrer, True, *timings)
+        referrer = url
+        yield CreateDocument()
+        nodes = [0]
+        for _ in range(rnd.randint(50, 300)):
+            node_id = len(nodes)
+            yield CreateElementNode(node_id, rnd.choice(nodes), rnd.randrange(10), rnd.choice(TAGS), False)
+            nodes.append(node_id)
+            if rnd.random() < 0.5:
+                name, value = rnd.choice(ATTRIBUTES)
+                yield SetNodeAttribute(node_id, name, value.format(rnd.randrange(1000)))
+            if rnd.random() < 0.3:
+                nodes.append(len(nodes))
+                yield CreateTextNode(len(nodes) - 1, node_id, 0)
+                yield SetNodeData(len(nodes) - 1, rnd.choice(LABELS))
+        for _ in range(rnd.randint(3, 15)):
+            yield ResourceTiming(ts, rnd.randrange(500), rnd.randrange(100), 300, rnd.randrange(100000),
+                                 rnd.randrange(300000), f'https://example.com/static/{rnd.randrange(50)}.js',
+                                 rnd.choice(['script', 'img', 'css', 'fetch']))
+        for _ in range(rnd.randint(20, 200)):
+            ts += rnd.randrange(10, 2000)
+            r = rnd.random()
+            if r < 0.55:
+                yield MouseMove(rnd.randrange(1920), rnd.randrange(1080))
+            elif r < 0.7:
+                node_id = rnd.randrange(len(nodes))
+                name, value = rnd.choice(ATTRIBUTES)
+                yield SetNodeAttribute(node_id, name, value.format(rnd.randrange(1000)))
+            elif r < 0.8:
+                label = rnd.choice(LABELS)
+                message_id += 1
+                yield MouseClick(rnd.randrange(len(nodes)), rnd.randrange(3000), label)
+                yield ClickEvent(message_id, ts, rnd.randrange(3000), label)
+            elif r < 0.85:
+                message_id += 1
+                yield InputEvent(message_id, ts, '', True, rnd.choice(['email', 'search', 'name']))
+            elif r < 0.9:
+                yield ConsoleLog(rnd.choice(['log', 'warn', 'error']), 'cart updated')
+            elif r < 0.95:
+                yield PerformanceTrack(rnd.randrange(60), rnd.randrange(60), 30000000, rnd.randrange(30000000))
+            else:
+                yield Timestamp(ts)
+    yield SessionEnd(ts)
+
+
+def generate(path, sessions=1000, concurrency=100, seed=0, project_ids=(1, 2, 3)) -> int:
+    """
+    Write `sessions` sessions to `path`, returns the number of messages written
+    """
+    rnd = random.Random(seed)
+    encode = MessageCodec().encode
+    start_ts = 1650000000000
+    active = []
+    started = 0
+    written = 0
+
+    def start_session():
+        nonlocal started
+        if started == sessions:
+            return
+        started += 1
+        session_id = rnd.getrandbits(63)
+        active.append((session_id, session_messages(rnd, start_ts + rnd.randrange(3600000),
+                                                    rnd.choice(project_ids))))
+
+    for _ in range(concurrency):
+        start_session()
+    with open(path, 'wb') as f:
+        while active:
+            i = rnd.randrange(len(active))
+            session_id, messages = active[i]
+            message = next(messages, None)
+            if message is None:
+                active[i] = active[-1]
+                active.pop()
+                start_session()
+                continue
+            write_record(f, session_id, encode(message))
+            written += 1
+    return written
+
+
+if __name__ == '__main__':
+    args = sys.argv[1:]
+    if not args:
+        print(__doc__)
+        sys.exit(1)
+    n = generate(args[0], *(int(a) for a in args[1:4]))
+    print(f"{n} messages written to {args[0]}")